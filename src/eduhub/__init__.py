@@ -0,0 +1,96 @@
+
+# ### EduHub
+# The EduHub MongoDB toolkit as an importable package. Importing eduhub (or any
+# of its modules) does no I/O: no client is created, no collection is touched
+# and the environment is only read when the first connection is needed.
+#
+#   import eduhub
+#
+#   eduhub.setup()                                  # collections, validators, indexes
+#   eduhub.seed_data(counts={"users": 1000})        # synthetic data
+#   eduhub.report("top_students", limit=10)         # any eduhub.analytics report
+#   eduhub.benchmark_queries(["course_by_id"])      # registry queries, p50/p95/p99
+#   eduhub.close()
+#
+# The module-level functions use one shared client built by eduhub.client from
+# the EDUHUB_* settings; pass db= to run against another database. The same
+# operations are available from the command line:
+#
+#   python -m eduhub --help
+
+__all__ = ["get_client", "get_db", "close", "setup", "seed_data", "report", "benchmark_queries"]
+
+
+
+
+## Shared client
+def get_client():
+    """Returns the shared MongoClient, creating it on first use."""
+    from .client import get_shared_client
+    return get_shared_client()[0]
+
+
+def get_db():
+    """Returns the configured EduHub database of the shared client."""
+    from .client import get_shared_client
+    client, settings, _ = get_shared_client()
+    return client[settings["database"]]
+
+
+def close():
+    """Closes the shared client."""
+    from .client import close_shared_client
+    close_shared_client()
+
+
+
+
+## Operations
+def setup(db=None, validation_level="strict", indexes=True):
+    """
+    Creates the collections with their validators and syncs the index manifest.
+    Safe to run repeatedly.
+
+    Returns:
+        dict: {"collections": setup_database() result, "indexes": sync_indexes() report or None}.
+    """
+    from .schema import setup_database
+    from .indexes import sync_indexes
+    db = db if db is not None else get_db()
+    return {
+        "collections": setup_database(db, validation_level=validation_level),
+        "indexes": sync_indexes(db) if indexes else None
+    }
+
+
+def seed_data(db=None, **options):
+    """
+    Seeds synthetic data; options are passed to eduhub.seed.seed_database.
+    Worker processes (workers > 1) connect with the shared client's settings.
+    """
+    from .client import get_shared_client
+    from .seed import seed_database
+    if db is None:
+        db = get_db()
+        options.setdefault("settings", get_shared_client()[1])
+    return seed_database(db, **options)
+
+
+def report(name, db=None, **params):
+    """Runs an eduhub.analytics report by name and returns its rows."""
+    from .analytics import run_report
+    return run_report(db if db is not None else get_db(), name, **params)
+
+
+def benchmark_queries(names=None, db=None, warmup=5, iterations=50):
+    """
+    Benchmarks registry queries (all of them when names is empty).
+
+    Returns:
+        list: One eduhub.benchmark result dict per query.
+    """
+    from .registry import build_query_registry, select_queries
+    from .benchmark import run_benchmark
+    db = db if db is not None else get_db()
+    specs = select_queries(build_query_registry(db), names)
+    return run_benchmark(db, specs, warmup, iterations)
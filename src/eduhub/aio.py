@@ -0,0 +1,423 @@
+
+# ### EduHub Async API
+# asyncio versions of the Section 3 CRUD helpers and the Section 4 reports,
+# for services that serve many requests from one event loop. Uses PyMongo's
+# AsyncMongoClient and falls back to Motor when it is not available; this is
+# an optional dependency (pip install "pymongo>=4.9", or pip install motor),
+# so on older PyMongo without Motor the module imports but its helpers raise
+# ImportError.
+#
+# Filters, updates, pipelines and document builders are shared with the
+# synchronous modules (eduhub.writes, eduhub.search, eduhub.rollups, ...), so
+# both APIs always issue the same queries. Writes invalidate the
+# in-process query cache like their synchronous counterparts; reads go straight
+# to the server, since the cache wraps synchronous loaders.
+#
+#   python -m eduhub async dashboard
+#   python -m eduhub async bench --iterations 20
+
+
+
+## Importing libraries
+from datetime import datetime, timezone
+from .analytics import REPORT_PIPELINES
+from .cache import query_cache
+from .client import add_connection_arguments, create_client, load_client_settings, settings_from_args
+from .reads import course_roster_pipeline, DEFAULT_PAGE_SIZE
+from .search import with_title_trigrams, with_trigram_update, substring_query, TRIGRAM_FIELD
+from .writes import (course_tags_update, enrollment_filter, grade_update, lesson_filter, profile_update,
+                     publish_update, DELETED_ENROLLMENT_PROJECTION)
+from .denormalize import course_snapshot, snapshot_update, COURSE_SNAPSHOT_PROJECTION
+from .rollups import bucket_updates, moved_bucket_update, ROLLUP_COLLECTIONS, UNCATEGORIZED
+from .stats import removal_tombstones, TOMBSTONES
+import argparse
+import asyncio
+import inspect
+import json
+import statistics
+import time
+
+try:
+    from pymongo import AsyncMongoClient
+except ImportError:
+    try:
+        from motor.motor_asyncio import AsyncIOMotorClient as AsyncMongoClient
+    except ImportError:
+        AsyncMongoClient = None
+
+
+
+DEFAULT_URI = "mongodb://localhost:27017/"
+
+# Per-query timeout (seconds) and number of queries run at once by the dashboard
+DEFAULT_QUERY_TIMEOUT = 5.0
+DEFAULT_MAX_CONCURRENCY = 4
+
+# Report name -> keyword arguments of its pipeline builder
+DASHBOARD_REPORTS = {
+    "completion_rate_by_course": {},
+    "top_students": {"limit": 5},
+    "revenue_per_instructor": {"denormalized": True},
+    "avg_rating_per_instructor": {}
+}
+
+
+
+
+## Client
+def get_async_client(uri=DEFAULT_URI, **options):
+    """
+    Returns an asyncio MongoDB client (PyMongo AsyncMongoClient or Motor).
+
+    Raises:
+        ImportError: If neither PyMongo 4.9+ nor Motor is installed.
+    """
+    if AsyncMongoClient is None:
+        raise ImportError('The async API needs PyMongo 4.9+ or Motor (pip install "pymongo>=4.9").')
+    return AsyncMongoClient(uri, **options)
+
+
+async def close_async_client(client):
+    """Closes an async client (a coroutine in PyMongo, a plain call in Motor)."""
+    closed = client.close()
+    if inspect.isawaitable(closed):
+        await closed
+
+
+async def _to_list(cursor, length=None):
+    # PyMongo's async aggregate() is a coroutine returning a cursor; Motor's returns the cursor
+    if inspect.isawaitable(cursor):
+        cursor = await cursor
+    return await cursor.to_list(length)
+
+
+
+
+## Section 3.1: inserts
+async def insert_user(db, user):
+    """Inserts a user."""
+    result = await db.users.insert_one(user)
+    query_cache.invalidate("users")
+    return result
+
+
+async def insert_course(db, course):
+    """Inserts a course together with its title trigrams."""
+    result = await db.courses.insert_one(with_title_trigrams(course))
+    query_cache.invalidate("courses")
+    return result
+
+
+async def enroll_student(db, enrollment):
+    """
+    Inserts an enrollment with its course snapshot and counts it in the
+    enrollment rollups (see eduhub.denormalize.enroll_student).
+
+    Raises:
+        ValueError: If the referenced course does not exist.
+    """
+    course = await db.courses.find_one({"courseId": enrollment["courseId"]}, COURSE_SNAPSHOT_PROJECTION)
+    if course is None:
+        raise ValueError(f"Course '{enrollment['courseId']}' does not exist.")
+
+    now = datetime.now(timezone.utc)
+    document = {"updatedAt": now, **enrollment, **course_snapshot(course)}
+    result = await db.enrollments.insert_one(document)
+    await _record_enrollment(db, document)
+    query_cache.invalidate("enrollments")
+    return result
+
+
+async def insert_lesson(db, lesson):
+    """Adds a lesson to a course."""
+    result = await db.lessons.insert_one(lesson)
+    query_cache.invalidate("lessons")
+    return result
+
+
+async def _record_enrollment(db, enrollment, delta=1):
+    await asyncio.gather(*(db[collection].update_one(filter, update, upsert=upsert)
+                           for collection, filter, update, upsert in bucket_updates(enrollment, delta)))
+
+
+
+
+## Section 3.2: reads
+async def find_user_by_email(db, email, projection=None):
+    """Returns the user with an email address, or None."""
+    return await db.users.find_one({"email": email}, projection)
+
+
+async def find_active_students(db, projection=None):
+    """Returns all active students."""
+    return await _to_list(db.users.find({"role": "student", "isActive": True}, projection))
+
+
+async def find_courses_by_category(db, category, projection=None):
+    """Returns all courses in a category."""
+    return await _to_list(db.courses.find({"category": category}, projection))
+
+
+async def course_roster(db, course_id, active_enrollments_only=False, active_users_only=False,
+                        after=None, page_size=DEFAULT_PAGE_SIZE):
+    """Returns one page of the students enrolled in a course (see eduhub.reads.course_roster)."""
+    pipeline = course_roster_pipeline(course_id, active_enrollments_only, active_users_only, after, page_size)
+    return await _to_list(db.enrollments.aggregate(pipeline))
+
+
+async def substring_search_courses(db, term, limit=None):
+    """Case-insensitive infix search on course titles, backed by the trigram index."""
+    term = term.strip()
+    if not term:
+        return []
+    cursor = db.courses.find(substring_query(term), {TRIGRAM_FIELD: 0})
+    if limit:
+        cursor = cursor.limit(limit)
+    return await _to_list(cursor)
+
+
+
+
+## Section 3.3: updates and deletes
+async def update_user_profile(db, user_id, profile):
+    """Sets fields of a user's embedded profile."""
+    result = await db.users.update_one({"userId": user_id}, profile_update(profile))
+    query_cache.invalidate("users")
+    return result
+
+
+async def update_course(db, course_id, update):
+    """
+    Applies an update to one course, refreshing the trigrams when the title
+    changes, copying category / instructorId changes onto its enrollments and
+    moving its rollup buckets to a new category (see eduhub.denormalize).
+    """
+    changes = update.get("$set", {})
+    previous = None
+    if "category" in changes:
+        previous = await db.courses.find_one({"courseId": course_id}, {"_id": 0, "category": 1})
+    result = await db.courses.update_one({"courseId": course_id}, with_trigram_update(update))
+    query_cache.invalidate("courses")
+    snapshot = snapshot_update(changes)
+    if snapshot is not None:
+        await db.enrollments.update_many({"courseId": course_id}, snapshot)
+        query_cache.invalidate("enrollments")
+    if previous is not None:
+        await _move_course_category(db, course_id, previous.get("category"), changes["category"])
+    return result
+
+
+async def _move_course_category(db, course_id, old_category, new_category):
+    old_key = old_category or UNCATEGORIZED
+    if old_key == (new_category or UNCATEGORIZED):
+        return
+    for collection in ROLLUP_COLLECTIONS.values():
+        buckets = await db[collection].find({"courseId": course_id, "category": old_key}, {"_id": 1}).to_list(None)
+        for bucket in buckets:
+            removed = await db[collection].find_one_and_delete({"_id": bucket["_id"]})
+            if removed is not None:
+                filter, update = moved_bucket_update(removed, new_category)
+                await db[collection].update_one(filter, update, upsert=True)
+
+
+async def publish_course(db, course_id):
+    """Marks a course as published."""
+    return await update_course(db, course_id, publish_update())
+
+
+async def add_course_tags(db, course_id, tags):
+    """Adds tags to a course, skipping the ones it already has."""
+    return await update_course(db, course_id, course_tags_update(tags))
+
+
+async def grade_submission(db, submission_id, grade, feedback=None):
+    """Records the grade (and optional feedback) of a submission."""
+    result = await db.submissions.update_one({"submissionId": submission_id}, grade_update(grade, feedback))
+    query_cache.invalidate("submissions")
+    return result
+
+
+async def soft_delete_user(db, user_id):
+    """Deactivates a user instead of removing the document."""
+    result = await db.users.update_one({"userId": user_id}, {"$set": {"isActive": False}})
+    query_cache.invalidate("users")
+    return result
+
+
+async def delete_enrollment(db, student_id, course_id):
+    """Removes a student's enrollment in a course (see eduhub.writes.delete_enrollment)."""
+    deleted = await db.enrollments.find_one_and_delete(enrollment_filter(student_id, course_id),
+                                                       DELETED_ENROLLMENT_PROJECTION)
+    if deleted is not None:
+        await db[TOMBSTONES].insert_many(removal_tombstones([deleted]))
+    if deleted is not None and "enrolledAt" in deleted:
+        await _record_enrollment(db, deleted, delta=-1)
+    query_cache.invalidate("enrollments")
+    return deleted
+
+
+async def remove_lesson(db, course_id, order):
+    """Removes the lesson at a given position of a course."""
+    result = await db.lessons.delete_one(lesson_filter(course_id, order))
+    query_cache.invalidate("lessons")
+    return result
+
+
+
+
+## Section 4: reports
+async def run_report(db, name, timeout=None, **params):
+    """
+    Runs one of the eduhub.analytics reports.
+
+    Parameters:
+        db (AsyncDatabase): The async database object.
+        name (str): Key of eduhub.analytics.REPORT_PIPELINES.
+        timeout (float): Optional server-side limit in seconds (maxTimeMS).
+        **params: Arguments of the report's pipeline builder (e.g. denormalized=True).
+
+    Returns:
+        list: The report rows.
+    """
+    collection, build = REPORT_PIPELINES[name]
+    options = {"allowDiskUse": True}
+    if timeout:
+        options["maxTimeMS"] = int(timeout * 1000)
+    return await _to_list(db[collection].aggregate(build(**params), **options))
+
+
+async def instructor_dashboard(db, reports=None, timeout=DEFAULT_QUERY_TIMEOUT,
+                               max_concurrency=DEFAULT_MAX_CONCURRENCY):
+    """
+    Runs the dashboard reports concurrently.
+
+    Each report gets its own timeout (enforced on the client with
+    asyncio.wait_for and on the server with maxTimeMS), and at most
+    max_concurrency reports run at once, so one dashboard cannot take every
+    pooled connection. A failed or timed-out report does not fail the others.
+
+    Parameters:
+        db (AsyncDatabase): The async database object.
+        reports (dict): Report name -> builder arguments (default: DASHBOARD_REPORTS).
+        timeout (float): Seconds allowed per report.
+        max_concurrency (int): Reports running at the same time.
+
+    Returns:
+        dict: {"results": {name: rows}, "errors": {name: message},
+               "timings": {name: ms}, "elapsedMs": total wall time}.
+    """
+    reports = reports if reports is not None else DASHBOARD_REPORTS
+    semaphore = asyncio.Semaphore(max_concurrency)
+    timings = {}
+
+    async def run(name, params):
+        async with semaphore:
+            start = time.perf_counter()
+            try:
+                return await asyncio.wait_for(run_report(db, name, timeout=timeout, **params), timeout)
+            finally:
+                timings[name] = round((time.perf_counter() - start) * 1000, 3)
+
+    start = time.perf_counter()
+    outcomes = await asyncio.gather(*(run(name, params) for name, params in reports.items()),
+                                    return_exceptions=True)
+
+    results, errors = {}, {}
+    for name, outcome in zip(reports, outcomes):
+        if isinstance(outcome, asyncio.TimeoutError):
+            errors[name] = f"timed out after {timeout}s"
+        elif isinstance(outcome, Exception):
+            errors[name] = f"{type(outcome).__name__}: {outcome}"
+        else:
+            results[name] = outcome
+
+    return {"results": results, "errors": errors, "timings": timings,
+            "elapsedMs": round((time.perf_counter() - start) * 1000, 3)}
+
+
+
+
+## Benchmark: sequential vs concurrent dashboard
+def sequential_dashboard(db, reports=None):
+    """Runs the dashboard reports one after another with the synchronous client."""
+    reports = reports if reports is not None else DASHBOARD_REPORTS
+    results = {}
+    for name, params in reports.items():
+        collection, build = REPORT_PIPELINES[name]
+        results[name] = list(db[collection].aggregate(build(**params), allowDiskUse=True))
+    return results
+
+
+async def _timed_async_runs(settings, iterations, max_concurrency):
+    client = create_client(settings, async_client=True)
+    try:
+        db = client[settings["database"]]
+        await instructor_dashboard(db, max_concurrency=max_concurrency)  # warm the pool
+        timings = []
+        for _ in range(iterations):
+            timings.append((await instructor_dashboard(db, max_concurrency=max_concurrency))["elapsedMs"])
+        return timings
+    finally:
+        await close_async_client(client)
+
+
+def benchmark_dashboard(settings=None, iterations=20, max_concurrency=DEFAULT_MAX_CONCURRENCY):
+    """
+    Compares the dashboard latency of sequential synchronous reports with the
+    concurrent async dashboard. Both clients are built from the same settings
+    (default: load_client_settings()).
+
+    Returns:
+        dict: p50/mean latency (ms) for each mode and the p50 speedup.
+    """
+    settings = settings or load_client_settings()
+    db = create_client(settings)[settings["database"]]
+    sequential_dashboard(db)  # warmup
+    sequential = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        sequential_dashboard(db)
+        sequential.append((time.perf_counter() - start) * 1000)
+
+    concurrent = asyncio.run(_timed_async_runs(settings, iterations, max_concurrency))
+
+    summary = {}
+    for mode, timings in (("sequential", sequential), ("concurrent", concurrent)):
+        summary[mode] = {"p50": round(statistics.median(timings), 3), "mean": round(statistics.fmean(timings), 3)}
+    summary["speedup"] = round(summary["sequential"]["p50"] / summary["concurrent"]["p50"], 2)
+    return summary
+
+
+
+
+## Command line entry point
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run or benchmark the EduHub async dashboard.")
+    parser.add_argument("command", choices=["dashboard", "bench"])
+    add_connection_arguments(parser)
+    parser.add_argument("--iterations", type=int, default=20)
+    parser.add_argument("--timeout", type=float, default=DEFAULT_QUERY_TIMEOUT)
+    parser.add_argument("--max-concurrency", type=int, default=DEFAULT_MAX_CONCURRENCY)
+    args = parser.parse_args(argv)
+    settings = settings_from_args(args)
+
+    if args.command == "bench":
+        print(json.dumps(benchmark_dashboard(settings, args.iterations, args.max_concurrency), indent=4))
+        return
+
+    async def dashboard():
+        client = create_client(settings, async_client=True)
+        try:
+            return await instructor_dashboard(client[settings["database"]], timeout=args.timeout,
+                                              max_concurrency=args.max_concurrency)
+        finally:
+            await close_async_client(client)
+
+    report = asyncio.run(dashboard())
+    print(json.dumps({key: report[key] for key in ("errors", "timings", "elapsedMs")}, indent=4))
+    for name, rows in report["results"].items():
+        print(f"✅ {name}: {len(rows)} rows")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,400 @@
+
+# ### EduHub Analytics Reports
+# Section 4 aggregation pipelines as reusable functions. Each report has a
+# *_pipeline() builder (used by the benchmark and explain tooling) and a
+# function that runs it.
+#
+# Reports that need course attributes can run in two modes:
+#   - denormalized=False: $lookup every enrollment into courses (always correct,
+#     cost grows with enrollments x lookup).
+#   - denormalized=True: read the category / instructorId / pricePaid snapshot
+#     stored on each enrollment (see eduhub.denormalize) with a single $group.
+#
+#   python -m eduhub report top_students --limit 10
+#   python -m eduhub report popular_categories --denormalized
+
+
+
+## Importing libraries
+from bson import json_util
+from datetime import datetime, timezone, timedelta
+from .client import add_connection_arguments, connect_from_args
+import argparse
+import inspect
+
+
+
+# Lookup stages used by the non-denormalized reports
+COURSE_LOOKUP_STAGES = [
+    {
+        "$lookup": {
+            "from": "courses",
+            "localField": "courseId",
+            "foreignField": "courseId",
+            "as": "course"
+        }
+    },
+    {"$unwind": "$course"}
+]
+
+# Enrollments without a snapshot are skipped, as $unwind skips those whose course
+# is missing. Seeding, loading and enroll_student() all store the snapshot;
+# enrollments written any other way need `python -m eduhub denormalize backfill`
+# (main() warns when it finds one).
+SNAPSHOT_MATCH_STAGE = {"$match": {"instructorId": {"$exists": True}}}
+
+
+
+
+def _course_field(field, denormalized):
+    return f"${field}" if denormalized else f"$course.{field}"
+
+
+def _source_stages(denormalized):
+    return [SNAPSHOT_MATCH_STAGE] if denormalized else list(COURSE_LOOKUP_STAGES)
+
+
+
+
+## Section 4.2: course enrollment statistics
+def enrollments_per_course_pipeline():
+    return [
+        {
+            "$group": {
+                "_id": "$courseId",
+                "totalEnrollments": {"$sum": 1}
+            }
+        }
+    ]
+
+
+def enrollments_per_course(db):
+    """Counts enrollments per course: {"_id": courseId, "totalEnrollments": n}."""
+    return list(db.enrollments.aggregate(enrollments_per_course_pipeline()))
+
+
+def avg_course_rating_pipeline():
+    return [
+        {
+            "$unwind": "$rating"
+        },
+        {
+            "$group": {
+                "_id": "$courseId",
+                "avgRating": {"$avg": "$rating"}
+            }
+        }
+    ]
+
+
+def avg_course_rating(db):
+    """Average rating per course: {"_id": courseId, "avgRating": x}."""
+    return list(db.courses.aggregate(avg_course_rating_pipeline()))
+
+
+def enrollment_by_category_pipeline(denormalized=False):
+    return _source_stages(denormalized) + [
+        {
+            "$group": {
+                "_id": _course_field("category", denormalized),
+                "totalEnrollments": {"$sum": 1}
+            }
+        }
+    ]
+
+
+def enrollment_by_category(db, denormalized=False):
+    """
+    Counts enrollments per course category.
+
+    Parameters:
+        db (Database): The connected MongoDB database object.
+        denormalized (bool): Read the category snapshot on enrollments instead of $lookup.
+
+    Returns:
+        list: Documents of the form {"_id": category, "totalEnrollments": n}.
+    """
+    return list(db.enrollments.aggregate(enrollment_by_category_pipeline(denormalized)))
+
+
+
+
+## Section 4.3: student performance
+def avg_grade_per_student_pipeline():
+    return [
+        {
+            "$group": {
+                "_id": "$studentId",
+                "averageGrade": {"$avg": "$grade"}
+            }
+        }
+    ]
+
+
+def avg_grade_per_student(db):
+    """Average submission grade per student: {"_id": studentId, "averageGrade": x}."""
+    return list(db.submissions.aggregate(avg_grade_per_student_pipeline()))
+
+
+def completion_rate_by_course_pipeline():
+    return [
+        {
+            "$group": {
+                "_id": "$courseId",
+                "totalEnrolled": {"$sum": 1},
+                "completedCount": {
+                    "$sum": {
+                        "$cond": [{"$eq": ["$status", "completed"]}, 1, 0]
+                    }
+                }
+            }
+        },
+        {
+            "$project": {
+                "completionRate": {
+                    "$cond": [
+                        {"$eq": ["$totalEnrolled", 0]},
+                        0,
+                        {"$multiply": [{"$divide": ["$completedCount", "$totalEnrolled"]}, 100]}
+                    ]
+                }
+            }
+        }
+    ]
+
+
+def completion_rate_by_course(db):
+    """Percentage of completed enrollments per course: {"_id": courseId, "completionRate": pct}."""
+    return list(db.enrollments.aggregate(completion_rate_by_course_pipeline()))
+
+
+def top_students_pipeline(limit=5):
+    return [
+        {
+            "$group": {
+                "_id": "$studentId",
+                "avgGrade": {"$avg": "$grade"}
+            }
+        },
+        {"$sort": {"avgGrade": -1}},
+        {"$limit": limit}
+    ]
+
+
+def top_students(db, limit=5):
+    """Students with the highest average grade: {"_id": studentId, "avgGrade": x}."""
+    return list(db.submissions.aggregate(top_students_pipeline(limit)))
+
+
+
+
+## Section 4.3 (3): instructor analytics
+def students_per_instructor_pipeline(denormalized=False):
+    return _source_stages(denormalized) + [
+        {
+            "$group": {
+                "_id": _course_field("instructorId", denormalized),
+                "uniqueStudents": {"$addToSet": "$studentId"}
+            }
+        },
+        {
+            "$project": {
+                "totalStudents": {"$size": "$uniqueStudents"}
+            }
+        }
+    ]
+
+
+def students_per_instructor(db, denormalized=False):
+    """
+    Counts the distinct students taught by each instructor.
+
+    Returns:
+        list: Documents of the form {"_id": instructorId, "totalStudents": n}.
+    """
+    return list(db.enrollments.aggregate(students_per_instructor_pipeline(denormalized), allowDiskUse=True))
+
+
+def avg_rating_per_instructor_pipeline():
+    return [
+        {
+            "$unwind": "$rating"
+        },
+        {
+            "$group": {
+                "_id": "$instructorId",
+                "avgRating": {"$avg": "$rating"}
+            }
+        }
+    ]
+
+
+def avg_rating_per_instructor(db):
+    """Average course rating per instructor: {"_id": instructorId, "avgRating": x}."""
+    return list(db.courses.aggregate(avg_rating_per_instructor_pipeline()))
+
+
+def revenue_per_instructor_pipeline(denormalized=False):
+    price = "$pricePaid" if denormalized else "$course.price"
+    return _source_stages(denormalized) + [
+        {
+            "$group": {
+                "_id": _course_field("instructorId", denormalized),
+                "totalRevenue": {"$sum": price}
+            }
+        }
+    ]
+
+
+def revenue_per_instructor(db, denormalized=False):
+    """
+    Sums enrollment revenue per instructor.
+
+    With denormalized=True the revenue is the pricePaid recorded on each
+    enrollment; otherwise it is the course's current price.
+
+    Returns:
+        list: Documents of the form {"_id": instructorId, "totalRevenue": amount}.
+    """
+    return list(db.enrollments.aggregate(revenue_per_instructor_pipeline(denormalized)))
+
+
+
+
+## Section 4.4: advanced analytics
+def monthly_enrollments_pipeline(now=None):
+    now = now or datetime.now(timezone.utc)
+    return [
+        {
+            "$match": {
+                "enrolledAt": {
+                    "$gte": now - timedelta(days=365)
+                }
+            }
+        },
+        {
+            "$group": {
+                "_id": {
+                    "year": {"$year": "$enrolledAt"},
+                    "month": {"$month": "$enrolledAt"}
+                },
+                "count": {"$sum": 1}
+            }
+        },
+        {"$sort": {"_id.year": 1, "_id.month": 1}}
+    ]
+
+
+def monthly_enrollments(db, now=None):
+    """Enrollments per calendar month over the last 12 months, oldest first."""
+    return list(db.enrollments.aggregate(monthly_enrollments_pipeline(now)))
+
+
+def popular_categories_pipeline(denormalized=False):
+    return _source_stages(denormalized) + [
+        {
+            "$group": {
+                "_id": _course_field("category", denormalized),
+                "enrollmentCount": {"$sum": 1}
+            }
+        },
+        {"$sort": {"enrollmentCount": -1}}
+    ]
+
+
+def popular_categories(db, denormalized=False):
+    """
+    Ranks course categories by enrollment count.
+
+    Returns:
+        list: Documents of the form {"_id": category, "enrollmentCount": n}, most popular first.
+    """
+    return list(db.enrollments.aggregate(popular_categories_pipeline(denormalized)))
+
+
+def avg_progress_per_student_pipeline():
+    return [
+        {
+            "$group": {
+                "_id": "$studentId",
+                "avgProgress": {"$avg": "$progress"}
+            }
+        }
+    ]
+
+
+def avg_progress_per_student(db):
+    """Average enrollment progress per student: {"_id": studentId, "avgProgress": x}."""
+    return list(db.enrollments.aggregate(avg_progress_per_student_pipeline()))
+
+
+
+
+# Report name -> (source collection, pipeline builder)
+REPORT_PIPELINES = {
+    "enrollments_per_course": ("enrollments", enrollments_per_course_pipeline),
+    "avg_course_rating": ("courses", avg_course_rating_pipeline),
+    "enrollment_by_category": ("enrollments", enrollment_by_category_pipeline),
+    "avg_grade_per_student": ("submissions", avg_grade_per_student_pipeline),
+    "completion_rate_by_course": ("enrollments", completion_rate_by_course_pipeline),
+    "top_students": ("submissions", top_students_pipeline),
+    "students_per_instructor": ("enrollments", students_per_instructor_pipeline),
+    "avg_rating_per_instructor": ("courses", avg_rating_per_instructor_pipeline),
+    "revenue_per_instructor": ("enrollments", revenue_per_instructor_pipeline),
+    "monthly_enrollments": ("enrollments", monthly_enrollments_pipeline),
+    "popular_categories": ("enrollments", popular_categories_pipeline),
+    "avg_progress_per_student": ("enrollments", avg_progress_per_student_pipeline)
+}
+
+
+def run_report(db, name, **params):
+    """
+    Runs a report by name.
+
+    Parameters:
+        db (Database): The connected MongoDB database object.
+        name (str): Key of REPORT_PIPELINES.
+        **params: Arguments of the report's pipeline builder (e.g. denormalized=True, limit=10).
+
+    Returns:
+        list: The report rows.
+    """
+    if name not in REPORT_PIPELINES:
+        raise ValueError(f"Unknown report: {name}")
+    collection, build = REPORT_PIPELINES[name]
+    return list(db[collection].aggregate(build(**params), allowDiskUse=True))
+
+
+def report_params(name, **options):
+    """
+    Keeps the options (e.g. from command line flags) that the report's pipeline
+    builder accepts, dropping unset ones (None or False).
+    """
+    accepted = inspect.signature(REPORT_PIPELINES[name][1]).parameters
+    return {key: value for key, value in options.items()
+            if key in accepted and value is not None and value is not False}
+
+
+
+
+## Command line entry point
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run an EduHub analytics report.")
+    parser.add_argument("name", choices=sorted(REPORT_PIPELINES))
+    add_connection_arguments(parser)
+    parser.add_argument("--denormalized", action="store_true")
+    parser.add_argument("--limit", type=int)
+    args = parser.parse_args(argv)
+    params = report_params(args.name, denormalized=args.denormalized, limit=args.limit)
+
+    db, _ = connect_from_args(args)
+    if args.denormalized and db.enrollments.find_one({"instructorId": {"$exists": False}}, {"_id": 1}):
+        print("❌ Some enrollments have no course snapshot and are left out; "
+              "run `python -m eduhub denormalize backfill` first.")
+    rows = run_report(db, args.name, **params)
+    print(json_util.dumps(rows, indent=4))
+    print(f"✅ {args.name}: {len(rows)} rows")
+
+
+if __name__ == "__main__":
+    main()
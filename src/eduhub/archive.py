@@ -0,0 +1,243 @@
+
+# ### EduHub Archiving
+# Moves old enrollments and assignments out of the hot collections into
+# archived_enrollments / archived_assignments, so the queries on current data
+# stop scanning rows nobody reads anymore.
+#
+# The job walks the source in _id order, one chunk at a time: the chunk is
+# upserted into the archive, enrollments get their stats tombstones, then the
+# chunk is deleted from the source and the last _id is stored in
+# archive_checkpoints. Every step is idempotent, so a run that crashes at any
+# point resumes from the checkpoint (with the cutoff it started with) and
+# neither loses nor duplicates documents, nor leaves a deleted enrollment
+# without its tombstone.
+#
+#   python -m eduhub archive run --max-docs-per-second 5000
+#   python -m eduhub archive status
+
+
+
+## Importing libraries
+from pymongo import ReplaceOne
+from datetime import datetime, timezone, timedelta
+from .cache import query_cache
+from .stats import record_removed_enrollments
+from .client import add_connection_arguments, connect_from_args
+import argparse
+import time
+
+
+
+CHECKPOINTS = "archive_checkpoints"
+
+DEFAULT_ARCHIVE_BATCH_SIZE = 1000
+
+# Source collection -> archive collection and default age (days) before a document qualifies
+ARCHIVE_POLICIES = {
+    "enrollments": {"target": "archived_enrollments", "age_days": 365},
+    "assignments": {"target": "archived_assignments", "age_days": 180}
+}
+
+
+
+
+## Policies
+def archive_filter(collection, cutoff):
+    """
+    Returns the filter of the documents of a collection that qualify for archiving.
+
+    - enrollments: completed or dropped, enrolled before the cutoff.
+    - assignments: due before the cutoff.
+    """
+    if collection == "enrollments":
+        return {"status": {"$in": ["completed", "dropped"]}, "enrolledAt": {"$lt": cutoff}}
+    if collection == "assignments":
+        return {"dueDate": {"$lt": cutoff}}
+    raise ValueError(f"No archive policy for {collection}")
+
+
+def archive_collection_name(collection):
+    """Returns the name of the archive collection of a source collection."""
+    return ARCHIVE_POLICIES[collection]["target"]
+
+
+
+
+## Checkpoints
+def get_checkpoint(db, collection):
+    """Returns the stored progress of the archive job for a collection, or None."""
+    return db[CHECKPOINTS].find_one({"_id": collection})
+
+
+def _save_checkpoint(db, collection, fields):
+    db[CHECKPOINTS].update_one(
+        {"_id": collection},
+        {"$set": {**fields, "updatedAt": datetime.now(timezone.utc)}},
+        upsert=True
+    )
+
+
+
+
+## Archive job
+def _move_chunk(db, collection, target, docs, query):
+    ids = [doc["_id"] for doc in docs]
+    db[target].bulk_write([ReplaceOne({"_id": doc["_id"]}, doc, upsert=True) for doc in docs], ordered=False)
+    if collection == "enrollments":
+        # Before the delete, so a crash in between cannot lose them; a tombstone of
+        # an enrollment that ends up staying hot only makes the refresh regroup it
+        record_removed_enrollments(db, docs)
+
+    # Only delete what still qualifies; a document updated since it was read
+    # stays hot and its archive copy is removed again.
+    deleted = db[collection].delete_many({**query, "_id": {"$in": ids}}).deleted_count
+    if deleted < len(ids):
+        kept = [doc["_id"] for doc in db[collection].find({"_id": {"$in": ids}}, {"_id": 1})]
+        if kept:
+            db[target].delete_many({"_id": {"$in": kept}})
+    return deleted
+
+
+def archive_old_records(db, collection, cutoff=None, batch_size=DEFAULT_ARCHIVE_BATCH_SIZE,
+                        max_docs_per_second=None, max_batches=None, restart=False):
+    """
+    Moves the qualifying documents of a collection into its archive collection.
+
+    An unfinished run is resumed from its checkpoint with the cutoff it started
+    with; pass restart=True to start over with a new cutoff. Moved enrollments
+    leave stats tombstones, so the next refresh_stats() (eduhub.stats) regroups
+    their courses and students.
+
+    Parameters:
+        db (Database): The connected MongoDB database object.
+        collection (str): "enrollments" or "assignments".
+        cutoff (datetime): Documents older than this qualify (default: the policy age).
+        batch_size (int): Documents moved per chunk.
+        max_docs_per_second (float): Throughput limit; the job sleeps between chunks to stay under it.
+        max_batches (int): Stop after this many chunks (the checkpoint allows resuming later).
+        restart (bool): Ignore an unfinished checkpoint.
+
+    Returns:
+        dict: {"collection", "archive", "cutoff", "moved", "batches", "finished", "seconds"}.
+    """
+    target = archive_collection_name(collection)
+    checkpoint = get_checkpoint(db, collection)
+
+    if checkpoint and not checkpoint.get("finishedAt") and not restart:
+        cutoff, last_id = checkpoint["cutoff"], checkpoint.get("lastId")
+    else:
+        cutoff = cutoff or datetime.now(timezone.utc) - timedelta(days=ARCHIVE_POLICIES[collection]["age_days"])
+        last_id = None
+        _save_checkpoint(db, collection, {"cutoff": cutoff, "lastId": None, "moved": 0,
+                                          "startedAt": datetime.now(timezone.utc), "finishedAt": None})
+
+    query = archive_filter(collection, cutoff)
+    moved = batches = 0
+    finished = False
+    start = time.perf_counter()
+
+    try:
+        while max_batches is None or batches < max_batches:
+            chunk_query = dict(query)
+            if last_id is not None:
+                chunk_query["_id"] = {"$gt": last_id}
+            docs = list(db[collection].find(chunk_query).sort("_id", 1).limit(batch_size))
+            if not docs:
+                finished = True
+                break
+
+            deleted = _move_chunk(db, collection, target, docs, query)
+            last_id = docs[-1]["_id"]
+            moved += deleted
+            batches += 1
+            db[CHECKPOINTS].update_one({"_id": collection}, {"$set": {"lastId": last_id}, "$inc": {"moved": deleted}})
+
+            if max_docs_per_second:
+                ahead = moved / max_docs_per_second - (time.perf_counter() - start)
+                if ahead > 0:
+                    time.sleep(ahead)
+    finally:
+        query_cache.invalidate(collection)
+
+    if finished:
+        _save_checkpoint(db, collection, {"finishedAt": datetime.now(timezone.utc)})
+
+    return {
+        "collection": collection,
+        "archive": target,
+        "cutoff": cutoff,
+        "moved": moved,
+        "batches": batches,
+        "finished": finished,
+        "seconds": round(time.perf_counter() - start, 3)
+    }
+
+
+
+
+## Reading across hot and archived data
+def find_with_archive(db, collection, filter=None, projection=None, sort=None, limit=0, mark_archived=True):
+    """
+    Runs a query over a collection and its archive as if they were one.
+
+    Parameters:
+        db (Database): The connected MongoDB database object.
+        collection (str): "enrollments" or "assignments".
+        filter (dict): Query applied to both collections.
+        projection (dict): Optional $project stage.
+        sort (dict): Optional sort over the combined result.
+        limit (int): Optional limit over the combined result (0 = none).
+        mark_archived (bool): Add "archived": True/False to every document.
+
+    Returns:
+        list: Matching documents from both collections.
+    """
+    match = {"$match": filter or {}}
+    hot = [match]
+    archived = [match]
+    if mark_archived:
+        hot.append({"$set": {"archived": False}})
+        archived.append({"$set": {"archived": True}})
+
+    pipeline = hot + [{"$unionWith": {"coll": archive_collection_name(collection), "pipeline": archived}}]
+    if sort:
+        pipeline.append({"$sort": sort})
+    if limit:
+        pipeline.append({"$limit": limit})
+    if projection:
+        pipeline.append({"$project": projection})
+    return list(db[collection].aggregate(pipeline, allowDiskUse=True))
+
+
+def count_with_archive(db, collection, filter=None):
+    """Counts the matching documents in a collection and its archive."""
+    filter = filter or {}
+    return (db[collection].count_documents(filter)
+            + db[archive_collection_name(collection)].count_documents(filter))
+
+
+
+
+## Command line entry point
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Move old EduHub records into the archive collections.")
+    parser.add_argument("command", choices=["run", "status"])
+    add_connection_arguments(parser)
+    parser.add_argument("--collections", nargs="*", choices=sorted(ARCHIVE_POLICIES), default=sorted(ARCHIVE_POLICIES))
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_ARCHIVE_BATCH_SIZE)
+    parser.add_argument("--max-docs-per-second", type=float)
+    parser.add_argument("--restart", action="store_true", help="Ignore unfinished checkpoints")
+    args = parser.parse_args(argv)
+
+    db, _ = connect_from_args(args)
+    for collection in args.collections:
+        if args.command == "status":
+            print(collection, get_checkpoint(db, collection))
+            continue
+        result = archive_old_records(db, collection, batch_size=args.batch_size,
+                                     max_docs_per_second=args.max_docs_per_second, restart=args.restart)
+        print(f"✅ Moved {result['moved']} {collection} to {result['archive']} in {result['seconds']}s")
+
+
+if __name__ == "__main__":
+    main()
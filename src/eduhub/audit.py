@@ -0,0 +1,225 @@
+
+# ### EduHub Explain-Plan Auditor
+# Runs explain("executionStats") for every entry of the query registry and
+# reports plan problems as machine-readable findings, so a deployment can be
+# gated on them:
+#
+#   python -m eduhub audit --output audit.json --fail-on error
+#
+# Findings (code / default severity):
+#   COLLSCAN            error   full collection scan (warning on small collections)
+#   IN_MEMORY_SORT      warning blocking SORT stage (error if it spilled to disk)
+#   EXAMINED_RATIO      warning totalDocsExamined / nReturned above the threshold
+#   LOOKUP_NO_INDEX     error   $lookup whose foreignField is not an index prefix
+#   BLOCKING_GROUP      warning $group over the whole collection (info after a $match)
+
+
+
+## Importing libraries
+from datetime import datetime, timezone
+from .registry import build_query_registry, select_queries, explain_query, winning_plan, plan_summary
+from .client import add_connection_arguments, connect_from_args
+import argparse
+import json
+
+
+
+SEVERITIES = ["info", "warning", "error"]
+
+# Collections scanned below this many documents only produce a warning
+SMALL_COLLECTION_DOCS = 1000
+
+EXAMINED_RATIO_WARNING = 10
+EXAMINED_RATIO_ERROR = 100
+
+SORT_STAGES = {"SORT", "SORT_SIMPLE", "SORT_DEFAULT"}
+
+
+
+
+## Explain output helpers
+def execution_stats(explain):
+    """Returns the executionStats section of a find or aggregate explain output."""
+    if "executionStats" in explain:
+        return explain["executionStats"]
+    for stage in explain.get("stages", []):
+        if "$cursor" in stage:
+            return stage["$cursor"].get("executionStats", {})
+    for shard in explain.get("shards", {}).values():
+        return execution_stats(shard)
+    return {}
+
+
+def iter_plan_stages(plan):
+    """Yields every stage of a plan tree, depth first."""
+    plan = plan.get("queryPlan", plan)
+    if not plan:
+        return
+    yield plan
+    for key in ("inputStage", "outerStage", "innerStage"):
+        if key in plan:
+            yield from iter_plan_stages(plan[key])
+    for child in plan.get("inputStages", []):
+        yield from iter_plan_stages(child)
+
+
+def _pipeline_stages(pipeline):
+    # Top-level stages plus the stages of nested $lookup / $facet pipelines
+    for stage in pipeline:
+        yield stage
+        lookup = stage.get("$lookup", {})
+        if "pipeline" in lookup:
+            yield from _pipeline_stages(lookup["pipeline"])
+        for branch in stage.get("$facet", {}).values():
+            yield from _pipeline_stages(branch)
+
+
+def _has_index_prefix(db, collection, field, cache):
+    if collection not in cache:
+        cache[collection] = [list(index["key"].keys()) for index in db[collection].list_indexes()]
+    return any(keys and keys[0] == field for keys in cache[collection])
+
+
+
+
+## Checks
+def _finding(code, severity, message, **details):
+    return {"code": code, "severity": severity, "message": message, **details}
+
+
+def audit_query(db, spec, index_cache=None):
+    """
+    Explains one registry entry and returns its audit record.
+
+    Parameters:
+        db (Database): The connected MongoDB database object.
+        spec (dict): Registry entry.
+        index_cache (dict): Optional cache of list_indexes() results shared between calls.
+
+    Returns:
+        dict: name, collection, op, plan summary, execution counters and findings.
+    """
+    index_cache = {} if index_cache is None else index_cache
+    explain = explain_query(db, spec, "executionStats")
+    stats = execution_stats(explain)
+    plan = winning_plan(explain)
+    findings = []
+
+    returned = stats.get("nReturned", 0)
+    docs_examined = stats.get("totalDocsExamined", 0)
+
+    for stage in iter_plan_stages(plan):
+        name = stage.get("stage", "").upper()
+        if name == "COLLSCAN":
+            severity = "error" if docs_examined >= SMALL_COLLECTION_DOCS else "warning"
+            findings.append(_finding("COLLSCAN", severity,
+                                     f"Full scan of {spec['collection']} ({docs_examined} docs examined)"))
+        elif name in SORT_STAGES:
+            spilled = stats.get("usedDisk") or stage.get("usedDisk")
+            findings.append(_finding("IN_MEMORY_SORT", "error" if spilled else "warning",
+                                     "Blocking in-memory sort" + (" that spilled to disk" if spilled else ""),
+                                     sortPattern=stage.get("sortPattern")))
+        elif name == "EQ_LOOKUP" and stage.get("strategy") == "NestedLoopJoin":
+            findings.append(_finding("LOOKUP_NO_INDEX", "error",
+                                     f"$lookup into {stage.get('foreignCollection')} runs as a nested loop join"))
+
+    if docs_examined:
+        ratio = docs_examined / max(returned, 1)
+        if ratio >= EXAMINED_RATIO_WARNING:
+            findings.append(_finding("EXAMINED_RATIO", "error" if ratio >= EXAMINED_RATIO_ERROR else "warning",
+                                     f"{docs_examined} docs examined for {returned} returned",
+                                     ratio=round(ratio, 1)))
+
+    if spec["op"] == "aggregate":
+        # Only a top-level $match narrows the documents a later $group reads;
+        # one inside a $lookup or $facet pipeline filters that branch only
+        top_level = {id(stage) for stage in spec["pipeline"]}
+        preceded_by_match = False
+        for stage in _pipeline_stages(spec["pipeline"]):
+            if "$match" in stage:
+                preceded_by_match = preceded_by_match or id(stage) in top_level
+            elif "$lookup" in stage and "foreignField" in stage["$lookup"]:
+                lookup = stage["$lookup"]
+                if not _has_index_prefix(db, lookup["from"], lookup["foreignField"], index_cache):
+                    findings.append(_finding("LOOKUP_NO_INDEX", "error",
+                                             f"$lookup into {lookup['from']} on unindexed {lookup['foreignField']}"))
+            elif "$group" in stage:
+                findings.append(_finding(
+                    "BLOCKING_GROUP", "info" if preceded_by_match else "warning",
+                    "Blocking $group" + (" after $match" if preceded_by_match else " over the whole collection")
+                ))
+
+    # The same problem can be reported by both the plan tree and the pipeline
+    unique = {(f["code"], f["message"]): f for f in findings}
+    return {
+        "name": spec["name"],
+        "collection": spec["collection"],
+        "op": spec["op"],
+        "plan": plan_summary(plan),
+        "nReturned": returned,
+        "totalDocsExamined": docs_examined,
+        "totalKeysExamined": stats.get("totalKeysExamined", 0),
+        "executionTimeMillis": stats.get("executionTimeMillis"),
+        "findings": list(unique.values())
+    }
+
+
+def audit_queries(db, specs=None):
+    """
+    Audits registry entries (all of them by default).
+
+    Returns:
+        dict: {"generatedAt", "database", "summary": {...}, "queries": [audit records]}.
+    """
+    specs = specs if specs is not None else build_query_registry(db)
+    index_cache = {}
+    records = [audit_query(db, spec, index_cache) for spec in specs]
+
+    summary = {"queries": len(records)}
+    for severity in SEVERITIES:
+        summary[severity] = sum(1 for record in records for f in record["findings"] if f["severity"] == severity)
+    summary["clean"] = sum(1 for record in records if not record["findings"])
+
+    return {
+        "generatedAt": datetime.now(timezone.utc).isoformat(),
+        "database": db.name,
+        "summary": summary,
+        "queries": records
+    }
+
+
+def gate(report, fail_on="error"):
+    """Returns True when the report has no finding at or above the fail_on severity."""
+    threshold = SEVERITIES.index(fail_on)
+    return not any(SEVERITIES.index(f["severity"]) >= threshold
+                   for record in report["queries"] for f in record["findings"])
+
+
+
+
+## Command line entry point
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Audit the explain plans of the EduHub queries.")
+    add_connection_arguments(parser)
+    parser.add_argument("--queries", nargs="*", help="Only audit these registry entries")
+    parser.add_argument("--output", help="Write the JSON report to this file instead of stdout")
+    parser.add_argument("--fail-on", choices=SEVERITIES, default="error")
+    args = parser.parse_args(argv)
+
+    db, _ = connect_from_args(args)
+    report = audit_queries(db, select_queries(build_query_registry(db), args.queries))
+
+    text = json.dumps(report, indent=4, default=str)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text)
+        print("Audit summary:", report["summary"])
+    else:
+        print(text)
+
+    if not gate(report, args.fail_on):
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
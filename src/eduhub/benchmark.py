@@ -0,0 +1,241 @@
+
+# ### EduHub Query Benchmark Suite
+# Seeds a dataset of a chosen size, runs every registered query with warmup
+# and many timed iterations, and compares the latency percentiles and winning
+# plans against stored baselines. A regression exits with status 1.
+#
+#   python -m eduhub benchmark --scale small --baseline baselines.json --update-baseline
+#   python -m eduhub benchmark --scale small --baseline baselines.json --skip-seed
+#
+# Baselines depend on the machine and server they were recorded on, so none
+# ships with the project: --baseline names the file to record into and
+# compare against.
+
+
+
+## Importing libraries
+from datetime import datetime, timezone
+from .seed import seed_database, SAMPLE_COUNTS, SEED_ORDER
+from .search import backfill_title_trigrams
+from .indexes import sync_indexes
+from .rollups import backfill_enrollment_rollups, ROLLUP_COLLECTIONS
+from .registry import build_query_registry, select_queries, run_query, explain_query, winning_plan, plan_summary
+from .client import add_connection_arguments, connect_from_args
+from pathlib import Path
+import argparse
+import json
+import math
+import statistics
+import time
+
+
+
+# Dataset sizes; the reference time and seed are fixed so every run of a
+# scale benchmarks byte-identical data.
+SCALES = {
+    "sample": SAMPLE_COUNTS,
+    "small": {"users": 10_000, "courses": 1_000, "enrollments": 50_000,
+              "lessons": 10_000, "assignments": 5_000, "submissions": 50_000},
+    "medium": {"users": 100_000, "courses": 10_000, "enrollments": 500_000,
+               "lessons": 100_000, "assignments": 50_000, "submissions": 500_000},
+    "large": {"users": 1_000_000, "courses": 50_000, "enrollments": 5_000_000,
+              "lessons": 500_000, "assignments": 200_000, "submissions": 5_000_000}
+}
+
+BENCHMARK_SEED = 2024
+BENCHMARK_REFERENCE_TIME = datetime(2025, 1, 1, tzinfo=timezone.utc)
+
+# A query regresses when its p95 grows by more than this fraction AND by more
+# than REGRESSION_FLOOR_MS, so sub-millisecond jitter cannot fail a run.
+DEFAULT_TOLERANCE = 0.25
+REGRESSION_FLOOR_MS = 1.0
+
+
+
+
+## Dataset preparation
+def prepare_indexes(db):
+    """Builds the manifest indexes, so benchmarks run against production index coverage."""
+    return sync_indexes(db)
+
+
+def seed_benchmark_dataset(db, counts, settings=None, workers=4):
+    """
+    Drops the benchmark collections and seeds a reproducible dataset of the given size,
+    with the snapshots, trigrams and enrollment rollups the registered queries read.
+    settings are the client settings of the seed workers (default: load_client_settings()).
+    """
+    for collection in list(SEED_ORDER) + list(ROLLUP_COLLECTIONS.values()):
+        db[collection].drop()
+    seed_database(db, counts=counts, seed=BENCHMARK_SEED, workers=workers, settings=settings,
+                  mode="vectorized", reference_time=BENCHMARK_REFERENCE_TIME)
+    backfill_title_trigrams(db)
+    # After the indexes: the backfill's $merge needs the rollups' unique key index
+    prepare_indexes(db)
+    backfill_enrollment_rollups(db)
+
+
+
+
+## Measurement
+def percentile(sorted_values, fraction):
+    """Returns the nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(0, min(len(sorted_values) - 1, math.ceil(fraction * len(sorted_values)) - 1))
+    return sorted_values[rank]
+
+
+def benchmark_query(db, spec, warmup=5, iterations=50):
+    """
+    Times one registry entry.
+
+    Parameters:
+        db (Database): The connected MongoDB database object.
+        spec (dict): Registry entry.
+        warmup (int): Untimed runs to warm caches and the plan cache.
+        iterations (int): Timed runs.
+
+    Returns:
+        dict: p50/p95/p99/mean latency (ms), throughput (queries/s), documents
+              returned and the winning plan summary.
+    """
+    for _ in range(warmup):
+        run_query(db, spec)
+
+    timings = []
+    returned = 0
+    for _ in range(iterations):
+        start = time.perf_counter()
+        returned = len(run_query(db, spec))
+        timings.append((time.perf_counter() - start) * 1000)
+
+    timings.sort()
+    total_seconds = sum(timings) / 1000
+    return {
+        "name": spec["name"],
+        "collection": spec["collection"],
+        "p50": round(percentile(timings, 0.50), 3),
+        "p95": round(percentile(timings, 0.95), 3),
+        "p99": round(percentile(timings, 0.99), 3),
+        "mean": round(statistics.fmean(timings), 3),
+        "throughput": round(iterations / total_seconds, 1) if total_seconds else None,
+        "returned": returned,
+        "plan": plan_summary(winning_plan(explain_query(db, spec, "queryPlanner")))
+    }
+
+
+def run_benchmark(db, specs, warmup=5, iterations=50):
+    """Benchmarks each registry entry in turn. Returns the list of results."""
+    return [benchmark_query(db, spec, warmup, iterations) for spec in specs]
+
+
+
+
+## Baselines
+def load_baselines(path):
+    path = Path(path)
+    if not path.exists():
+        return {}
+    with open(path) as f:
+        return json.load(f)
+
+
+def save_baseline(results, scale, counts, path):
+    """Stores the results of a run as the baseline for a scale."""
+    baselines = load_baselines(path)
+    baselines[scale] = {
+        "counts": counts,
+        "recordedAt": datetime.now(timezone.utc).isoformat(),
+        "queries": {row["name"]: {key: row[key] for key in ("p50", "p95", "p99", "plan")} for row in results}
+    }
+    with open(path, "w") as f:
+        json.dump(baselines, f, indent=4, sort_keys=True)
+
+
+def compare_to_baseline(results, baseline, tolerance=DEFAULT_TOLERANCE):
+    """
+    Compares a run with a stored baseline.
+
+    Returns:
+        list: Regressions, each {"name", "reason", ...}. Latency regressions are
+              p95 increases beyond the tolerance; plan changes are reported too,
+              since a different winning plan usually explains a slowdown.
+    """
+    regressions = []
+    stored = baseline.get("queries", {})
+    for row in results:
+        previous = stored.get(row["name"])
+        if previous is None:
+            continue
+        limit = previous["p95"] * (1 + tolerance)
+        if row["p95"] > limit and row["p95"] - previous["p95"] > REGRESSION_FLOOR_MS:
+            regressions.append({"name": row["name"], "reason": "latency",
+                                "baselineP95": previous["p95"], "p95": row["p95"]})
+        if previous.get("plan") and row["plan"] != previous["plan"]:
+            regressions.append({"name": row["name"], "reason": "plan",
+                                "baselinePlan": previous["plan"], "plan": row["plan"]})
+    return regressions
+
+
+def print_report(results):
+    print(f"{'query':<36}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'qps':>10}{'docs':>8}  plan")
+    for row in results:
+        print(f"{row['name']:<36}{row['p50']:>9}{row['p95']:>9}{row['p99']:>9}"
+              f"{row['throughput']!s:>10}{row['returned']:>8}  {row['plan']}")
+
+
+
+
+## Command line entry point
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the EduHub queries against a local mongod.")
+    add_connection_arguments(parser, database="eduhub_bench")
+    parser.add_argument("--scale", choices=sorted(SCALES), default="small")
+    parser.add_argument("--queries", nargs="*", help="Only run these registry entries")
+    parser.add_argument("--warmup", type=int, default=5)
+    parser.add_argument("--iterations", type=int, default=50)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--skip-seed", action="store_true", help="Reuse the dataset already in --db")
+    parser.add_argument("--baseline", required=True, help="JSON file of stored baselines, one per scale")
+    parser.add_argument("--update-baseline", action="store_true")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE)
+    parser.add_argument("--json", help="Also write the results to this file")
+    args = parser.parse_args(argv)
+
+    db, settings = connect_from_args(args)
+    counts = SCALES[args.scale]
+
+    if not args.skip_seed:
+        start = time.perf_counter()
+        seed_benchmark_dataset(db, counts, settings, args.workers)
+        print(f"Seeded '{args.scale}' dataset in {time.perf_counter() - start:.1f}s")
+
+    specs = select_queries(build_query_registry(db, now=BENCHMARK_REFERENCE_TIME), args.queries)
+    results = run_benchmark(db, specs, args.warmup, args.iterations)
+    print_report(results)
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"scale": args.scale, "counts": counts, "results": results}, f, indent=4)
+
+    if args.update_baseline:
+        save_baseline(results, args.scale, counts, args.baseline)
+        print(f"✅ Baseline for '{args.scale}' saved to {args.baseline}")
+        return
+
+    baseline = load_baselines(args.baseline).get(args.scale)
+    if baseline is None:
+        print(f"No baseline for '{args.scale}' yet; run with --update-baseline to record one.")
+        return
+
+    regressions = compare_to_baseline(results, baseline, args.tolerance)
+    for regression in regressions:
+        print("❌ Regression:", regression)
+    if regressions:
+        raise SystemExit(1)
+    print("✅ No regressions against the stored baseline")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,245 @@
+
+# ### EduHub Bulk Write Helpers
+# Streams a cursor into batched bulk_write calls so maintenance jobs (backfills,
+# migrations) cost one round trip per batch instead of one per document.
+#
+# insert_with_report() does the same for imports: unordered insert_many
+# batches, with every write error from BulkWriteError.details["writeErrors"]
+# mapped back to its source document and classified (duplicate_key, type,
+# validation, other), so the good documents land at full batch speed and the
+# bad ones come back in a structured report instead of an exception.
+
+
+
+## Importing libraries
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError
+from bson import encode
+from bson.errors import InvalidDocument
+from .cache import query_cache
+from itertools import islice
+import time
+
+
+
+DEFAULT_BULK_BATCH_SIZE = 1000
+
+DUPLICATE_KEY_CODES = {11000, 11001}
+DOCUMENT_VALIDATION_FAILURE = 121
+# Failure details kept in an insert report (the counts always cover every failure)
+DEFAULT_MAX_FAILURES = 1000
+
+
+
+
+def _empty_counts():
+    return {"matched": 0, "modified": 0, "upserted": 0, "inserted": 0, "deleted": 0, "batches": 0}
+
+
+def write_in_batches(collection, operations, batch_size=DEFAULT_BULK_BATCH_SIZE, ordered=False):
+    """
+    Sends write operations to a collection in bulk_write batches.
+
+    Operations are consumed lazily, so at most batch_size of them are held in
+    memory at once.
+
+    Parameters:
+        collection (Collection): Target collection.
+        operations (iterable): UpdateOne / ReplaceOne / InsertOne / DeleteOne requests.
+        batch_size (int): Number of operations per bulk_write call.
+        ordered (bool): Whether each batch is applied in order and stops at the first error.
+
+    Returns:
+        dict: Totals of matched, modified, upserted, inserted and deleted documents,
+              and the number of batches sent.
+    """
+    if batch_size <= 0:
+        raise ValueError("batch_size must be positive.")
+
+    counts = _empty_counts()
+    operations = iter(operations)
+
+    try:
+        while True:
+            batch = list(islice(operations, batch_size))
+            if not batch:
+                break
+
+            result = collection.bulk_write(batch, ordered=ordered)
+            counts["matched"] += result.matched_count
+            counts["modified"] += result.modified_count
+            counts["upserted"] += result.upserted_count
+            counts["inserted"] += result.inserted_count
+            counts["deleted"] += result.deleted_count
+            counts["batches"] += 1
+    finally:
+        # Cached reads of this collection may be stale even if a batch failed
+        query_cache.invalidate(collection.name)
+    return counts
+
+
+def bulk_update(collection, build_update, filter=None, projection=None,
+                batch_size=DEFAULT_BULK_BATCH_SIZE, ordered=False):
+    """
+    Streams the documents matching a filter and updates each one by _id in batches.
+
+    Parameters:
+        collection (Collection): Collection to read and update.
+        build_update (callable): Receives a document and returns an update document
+                                 (e.g. {"$set": {...}}), or None to leave it unchanged.
+        filter (dict): Selects the documents to update (default: all).
+        projection (dict): Fields build_update needs; keep it small to limit transfer.
+        batch_size (int): Cursor batch size and number of updates per bulk_write call.
+        ordered (bool): Whether each batch stops at the first error.
+
+    Returns:
+        dict: Matched/modified totals as returned by write_in_batches().
+    """
+    cursor = collection.find(filter or {}, projection, batch_size=batch_size)
+
+    def operations():
+        for doc in cursor:
+            update = build_update(doc)
+            if update is not None:
+                yield UpdateOne({"_id": doc["_id"]}, update)
+
+    try:
+        return write_in_batches(collection, operations(), batch_size, ordered)
+    finally:
+        cursor.close()
+
+
+
+
+
+## Inserts with per-document error attribution
+def _schema_failures(details, prefix=""):
+    """Flattens $jsonSchema errInfo details into (field, rule) pairs."""
+    pairs = []
+    for rule in details.get("schemaRulesNotSatisfied", []):
+        operator = rule.get("operatorName")
+        if operator == "required":
+            pairs += [(f"{prefix}{field}", "required") for field in rule.get("missingProperties", [])]
+        elif operator == "properties":
+            for prop in rule.get("propertiesNotSatisfied", []):
+                field = f"{prefix}{prop['propertyName']}"
+                for detail in prop.get("details", []):
+                    if "schemaRulesNotSatisfied" in detail:
+                        pairs += _schema_failures(detail, f"{field}.")
+                    else:
+                        pairs.append((field, detail.get("operatorName")))
+        else:
+            pairs.append((prefix.rstrip(".") or None, operator))
+    return pairs
+
+
+def classify_write_error(error):
+    """
+    Classifies one entry of BulkWriteError.details["writeErrors"].
+
+    Returns:
+        dict: {"reason": "duplicate_key" | "type" | "validation" | "other",
+               "code", "message", "fields": [field names involved]}.
+    """
+    code = error.get("code")
+    failure = {"reason": "other", "code": code, "message": error.get("errmsg"), "fields": []}
+    if code in DUPLICATE_KEY_CODES:
+        failure["reason"] = "duplicate_key"
+        failure["fields"] = sorted(error.get("keyValue", {}))
+    elif code == DOCUMENT_VALIDATION_FAILURE:
+        pairs = _schema_failures(error.get("errInfo", {}).get("details", {}))
+        failure["reason"] = "type" if any(rule == "bsonType" for _, rule in pairs) else "validation"
+        failure["fields"] = sorted({field for field, _ in pairs if field})
+    return failure
+
+
+def _insert_batch(collection, batch, bypass_validation):
+    """Inserts one batch unordered. Returns (inserted count, [(batch index, failure)])."""
+    try:
+        result = collection.insert_many(batch, ordered=False, bypass_document_validation=bypass_validation)
+        return len(result.inserted_ids), []
+    except BulkWriteError as exc:
+        errors = exc.details.get("writeErrors", [])
+        return exc.details.get("nInserted", 0), [(error["index"], classify_write_error(error)) for error in errors]
+    except InvalidDocument:
+        # The driver could not encode some document. It encodes while it sends, so
+        # the documents before it may already be written: find the offenders, then
+        # retry only the encodable documents that did not make it
+        failures, encodable = [], []
+        for position, doc in enumerate(batch):
+            try:
+                encode(doc)
+                encodable.append(position)
+            except InvalidDocument as exc:
+                failures.append((position, {"reason": "type", "code": None, "message": str(exc), "fields": []}))
+
+        ids = [batch[position]["_id"] for position in encodable if "_id" in batch[position]]
+        written = [doc["_id"] for doc in collection.find({"_id": {"$in": ids}}, {"_id": 1})] if ids else []
+        retry = [position for position in encodable if batch[position].get("_id") not in written]
+        inserted = len(encodable) - len(retry)
+        if retry:
+            retried_inserted, retried = _insert_batch(collection, [batch[position] for position in retry],
+                                                      bypass_validation)
+            inserted += retried_inserted
+            failures += [(retry[position], failure) for position, failure in retried]
+        return inserted, failures
+
+
+def insert_with_report(collection, documents, batch_size=DEFAULT_BULK_BATCH_SIZE, key_field=None,
+                       bypass_validation=False, max_failures=DEFAULT_MAX_FAILURES, on_failure=None):
+    """
+    Inserts documents in unordered batches and reports every failure per document.
+
+    Documents are consumed lazily, batch_size at a time, so an import of any size
+    holds one batch in memory.
+
+    Parameters:
+        collection (Collection): Target collection.
+        documents (iterable): Documents to insert.
+        batch_size (int): Documents per insert_many call.
+        key_field (str): Field that identifies a document in the report (e.g. "userId").
+        bypass_validation (bool): Skip the collection's $jsonSchema validator.
+        max_failures (int): Failure details kept in the report (None = all).
+        on_failure (callable): Optional callback(document, failure) for every failure,
+                               e.g. to write a dead-letter file.
+
+    Returns:
+        dict: {"inserted", "failed", "batches", "seconds", "docsPerSecond",
+               "byReason": {reason: count},
+               "failures": [{"index", "key", "reason", "code", "message", "fields"}]}.
+    """
+    if batch_size <= 0:
+        raise ValueError("batch_size must be positive.")
+
+    report = {"inserted": 0, "failed": 0, "batches": 0, "byReason": {}, "failures": []}
+    documents = iter(documents)
+    offset = 0
+    started = time.perf_counter()
+
+    try:
+        while True:
+            batch = list(islice(documents, batch_size))
+            if not batch:
+                break
+
+            inserted, failures = _insert_batch(collection, batch, bypass_validation)
+            report["inserted"] += inserted
+            report["batches"] += 1
+            for position, failure in sorted(failures, key=lambda item: item[0]):
+                doc = batch[position]
+                failure = {"index": offset + position,
+                           "key": doc.get(key_field) if key_field else doc.get("_id"), **failure}
+                report["failed"] += 1
+                report["byReason"][failure["reason"]] = report["byReason"].get(failure["reason"], 0) + 1
+                if max_failures is None or len(report["failures"]) < max_failures:
+                    report["failures"].append(failure)
+                if on_failure:
+                    on_failure(doc, failure)
+            offset += len(batch)
+    finally:
+        query_cache.invalidate(collection.name)
+
+    seconds = time.perf_counter() - started
+    report["seconds"] = round(seconds, 3)
+    report["docsPerSecond"] = round(report["inserted"] / seconds) if seconds else None
+    return report
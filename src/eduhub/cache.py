@@ -0,0 +1,146 @@
+
+# ### EduHub Query Cache
+# In-process read-through cache for catalogue queries whose data changes
+# rarely. Entries are keyed by the normalized query, bounded by an LRU limit,
+# expire after a TTL, and are dropped as soon as a write helper touches one of
+# the collections they were read from.
+
+
+
+## Importing libraries
+from bson import json_util
+from collections import OrderedDict
+import threading
+import time
+
+
+
+DEFAULT_MAX_ENTRIES = 1024
+DEFAULT_TTL_SECONDS = 300.0
+
+# Operators whose array operands are sets, so their order does not matter
+_SET_OPERATORS = {"$in", "$nin", "$all"}
+
+
+
+
+def _normalize(value, operator=None):
+    if isinstance(value, dict):
+        return {key: _normalize(item, key) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        items = [_normalize(item) for item in value]
+        if operator in _SET_OPERATORS:
+            items = sorted(items, key=lambda item: json_util.dumps(item, sort_keys=True))
+        return items
+    return value
+
+
+def make_key(name, collection, filter=None, projection=None, **options):
+    """
+    Builds a cache key from a query description.
+
+    Filter and projection documents are normalized (dict keys sorted, $in /
+    $nin / $all operands sorted), so equivalent queries share one entry.
+    Sort specifications must be passed as lists, whose order is preserved.
+    """
+    return json_util.dumps(
+        [name, collection, _normalize(filter or {}), _normalize(projection or {}), _normalize(options)],
+        sort_keys=True
+    )
+
+
+class QueryCache:
+    """
+    Bounded LRU cache with per-entry TTL and per-collection invalidation.
+
+    Cached results are shared between callers and must be treated as read-only.
+    """
+
+    def __init__(self, max_entries=DEFAULT_MAX_ENTRIES, ttl=DEFAULT_TTL_SECONDS, clock=time.monotonic):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.clock = clock
+        self._entries = OrderedDict()  # key -> (expires_at, collections, value)
+        self._lock = threading.Lock()
+        # Bumped by invalidate(); a load that overlaps an invalidation is not stored
+        self._generations = {}  # collection -> generation (None: every collection)
+        self._stats = {"hits": 0, "misses": 0, "evictions": 0, "expirations": 0, "invalidations": 0}
+
+    def get_or_load(self, key, collections, loader):
+        """
+        Returns the cached value for key, or calls loader() and caches its result.
+
+        loader() runs outside the lock; if one of the collections is invalidated
+        while it runs, its result is returned but not cached.
+
+        Parameters:
+            key (str): Key built with make_key().
+            collections (iterable): Collections the value was read from.
+            loader (callable): Runs the query on a miss.
+        """
+        collections = frozenset(collections)
+        now = self.clock()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if entry[0] > now:
+                    self._entries.move_to_end(key)
+                    self._stats["hits"] += 1
+                    return entry[2]
+                del self._entries[key]
+                self._stats["expirations"] += 1
+            self._stats["misses"] += 1
+            generation = self._generation(collections)
+
+        value = loader()
+
+        with self._lock:
+            if self._generation(collections) != generation:
+                return value
+            self._entries[key] = (self.clock() + self.ttl, collections, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._stats["evictions"] += 1
+        return value
+
+    def invalidate(self, collection=None):
+        """
+        Drops the entries read from a collection (or every entry when collection is None).
+
+        Returns:
+            int: Number of entries dropped.
+        """
+        with self._lock:
+            self._generations[collection] = self._generations.get(collection, 0) + 1
+            if collection is None:
+                stale = list(self._entries)
+            else:
+                stale = [key for key, entry in self._entries.items() if collection in entry[1]]
+            for key in stale:
+                del self._entries[key]
+            self._stats["invalidations"] += len(stale)
+        return len(stale)
+
+    def _generation(self, collections):
+        return [self._generations.get(None, 0)] + [self._generations.get(name, 0) for name in sorted(collections)]
+
+    def stats(self):
+        """Returns hit/miss/eviction/expiration/invalidation counters, size and hit ratio."""
+        with self._lock:
+            stats = dict(self._stats, size=len(self._entries))
+        lookups = stats["hits"] + stats["misses"]
+        stats["hitRatio"] = stats["hits"] / lookups if lookups else 0.0
+        return stats
+
+    def clear(self):
+        """Removes every entry and resets the counters."""
+        with self._lock:
+            self._entries.clear()
+            self._generations[None] = self._generations.get(None, 0) + 1
+            for name in self._stats:
+                self._stats[name] = 0
+
+
+# Shared cache used by the read helpers and invalidated by the write helpers
+query_cache = QueryCache()
@@ -0,0 +1,79 @@
+
+# ### EduHub Command Line
+# One entry point for the package's tools; every subcommand forwards its
+# arguments to the main() of the module that implements it:
+#
+#   python -m eduhub setup
+#   python -m eduhub seed --users 1000
+#   python -m eduhub report top_students --limit 10
+#   python -m eduhub benchmark --scale small
+#   python -m eduhub <command> --help
+#
+# Modules are imported only when their subcommand runs, so a command never
+# pays for (or needs) the dependencies of the others. Commands connect through
+# the package's shared client (eduhub.client.get_shared_client), so
+# `python -m eduhub setup` and eduhub.setup() use the same settings.
+
+
+
+## Importing libraries
+from .client import close_shared_client
+import importlib
+import sys
+
+
+
+# Subcommand -> (module, description)
+COMMANDS = {
+    "setup": ("schema", "Create the collections, validators and indexes"),
+    "seed": ("seed", "Seed synthetic data"),
+    "report": ("analytics", "Run an analytics report"),
+    "columnar": ("columnar", "Write a report to Parquet or benchmark the Arrow mode"),
+    "benchmark": ("benchmark", "Benchmark the query registry against baselines"),
+    "indexes": ("indexes", "Diff or sync the index manifest"),
+    "index-advisor": ("index_advisor", "Propose indexes for the query shapes"),
+    "audit": ("audit", "Audit query plans for collection scans"),
+    "stats": ("stats", "Maintain the precomputed course statistics"),
+    "denormalize": ("denormalize", "Backfill the enrollment course snapshots"),
+    "rollups": ("rollups", "Backfill or query the enrollment rollups"),
+    "archive": ("archive", "Move old records into the archive collections"),
+    "export": ("export", "Export collections to compressed NDJSON or BSON files"),
+    "load": ("load", "Load an export or dump file in parallel"),
+    "validate": ("validation", "Schema drift, client-side screening and validator benchmark"),
+    "profiles": ("projections", "Benchmark the projection profiles on a large listing"),
+    "search-bench": ("search_bench", "Benchmark the course search strategies"),
+    "async": ("aio", "Run the concurrent instructor dashboard"),
+    "client": ("client", "Show client settings or probe the connection pool"),
+}
+
+
+
+
+## Dispatch
+def usage():
+    width = max(len(name) for name in COMMANDS)
+    lines = ["usage: python -m eduhub <command> [options]", "", "commands:"]
+    lines += [f"  {name:<{width}}  {description}" for name, (_, description) in COMMANDS.items()]
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    argv = list(sys.argv[1:] if argv is None else argv)
+    if not argv or argv[0] in ("-h", "--help"):
+        print(usage())
+        return
+    command, rest = argv[0], argv[1:]
+    if command not in COMMANDS:
+        print(f"❌ Unknown command: {command}\n\n{usage()}", file=sys.stderr)
+        raise SystemExit(2)
+
+    module = importlib.import_module(f".{COMMANDS[command][0]}", __package__)
+    sys.argv[0] = f"python -m eduhub {command}"
+    try:
+        module.main(rest)
+    finally:
+        close_shared_client()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,385 @@
+
+# ### EduHub Client Factory
+# Builds MongoDB clients from one set of settings (defaults < JSON config file
+# < environment variables) instead of a bare MongoClient with driver defaults,
+# and records connection-pool checkout metrics so maxPoolSize can be sized from
+# what the pool actually does under load.
+#
+# Environment variables:
+#   EDUHUB_MONGO_URI, EDUHUB_DB, EDUHUB_CONFIG (path of a JSON config file)
+#   EDUHUB_MAX_POOL_SIZE, EDUHUB_MIN_POOL_SIZE, EDUHUB_MAX_IDLE_TIME_MS,
+#   EDUHUB_WAIT_QUEUE_TIMEOUT_MS, EDUHUB_SERVER_SELECTION_TIMEOUT_MS,
+#   EDUHUB_CONNECT_TIMEOUT_MS, EDUHUB_SOCKET_TIMEOUT_MS, EDUHUB_COMPRESSORS
+#
+#   python -m eduhub client settings
+#   python -m eduhub client probe --threads 64 --seconds 10
+
+
+
+## Importing libraries
+from pymongo import MongoClient, monitoring
+from collections import deque
+import argparse
+import importlib.util
+import json
+import math
+import os
+import threading
+import time
+
+
+
+DEFAULT_SETTINGS = {
+    "uri": "mongodb://localhost:27017/",
+    "database": "eduhub_db",
+    "options": {
+        "appname": "eduhub",
+        "maxPoolSize": 100,
+        "minPoolSize": 5,
+        "maxIdleTimeMS": 60_000,
+        "waitQueueTimeoutMS": 2_000,
+        "serverSelectionTimeoutMS": 5_000,
+        "connectTimeoutMS": 5_000,
+        "socketTimeoutMS": 30_000,
+        "compressors": "zstd,snappy,zlib",
+        "retryWrites": True
+    }
+}
+
+# Environment variable -> (client option, type)
+ENV_OPTIONS = {
+    "EDUHUB_MAX_POOL_SIZE": ("maxPoolSize", int),
+    "EDUHUB_MIN_POOL_SIZE": ("minPoolSize", int),
+    "EDUHUB_MAX_IDLE_TIME_MS": ("maxIdleTimeMS", int),
+    "EDUHUB_WAIT_QUEUE_TIMEOUT_MS": ("waitQueueTimeoutMS", int),
+    "EDUHUB_SERVER_SELECTION_TIMEOUT_MS": ("serverSelectionTimeoutMS", int),
+    "EDUHUB_CONNECT_TIMEOUT_MS": ("connectTimeoutMS", int),
+    "EDUHUB_SOCKET_TIMEOUT_MS": ("socketTimeoutMS", int),
+    "EDUHUB_COMPRESSORS": ("compressors", str)
+}
+
+# Compressor -> Python module the driver needs for it (zlib is always available)
+COMPRESSOR_MODULES = {"zstd": "zstandard", "snappy": "snappy", "zlib": None}
+
+# Number of checkout wait times kept for the percentiles
+METRICS_WINDOW = 10_000
+
+
+
+
+## Settings
+def available_compressors(requested):
+    """Keeps the requested compressors whose Python module is installed, in order."""
+    names = [name.strip() for name in requested.split(",") if name.strip()]
+    return ",".join(name for name in names
+                    if name in COMPRESSOR_MODULES
+                    and (COMPRESSOR_MODULES[name] is None or importlib.util.find_spec(COMPRESSOR_MODULES[name])))
+
+
+def load_client_settings(config=None, environ=None):
+    """
+    Resolves the client settings.
+
+    Parameters:
+        config (dict | str): Settings dict or path of a JSON file with "uri",
+            "database" and "options" (default: the file named by EDUHUB_CONFIG).
+        environ (dict): Environment to read (default: os.environ).
+
+    Returns:
+        dict: {"uri", "database", "options"} with the environment applied last.
+    """
+    environ = os.environ if environ is None else environ
+    settings = {**DEFAULT_SETTINGS, "options": dict(DEFAULT_SETTINGS["options"])}
+
+    config = config if config is not None else environ.get("EDUHUB_CONFIG")
+    if isinstance(config, str):
+        with open(config) as f:
+            config = json.load(f)
+    if config:
+        settings.update({key: config[key] for key in ("uri", "database") if key in config})
+        settings["options"].update(config.get("options", {}))
+
+    if "EDUHUB_MONGO_URI" in environ:
+        settings["uri"] = environ["EDUHUB_MONGO_URI"]
+    if "EDUHUB_DB" in environ:
+        settings["database"] = environ["EDUHUB_DB"]
+    for variable, (option, cast) in ENV_OPTIONS.items():
+        if variable in environ:
+            settings["options"][option] = cast(environ[variable])
+
+    compressors = available_compressors(settings["options"].get("compressors", ""))
+    if compressors:
+        settings["options"]["compressors"] = compressors
+    else:
+        settings["options"].pop("compressors", None)
+    return settings
+
+
+def resolve_client_settings(uri=None, database=None, config=None):
+    """load_client_settings() with explicit overrides (e.g. --uri / --db) applied last."""
+    settings = load_client_settings(config)
+    if uri:
+        settings["uri"] = uri
+    if database:
+        settings["database"] = database
+    return settings
+
+
+def add_connection_arguments(parser, database=None):
+    """
+    Adds the --uri, --db and --config options every command shares. They only
+    override the resolved settings; unset, EDUHUB_* and the config file apply.
+
+    Parameters:
+        parser (ArgumentParser): The command's parser.
+        database (str): Default for --db when the command should not use the
+            configured database (e.g. the benchmarks' eduhub_bench).
+    """
+    parser.add_argument("--uri", help="Connection string (default: $EDUHUB_MONGO_URI, the config file or localhost)")
+    parser.add_argument("--db", default=database,
+                        help=f"Database (default: {database or '$EDUHUB_DB, the config file or eduhub_db'})")
+    parser.add_argument("--config", help="JSON client config file (default: $EDUHUB_CONFIG)")
+
+
+def settings_from_args(args):
+    """Resolves the client settings of a command parsed with add_connection_arguments()."""
+    return resolve_client_settings(args.uri, args.db, args.config)
+
+
+
+
+## Pool metrics
+class PoolMetrics(monitoring.ConnectionPoolListener):
+    """
+    Connection pool listener counting checkouts, checkout waits and failures.
+
+    A steadily high checkout wait (or waitQueueTimeout failures) means the pool
+    is too small for the load; a peak in-use count far below maxPoolSize means
+    it can shrink.
+    """
+
+    def __init__(self, window=METRICS_WINDOW):
+        self._lock = threading.Lock()
+        self._waits = deque(maxlen=window)
+        self._counts = {"checkouts": 0, "checkins": 0, "checkoutFailures": 0, "created": 0,
+                        "closed": 0, "poolCleared": 0}
+        self._failures = {}
+        self._in_use = 0
+        self._peak_in_use = 0
+
+    def _add(self, name, amount=1):
+        with self._lock:
+            self._counts[name] += amount
+
+    def pool_created(self, event):
+        pass
+
+    def pool_ready(self, event):
+        pass
+
+    def pool_cleared(self, event):
+        self._add("poolCleared")
+
+    def pool_closed(self, event):
+        pass
+
+    def connection_created(self, event):
+        self._add("created")
+
+    def connection_ready(self, event):
+        pass
+
+    def connection_closed(self, event):
+        self._add("closed")
+
+    def connection_check_out_started(self, event):
+        pass
+
+    def connection_check_out_failed(self, event):
+        with self._lock:
+            self._counts["checkoutFailures"] += 1
+            self._failures[event.reason] = self._failures.get(event.reason, 0) + 1
+            if getattr(event, "duration", None) is not None:
+                self._waits.append(event.duration * 1000)
+
+    def connection_checked_out(self, event):
+        with self._lock:
+            self._counts["checkouts"] += 1
+            self._in_use += 1
+            self._peak_in_use = max(self._peak_in_use, self._in_use)
+            if getattr(event, "duration", None) is not None:
+                self._waits.append(event.duration * 1000)
+
+    def connection_checked_in(self, event):
+        with self._lock:
+            self._counts["checkins"] += 1
+            self._in_use -= 1
+
+    def snapshot(self):
+        """
+        Returns the counters, the current and peak number of connections in use,
+        failures by reason, and checkout wait percentiles (ms).
+        """
+        with self._lock:
+            waits = sorted(self._waits)
+            result = dict(self._counts, inUse=self._in_use, peakInUse=self._peak_in_use,
+                          failuresByReason=dict(self._failures))
+
+        def percentile(fraction):
+            if not waits:
+                return 0.0
+            return round(waits[max(0, math.ceil(fraction * len(waits)) - 1)], 3)
+
+        result["checkoutWaitMs"] = {"p50": percentile(0.50), "p95": percentile(0.95),
+                                    "p99": percentile(0.99), "max": round(waits[-1], 3) if waits else 0.0}
+        return result
+
+    def reset(self):
+        with self._lock:
+            self._waits.clear()
+            for name in self._counts:
+                self._counts[name] = 0
+            self._failures.clear()
+            self._peak_in_use = self._in_use
+
+
+def pool_sizing_hint(snapshot, max_pool_size, wait_budget_ms=5.0):
+    """Turns a PoolMetrics snapshot into a one-line maxPoolSize recommendation."""
+    if snapshot["failuresByReason"].get("timeout") or snapshot["checkoutWaitMs"]["p95"] > wait_budget_ms:
+        return (f"Checkouts wait (p95 {snapshot['checkoutWaitMs']['p95']} ms, "
+                f"{snapshot['failuresByReason'].get('timeout', 0)} timeouts): raise maxPoolSize above {max_pool_size}.")
+    if snapshot["peakInUse"] < max_pool_size / 2:
+        return (f"Peak of {snapshot['peakInUse']} connections in use: maxPoolSize {max_pool_size} "
+                f"can shrink towards {max(snapshot['peakInUse'] * 2, 1)}.")
+    return f"maxPoolSize {max_pool_size} fits the observed load."
+
+
+
+
+## Factory
+def create_client(settings=None, metrics=None, async_client=False):
+    """
+    Creates a MongoDB client from resolved settings.
+
+    Parameters:
+        settings (dict): Output of load_client_settings() (default: resolved now).
+        metrics (PoolMetrics): Optional listener registered on the client's pools.
+        async_client (bool): Return an asyncio client (see eduhub.aio) instead of MongoClient.
+
+    Returns:
+        MongoClient | AsyncMongoClient: The client (connections are opened lazily).
+    """
+    settings = settings or load_client_settings()
+    options = dict(settings["options"])
+    if metrics is not None:
+        options["event_listeners"] = [metrics]
+
+    if async_client:
+        from .aio import get_async_client
+        return get_async_client(settings["uri"], **options)
+    return MongoClient(settings["uri"], **options)
+
+
+def get_database(settings=None, metrics=None):
+    """Creates a client and returns the configured database."""
+    settings = settings or load_client_settings()
+    return create_client(settings, metrics)[settings["database"]]
+
+
+def connect_from_args(args):
+    """
+    Connects a command parsed with add_connection_arguments() through the
+    process-wide shared client, the same one eduhub.get_db() returns.
+
+    Returns:
+        tuple: (Database, settings dict); pass the settings on to worker processes.
+    """
+    client, settings, _ = get_shared_client(settings_from_args(args))
+    return client[settings["database"]], settings
+
+
+
+
+## Shared client
+# One process-wide client, created on first use rather than at import time so
+# importing eduhub never opens a connection or reads the environment early.
+_shared = {"client": None, "settings": None, "metrics": None}
+_shared_lock = threading.Lock()
+
+
+def get_shared_client(settings=None):
+    """
+    Returns the process-wide client, creating it on the first call.
+
+    Parameters:
+        settings (dict): Settings to create the client with (default: load_client_settings()).
+
+    Returns:
+        tuple: (MongoClient, settings dict, PoolMetrics).
+
+    Raises:
+        ValueError: If the client already exists with different settings.
+    """
+    with _shared_lock:
+        if _shared["client"] is not None and settings is not None and settings != _shared["settings"]:
+            raise ValueError("The shared client is already open with other settings; close it first.")
+        if _shared["client"] is None:
+            settings = settings or load_client_settings()
+            metrics = PoolMetrics()
+            _shared.update(client=create_client(settings, metrics), settings=settings, metrics=metrics)
+        return _shared["client"], _shared["settings"], _shared["metrics"]
+
+
+def close_shared_client():
+    """Closes the process-wide client; the next get_shared_client() creates a new one."""
+    with _shared_lock:
+        if _shared["client"] is not None:
+            _shared["client"].close()
+        _shared.update(client=None, settings=None, metrics=None)
+
+
+
+
+## Command line entry point
+def _probe(db, threads, seconds):
+    deadline = time.perf_counter() + seconds
+    email = (db.users.find_one({}, {"email": 1}) or {}).get("email", "student@example.com")
+    queries = [0] * threads
+
+    def worker(slot):
+        while time.perf_counter() < deadline:
+            db.users.find_one({"email": email})
+            queries[slot] += 1
+
+    pool = [threading.Thread(target=worker, args=(slot,)) for slot in range(threads)]
+    for thread in pool:
+        thread.start()
+    for thread in pool:
+        thread.join()
+    return sum(queries)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Show the EduHub client settings or probe the connection pool.")
+    parser.add_argument("command", choices=["settings", "probe"])
+    add_connection_arguments(parser)
+    parser.add_argument("--threads", type=int, default=32)
+    parser.add_argument("--seconds", type=float, default=10.0)
+    args = parser.parse_args(argv)
+
+    settings = settings_from_args(args)
+    if args.command == "settings":
+        print(json.dumps(settings, indent=4))
+        return
+
+    client, settings, metrics = get_shared_client(settings)
+    metrics.reset()
+    total = _probe(client[settings["database"]], args.threads, args.seconds)
+    snapshot = metrics.snapshot()
+    print(json.dumps(snapshot, indent=4))
+    print(f"✅ {total} queries from {args.threads} threads ({total / args.seconds:.0f}/s)")
+    print(pool_sizing_hint(snapshot, settings["options"]["maxPoolSize"]))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,257 @@
+
+# ### EduHub Columnar Reports
+# Runs the Section 4 report pipelines (eduhub.analytics) into Arrow record
+# batches, pandas DataFrames or Parquet files instead of lists of dicts. Each
+# report has an explicit column schema, so types do not depend on the first
+# rows seen, and results are converted chunk by chunk so millions of rows
+# never exist as Python dicts at the same time:
+#
+#   table = report_table(db, "avg_grade_per_student")
+#   frame = report_frame(db, "revenue_per_instructor", denormalized=True)
+#   write_parquet(db, "avg_grade_per_student", "reports/avg_grade.parquet")
+#
+#   python -m eduhub columnar parquet avg_grade_per_student --out reports/avg_grade.parquet
+#   python -m eduhub columnar bench avg_progress_per_student
+#
+# Needs pyarrow (pandas for the DataFrame helpers). When PyMongoArrow is
+# installed, report_table decodes the BSON result batches straight into Arrow
+# arrays without building Python objects at all.
+
+
+
+## Importing libraries
+from .analytics import REPORT_PIPELINES, report_params
+from .client import add_connection_arguments, connect_from_args
+from pathlib import Path
+import argparse
+import time
+import tracemalloc
+
+try:
+    import pyarrow
+    import pyarrow.parquet
+except ImportError:
+    pyarrow = None
+
+try:
+    import pandas
+except ImportError:
+    pandas = None
+
+try:
+    from pymongoarrow.api import Schema, aggregate_arrow_all
+except ImportError:
+    aggregate_arrow_all = None
+
+
+
+# Report name -> column types (pyarrow type aliases; nested dicts are structs)
+REPORT_SCHEMAS = {
+    "enrollments_per_course": {"_id": "string", "totalEnrollments": "int64"},
+    "avg_course_rating": {"_id": "string", "avgRating": "float64"},
+    "enrollment_by_category": {"_id": "string", "totalEnrollments": "int64"},
+    "avg_grade_per_student": {"_id": "string", "averageGrade": "float64"},
+    "completion_rate_by_course": {"_id": "string", "completionRate": "float64"},
+    "top_students": {"_id": "string", "avgGrade": "float64"},
+    "students_per_instructor": {"_id": "string", "totalStudents": "int64"},
+    "avg_rating_per_instructor": {"_id": "string", "avgRating": "float64"},
+    "revenue_per_instructor": {"_id": "string", "totalRevenue": "float64"},
+    "monthly_enrollments": {"_id": {"year": "int32", "month": "int32"}, "count": "int64"},
+    "popular_categories": {"_id": "string", "enrollmentCount": "int64"},
+    "avg_progress_per_student": {"_id": "string", "avgProgress": "float64"}
+}
+
+DEFAULT_CHUNK_ROWS = 50_000
+PARQUET_COMPRESSION = "zstd"
+
+
+
+
+## Schemas
+def _require_pyarrow():
+    if pyarrow is None:
+        raise ImportError("Columnar reports need the pyarrow package (pip install pyarrow).")
+
+
+def _require_pandas():
+    if pandas is None:
+        raise ImportError("DataFrame reports need the pandas package (pip install pandas).")
+
+
+def _arrow_type(spec):
+    if isinstance(spec, dict):
+        return pyarrow.struct([(field, _arrow_type(value)) for field, value in spec.items()])
+    return pyarrow.type_for_alias(spec)
+
+
+def arrow_schema(name):
+    """Returns the pyarrow schema of a report's rows."""
+    _require_pyarrow()
+    if name not in REPORT_SCHEMAS:
+        raise ValueError(f"Unknown report: {name}")
+    return pyarrow.schema([(field, _arrow_type(spec)) for field, spec in REPORT_SCHEMAS[name].items()])
+
+
+def _report_cursor(db, name, chunk_size, params):
+    if name not in REPORT_PIPELINES:
+        raise ValueError(f"Unknown report: {name}")
+    collection, build = REPORT_PIPELINES[name]
+    return db[collection].aggregate(build(**params), allowDiskUse=True, batchSize=chunk_size)
+
+
+
+
+## Arrow and pandas results
+def iter_record_batches(db, name, chunk_size=DEFAULT_CHUNK_ROWS, **params):
+    """
+    Runs a report and yields its rows as pyarrow RecordBatches of up to chunk_size rows.
+
+    Fields outside the report's schema are dropped; missing fields become nulls.
+    """
+    schema = arrow_schema(name)
+    rows = []
+    for row in _report_cursor(db, name, chunk_size, params):
+        rows.append(row)
+        if len(rows) == chunk_size:
+            yield pyarrow.RecordBatch.from_pylist(rows, schema=schema)
+            rows = []
+    if rows:
+        yield pyarrow.RecordBatch.from_pylist(rows, schema=schema)
+
+
+def report_table(db, name, chunk_size=DEFAULT_CHUNK_ROWS, **params):
+    """Runs a report into a pyarrow Table (through PyMongoArrow when it is installed)."""
+    schema = arrow_schema(name)
+    if aggregate_arrow_all is not None:
+        collection, build = REPORT_PIPELINES[name]
+        table = aggregate_arrow_all(db[collection], build(**params),
+                                    schema=Schema(dict(zip(schema.names, schema.types))), allowDiskUse=True)
+        return table.select(schema.names)
+    return pyarrow.Table.from_batches(iter_record_batches(db, name, chunk_size, **params), schema=schema)
+
+
+def report_frame(db, name, chunk_size=DEFAULT_CHUNK_ROWS, **params):
+    """Runs a report into a pandas DataFrame; struct columns are flattened (_id.year, _id.month)."""
+    _require_pandas()
+    return report_table(db, name, chunk_size, **params).flatten().to_pandas()
+
+
+def iter_report_frames(db, name, chunk_size=DEFAULT_CHUNK_ROWS, **params):
+    """Yields a report as pandas DataFrames of up to chunk_size rows."""
+    _require_pandas()
+    for batch in iter_record_batches(db, name, chunk_size, **params):
+        yield pyarrow.Table.from_batches([batch]).flatten().to_pandas()
+
+
+
+
+## Parquet
+def write_parquet(db, name, path, chunk_size=DEFAULT_CHUNK_ROWS, compression=PARQUET_COMPRESSION, **params):
+    """
+    Streams a report into a Parquet file, one row group per chunk.
+
+    Parameters:
+        db (Database): The connected MongoDB database object.
+        name (str): Key of REPORT_PIPELINES.
+        path (str): Output file; parent directories are created.
+        chunk_size (int): Rows per record batch / row group.
+        compression (str): Parquet codec (zstd, snappy, gzip or none).
+        **params: Arguments of the report's pipeline builder (e.g. denormalized=True).
+
+    Returns:
+        dict: Rows and row groups written, file size in bytes and elapsed seconds.
+    """
+    schema = arrow_schema(name)
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    started = time.perf_counter()
+    rows = batches = 0
+    with pyarrow.parquet.ParquetWriter(path, schema, compression=compression) as writer:
+        for batch in iter_record_batches(db, name, chunk_size, **params):
+            writer.write_batch(batch)
+            rows += batch.num_rows
+            batches += 1
+    return {
+        "report": name,
+        "path": str(path),
+        "rows": rows,
+        "rowGroups": batches,
+        "bytes": path.stat().st_size,
+        "seconds": round(time.perf_counter() - started, 3)
+    }
+
+
+
+
+## Benchmark
+def benchmark_columnar(db, name, **params):
+    """
+    Compares a report as a list of dicts with the same report as an Arrow table.
+
+    Returns:
+        dict: Rows, seconds and result memory of both modes (tracemalloc for the
+              dicts, the Arrow buffers' size for the table).
+    """
+    _require_pyarrow()
+    collection, build = REPORT_PIPELINES[name]
+
+    # Timed untraced: tracemalloc slows allocation-heavy decoding several times over
+    started = time.perf_counter()
+    list(db[collection].aggregate(build(**params), allowDiskUse=True))
+    dict_seconds = time.perf_counter() - started
+    tracemalloc.start()
+    try:
+        rows = list(db[collection].aggregate(build(**params), allowDiskUse=True))
+        dict_memory, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    del rows
+
+    started = time.perf_counter()
+    table = report_table(db, name, **params)
+    arrow_seconds = time.perf_counter() - started
+    return {
+        "report": name,
+        "rows": table.num_rows,
+        "dictSeconds": round(dict_seconds, 3),
+        "dictMemory": dict_memory,
+        "arrowSeconds": round(arrow_seconds, 3),
+        "arrowMemory": table.nbytes,
+        "pymongoarrow": aggregate_arrow_all is not None
+    }
+
+
+
+
+## Command line entry point
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Write an analytics report to Parquet or benchmark columnar mode.")
+    parser.add_argument("command", choices=["parquet", "bench"])
+    parser.add_argument("name", choices=sorted(REPORT_PIPELINES))
+    add_connection_arguments(parser)
+    parser.add_argument("--out", help="Parquet file to write (parquet command)")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_ROWS)
+    parser.add_argument("--compression", default=PARQUET_COMPRESSION, choices=["zstd", "snappy", "gzip", "none"])
+    parser.add_argument("--denormalized", action="store_true")
+    parser.add_argument("--limit", type=int)
+    args = parser.parse_args(argv)
+    params = report_params(args.name, denormalized=args.denormalized, limit=args.limit)
+
+    db, _ = connect_from_args(args)
+    if args.command == "parquet":
+        if not args.out:
+            parser.error("--out is required for the parquet command")
+        result = write_parquet(db, args.name, args.out, args.chunk_size, args.compression, **params)
+        print(f"✅ {args.name}: {result['rows']} rows in {result['rowGroups']} row groups, "
+              f"{result['bytes']} bytes -> {result['path']} ({result['seconds']}s)")
+        return
+
+    result = benchmark_columnar(db, args.name, **params)
+    engine = "PyMongoArrow" if result["pymongoarrow"] else "record batches"
+    print(f"✅ {args.name}: {result['rows']} rows")
+    print(f"   dicts: {result['dictSeconds']}s, {result['dictMemory'] / 2**20:.1f} MiB")
+    print(f"   arrow ({engine}): {result['arrowSeconds']}s, {result['arrowMemory'] / 2**20:.1f} MiB")
+
+
+if __name__ == "__main__":
+    main()
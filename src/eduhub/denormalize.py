@@ -0,0 +1,197 @@
+
+# ### EduHub Enrollment Denormalization
+# Optional mode that stores a snapshot of the course attributes hot analytics
+# need (category, instructorId, pricePaid) on every enrollment, so those
+# reports run as one $group over enrollments instead of a $lookup per row.
+#
+# Every enrollment writer stores the snapshot: enroll_student(), the seeder and
+# the bulk loader (which backfill it after inserting). category and
+# instructorId follow the course: every course update (eduhub.writes,
+# eduhub.aio) goes through update_course_with_snapshots() or snapshot_update(),
+# which propagate them to its enrollments; a category change also moves the
+# course's enrollment rollup buckets. pricePaid is what the student paid when
+# enrolling and is never rewritten.
+#
+#   python -m eduhub denormalize backfill | bench
+
+
+
+## Importing libraries
+from pymongo import UpdateMany
+from datetime import datetime, timezone
+from .bulk import write_in_batches, DEFAULT_BULK_BATCH_SIZE
+from .search import update_course
+from .cache import query_cache
+from .rollups import move_course_category, record_enrollment
+from .analytics import (
+    enrollment_by_category,
+    students_per_instructor,
+    revenue_per_instructor,
+    popular_categories
+)
+from .client import add_connection_arguments, connect_from_args
+import argparse
+import statistics
+import time
+
+
+
+# Course field -> enrollment field
+SNAPSHOT_FIELDS = {"category": "category", "instructorId": "instructorId", "price": "pricePaid"}
+
+# Snapshot fields that track later course edits
+PROPAGATED_FIELDS = {"category": "category", "instructorId": "instructorId"}
+
+COURSE_SNAPSHOT_PROJECTION = {"_id": 0, "courseId": 1, "category": 1, "instructorId": 1, "price": 1}
+
+
+
+
+def course_snapshot(course):
+    """Returns the enrollment fields copied from a course document."""
+    return {target: course[source] for source, target in SNAPSHOT_FIELDS.items() if source in course}
+
+
+def enroll_student(db, enrollment):
+    """
+    Inserts an enrollment with the snapshot of its course attributes and counts
+    it in the daily/monthly enrollment rollups.
+
+    Raises:
+        ValueError: If the referenced course does not exist.
+    """
+    course = db.courses.find_one({"courseId": enrollment["courseId"]}, COURSE_SNAPSHOT_PROJECTION)
+    if course is None:
+        raise ValueError(f"Course '{enrollment['courseId']}' does not exist.")
+
+    now = datetime.now(timezone.utc)
+    document = {"updatedAt": now, **enrollment, **course_snapshot(course)}
+    result = db.enrollments.insert_one(document)
+    record_enrollment(db, document)
+    query_cache.invalidate("enrollments")
+    return result
+
+
+def backfill_enrollment_snapshots(db, batch_size=DEFAULT_BULK_BATCH_SIZE, overwrite=False):
+    """
+    Adds the course snapshot to existing enrollments.
+
+    Streams the (small) courses collection and sends one UpdateMany per course,
+    in bulk_write batches; each update is served by an enrollments index that
+    starts with courseId. Enrollments that already carry a snapshot are skipped
+    unless overwrite=True, so an interrupted backfill can simply be rerun.
+
+    Returns:
+        dict: Matched/modified totals from write_in_batches().
+    """
+    def operations():
+        for course in db.courses.find({}, COURSE_SNAPSHOT_PROJECTION, batch_size=batch_size):
+            query = {"courseId": course["courseId"]}
+            if not overwrite:
+                query["instructorId"] = {"$exists": False}
+            yield UpdateMany(query, {"$set": course_snapshot(course)})
+
+    return write_in_batches(db.enrollments, operations(), batch_size)
+
+
+def snapshot_update(changes):
+    """
+    Returns the enrollments update carrying changed category / instructorId
+    values of a course, or None when the $set document touches neither.
+    """
+    snapshot = {target: changes[source] for source, target in PROPAGATED_FIELDS.items() if source in changes}
+    return {"$set": snapshot} if snapshot else None
+
+
+def propagate_course_changes(db, course_id, changes):
+    """
+    Copies changed category / instructorId values of a course onto its enrollments.
+
+    Parameters:
+        db (Database): The connected MongoDB database object.
+        course_id (str): The course that changed.
+        changes (dict): The $set document applied to the course.
+
+    Returns:
+        int: Number of enrollments modified (0 when nothing relevant changed).
+    """
+    update = snapshot_update(changes)
+    if update is None:
+        return 0
+    modified = db.enrollments.update_many({"courseId": course_id}, update).modified_count
+    query_cache.invalidate("enrollments")
+    return modified
+
+
+def update_course_with_snapshots(db, course_id, update):
+    """
+    Updates a course (see eduhub.search.update_course), propagates category /
+    instructorId changes to its enrollments and moves its enrollment rollup
+    buckets when the category changes.
+    """
+    changes = update.get("$set", {})
+    previous = None
+    if "category" in changes:
+        previous = db.courses.find_one({"courseId": course_id}, {"_id": 0, "category": 1})
+    result = update_course(db, course_id, update)
+    propagate_course_changes(db, course_id, changes)
+    if previous is not None:
+        move_course_category(db, course_id, previous.get("category"), changes["category"])
+    return result
+
+
+
+
+## Before/after measurement
+HOT_REPORTS = [enrollment_by_category, students_per_instructor, revenue_per_instructor, popular_categories]
+
+
+def benchmark_hot_reports(db, repeat=3):
+    """
+    Times each hot report with $lookup and with the denormalized snapshot.
+
+    Returns:
+        list: One dict per report with median timings (ms) for both modes.
+    """
+    rows = []
+    for report in HOT_REPORTS:
+        timings = {}
+        for denormalized in (False, True):
+            runs = []
+            for _ in range(repeat):
+                start = time.perf_counter()
+                report(db, denormalized=denormalized)
+                runs.append(time.perf_counter() - start)
+            timings[denormalized] = statistics.median(runs) * 1000
+        rows.append({
+            "report": report.__name__,
+            "lookupMs": round(timings[False], 1),
+            "denormalizedMs": round(timings[True], 1),
+            "speedup": round(timings[False] / timings[True], 1) if timings[True] else None
+        })
+    return rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Manage the denormalized enrollment snapshot.")
+    parser.add_argument("command", choices=["backfill", "bench"])
+    add_connection_arguments(parser)
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BULK_BATCH_SIZE)
+    parser.add_argument("--overwrite", action="store_true")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args(argv)
+
+    db, _ = connect_from_args(args)
+
+    if args.command == "backfill":
+        start = time.perf_counter()
+        result = backfill_enrollment_snapshots(db, args.batch_size, args.overwrite)
+        print(f"✅ Backfilled enrollment snapshots in {time.perf_counter() - start:.1f}s:", result)
+    else:
+        print(f"{'report':<26}{'$lookup ms':>12}{'denorm ms':>12}{'speedup':>10}")
+        for row in benchmark_hot_reports(db, args.repeat):
+            print(f"{row['report']:<26}{row['lookupMs']:>12}{row['denormalizedMs']:>12}{row['speedup']!s:>10}")
+
+
+if __name__ == "__main__":
+    main()
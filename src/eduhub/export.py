@@ -0,0 +1,325 @@
+
+# ### EduHub Collection Export
+# Streams whole collections to compressed files that can be loaded back with
+# their types intact, one worker per collection, and writes a manifest with
+# the document count and checksum of every file:
+#
+#   python -m eduhub export run --out exports/2025-06-01 --format ndjson --compression gzip
+#   python -m eduhub export run --out exports/raw --format bson --compression zstd --workers 6
+#   python -m eduhub export verify --out exports/2025-06-01
+#
+# Formats:
+#   - ndjson: one Extended JSON document per line (canonical mode by default,
+#     so ObjectId, dates, int32/int64 and doubles survive the round trip).
+#   - bson: the raw BSON documents back to back, as mongodump writes them; the
+#     cursor returns RawBSONDocument so documents are never decoded.
+#
+# Documents are read in cursor batches and written as they arrive, so memory
+# stays flat whatever the collection size. Files are read in _id order and
+# gzip headers carry no timestamp, so exporting unchanged data reproduces the
+# same checksums.
+
+
+
+## Importing libraries
+from bson import decode_file_iter, json_util
+from bson.codec_options import CodecOptions
+from bson.json_util import CANONICAL_JSON_OPTIONS, RELAXED_JSON_OPTIONS
+from bson.raw_bson import RawBSONDocument
+from .client import add_connection_arguments, connect_from_args, create_client, load_client_settings
+from datetime import datetime, timezone
+from pathlib import Path
+import multiprocessing
+import argparse
+import gzip
+import hashlib
+import json
+import time
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+
+
+EXPORT_COLLECTIONS = ["users", "courses", "enrollments", "lessons", "assignments", "submissions"]
+FORMATS = ("ndjson", "bson")
+COMPRESSIONS = {"gzip": ".gz", "zstd": ".zst", "none": ""}
+JSON_MODES = {"canonical": CANONICAL_JSON_OPTIONS, "relaxed": RELAXED_JSON_OPTIONS}
+MANIFEST_NAME = "manifest.json"
+
+DEFAULT_BATCH_SIZE = 1000
+ZSTD_LEVEL = 3
+CHUNK_SIZE = 1 << 20
+
+
+
+
+## Compressed streams
+class _HashingWriter:
+    """File wrapper that hashes and counts the bytes written to disk."""
+
+    def __init__(self, raw):
+        self.raw = raw
+        self.sha256 = hashlib.sha256()
+        self.bytes = 0
+
+    def write(self, data):
+        self.sha256.update(data)
+        self.bytes += len(data)
+        return self.raw.write(data)
+
+    def flush(self):
+        self.raw.flush()
+
+
+def _require_zstandard():
+    if zstandard is None:
+        raise ImportError("zstd compression needs the zstandard package (pip install zstandard).")
+
+
+def _open_writer(sink, compression):
+    if compression == "gzip":
+        return gzip.GzipFile(filename="", mode="wb", fileobj=sink, mtime=0)
+    if compression == "zstd":
+        _require_zstandard()
+        return zstandard.ZstdCompressor(level=ZSTD_LEVEL).stream_writer(sink, closefd=False)
+    return sink
+
+
+def open_export_file(path, compression):
+    """Opens an export file for reading, decompressing on the fly."""
+    if compression == "gzip":
+        return gzip.open(path, "rb")
+    if compression == "zstd":
+        _require_zstandard()
+        return zstandard.ZstdDecompressor().stream_reader(open(path, "rb"), closefd=True)
+    return open(path, "rb")
+
+
+def export_filename(collection, fmt, compression):
+    return f"{collection}.{fmt}{COMPRESSIONS[compression]}"
+
+
+
+
+## Export
+def export_collection(db, collection, out_dir, fmt="ndjson", compression="gzip",
+                      batch_size=DEFAULT_BATCH_SIZE, json_mode="canonical"):
+    """
+    Streams one collection to a file.
+
+    Parameters:
+        db (Database): Source database.
+        collection (str): Collection to export.
+        out_dir (str | Path): Directory of the export.
+        fmt (str): "ndjson" or "bson".
+        compression (str): "gzip", "zstd" or "none".
+        batch_size (int): Documents per cursor batch.
+        json_mode (str): Extended JSON mode of ndjson exports ("canonical" or "relaxed").
+
+    Returns:
+        dict: Manifest entry {"file", "documents", "bytes", "uncompressedBytes", "sha256", "seconds"}.
+    """
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown format: {fmt}")
+    if compression not in COMPRESSIONS:
+        raise ValueError(f"Unknown compression: {compression}")
+
+    path = Path(out_dir) / export_filename(collection, fmt, compression)
+    if fmt == "bson":
+        source = db.get_collection(collection, codec_options=CodecOptions(document_class=RawBSONDocument))
+    else:
+        source = db[collection]
+        json_options = JSON_MODES[json_mode]
+
+    started = time.perf_counter()
+    documents = uncompressed = 0
+    with open(path, "wb") as raw:
+        sink = _HashingWriter(raw)
+        writer = _open_writer(sink, compression)
+        try:
+            for doc in source.find({}, batch_size=batch_size).sort("_id", 1):
+                data = doc.raw if fmt == "bson" else (json_util.dumps(doc, json_options=json_options) + "\n").encode()
+                writer.write(data)
+                documents += 1
+                uncompressed += len(data)
+        finally:
+            if writer is not sink:
+                writer.close()
+        sink.flush()
+
+    return {
+        "file": path.name,
+        "documents": documents,
+        "bytes": sink.bytes,
+        "uncompressedBytes": uncompressed,
+        "sha256": sink.sha256.hexdigest(),
+        "seconds": round(time.perf_counter() - started, 3)
+    }
+
+
+# Worker process state (one client per process)
+_worker_db = None
+
+
+def _init_worker(settings, db_name):
+    global _worker_db
+    _worker_db = create_client(settings)[db_name]
+
+
+def _run_export(task):
+    collection, options = task
+    return collection, export_collection(_worker_db, collection, **options)
+
+
+def export_database(db, out_dir, collections=None, fmt="ndjson", compression="gzip", workers=1,
+                    settings=None, batch_size=DEFAULT_BATCH_SIZE, json_mode="canonical"):
+    """
+    Exports collections in parallel and writes the manifest.
+
+    Parameters:
+        db (Database): Source database.
+        out_dir (str | Path): Directory of the export (created if missing).
+        collections (list): Collections to export (default: EXPORT_COLLECTIONS).
+        fmt (str): "ndjson" or "bson".
+        compression (str): "gzip", "zstd" or "none".
+        workers (int): Worker processes, each exporting one collection at a time (1 = this process).
+        settings (dict): Client settings the workers connect with (default: load_client_settings()).
+        batch_size (int): Documents per cursor batch.
+        json_mode (str): Extended JSON mode of ndjson exports.
+
+    Returns:
+        dict: The manifest.
+    """
+    if compression == "zstd":
+        _require_zstandard()
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    collections = collections or EXPORT_COLLECTIONS
+    options = {"out_dir": str(out_dir), "fmt": fmt, "compression": compression,
+               "batch_size": batch_size, "json_mode": json_mode}
+
+    started = time.perf_counter()
+    if workers <= 1:
+        results = {name: export_collection(db, name, **options) for name in collections}
+    else:
+        with multiprocessing.Pool(min(workers, len(collections)), initializer=_init_worker,
+                                  initargs=(settings or load_client_settings(), db.name)) as pool:
+            results = dict(pool.imap_unordered(_run_export, ((name, options) for name in collections)))
+
+    manifest = {
+        "database": db.name,
+        "exportedAt": datetime.now(timezone.utc).isoformat(),
+        "format": fmt,
+        "compression": compression,
+        "jsonMode": json_mode if fmt == "ndjson" else None,
+        "seconds": round(time.perf_counter() - started, 3),
+        "collections": {name: results[name] for name in collections}
+    }
+    (out_dir / MANIFEST_NAME).write_text(json.dumps(manifest, indent=4))
+    return manifest
+
+
+
+
+## Reading exports back
+def load_manifest(out_dir):
+    return json.loads((Path(out_dir) / MANIFEST_NAME).read_text())
+
+
+def iter_export_documents(path, fmt, compression, json_mode="canonical"):
+    """
+    Streams the documents of an export file.
+
+    Yields:
+        dict: Decoded documents, with the BSON types restored.
+    """
+    with open_export_file(path, compression) as stream:
+        if fmt == "bson":
+            yield from decode_file_iter(stream)
+            return
+        json_options = JSON_MODES[json_mode or "canonical"]
+        pending = b""
+        while chunk := stream.read(CHUNK_SIZE):
+            lines = (pending + chunk).split(b"\n")
+            pending = lines.pop()
+            for line in lines:
+                if line:
+                    yield json_util.loads(line, json_options=json_options)
+        if pending.strip():
+            yield json_util.loads(pending, json_options=json_options)
+
+
+def verify_export(out_dir, count_documents=True):
+    """
+    Checks every file of an export against its manifest entry.
+
+    Parameters:
+        out_dir (str | Path): Directory of the export.
+        count_documents (bool): Also decompress and decode each file to recount its documents.
+
+    Returns:
+        dict: Collection -> list of problems (empty when the file matches).
+    """
+    out_dir = Path(out_dir)
+    manifest = load_manifest(out_dir)
+    problems = {}
+    for name, entry in manifest["collections"].items():
+        path = out_dir / entry["file"]
+        problems[name] = []
+        if not path.exists():
+            problems[name].append("file is missing")
+            continue
+
+        sha256 = hashlib.sha256()
+        with open(path, "rb") as stream:
+            while chunk := stream.read(CHUNK_SIZE):
+                sha256.update(chunk)
+        if sha256.hexdigest() != entry["sha256"]:
+            problems[name].append("checksum mismatch")
+        if count_documents:
+            documents = sum(1 for _ in iter_export_documents(path, manifest["format"], manifest["compression"],
+                                                             manifest.get("jsonMode")))
+            if documents != entry["documents"]:
+                problems[name].append(f"{documents} documents, manifest lists {entry['documents']}")
+    return problems
+
+
+
+
+## Command line entry point
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Export EduHub collections or verify an export.")
+    parser.add_argument("command", choices=["run", "verify"])
+    add_connection_arguments(parser)
+    parser.add_argument("--out", required=True, help="Export directory")
+    parser.add_argument("--collections", nargs="*", default=EXPORT_COLLECTIONS)
+    parser.add_argument("--format", choices=FORMATS, default="ndjson")
+    parser.add_argument("--compression", choices=sorted(COMPRESSIONS), default="gzip")
+    parser.add_argument("--json-mode", choices=sorted(JSON_MODES), default="canonical")
+    parser.add_argument("--workers", type=int, default=len(EXPORT_COLLECTIONS))
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE)
+    parser.add_argument("--checksums-only", action="store_true", help="verify: skip recounting documents")
+    args = parser.parse_args(argv)
+
+    if args.command == "verify":
+        problems = verify_export(args.out, count_documents=not args.checksums_only)
+        for name, issues in problems.items():
+            print(f"❌ {name}: {'; '.join(issues)}" if issues else f"✅ {name}")
+        if any(problems.values()):
+            raise SystemExit(1)
+        return
+
+    db, settings = connect_from_args(args)
+    manifest = export_database(db, args.out, args.collections, args.format, args.compression,
+                               args.workers, settings, args.batch_size, args.json_mode)
+    for name, entry in manifest["collections"].items():
+        print(f"✅ {name}: {entry['documents']} documents -> {entry['file']} "
+              f"({entry['bytes']:,} bytes, {entry['seconds']}s)")
+    print(f"✅ Export finished in {manifest['seconds']}s; manifest at {Path(args.out) / MANIFEST_NAME}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,317 @@
+
+# ### EduHub Index Advisor
+# Derives index recommendations from the query shapes the project actually
+# issues (the query registry) or from the database profiler. Each shape's
+# fields are ordered Equality, Sort, Range (ESR), shapes already served by an
+# existing index prefix are skipped, and the proposals come with a size
+# estimate. Existing indexes that are a strict prefix of another are flagged
+# as redundant.
+#
+#   python -m eduhub index-advisor                 # report only
+#   python -m eduhub index-advisor --source profiler --apply
+
+
+
+## Importing libraries
+from .registry import build_query_registry
+from .client import add_connection_arguments, connect_from_args
+import bson
+import argparse
+import json
+
+
+
+RANGE_OPERATORS = {"$gt", "$gte", "$lt", "$lte", "$ne", "$nin", "$regex", "$not", "$type", "$size"}
+EQUALITY_OPERATORS = {"$eq", "$in", "$all", "$elemMatch"}
+# $exists alone matches most of a collection, so it is not worth an index key
+
+# Approximate per-entry overhead of a WiredTiger index key (record id + framing)
+INDEX_ENTRY_OVERHEAD_BYTES = 16
+SIZE_SAMPLE_DOCS = 1000
+
+
+
+
+## Query shapes
+def _classify_filter(filter, equality, ranges):
+    for field, condition in filter.items():
+        if field in ("$and",):
+            for clause in condition:
+                _classify_filter(clause, equality, ranges)
+            continue
+        if field.startswith("$") or field == "_id":
+            continue  # $text / $or / $expr are not served by a B-tree prefix
+        if isinstance(condition, dict) and any(key.startswith("$") for key in condition):
+            operators = set(condition) - {"$options"}
+            if operators & RANGE_OPERATORS:
+                ranges.append(field)
+            elif operators & EQUALITY_OPERATORS:
+                equality.append(field)
+        else:
+            equality.append(field)
+
+
+def _shape(name, collection, filter, sort=None):
+    equality, ranges = [], []
+    _classify_filter(filter or {}, equality, ranges)
+    sort_keys = [(field, direction) for field, direction in (sort or {}).items() if isinstance(direction, int)]
+    if not (equality or ranges or sort_keys):
+        return None
+
+    sorted_fields = {field for field, _ in sort_keys}
+    return {
+        "name": name,
+        "collection": collection,
+        "equality": [field for field in dict.fromkeys(equality) if field not in sorted_fields],
+        "sort": sort_keys,
+        "range": [field for field in dict.fromkeys(ranges) if field not in sorted_fields and field not in equality]
+    }
+
+
+def shapes_from_spec(spec):
+    """
+    Extracts the index-relevant shapes of a registry entry.
+
+    Finds give one shape. Aggregations give one for the leading $match/$sort and
+    one per $lookup (an equality on the foreign field of the joined collection).
+    """
+    if spec["op"] == "find":
+        shape = _shape(spec["name"], spec["collection"], spec["filter"], spec.get("sort"))
+        return [shape] if shape else []
+
+    shapes = []
+    pipeline = spec["pipeline"]
+    match, sort = {}, None
+    for stage in pipeline:
+        if "$match" in stage and sort is None:
+            match.update(stage["$match"])
+        elif "$sort" in stage and sort is None:
+            sort = stage["$sort"]
+        else:
+            break
+    shape = _shape(spec["name"], spec["collection"], match, sort)
+    if shape:
+        shapes.append(shape)
+
+    for stage in pipeline:
+        lookup = stage.get("$lookup")
+        if lookup and "foreignField" in lookup:
+            shapes.append({"name": f"{spec['name']}:$lookup", "collection": lookup["from"],
+                           "equality": [lookup["foreignField"]], "sort": [], "range": []})
+    return shapes
+
+
+def shapes_from_registry(db, specs=None):
+    """Returns the shapes of every registry entry."""
+    specs = specs if specs is not None else build_query_registry(db)
+    return [shape for spec in specs for shape in shapes_from_spec(spec)]
+
+
+def shapes_from_profiler(db, limit=10000):
+    """
+    Returns the shapes of the finds and aggregations recorded by the profiler
+    (enable it with db.command("profile", 2) or a slowms threshold first).
+    """
+    shapes = []
+    for entry in db["system.profile"].find({"op": {"$in": ["query", "command"]}}).sort("ts", -1).limit(limit):
+        command = entry.get("command", {})
+        collection = entry.get("ns", ".").split(".", 1)[1]
+        if collection.startswith("system."):
+            continue
+        if "find" in command:
+            spec = {"name": f"profile:{collection}", "collection": collection, "op": "find",
+                    "filter": command.get("filter", {}), "sort": command.get("sort")}
+        elif "aggregate" in command:
+            spec = {"name": f"profile:{collection}", "collection": collection, "op": "aggregate",
+                    "pipeline": command.get("pipeline", [])}
+        else:
+            continue
+        shapes.extend(shapes_from_spec(spec))
+    return shapes
+
+
+
+
+## Recommendations
+def esr_keys(shape):
+    """Returns the ESR-ordered index keys for a shape: [(field, direction), ...]."""
+    return ([(field, 1) for field in shape["equality"]] + list(shape["sort"])
+            + [(field, 1) for field in shape["range"][:1]])
+
+
+def covers(index_keys, shape):
+    """
+    Returns True if an index (list of (field, direction)) serves a shape: its
+    leading keys are the equality fields in any order, followed by the sort
+    keys (or all of them reversed), followed by the first range field.
+    """
+    fields = [field for field, _ in index_keys]
+    n_eq = len(shape["equality"])
+    if set(fields[:n_eq]) != set(shape["equality"]):
+        return False
+
+    sort = list(shape["sort"])
+    following = list(index_keys[n_eq:n_eq + len(sort)])
+    if sort and following != sort and following != [(f, -d) for f, d in sort]:
+        return False
+
+    if shape["range"]:
+        position = n_eq + len(sort)
+        return len(fields) > position and fields[position] in shape["range"]
+    return True
+
+
+def _existing_indexes(db, collection):
+    indexes = []
+    for index in db[collection].list_indexes():
+        keys = list(index["key"].items())
+        indexes.append({"name": index["name"], "keys": keys, "options": {
+            option: index[option] for option in ("unique", "partialFilterExpression", "expireAfterSeconds", "sparse")
+            if option in index
+        }})
+    return indexes
+
+
+def estimate_index_bytes(db, collection, keys, sample_size=SIZE_SAMPLE_DOCS):
+    """
+    Estimates the uncompressed size of an index from a document sample.
+
+    Multikey fields count one entry per array element. WiredTiger prefix
+    compression usually makes the real index noticeably smaller.
+    """
+    total = db[collection].estimated_document_count()
+    if not total:
+        return 0
+
+    projection = {field: 1 for field, _ in keys}
+    sample = list(db[collection].aggregate([{"$sample": {"size": sample_size}}, {"$project": projection}]))
+    if not sample:
+        return 0
+
+    sample_bytes = 0
+    for doc in sample:
+        entries = 1
+        key_bytes = 0
+        for field, _ in keys:
+            value = doc
+            for part in field.split("."):
+                value = value.get(part) if isinstance(value, dict) else None
+            if isinstance(value, list):
+                entries = max(entries, len(value) or 1)
+                value = value[0] if value else None
+            key_bytes += len(bson.encode({"k": value})) - 5
+        sample_bytes += entries * (key_bytes + INDEX_ENTRY_OVERHEAD_BYTES)
+    return int(sample_bytes / len(sample) * total)
+
+
+def redundant_indexes(indexes):
+    """
+    Returns the indexes whose keys are a strict prefix of another index's keys.
+    Unique, partial, sparse and TTL indexes are never reported, since they
+    enforce more than lookup speed.
+    """
+    redundant = []
+    for index in indexes:
+        if index["name"] == "_id_" or index["options"] or any(d == "text" for _, d in index["keys"]):
+            continue
+        for other in indexes:
+            if other is not index and len(other["keys"]) > len(index["keys"]) \
+                    and other["keys"][:len(index["keys"])] == index["keys"]:
+                redundant.append({"name": index["name"], "keys": index["keys"], "coveredBy": other["name"]})
+                break
+    return redundant
+
+
+def advise_indexes(db, shapes=None, estimate_sizes=True):
+    """
+    Proposes indexes for the given query shapes (registry shapes by default).
+
+    Returns:
+        dict: {"proposals": [{"collection", "keys", "queries", "estimatedBytes"}],
+               "redundant": {collection: [...]}, "served": [names of shapes already indexed]}
+    """
+    shapes = shapes if shapes is not None else shapes_from_registry(db)
+    existing = {}
+    proposals = {}
+    served = []
+
+    for shape in shapes:
+        collection = shape["collection"]
+        if collection not in existing:
+            existing[collection] = _existing_indexes(db, collection)
+
+        if any(covers(index["keys"], shape) for index in existing[collection]):
+            served.append(shape["name"])
+            continue
+
+        keys = esr_keys(shape)
+        proposal = next((p for p in proposals.values()
+                         if p["collection"] == collection and covers(p["keys"], shape)), None)
+        if proposal is None:
+            proposal = {"collection": collection, "keys": keys, "queries": []}
+            proposals[(collection, tuple(keys))] = proposal
+        proposal["queries"].append(shape["name"])
+
+    # Fold proposals that are a prefix of a longer proposal into it
+    result = []
+    for proposal in proposals.values():
+        longer = max((other for other in proposals.values()
+                      if other["collection"] == proposal["collection"]
+                      and len(other["keys"]) > len(proposal["keys"])
+                      and other["keys"][:len(proposal["keys"])] == proposal["keys"]),
+                     key=lambda other: len(other["keys"]), default=None)
+        if longer is not None:
+            longer["queries"].extend(proposal["queries"])
+            continue
+        if estimate_sizes:
+            proposal["estimatedBytes"] = estimate_index_bytes(db, proposal["collection"], proposal["keys"])
+        result.append(proposal)
+
+    return {
+        "proposals": result,
+        "redundant": {collection: found for collection, indexes in existing.items()
+                      if (found := redundant_indexes(indexes))},
+        "served": served
+    }
+
+
+def apply_recommendations(db, advice, drop_redundant=False):
+    """
+    Builds the proposed indexes (and optionally drops the redundant ones).
+
+    Returns:
+        dict: {"created": [index names], "dropped": [index names]}
+    """
+    created, dropped = [], []
+    for proposal in advice["proposals"]:
+        created.append(db[proposal["collection"]].create_index(proposal["keys"]))
+    if drop_redundant:
+        for collection, indexes in advice["redundant"].items():
+            for index in indexes:
+                db[collection].drop_index(index["name"])
+                dropped.append(f"{collection}.{index['name']}")
+    return {"created": created, "dropped": dropped}
+
+
+
+
+## Command line entry point
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Recommend indexes for the EduHub query shapes.")
+    add_connection_arguments(parser)
+    parser.add_argument("--source", choices=["registry", "profiler"], default="registry")
+    parser.add_argument("--apply", action="store_true", help="Create the proposed indexes")
+    parser.add_argument("--drop-redundant", action="store_true", help="With --apply, also drop redundant indexes")
+    args = parser.parse_args(argv)
+
+    db, _ = connect_from_args(args)
+    shapes = shapes_from_profiler(db) if args.source == "profiler" else shapes_from_registry(db)
+    advice = advise_indexes(db, shapes)
+    print(json.dumps(advice, indent=4, default=str))
+
+    if args.apply:
+        print("✅ Applied:", apply_recommendations(db, advice, args.drop_redundant))
+
+
+if __name__ == "__main__":
+    main()
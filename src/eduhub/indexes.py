@@ -0,0 +1,293 @@
+
+# ### EduHub Index Manifest
+# The single list of indexes every EduHub environment should have (the six
+# collections plus the rollup, archive and stats collections), and a sync that
+# diffs it against list_indexes(). Modules do not create indexes themselves;
+# they call sync_indexes() for the collections they need:
+#
+#   python -m eduhub indexes diff
+#   python -m eduhub indexes sync [--rebuild-changed] [--drop-unlisted]
+#
+# Missing indexes are built one at a time, so each build is timed on its own
+# and never competes with another build for the index build memory budget.
+# Indexes that are not in the manifest are only reported unless
+# --drop-unlisted is given, and indexes whose options differ from the
+# manifest are only rebuilt with --rebuild-changed.
+#
+# Manifest entries: {"keys": [(field, direction), ...], optional "name", and
+# any of the options "unique", "sparse", "partialFilterExpression",
+# "expireAfterSeconds" (TTL), "weights" (text)}.
+
+
+
+## Importing libraries
+from pymongo import ASCENDING, DESCENDING
+from .search import COURSE_TEXT_INDEX, COURSE_TEXT_WEIGHTS, TRIGRAM_FIELD, TRIGRAM_INDEX
+from .stats import TOMBSTONES, TOMBSTONE_TTL_SECONDS
+from .client import add_connection_arguments, connect_from_args
+import argparse
+import json
+import time
+
+
+
+INDEX_OPTIONS = ("unique", "sparse", "partialFilterExpression", "expireAfterSeconds", "weights")
+
+INDEX_MANIFEST = {
+    "users": [
+        {"keys": [("email", ASCENDING)], "unique": True},
+        {"keys": [("userId", ASCENDING)], "unique": True},
+        # Active students, paged in _id order (eduhub.pagination)
+        {"keys": [("role", ASCENDING), ("isActive", ASCENDING), ("_id", ASCENDING)]},
+        {"keys": [("dateJoined", DESCENDING)]}
+    ],
+    "courses": [
+        {"keys": [("courseId", ASCENDING)], "unique": True},
+        # One text index per collection; category/level are suffix keys so those filters use the index entries
+        {"name": COURSE_TEXT_INDEX, "weights": COURSE_TEXT_WEIGHTS,
+         "keys": [("title", "text"), ("description", "text"), ("tags", "text"),
+                  ("category", ASCENDING), ("level", ASCENDING)]},
+        {"name": TRIGRAM_INDEX, "keys": [(TRIGRAM_FIELD, ASCENDING)]},
+        # Keyset pages (eduhub.pagination): equality field, then the sort keys ending in _id.
+        # They also serve the plain category / price range / tags filters.
+        {"keys": [("category", ASCENDING), ("createdAt", DESCENDING), ("_id", DESCENDING)]},
+        {"keys": [("category", ASCENDING), ("rating", DESCENDING), ("_id", DESCENDING)]},
+        {"keys": [("category", ASCENDING), ("price", ASCENDING), ("_id", ASCENDING)]},
+        {"keys": [("createdAt", DESCENDING), ("_id", DESCENDING)]},
+        {"keys": [("rating", DESCENDING), ("_id", DESCENDING)]},
+        {"keys": [("price", ASCENDING), ("_id", ASCENDING)]},
+        {"keys": [("tags", ASCENDING), ("createdAt", DESCENDING), ("_id", DESCENDING)]},
+        {"keys": [("instructorId", ASCENDING)]}
+    ],
+    "enrollments": [
+        {"keys": [("enrollmentId", ASCENDING)], "unique": True},
+        {"keys": [("studentId", ASCENDING), ("courseId", ASCENDING)]},
+        # Course roster (eduhub.reads); also serves every courseId-only filter
+        {"keys": [("courseId", ASCENDING), ("status", ASCENDING), ("enrollmentId", ASCENDING)]},
+        # Active-only roster pages; only active enrollments are indexed, so it stays
+        # small as completed and dropped enrollments pile up
+        {"name": "active_enrollments_roster", "keys": [("courseId", ASCENDING), ("enrollmentId", ASCENDING)],
+         "partialFilterExpression": {"status": "active"}},
+        # Incremental stats refresh (eduhub.stats)
+        {"keys": [("updatedAt", ASCENDING)]},
+        {"keys": [("enrolledAt", ASCENDING)]}
+    ],
+    "lessons": [
+        {"keys": [("lessonId", ASCENDING)], "unique": True},
+        {"keys": [("courseId", ASCENDING), ("order", ASCENDING)]}
+    ],
+    "assignments": [
+        {"keys": [("assignmentId", ASCENDING)], "unique": True},
+        {"keys": [("courseId", ASCENDING)]},
+        {"keys": [("dueDate", ASCENDING)]}
+    ],
+    "submissions": [
+        {"keys": [("submissionId", ASCENDING)], "unique": True},
+        {"keys": [("studentId", ASCENDING)]},
+        {"keys": [("assignmentId", ASCENDING)]}
+    ],
+    # Enrollment rollup buckets (eduhub.rollups); $merge matches on this unique key
+    "enrollment_rollups_daily": [
+        {"keys": [("period", ASCENDING), ("courseId", ASCENDING), ("category", ASCENDING)], "unique": True}
+    ],
+    "enrollment_rollups_monthly": [
+        {"keys": [("period", ASCENDING), ("courseId", ASCENDING), ("category", ASCENDING)], "unique": True}
+    ],
+    # Archive collections (eduhub.archive) keep the lookup paths of audit queries
+    "archived_enrollments": [
+        {"keys": [("studentId", ASCENDING), ("courseId", ASCENDING)]},
+        {"keys": [("courseId", ASCENDING)]}
+    ],
+    "archived_assignments": [
+        {"keys": [("courseId", ASCENDING)]}
+    ],
+    # Stats tombstones (eduhub.stats): read by updatedAt, expired after a while as
+    # a backstop to the pruning done by refresh_stats()
+    TOMBSTONES: [
+        {"keys": [("updatedAt", ASCENDING)], "expireAfterSeconds": TOMBSTONE_TTL_SECONDS}
+    ]
+}
+
+
+
+
+## Normalization
+def index_name(entry):
+    """Returns the manifest entry's name, or the name MongoDB would generate for its keys."""
+    return entry.get("name") or "_".join(f"{field}_{direction}" for field, direction in entry["keys"])
+
+
+def _normalized_keys(keys):
+    # list_indexes() reports a text index as _fts/_ftsx in place of its text fields
+    normalized = []
+    for field, direction in keys:
+        if field == "_ftsx":
+            continue
+        if direction == "text":
+            if ("_fts", "text") not in normalized:
+                normalized += [("_fts", "text"), ("_ftsx", 1)]
+        else:
+            normalized.append((field, direction))
+    return normalized
+
+
+def _normalized_options(options):
+    normalized = {}
+    for option in INDEX_OPTIONS:
+        value = options.get(option)
+        if value in (None, False):
+            continue
+        if isinstance(value, dict):
+            value = json.loads(json.dumps(value, sort_keys=True, default=str))
+        normalized[option] = value
+    return normalized
+
+
+def describe(entry):
+    """Returns the comparable form of a manifest entry or a list_indexes() document."""
+    keys = _normalized_keys(entry["key"].items() if "key" in entry else entry["keys"])
+    return {"keys": [[field, direction] for field, direction in keys], "options": _normalized_options(entry)}
+
+
+
+
+## Diff and sync
+def diff_indexes(db, manifest=INDEX_MANIFEST, collections=None):
+    """
+    Compares the manifest with the indexes that exist.
+
+    Returns:
+        dict: Per collection {"missing": [names], "changed": [names], "unlisted": [names], "ok": [names]}.
+              An existing index with the manifest's keys under another name counts as "changed".
+    """
+    report = {}
+    for collection in collections or manifest:
+        existing = {index["name"]: describe(index) for index in db[collection].list_indexes()}
+        existing.pop("_id_", None)
+        result = {"missing": [], "changed": [], "unlisted": [], "ok": []}
+
+        listed = set()
+        for entry in manifest[collection]:
+            name = index_name(entry)
+            listed.add(name)
+            wanted = describe(entry)
+            if name in existing:
+                result["ok" if existing[name] == wanted else "changed"].append(name)
+                continue
+            same_keys = [other for other, found in existing.items() if found["keys"] == wanted["keys"]]
+            if same_keys:
+                listed.update(same_keys)
+                result["changed"].append(name)
+            else:
+                result["missing"].append(name)
+
+        result["unlisted"] = sorted(set(existing) - listed)
+        report[collection] = result
+    return report
+
+
+def _build(collection, entry):
+    options = {option: entry[option] for option in INDEX_OPTIONS if option in entry}
+    start = time.perf_counter()
+    collection.create_index(entry["keys"], name=index_name(entry), **options)
+    return round(time.perf_counter() - start, 3)
+
+
+def sync_indexes(db, manifest=INDEX_MANIFEST, collections=None, rebuild_changed=False,
+                 drop_unlisted=False, dry_run=False):
+    """
+    Makes the indexes of each collection match the manifest.
+
+    Parameters:
+        db (Database): The connected MongoDB database object.
+        manifest (dict): Collection name -> list of index entries.
+        collections (list): Only sync these collections (default: all in the manifest).
+        rebuild_changed (bool): Drop and rebuild indexes whose keys/options differ from the manifest.
+        drop_unlisted (bool): Drop indexes that are not in the manifest (never _id_).
+        dry_run (bool): Only report what would be done.
+
+    Returns:
+        dict: Per collection {"built": {name: seconds}, "rebuilt": {name: seconds},
+              "dropped": [names], "changed": [names left as they are],
+              "unlisted": [names left as they are], "ok": [names]}.
+    """
+    diff = diff_indexes(db, manifest, collections)
+    report = {}
+
+    for collection_name, result in diff.items():
+        collection = db[collection_name]
+        entries = {index_name(entry): entry for entry in manifest[collection_name]}
+        existing = {index["name"]: describe(index) for index in collection.list_indexes()}
+        summary = {"built": {}, "rebuilt": {}, "dropped": [], "changed": [], "unlisted": [], "ok": result["ok"]}
+
+        if drop_unlisted:
+            for name in result["unlisted"]:
+                if not dry_run:
+                    collection.drop_index(name)
+                summary["dropped"].append(name)
+        else:
+            summary["unlisted"] = result["unlisted"]
+
+        for name in result["changed"]:
+            if not rebuild_changed:
+                summary["changed"].append(name)
+                continue
+            wanted = describe(entries[name])
+            # Drop the stale index (under its own or another name) before rebuilding
+            for stale in [other for other, found in existing.items()
+                          if other == name or found["keys"] == wanted["keys"]]:
+                if not dry_run:
+                    collection.drop_index(stale)
+            summary["rebuilt"][name] = None if dry_run else _build(collection, entries[name])
+
+        for name in result["missing"]:
+            # A collection has a single text index, so a differently named one must go first
+            if any(direction == "text" for _, direction in entries[name]["keys"]):
+                for other, found in existing.items():
+                    if ["_fts", "text"] in found["keys"] and other not in summary["dropped"]:
+                        if not dry_run:
+                            collection.drop_index(other)
+                        summary["dropped"].append(other)
+            summary["built"][name] = None if dry_run else _build(collection, entries[name])
+
+        summary["unlisted"] = [name for name in summary["unlisted"] if name not in summary["dropped"]]
+        report[collection_name] = summary
+    return report
+
+
+def verify_indexes(db, manifest=INDEX_MANIFEST, collections=None):
+    """Returns True when every manifest index exists with the listed keys and options."""
+    return all(not result["missing"] and not result["changed"]
+               for result in diff_indexes(db, manifest, collections).values())
+
+
+
+
+## Command line entry point
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Diff or sync the EduHub indexes with the manifest.")
+    parser.add_argument("command", choices=["diff", "sync"])
+    add_connection_arguments(parser)
+    parser.add_argument("--collections", nargs="*", choices=sorted(INDEX_MANIFEST))
+    parser.add_argument("--rebuild-changed", action="store_true")
+    parser.add_argument("--drop-unlisted", action="store_true")
+    parser.add_argument("--dry-run", action="store_true")
+    args = parser.parse_args(argv)
+
+    db, _ = connect_from_args(args)
+    if args.command == "diff":
+        print(json.dumps(diff_indexes(db, collections=args.collections), indent=4))
+        if not verify_indexes(db, collections=args.collections):
+            raise SystemExit(1)
+        return
+
+    report = sync_indexes(db, collections=args.collections, rebuild_changed=args.rebuild_changed,
+                          drop_unlisted=args.drop_unlisted, dry_run=args.dry_run)
+    print(json.dumps(report, indent=4))
+    total = sum(seconds or 0 for result in report.values()
+                for seconds in list(result["built"].values()) + list(result["rebuilt"].values()))
+    print(f"✅ Index sync finished in {total:.2f}s of build time")
+
+
+if __name__ == "__main__":
+    main()
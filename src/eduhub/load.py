@@ -0,0 +1,410 @@
+
+# ### EduHub Bulk Loader
+# Loads dumps back into a database: export directories written by
+# eduhub.export (NDJSON or BSON, gzip/zstd), single .ndjson/.bson files, and
+# the legacy data/sample_data.json layout ({collection: [documents]}):
+#
+#   python -m eduhub load exports/2025-06-01 --workers 8 --defer-indexes
+#   python -m eduhub load dumps/enrollments.bson.zst --collection enrollments
+#   python -m eduhub load ../data/sample_data.json --bypass-validation
+#
+# The main process only decompresses and splits the input into batches of raw
+# lines / BSON documents; parsing and the unordered insert_many run in worker
+# processes, each with its own client. At most a few batches per worker are in
+# flight, so memory stays bounded however large the dump is.
+#
+# Duplicate keys do not abort a batch: the unordered insert keeps going and the
+# write errors are counted per document (duplicates vs other errors). With
+# --defer-indexes the non-unique secondary indexes of the target collections
+# are dropped before the load and recreated exactly afterwards (then the index
+# manifest is synced); unique indexes stay so duplicates are still rejected
+# during the load. --drop empties the target collections with delete_many,
+# so their validators and unique indexes survive.
+#
+# With --prevalidate each batch is screened by the compiled client-side
+# validators (eduhub.validation) before the insert; rejects go to the
+# --dead-letter file with their reasons instead of failing server-side. Pair
+# it with --bypass-validation to skip the server's own $jsonSchema pass.
+#
+# Loaded enrollments that lack the course snapshot (eduhub.denormalize) get it
+# backfilled once the load is done.
+
+
+
+## Importing libraries
+from pymongo.errors import BulkWriteError
+from bson import ObjectId, json_util
+from bson.raw_bson import RawBSONDocument
+from collections import deque
+from pathlib import Path
+from .bulk import classify_write_error
+from .cache import query_cache
+from .client import add_connection_arguments, connect_from_args, create_client, load_client_settings
+from .denormalize import backfill_enrollment_snapshots
+from .export import COMPRESSIONS, FORMATS, JSON_MODES, CHUNK_SIZE, open_export_file, load_manifest, verify_export
+from .indexes import INDEX_MANIFEST, sync_indexes
+from .validation import dead_letter_line, default_validators, screen_documents, write_dead_letters
+import multiprocessing
+import argparse
+import json
+import time
+
+
+
+DEFAULT_BATCH_SIZE = 1000
+# Batches queued per worker before the reader waits for results
+BATCHES_IN_FLIGHT = 2
+# Write errors kept per collection in the report
+ERROR_SAMPLES = 5
+
+
+
+
+## Inputs
+def _parse_filename(path):
+    """Returns (collection, format, compression) from names like enrollments.ndjson.gz."""
+    parts = Path(path).name.split(".")
+    compression = next((name for name, suffix in COMPRESSIONS.items() if suffix and suffix[1:] == parts[-1]), "none")
+    if compression != "none":
+        parts = parts[:-1]
+    fmt = parts[-1] if len(parts) > 1 else None
+    if fmt not in FORMATS + ("json",):
+        raise ValueError(f"Cannot tell the format of {path} (expected .ndjson, .bson or .json)")
+    return parts[0], fmt, compression
+
+
+def plan_inputs(path, collection=None):
+    """
+    Resolves a dump path into the files to load.
+
+    Parameters:
+        path (str | Path): Export directory (with manifest.json), or a single dump file.
+        collection (str): Target collection of a single .ndjson/.bson file (default: file name).
+
+    Returns:
+        list: [{"path", "collection", "format", "compression", "jsonMode", "documents"}].
+    """
+    path = Path(path)
+    if path.is_dir():
+        manifest = load_manifest(path)
+        return [{"path": path / entry["file"], "collection": name, "format": manifest["format"],
+                 "compression": manifest["compression"], "jsonMode": manifest.get("jsonMode"),
+                 "documents": entry["documents"]}
+                for name, entry in manifest["collections"].items()]
+
+    name, fmt, compression = _parse_filename(path)
+    if fmt == "json":
+        # Legacy dumps are a single small JSON document; read it once here
+        with open_export_file(path, compression) as stream:
+            dump = json_util.loads(stream.read())
+        groups = dump.items() if isinstance(dump, dict) else [(collection or name, dump)]
+        return [{"path": path, "collection": group, "format": "json", "compression": compression,
+                 "jsonMode": None, "documents": len(docs), "docs": [_legacy_document(doc) for doc in docs]}
+                for group, docs in groups]
+    return [{"path": path, "collection": collection or name, "format": fmt,
+             "compression": compression, "jsonMode": None, "documents": None}]
+
+
+def _legacy_document(doc):
+    # The legacy dump wrote ObjectIds with default=str
+    if isinstance(doc.get("_id"), str) and ObjectId.is_valid(doc["_id"]):
+        doc["_id"] = ObjectId(doc["_id"])
+    return doc
+
+
+def iter_batches(source, batch_size=DEFAULT_BATCH_SIZE):
+    """
+    Splits one input file into batches without parsing the documents.
+
+    Yields:
+        tuple: (collection, kind, payload) where kind is "ndjson" (list of raw
+        lines), "bson" (list of raw BSON documents) or "docs" (legacy documents,
+        already parsed by plan_inputs).
+    """
+    fmt, collection = source["format"], source["collection"]
+
+    if fmt == "json":
+        docs = source["docs"]
+        for start in range(0, len(docs), batch_size):
+            yield collection, "docs", docs[start:start + batch_size]
+        return
+
+    with open_export_file(source["path"], source["compression"]) as stream:
+        batch = []
+        if fmt == "bson":
+            while header := stream.read(4):
+                size = int.from_bytes(header, "little")
+                batch.append(header + stream.read(size - 4))
+                if len(batch) >= batch_size:
+                    yield collection, "bson", batch
+                    batch = []
+        else:
+            pending = b""
+            while chunk := stream.read(CHUNK_SIZE):
+                lines = (pending + chunk).split(b"\n")
+                pending = lines.pop()
+                for line in lines:
+                    if line.strip():
+                        batch.append(line)
+                        if len(batch) >= batch_size:
+                            yield collection, "ndjson", batch
+                            batch = []
+            if pending.strip():
+                batch.append(pending)
+        if batch:
+            yield collection, fmt, batch
+
+
+
+
+## Inserting
+def _decode(kind, payload, json_mode):
+    if kind == "bson":
+        return [RawBSONDocument(data) for data in payload]
+    if kind == "ndjson":
+        json_options = JSON_MODES[json_mode or "canonical"]
+        return [json_util.loads(line, json_options=json_options) for line in payload]
+    return payload
+
+
+def insert_batch(db, collection, docs, bypass_validation=False):
+    """
+    Inserts one batch unordered; write errors are counted, not raised.
+
+    Returns:
+        dict: {"collection", "inserted", "duplicates", "errors", "samples"}.
+    """
+    result = {"collection": collection, "inserted": len(docs), "duplicates": 0, "errors": 0, "samples": []}
+    if not docs:
+        return result
+    try:
+        db[collection].insert_many(docs, ordered=False, bypass_document_validation=bypass_validation)
+    except BulkWriteError as exc:
+        failures = [{"index": error.get("index"), **classify_write_error(error)}
+                    for error in exc.details.get("writeErrors", [])]
+        result["inserted"] = exc.details.get("nInserted", 0)
+        result["duplicates"] = sum(1 for failure in failures if failure["reason"] == "duplicate_key")
+        result["errors"] = len(failures) - result["duplicates"]
+        result["samples"] = [failure for failure in failures if failure["reason"] != "duplicate_key"][:ERROR_SAMPLES]
+    return result
+
+
+def _load_task(db, task, json_mode, bypass_validation, prevalidate):
+    collection, kind, payload = task
+    docs = _decode(kind, payload, json_mode)
+    rejects = []
+    validate = default_validators().get(collection) if prevalidate else None
+    if validate:
+        docs, rejects = screen_documents(docs, validate)
+    result = insert_batch(db, collection, docs, bypass_validation)
+    # Dead letters travel back as text so only the main process writes the file
+    result["rejected"] = len(rejects)
+    result["deadLetters"] = [dead_letter_line(collection, doc, errors) for doc, errors in rejects]
+    return result
+
+
+# Worker process state (one client per process)
+_worker_db = None
+
+
+def _init_worker(settings, db_name):
+    global _worker_db
+    _worker_db = create_client(settings)[db_name]
+
+
+def _run_task(task, json_mode, bypass_validation, prevalidate):
+    return _load_task(_worker_db, task, json_mode, bypass_validation, prevalidate)
+
+
+
+
+## Deferred indexes
+def index_spec(index):
+    """
+    Returns the create_index() arguments of a list_indexes() document, as
+    (keys, options). Text indexes get their text fields back from the weights.
+    """
+    keys = []
+    for field, direction in index["key"].items():
+        if field == "_fts":
+            keys += [(text_field, "text") for text_field in index.get("weights", {})]
+        elif field != "_ftsx":
+            keys.append((field, direction))
+    options = {option: value for option, value in index.items() if option not in ("v", "key", "ns")}
+    return keys, options
+
+
+def drop_secondary_indexes(db, collections):
+    """
+    Drops the non-unique secondary indexes of the collections.
+
+    Returns:
+        dict: collection -> list_indexes() documents of the dropped indexes (see restore_indexes).
+    """
+    dropped = {}
+    for name in collections:
+        dropped[name] = []
+        for index in list(db[name].list_indexes()):
+            if index["name"] != "_id_" and not index.get("unique"):
+                db[name].drop_index(index["name"])
+                dropped[name].append(index)
+    return dropped
+
+
+def restore_indexes(db, dropped):
+    """Recreates the indexes returned by drop_secondary_indexes() with their original keys and options."""
+    for name, indexes in dropped.items():
+        for index in indexes:
+            keys, options = index_spec(index)
+            db[name].create_index(keys, **options)
+
+
+
+
+## Loading
+def load_dump(db, path, collection=None, workers=1, settings=None, batch_size=DEFAULT_BATCH_SIZE,
+              defer_indexes=False, drop=False, bypass_validation=False, verify=True, prevalidate=False,
+              dead_letter_path=None, progress=None):
+    """
+    Loads a dump into the database.
+
+    Parameters:
+        db (Database): Target database.
+        path (str | Path): Export directory or dump file (see plan_inputs).
+        collection (str): Target collection of a single .ndjson/.bson file.
+        workers (int): Worker processes that parse and insert (1 = this process).
+        settings (dict): Client settings the workers connect with (default: load_client_settings()).
+        batch_size (int): Documents per insert_many call.
+        defer_indexes (bool): Drop non-unique secondary indexes first; recreate them and sync the manifest after.
+        drop (bool): Empty the target collections before loading (validators and indexes are kept).
+        bypass_validation (bool): Skip the $jsonSchema validators for trusted dumps.
+        verify (bool): Check export checksums against the manifest before loading.
+        prevalidate (bool): Screen documents with the compiled client-side validators first.
+        dead_letter_path (str): NDJSON file the prevalidation rejects are appended to.
+        progress (callable): Optional callback(batch result) invoked after each batch.
+
+    Returns:
+        dict: {"collections": {name: {"inserted", "duplicates", "errors", "rejected", "samples", "expected"}},
+               "documents", "seconds", "docsPerSecond", "indexSeconds"}.
+    """
+    sources = plan_inputs(path, collection)
+    if verify and Path(path).is_dir():
+        mismatched = {name: issues for name, issues in verify_export(path, count_documents=False).items() if issues}
+        if mismatched:
+            raise ValueError(f"Export does not match its manifest: {mismatched}")
+
+    targets = list(dict.fromkeys(source["collection"] for source in sources))
+    totals = {name: {"inserted": 0, "duplicates": 0, "errors": 0, "rejected": 0, "samples": [], "expected": None}
+              for name in targets}
+    for source in sources:
+        if source["documents"] is not None:
+            totals[source["collection"]]["expected"] = source["documents"]
+
+    def record(result):
+        entry = totals[result["collection"]]
+        for key in ("inserted", "duplicates", "errors", "rejected"):
+            entry[key] += result[key]
+        if dead_letter_path:
+            write_dead_letters(dead_letter_path, result["deadLetters"])
+        entry["samples"] = (entry["samples"] + result["samples"])[:ERROR_SAMPLES]
+        if progress:
+            progress(result)
+
+    index_seconds = None
+    dropped_indexes = {}
+    try:
+        if defer_indexes:
+            dropped_indexes = drop_secondary_indexes(db, targets)
+        if drop:
+            # delete_many rather than drop_collection: dropping would also remove the
+            # validators and the unique indexes the duplicate counts rely on
+            for name in targets:
+                db[name].delete_many({})
+                query_cache.invalidate(name)
+        started = time.perf_counter()
+        if workers <= 1:
+            for source in sources:
+                for task in iter_batches(source, batch_size):
+                    record(_load_task(db, task, source["jsonMode"], bypass_validation, prevalidate))
+        else:
+            # apply_async with a bounded queue instead of imap: imap would read the
+            # whole dump into the task queue ahead of the workers
+            with multiprocessing.Pool(workers, initializer=_init_worker,
+                                      initargs=(settings or load_client_settings(), db.name)) as pool:
+                pending = deque()
+                for source in sources:
+                    for task in iter_batches(source, batch_size):
+                        task_args = (task, source["jsonMode"], bypass_validation, prevalidate)
+                        pending.append(pool.apply_async(_run_task, task_args))
+                        if len(pending) >= workers * BATCHES_IN_FLIGHT:
+                            record(pending.popleft().get())
+                while pending:
+                    record(pending.popleft().get())
+        seconds = time.perf_counter() - started
+    finally:
+        # Rebuild the deferred indexes even when a batch or worker failed, so an
+        # aborted load never leaves the collections without secondary indexes
+        if defer_indexes:
+            index_started = time.perf_counter()
+            # Recreate exactly what was dropped (advisor-applied indexes included), then
+            # build whatever the manifest lists on top
+            restore_indexes(db, dropped_indexes)
+            sync_indexes(db, collections=[name for name in targets if name in INDEX_MANIFEST])
+            index_seconds = time.perf_counter() - index_started
+        for name, entry in totals.items():
+            if entry["inserted"]:
+                query_cache.invalidate(name)
+
+    if totals.get("enrollments", {}).get("inserted"):
+        # Dumps may predate the denormalized snapshot; the denormalized reports skip
+        # enrollments without one
+        backfill_enrollment_snapshots(db)
+
+    documents = sum(entry["inserted"] for entry in totals.values())
+    return {
+        "collections": totals,
+        "documents": documents,
+        "seconds": round(seconds, 3),
+        "docsPerSecond": round(documents / seconds) if seconds else None,
+        "indexSeconds": round(index_seconds, 3) if index_seconds is not None else None
+    }
+
+
+
+
+## Command line entry point
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Load an EduHub export or dump file into a database.")
+    parser.add_argument("path", help="Export directory (manifest.json) or .ndjson/.bson/.json file")
+    add_connection_arguments(parser)
+    parser.add_argument("--collection", help="Target collection of a single .ndjson/.bson file")
+    parser.add_argument("--workers", type=int, default=multiprocessing.cpu_count())
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE)
+    parser.add_argument("--defer-indexes", action="store_true")
+    parser.add_argument("--drop", action="store_true", help="Empty the target collections first")
+    parser.add_argument("--bypass-validation", action="store_true")
+    parser.add_argument("--skip-verify", action="store_true")
+    parser.add_argument("--prevalidate", action="store_true", help="Screen documents client-side before inserting")
+    parser.add_argument("--dead-letter", help="NDJSON file for documents rejected by --prevalidate")
+    args = parser.parse_args(argv)
+
+    db, settings = connect_from_args(args)
+    report = load_dump(db, args.path, args.collection, args.workers, settings, args.batch_size,
+                       args.defer_indexes, args.drop, args.bypass_validation, not args.skip_verify,
+                       args.prevalidate, args.dead_letter)
+
+    for name, entry in report["collections"].items():
+        expected = f" of {entry['expected']}" if entry["expected"] is not None else ""
+        status = "✅" if not entry["errors"] and not entry["rejected"] else "❌"
+        print(f"{status} {name}: {entry['inserted']}{expected} inserted, "
+              f"{entry['duplicates']} duplicates, {entry['errors']} errors, {entry['rejected']} rejected")
+        for sample in entry["samples"]:
+            print(f"   {json.dumps(sample)}")
+    print(f"✅ Loaded {report['documents']} documents in {report['seconds']}s "
+          f"({report['docsPerSecond']} docs/s)")
+    if report["indexSeconds"] is not None:
+        print(f"✅ Rebuilt deferred indexes in {report['indexSeconds']}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,225 @@
+
+# ### EduHub Keyset Pagination
+# Cursor-token pagination for listings. A page is "the next page_size documents
+# after the last one you saw" in a stable sort order that ends in _id, instead
+# of skip(N): the query starts at the token's position in a matching compound
+# index, so page 500 reads as many index entries as page 1.
+#
+#   page = courses_by_category_page(db, "Data Science", order="top_rated")
+#   page = courses_by_category_page(db, "Data Science", order="top_rated", token=page["next"])
+#
+# Each listing has a compound index in the manifest (eduhub.indexes) with the
+# filter's equality field first and the sort keys after it, e.g.
+# courses {category: 1, rating: -1, _id: -1}.
+#
+# Tokens are opaque (URL-safe base64 of a small BSON document holding the sort
+# order, the last row's sort values and a fingerprint of the filter) and are
+# rejected with ValueError when replayed against a different query or order.
+# Documents without a sort value sort as null, like the server does.
+
+
+
+## Importing libraries
+from bson import decode, encode, json_util
+from bson.errors import InvalidBSON
+from .cache import query_cache
+from .reads import cached_find
+import base64
+import binascii
+import hashlib
+import json
+
+
+
+# Order name -> sort keys; every order ends in _id so the sort is total
+SORT_ORDERS = {
+    "newest": [("createdAt", -1), ("_id", -1)],
+    "top_rated": [("rating", -1), ("_id", -1)],
+    "price_low": [("price", 1), ("_id", 1)],
+    "price_high": [("price", -1), ("_id", -1)],
+    "id": [("_id", 1)],
+}
+
+TOKEN_VERSION = 1
+MAX_PAGE_SIZE = 500
+
+
+
+
+## Tokens
+def query_fingerprint(collection, filter, order):
+    """Short hash tying a token to the query it was issued for."""
+    text = json.dumps([collection, json.loads(json_util.dumps(filter)), order], sort_keys=True)
+    return hashlib.sha1(text.encode()).hexdigest()[:16]
+
+
+def encode_token(order, values, fingerprint):
+    payload = encode({"v": TOKEN_VERSION, "o": order, "k": list(values), "q": fingerprint})
+    return base64.urlsafe_b64encode(payload).decode().rstrip("=")
+
+
+def decode_token(token, order, fingerprint):
+    """
+    Returns the sort values stored in a token.
+
+    Raises:
+        ValueError: If the token is malformed or belongs to another query or order.
+    """
+    try:
+        payload = decode(base64.urlsafe_b64decode(token + "=" * (-len(token) % 4)))
+    except (binascii.Error, InvalidBSON, ValueError) as exc:
+        raise ValueError("Malformed page token.") from exc
+    if payload.get("v") != TOKEN_VERSION or payload.get("o") != order or payload.get("q") != fingerprint:
+        raise ValueError("Page token does not belong to this query.")
+    if len(payload.get("k", [])) != len(SORT_ORDERS[order]):
+        raise ValueError("Malformed page token.")
+    return payload["k"]
+
+
+
+
+## Keyset filters
+def _get_path(doc, path):
+    for part in path.split("."):
+        if not isinstance(doc, dict):
+            return None
+        doc = doc.get(part)
+    return doc
+
+
+def _after(field, direction, value):
+    """Filter for values strictly after `value` in the given direction (None = nothing after)."""
+    if value is None:
+        # null sorts first: everything non-null is after it ascending, nothing is descending
+        return {field: {"$ne": None}} if direction == 1 else None
+    if direction == 1:
+        return {field: {"$gt": value}}
+    # Descending, the nulls/missing values come last
+    return {"$or": [{field: {"$lt": value}}, {field: None}]}
+
+
+def _from(field, direction, value):
+    """Index-bounding filter for values at or after `value` (None when it cannot bound the scan)."""
+    if value is None:
+        return {field: None} if direction == -1 else None
+    if direction == 1:
+        return {field: {"$gte": value}}
+    return {field: {"$not": {"$gt": value}}}
+
+
+def keyset_filter(sort, values):
+    """
+    Builds the filter selecting the documents after `values` in `sort` order.
+
+    For sort keys (k1, ..., kn) it is: k1 after v1, or k1 = v1 and k2 after v2,
+    ... A plain bound on k1 is added on top so the index scan starts at the
+    token's position instead of filtering from the beginning.
+    """
+    branches = []
+    for position, (field, direction) in enumerate(sort):
+        after = _after(field, direction, values[position])
+        if after is None:
+            continue
+        equal = {sort[i][0]: values[i] for i in range(position)}
+        branches.append({"$and": [equal, after]} if equal else after)
+
+    if not branches:
+        return {"_id": {"$exists": False}}  # nothing sorts after the token
+    keyset = branches[0] if len(branches) == 1 else {"$or": branches}
+    bound = _from(sort[0][0], sort[0][1], values[0]) if len(sort) > 1 else None
+    return {"$and": [bound, keyset]} if bound else keyset
+
+
+
+
+## Pages
+def find_page(db, collection, filter, order, page_size=50, token=None, projection=None, cache=None, name="page"):
+    """
+    Returns one page of a keyset-paginated find.
+
+    Parameters:
+        db (Database): The connected MongoDB database object.
+        collection (str): Collection to read.
+        filter (dict): Listing filter (the same for every page).
+        order (str): Key of SORT_ORDERS.
+        page_size (int): Documents per page (at most MAX_PAGE_SIZE).
+        token (str): The previous page's "next" token (None for the first page).
+        projection (dict): Optional inclusion projection; the sort fields are always returned.
+        cache (QueryCache): Optional read-through cache (see eduhub.reads.cached_find).
+        name (str): Query name, part of the cache key.
+
+    Returns:
+        dict: {"items": [documents], "next": token for the following page, or None on the last page}.
+    """
+    if order not in SORT_ORDERS:
+        raise ValueError(f"Unknown sort order: {order}")
+    if not 0 < page_size <= MAX_PAGE_SIZE:
+        raise ValueError(f"page_size must be between 1 and {MAX_PAGE_SIZE}.")
+
+    sort = SORT_ORDERS[order]
+    fingerprint = query_fingerprint(collection, filter, order)
+    query = filter
+    if token is not None:
+        query = {"$and": [filter, keyset_filter(sort, decode_token(token, order, fingerprint))]}
+    if projection:
+        # _id: 0 is fine (a projection profile's default); the sort fields re-include it
+        if not all(value for field, value in projection.items() if field != "_id"):
+            raise ValueError("Paged reads need an inclusion projection (the sort fields build the token).")
+        projection = {**projection, **{field: 1 for field, _ in sort}}
+
+    # One extra document tells whether another page exists
+    docs = cached_find(db, collection, query, projection, sort, page_size + 1, cache=cache, name=name)
+    items = docs[:page_size]
+    next_token = None
+    if len(docs) > page_size:
+        last = items[-1]
+        next_token = encode_token(order, [_get_path(last, field) for field, _ in sort], fingerprint)
+    return {"items": items, "next": next_token}
+
+
+def iter_pages(fetch_page, **params):
+    """Yields every page of a page function (e.g. courses_by_category_page), following the tokens."""
+    token = None
+    while True:
+        page = fetch_page(token=token, **params)
+        yield page
+        token = page["next"]
+        if token is None:
+            return
+
+
+
+
+
+## Listings (the Section 3.2 / 4.1 reads, paginated)
+def catalogue_page(db, order="newest", page_size=50, token=None, projection=None, cache=query_cache):
+    """Returns a page of all courses in the given order (newest, top_rated, price_low, price_high)."""
+    return find_page(db, "courses", {}, order, page_size, token, projection, cache, "catalogue_page")
+
+
+def courses_by_category_page(db, category, order="newest", page_size=50, token=None, projection=None,
+                             cache=query_cache):
+    """Returns a page of the courses in a category (newest, top_rated, price_low, price_high)."""
+    return find_page(db, "courses", {"category": category}, order, page_size, token, projection, cache,
+                     "courses_by_category_page")
+
+
+def courses_in_price_range_page(db, min_price, max_price, order="price_low", page_size=50, token=None,
+                                projection=None, cache=query_cache):
+    """Returns a page of the courses priced between min_price and max_price (price_low or price_high)."""
+    if order not in ("price_low", "price_high"):
+        raise ValueError("Price range pages are ordered by price (price_low or price_high).")
+    return find_page(db, "courses", {"price": {"$gte": min_price, "$lte": max_price}}, order, page_size,
+                     token, projection, cache, "courses_in_price_range_page")
+
+
+def courses_with_tags_page(db, tags, page_size=50, token=None, projection=None, cache=query_cache):
+    """Returns a page of the courses having at least one of the tags, newest first."""
+    return find_page(db, "courses", {"tags": {"$in": sorted(tags)}}, "newest", page_size, token, projection,
+                     cache, "courses_with_tags_page")
+
+
+def active_students_page(db, page_size=50, token=None, projection=None, cache=query_cache):
+    """Returns a page of the active students in _id order."""
+    return find_page(db, "users", {"role": "student", "isActive": True}, "id", page_size, token, projection,
+                     cache, "active_students_page")
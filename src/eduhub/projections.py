@@ -0,0 +1,253 @@
+
+# ### EduHub Projection Profiles
+# Named projections per collection, so list views stop fetching whole
+# documents (user bios and avatars, full lesson content, course title
+# trigrams) they never show:
+#
+#   summary  identifiers and the few fields a compact list row needs
+#   card     a listing card: summary plus status, dates and small attributes
+#   detail   the full document minus internal helper fields
+#
+#   db.users.find({"role": "student"}, projection("users", "card"))
+#   to_records(db.users.find({}, projection("users", "summary")), "users", "summary")
+#
+# summary and card documents can be decoded into __slots__ record types
+# (record_type), which hold the same values in a fraction of a dict's memory:
+#
+#   python -m eduhub profiles bench --collection users --rows 100000
+
+
+
+## Importing libraries
+from bson.codec_options import CodecOptions
+from bson.raw_bson import RawBSONDocument
+from functools import lru_cache
+from .seed import SAMPLE_COUNTS, seed_database
+from .client import add_connection_arguments, connect_from_args
+import argparse
+import time
+import tracemalloc
+
+
+
+PROJECTION_PROFILES = {
+    "users": {
+        "summary": ["userId", "firstName", "lastName", "role"],
+        "card": ["userId", "firstName", "lastName", "role", "email", "isActive", "dateJoined", "profile.avatar"],
+        "detail": {}
+    },
+    "courses": {
+        "summary": ["courseId", "title", "category", "level", "price", "rating"],
+        "card": ["courseId", "title", "category", "level", "price", "rating", "instructorId", "tags",
+                 "duration", "isPublished", "createdAt"],
+        # titleTrigrams only exists for the substring search index (eduhub.search)
+        "detail": {"titleTrigrams": 0}
+    },
+    "enrollments": {
+        "summary": ["enrollmentId", "studentId", "courseId", "status"],
+        "card": ["enrollmentId", "studentId", "courseId", "status", "progress", "enrolledAt"],
+        "detail": {}
+    },
+    "lessons": {
+        "summary": ["lessonId", "courseId", "title", "order"],
+        "card": ["lessonId", "courseId", "title", "order", "resources", "createdAt"],
+        "detail": {}
+    },
+    "assignments": {
+        "summary": ["assignmentId", "courseId", "title", "dueDate"],
+        "card": ["assignmentId", "courseId", "lessonId", "title", "dueDate", "points"],
+        "detail": {}
+    },
+    "submissions": {
+        "summary": ["submissionId", "assignmentId", "studentId", "grade"],
+        "card": ["submissionId", "assignmentId", "studentId", "grade", "submittedAt"],
+        "detail": {}
+    },
+}
+
+PROFILES = ("summary", "card", "detail")
+
+# Collection -> record class name prefix
+RECORD_NAMES = {"users": "User", "courses": "Course", "enrollments": "Enrollment",
+                "lessons": "Lesson", "assignments": "Assignment", "submissions": "Submission"}
+
+# Collections a benchmark collection's references point into (seeded at sample size)
+REFERENCED = {"users": [], "courses": ["users"], "enrollments": ["users", "courses"],
+              "lessons": ["users", "courses"], "assignments": ["users", "courses"],
+              "submissions": ["users", "courses", "assignments"]}
+
+
+
+
+## Projections
+def _profile(collection, profile):
+    if collection not in PROJECTION_PROFILES:
+        raise ValueError(f"No projection profiles for {collection}")
+    if profile not in PROJECTION_PROFILES[collection]:
+        raise ValueError(f"Unknown projection profile '{profile}'; expected one of {PROFILES}.")
+    return PROJECTION_PROFILES[collection][profile]
+
+
+def projection(collection, profile):
+    """
+    Returns the find()/$project projection of a profile.
+
+    summary and card are inclusion projections without _id (the business ids
+    identify the rows); detail is an exclusion projection, or None when the
+    whole document is returned.
+    """
+    fields = _profile(collection, profile)
+    if isinstance(fields, dict):
+        return dict(fields) or None
+    return {"_id": 0, **{field: 1 for field in fields}}
+
+
+def find_profiled(db, collection, filter=None, profile="summary", sort=None, limit=0, as_records=False):
+    """
+    Runs a find with a projection profile.
+
+    Returns:
+        list: Documents, or record objects when as_records is True (summary/card only).
+    """
+    cursor = db[collection].find(filter or {}, projection(collection, profile))
+    if sort:
+        cursor = cursor.sort(sort)
+    if limit:
+        cursor = cursor.limit(limit)
+    return list(to_records(cursor, collection, profile)) if as_records else list(cursor)
+
+
+
+
+## Record types
+class Record:
+    """Base of the generated record types: attribute access, no per-instance dict."""
+
+    __slots__ = ()
+    _paths = ()
+
+    def __init__(self, *values):
+        for attribute, value in zip(self.__slots__, values):
+            setattr(self, attribute, value)
+
+    @classmethod
+    def from_document(cls, doc):
+        values = []
+        for path in cls._paths:
+            value = doc
+            for part in path.split("."):
+                value = value.get(part) if isinstance(value, dict) else None
+            values.append(value)
+        return cls(*values)
+
+    def as_dict(self):
+        return {attribute: getattr(self, attribute) for attribute in self.__slots__}
+
+    def __eq__(self, other):
+        return type(self) is type(other) and self.as_dict() == other.as_dict()
+
+    def __repr__(self):
+        fields = ", ".join(f"{attribute}={getattr(self, attribute)!r}" for attribute in self.__slots__)
+        return f"{type(self).__name__}({fields})"
+
+
+@lru_cache(maxsize=None)
+def record_type(collection, profile):
+    """
+    Returns the __slots__ record class of a summary or card profile, e.g.
+    UserCard with attributes userId, ..., profile_avatar (dots become underscores).
+    """
+    fields = _profile(collection, profile)
+    if isinstance(fields, dict):
+        raise ValueError(f"The {profile} profile returns whole documents; records exist for summary and card.")
+    name = f"{RECORD_NAMES.get(collection, collection.title())}{profile.title()}"
+    return type(name, (Record,), {"__slots__": tuple(field.replace(".", "_") for field in fields),
+                                  "_paths": tuple(fields)})
+
+
+def to_records(docs, collection, profile):
+    """Decodes documents (e.g. a cursor) into record objects, one at a time."""
+    build = record_type(collection, profile).from_document
+    for doc in docs:
+        yield build(doc)
+
+
+
+
+## Benchmark
+def _listing_bytes(db, collection, profile, limit):
+    raw = db.get_collection(collection, codec_options=CodecOptions(document_class=RawBSONDocument))
+    return sum(len(doc.raw) for doc in raw.find({}, projection(collection, profile)).limit(limit))
+
+
+def _retained_memory(build):
+    tracemalloc.start()
+    try:
+        result = build()
+        retained, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return len(result), retained
+
+
+def benchmark_profiles(db, collection="users", rows=100_000):
+    """
+    Measures a rows-long listing under each profile.
+
+    Returns:
+        list: One dict per profile with the document bytes transferred, the
+              memory retained by the decoded dicts and by the records, and the fetch time.
+    """
+    results = []
+    for profile in PROFILES:
+        # Timed untraced: tracemalloc slows allocation-heavy decoding several times over
+        started = time.perf_counter()
+        find_profiled(db, collection, profile=profile, limit=rows)
+        seconds = time.perf_counter() - started
+        count, dict_memory = _retained_memory(lambda: find_profiled(db, collection, profile=profile, limit=rows))
+        record_memory = None
+        if not isinstance(PROJECTION_PROFILES[collection][profile], dict):
+            _, record_memory = _retained_memory(
+                lambda: find_profiled(db, collection, profile=profile, limit=rows, as_records=True))
+        results.append({
+            "profile": profile,
+            "rows": count,
+            "bytes": _listing_bytes(db, collection, profile, rows),
+            "dictMemory": dict_memory,
+            "recordMemory": record_memory,
+            "seconds": round(seconds, 3)
+        })
+    return results
+
+
+
+
+## Command line entry point
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the projection profiles on a large listing.")
+    parser.add_argument("command", choices=["bench"])
+    add_connection_arguments(parser, database="eduhub_bench")
+    parser.add_argument("--collection", default="users", choices=sorted(PROJECTION_PROFILES))
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--skip-seed", action="store_true", help="Reuse the documents already in --db")
+    args = parser.parse_args(argv)
+
+    db, settings = connect_from_args(args)
+    if not args.skip_seed:
+        counts = {name: SAMPLE_COUNTS[name] for name in REFERENCED[args.collection]}
+        counts[args.collection] = args.rows
+        for name in counts:
+            db.drop_collection(name)
+        seed_database(db, counts=counts, seed=7, workers=4, settings=settings, mode="vectorized")
+
+    full_bytes = None
+    for row in benchmark_profiles(db, args.collection, args.rows):
+        full_bytes = full_bytes or row["bytes"]
+        records = f", records {row['recordMemory'] / 2**20:.1f} MiB" if row["recordMemory"] is not None else ""
+        print(f"✅ {args.collection} {row['profile']:<7} {row['rows']} rows: "
+              f"{row['bytes'] / 2**20:.1f} MiB transferred ({row['bytes'] / full_bytes:.0%}), "
+              f"dicts {row['dictMemory'] / 2**20:.1f} MiB{records}, {row['seconds']}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,143 @@
+
+# ### EduHub Read Queries
+# Reusable, index-backed versions of the Section 3.2 / 4.1 read operations.
+
+
+
+## Importing libraries
+from .cache import query_cache, make_key
+
+
+
+ENROLLMENT_STATUSES = ["active", "completed", "dropped"]
+
+DEFAULT_PAGE_SIZE = 50
+
+# Fields returned for each student in a course roster
+ROSTER_STUDENT_FIELDS = {"_id": 0, "userId": 1, "email": 1, "firstName": 1, "lastName": 1, "isActive": 1}
+
+
+
+
+## Course roster
+def course_roster_pipeline(course_id, active_enrollments_only=False, active_users_only=False,
+                           after=None, page_size=DEFAULT_PAGE_SIZE):
+    """Builds the enrollments aggregation behind course_roster()."""
+    # Active-only pages match the partial active_enrollments_roster index (eduhub.indexes)
+    status = "active" if active_enrollments_only else {"$in": ENROLLMENT_STATUSES}
+    match = {"courseId": course_id, "status": status}
+    if after is not None:
+        match["enrollmentId"] = {"$gt": after}
+
+    user_pipeline = [{"$project": ROSTER_STUDENT_FIELDS}]
+    if active_users_only:
+        user_pipeline.insert(0, {"$match": {"isActive": True}})
+
+    pipeline = [
+        {"$match": match},
+        {"$sort": {"enrollmentId": 1}},
+        {"$lookup": {
+            "from": "users",
+            "localField": "studentId",
+            "foreignField": "userId",
+            "pipeline": user_pipeline,
+            "as": "student"
+        }},
+        {"$unwind": "$student"},
+        {"$limit": page_size},
+        {"$project": {
+            "_id": 0,
+            "enrollmentId": 1,
+            "status": 1,
+            "progress": 1,
+            "enrolledAt": 1,
+            "student": 1
+        }}
+    ]
+
+    # Without the user filter every enrollment yields a row, so the page can be
+    # cut before the $lookup and only page_size users are fetched.
+    if not active_users_only:
+        pipeline.insert(2, {"$limit": page_size})
+    return pipeline
+
+
+def course_roster(db, course_id, active_enrollments_only=False, active_users_only=False,
+                  after=None, page_size=DEFAULT_PAGE_SIZE):
+    """
+    Returns one page of the students enrolled in a course, in a single aggregation.
+
+    Replaces the two-query pattern (collect studentIds, then users.find with $in)
+    with a $lookup into users, so a roster costs one round trip regardless of size.
+
+    Parameters:
+        db (Database): The connected MongoDB database object.
+        course_id (str): The courseId to list students for.
+        active_enrollments_only (bool): Only include enrollments with status "active".
+        active_users_only (bool): Only include users with isActive = True.
+        after (str): enrollmentId of the last row of the previous page (None for the first page).
+        page_size (int): Maximum number of rows to return.
+
+    Returns:
+        list: Rows with enrollmentId, status, progress, enrolledAt and the embedded student.
+              Pass the last row's enrollmentId as `after` to fetch the next page.
+    """
+    pipeline = course_roster_pipeline(course_id, active_enrollments_only, active_users_only, after, page_size)
+    return list(db.enrollments.aggregate(pipeline))
+
+
+
+## Catalogue queries (Section 3.2 / 4.1), served through the query cache
+def cached_find(db, collection, filter, projection=None, sort=None, limit=0, cache=query_cache, name="find"):
+    """
+    Runs a find through the read-through cache.
+
+    Parameters:
+        db (Database): The connected MongoDB database object.
+        collection (str): Collection to query.
+        filter (dict): Query filter.
+        projection (dict): Optional projection.
+        sort (list): Optional list of (field, direction) pairs.
+        limit (int): Optional maximum number of documents (0 = no limit).
+        cache (QueryCache): Cache to use; None bypasses caching.
+        name (str): Query name, part of the cache key.
+
+    Returns:
+        list: Matching documents (shared with the cache; do not mutate).
+    """
+    def load():
+        cursor = db[collection].find(filter, projection)
+        if sort:
+            cursor = cursor.sort(sort)
+        if limit:
+            cursor = cursor.limit(limit)
+        return list(cursor)
+
+    if cache is None:
+        return load()
+    key = make_key(name, collection, filter, projection, db=db.name, sort=sort or [], limit=limit)
+    return cache.get_or_load(key, [collection], load)
+
+
+def find_active_students(db, projection=None, cache=query_cache):
+    """Returns all active students."""
+    return cached_find(db, "users", {"role": "student", "isActive": True}, projection,
+                       cache=cache, name="active_students")
+
+
+def find_courses_by_category(db, category, projection=None, cache=query_cache):
+    """Returns all courses in a category."""
+    return cached_find(db, "courses", {"category": category}, projection,
+                       cache=cache, name="courses_by_category")
+
+
+def find_courses_in_price_range(db, min_price, max_price, projection=None, cache=query_cache):
+    """Returns the courses priced between min_price and max_price (inclusive)."""
+    return cached_find(db, "courses", {"price": {"$gte": min_price, "$lte": max_price}}, projection,
+                       cache=cache, name="courses_in_price_range")
+
+
+def find_courses_with_tags(db, tags, projection=None, cache=query_cache):
+    """Returns the courses having at least one of the given tags."""
+    return cached_find(db, "courses", {"tags": {"$in": list(tags)}}, projection,
+                       cache=cache, name="courses_with_tags")
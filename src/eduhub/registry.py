@@ -0,0 +1,187 @@
+
+# ### EduHub Query Registry
+# One named entry for every find and aggregation the project runs, so the
+# benchmark and explain tooling exercise exactly the queries the code issues.
+#
+# Each entry is a dict:
+#   {"name", "collection", "op": "find" | "aggregate",
+#    "filter", "projection", "sort", "limit"}   for finds
+#   {"name", "collection", "op", "pipeline"}    for aggregations
+
+
+
+## Importing libraries
+from datetime import datetime, timezone, timedelta
+from .analytics import REPORT_PIPELINES
+from .reads import course_roster_pipeline
+from .search import substring_query, DEFAULT_SEARCH_PAGE_SIZE
+from .rollups import enrollment_trends_pipeline, ROLLUP_COLLECTIONS
+import inspect
+
+
+
+def _sample(db, collection, field, default):
+    doc = db[collection].find_one({field: {"$exists": True}}, {field: 1})
+    return doc[field] if doc else default
+
+
+def _find(name, collection, filter, projection=None, sort=None, limit=0):
+    return {"name": name, "collection": collection, "op": "find", "filter": filter,
+            "projection": projection, "sort": sort, "limit": limit}
+
+
+def _aggregate(name, collection, pipeline):
+    return {"name": name, "collection": collection, "op": "aggregate", "pipeline": pipeline}
+
+
+def build_query_registry(db, now=None):
+    """
+    Returns the registry of named queries, with parameters sampled from the database.
+
+    Parameters:
+        db (Database): The connected MongoDB database object (used to pick real ids/emails).
+        now (datetime): Reference time for date-relative queries (default: now, UTC).
+
+    Returns:
+        list: Query specs in a stable order.
+    """
+    now = now or datetime.now(timezone.utc)
+    email = _sample(db, "users", "email", "student@example.com")
+    user_id = _sample(db, "users", "userId", "missing-user")
+    # Per-role ids come from the collections referencing them, so the queries read a
+    # student with submissions and an instructor with courses (seeded users start
+    # with the instructors, so the first user is never a student)
+    student_id = _sample(db, "submissions", "studentId", "missing-student")
+    instructor_id = _sample(db, "courses", "instructorId", "missing-instructor")
+    course_id = _sample(db, "courses", "courseId", "missing-course")
+    submission_id = _sample(db, "submissions", "submissionId", "missing-submission")
+    enrollment = db.enrollments.find_one({}, {"studentId": 1, "courseId": 1}) or {}
+
+    registry = [
+        # Section 3.2 / 4.1 / 5.2 reads
+        _find("user_by_email", "users", {"email": email}, limit=1),
+        _find("user_by_id", "users", {"userId": user_id}, limit=1),
+        _find("active_students", "users", {"role": "student", "isActive": True}),
+        _find("recent_users", "users", {"dateJoined": {"$gte": now - timedelta(days=6 * 30)}}),
+        _find("course_by_id", "courses", {"courseId": course_id}, limit=1),
+        _find("courses_by_category", "courses", {"category": "Data Science"}),
+        _find("courses_in_price_range", "courses", {"price": {"$gte": 50, "$lte": 200}}),
+        _find("courses_with_tags", "courses", {"tags": {"$in": ["python", "data science"]}}),
+        _find("course_text_search", "courses", {"$text": {"$search": "python"}},
+              projection={"score": {"$meta": "textScore"}},
+              sort={"score": {"$meta": "textScore"}}, limit=DEFAULT_SEARCH_PAGE_SIZE),
+        _find("course_title_substring", "courses", substring_query("data")),
+        _find("lesson_by_course_order", "lessons", {"courseId": course_id, "order": 1}, limit=1),
+        _find("upcoming_assignments", "assignments",
+              {"dueDate": {"$gte": now, "$lte": now + timedelta(days=7)}}),
+        _find("submission_by_id", "submissions", {"submissionId": submission_id}, limit=1),
+        _find("enrollment_by_student_course", "enrollments",
+              {"studentId": enrollment.get("studentId", student_id),
+               "courseId": enrollment.get("courseId", course_id)}, limit=1),
+        # Per-entity listings (instructor dashboard, gradebook, snapshot propagation and stats refresh)
+        _find("courses_by_instructor", "courses", {"instructorId": instructor_id}),
+        _find("enrollments_by_course", "enrollments", {"courseId": course_id}),
+        _find("submissions_by_student", "submissions", {"studentId": student_id}),
+        _find("submissions_by_assignment", "submissions",
+              {"assignmentId": _sample(db, "assignments", "assignmentId", "missing-assignment")}),
+        _aggregate("course_with_instructor", "courses", [
+            {"$lookup": {"from": "users", "localField": "instructorId",
+                         "foreignField": "userId", "as": "instructor"}},
+            {"$unwind": "$instructor"}
+        ]),
+        _aggregate("course_roster", "enrollments", course_roster_pipeline(course_id)),
+        _aggregate("course_roster_active", "enrollments",
+                   course_roster_pipeline(course_id, active_enrollments_only=True, active_users_only=True))
+    ]
+
+    # Rollup trends (eduhub.rollups): the 12-month report and a 30-day daily trend per category
+    registry.append(_aggregate("monthly_enrollments_rollup", ROLLUP_COLLECTIONS["month"],
+                               enrollment_trends_pipeline(now - timedelta(days=365), now + timedelta(days=1))))
+    registry.append(_aggregate("daily_enrollments_by_category_rollup", ROLLUP_COLLECTIONS["day"],
+                               enrollment_trends_pipeline(now - timedelta(days=30), now, "day", group_by="category")))
+
+    # Section 4 reports, in both modes where they support denormalization
+    for name, (collection, build) in REPORT_PIPELINES.items():
+        parameters = inspect.signature(build).parameters
+        if "now" in parameters:
+            registry.append(_aggregate(name, collection, build(now=now)))
+        elif "denormalized" in parameters:
+            registry.append(_aggregate(name, collection, build(denormalized=False)))
+            registry.append(_aggregate(f"{name}_denormalized", collection, build(denormalized=True)))
+        else:
+            registry.append(_aggregate(name, collection, build()))
+
+    return registry
+
+
+def select_queries(registry, names=None):
+    """Returns the registry entries whose names are listed (all entries when names is empty)."""
+    if not names:
+        return list(registry)
+    known = {spec["name"] for spec in registry}
+    unknown = sorted(set(names) - known)
+    if unknown:
+        raise ValueError(f"Unknown queries: {', '.join(unknown)}")
+    return [spec for spec in registry if spec["name"] in names]
+
+
+
+
+## Running and explaining
+def run_query(db, spec):
+    """Executes a registry entry and returns the documents it produces."""
+    collection = db[spec["collection"]]
+    if spec["op"] == "aggregate":
+        return list(collection.aggregate(spec["pipeline"], allowDiskUse=True))
+
+    cursor = collection.find(spec["filter"], spec.get("projection"))
+    if spec.get("sort"):
+        cursor = cursor.sort(list(spec["sort"].items()))
+    if spec.get("limit"):
+        cursor = cursor.limit(spec["limit"])
+    return list(cursor)
+
+
+def explain_query(db, spec, verbosity="executionStats"):
+    """Runs the explain command for a registry entry and returns its raw output."""
+    if spec["op"] == "aggregate":
+        command = {"aggregate": spec["collection"], "pipeline": spec["pipeline"],
+                   "cursor": {}, "allowDiskUse": True}
+    else:
+        command = {"find": spec["collection"], "filter": spec["filter"]}
+        for option in ("projection", "sort", "limit"):
+            if spec.get(option):
+                command[option] = spec[option]
+    return db.command({"explain": command, "verbosity": verbosity})
+
+
+def winning_plan(explain):
+    """
+    Returns the winning plan of an explain output, looking inside the first
+    $cursor stage for aggregations.
+    """
+    if "queryPlanner" in explain:
+        return explain["queryPlanner"].get("winningPlan", {})
+    for stage in explain.get("stages", []):
+        if "$cursor" in stage:
+            return stage["$cursor"].get("queryPlanner", {}).get("winningPlan", {})
+    for shard in explain.get("shards", {}).values():
+        return winning_plan(shard)
+    return {}
+
+
+def plan_summary(plan):
+    """Compresses a winning plan into a readable chain, e.g. "FETCH > IXSCAN(email_1)"."""
+    plan = plan.get("queryPlan", plan)  # slot-based engine wraps the classic tree
+    parts = []
+    while plan:
+        stage = plan.get("stage", "?")
+        if plan.get("indexName"):
+            stage += f"({plan['indexName']})"
+        parts.append(stage)
+        children = plan.get("inputStages") or ([plan["inputStage"]] if "inputStage" in plan else [])
+        if len(children) > 1:
+            parts.append("[" + " | ".join(plan_summary(child) for child in children) + "]")
+            break
+        plan = children[0] if children else None
+    return " > ".join(parts)
@@ -0,0 +1,327 @@
+
+# ### EduHub Enrollment Rollups
+# Pre-aggregated enrollment counts per day and per month, keyed by
+# (period, courseId, category). enroll_student() increments the two buckets of
+# every new enrollment and delete_enrollment() decrements them, so a 12-month
+# trend reads a few hundred bucket documents instead of grouping a year of raw
+# enrollments. Archiving does not touch the buckets: trends keep counting
+# enrollments that were moved to archived_enrollments, and the backfill
+# regroups the hot and the archived enrollments together. A course whose
+# category changes has its buckets moved to the new category
+# (move_course_category(), called from the course update path).
+#
+# The backfill runs alongside the live writers: a bucket they touched after
+# the backfill read its enrollments keeps its live count instead of being
+# overwritten, and buckets the run did not refresh are removed.
+#
+#   python -m eduhub rollups backfill
+#   python -m eduhub rollups trends --granularity day --days 30
+
+
+
+## Importing libraries
+from datetime import datetime, timezone, timedelta
+from itertools import islice
+from .archive import archive_collection_name
+from .client import add_connection_arguments, connect_from_args
+import argparse
+import json
+
+
+
+ROLLUP_COLLECTIONS = {
+    "day": "enrollment_rollups_daily",
+    "month": "enrollment_rollups_monthly"
+}
+
+# Number of courses regrouped per backfill aggregation
+ROLLUP_BACKFILL_COURSES = 500
+
+# Bucket key for enrollments without a category ($merge cannot match on null)
+UNCATEGORIZED = "uncategorized"
+
+
+
+
+## Buckets
+def period_start(moment, granularity):
+    """Truncates a datetime to the start of its day or month (UTC)."""
+    if moment.tzinfo is not None:
+        moment = moment.astimezone(timezone.utc).replace(tzinfo=None)
+    if granularity == "day":
+        return datetime(moment.year, moment.month, moment.day)
+    if granularity == "month":
+        return datetime(moment.year, moment.month, 1)
+    raise ValueError(f"Unknown granularity: {granularity}")
+
+
+def bucket_key(enrollment, granularity):
+    """Returns the (period, courseId, category) key of an enrollment's bucket."""
+    return {
+        "period": period_start(enrollment["enrolledAt"], granularity),
+        "courseId": enrollment["courseId"],
+        "category": enrollment.get("category") or UNCATEGORIZED
+    }
+
+
+def bucket_updates(enrollment, delta=1):
+    """
+    Returns the (collection, filter, update, upsert) of each bucket update_one
+    that counts an enrollment; shared by the sync and async (eduhub.aio) writers.
+
+    Increments upsert the bucket. Decrements never create one and only apply
+    while the count covers them, so removing an enrollment whose bucket is
+    missing (or already at zero) cannot leave a negative count behind.
+    """
+    now = datetime.now(timezone.utc)
+    updates = []
+    for granularity, collection in ROLLUP_COLLECTIONS.items():
+        key = bucket_key(enrollment, granularity)
+        if delta < 0:
+            key["count"] = {"$gte": -delta}
+        updates.append((collection, key, {"$inc": {"count": delta}, "$set": {"updatedAt": now}}, delta > 0))
+    return updates
+
+
+def record_enrollment(db, enrollment, delta=1):
+    """
+    Adds an enrollment (or, with delta=-1, removes it) from its daily and monthly buckets.
+
+    The enrollment must carry enrolledAt and courseId; category comes from the
+    course snapshot stored on it (see eduhub.denormalize).
+    """
+    for collection, filter, update, upsert in bucket_updates(enrollment, delta):
+        db[collection].update_one(filter, update, upsert=upsert)
+
+
+def moved_bucket_update(bucket, category):
+    """
+    Returns the (filter, update) adding a removed bucket's count to the bucket
+    of the same period and course under another category; shared by the sync
+    and async (eduhub.aio) course updates.
+    """
+    key = {"period": bucket["period"], "courseId": bucket["courseId"], "category": category or UNCATEGORIZED}
+    return key, {"$inc": {"count": bucket["count"]}, "$set": {"updatedAt": datetime.now(timezone.utc)}}
+
+
+def move_course_category(db, course_id, old_category, new_category):
+    """
+    Moves the buckets of a course from its old category to the new one.
+
+    Each old bucket is taken out with find_one_and_delete and its count added
+    to the new bucket, so an increment racing the move is either moved with it
+    or lands in a fresh old-category bucket; it is never lost.
+
+    Returns:
+        int: Number of buckets moved.
+    """
+    old_key = old_category or UNCATEGORIZED
+    if old_key == (new_category or UNCATEGORIZED):
+        return 0
+    moved = 0
+    for collection in ROLLUP_COLLECTIONS.values():
+        for bucket in db[collection].find({"courseId": course_id, "category": old_key}, {"_id": 1}):
+            removed = db[collection].find_one_and_delete({"_id": bucket["_id"]})
+            if removed is None:
+                continue
+            filter, update = moved_bucket_update(removed, new_category)
+            db[collection].update_one(filter, update, upsert=True)
+            moved += 1
+    return moved
+
+
+
+
+## Backfill
+def _backfill_clock():
+    # Milliseconds only, as BSON stores them, so the stamps compare equal once written
+    now = datetime.now(timezone.utc)
+    return now.replace(microsecond=now.microsecond // 1000 * 1000)
+
+
+def _backfill_pipeline(granularity, course_ids, target, cutoff, started):
+    match = {"$match": {"courseId": {"$in": course_ids}}}
+    return [
+        match,
+        {"$unionWith": {"coll": archive_collection_name("enrollments"), "pipeline": [match]}},
+        {
+            "$group": {
+                "_id": {
+                    "period": {"$dateTrunc": {"date": "$enrolledAt", "unit": granularity}},
+                    "courseId": "$courseId",
+                    "category": "$category"
+                },
+                "count": {"$sum": 1}
+            }
+        },
+        {
+            "$project": {
+                "_id": 0,
+                "period": "$_id.period",
+                "courseId": "$_id.courseId",
+                "category": {"$ifNull": ["$_id.category", UNCATEGORIZED]},
+                "count": 1,
+                "updatedAt": cutoff,
+                "backfilledAt": started
+            }
+        },
+        {
+            "$merge": {
+                "into": target,
+                "on": ["period", "courseId", "category"],
+                # A bucket a live writer updated after the cutoff keeps its count:
+                # replacing it would drop increments this aggregation did not see
+                "whenMatched": [{"$replaceWith": {"$cond": [
+                    {"$gt": ["$updatedAt", cutoff]},
+                    "$$ROOT",
+                    {"$mergeObjects": ["$$new", {"_id": "$_id"}]}
+                ]}}],
+                "whenNotMatched": "insert"
+            }
+        }
+    ]
+
+
+def delete_stale_buckets(db, started):
+    """
+    Removes the buckets a backfill started at `started` neither refreshed nor
+    saw updated by a live writer: those of courses without enrollments left,
+    or of a (period, category) no enrollment falls into any more.
+
+    Returns:
+        int: Number of buckets deleted.
+    """
+    stale = {"backfilledAt": {"$ne": started}, "updatedAt": {"$lte": started}}
+    return sum(db[collection].delete_many(stale).deleted_count for collection in ROLLUP_COLLECTIONS.values())
+
+
+def backfill_enrollment_rollups(db, batch_size=ROLLUP_BACKFILL_COURSES):
+    """
+    Recomputes the buckets of every course from the raw enrollments, hot and
+    archived (archived_enrollments), so rerunning it after an archive job keeps
+    counting the moved enrollments.
+
+    Courses are regrouped batch_size at a time, each batch with one
+    aggregation per granularity that replaces its buckets through $merge, so
+    the backfill can be rerun (or interrupted) safely. Each aggregation takes a
+    cutoff before it reads the enrollments; a bucket that enroll_student() or
+    delete_enrollment() updated after it keeps its live count (the next run
+    refreshes it), so concurrent increments are never overwritten. Once every
+    course is done, buckets the run did not refresh are deleted.
+
+    Run backfill_enrollment_snapshots() first so enrollments carry their
+    category. $merge needs the unique (period, courseId, category) indexes
+    from the index manifest. Run it while no archive job is moving
+    enrollments: a document caught between its archive copy and its delete
+    counts twice.
+
+    Returns:
+        dict: Number of courses processed, stale buckets deleted and bucket documents per granularity.
+    """
+    started = _backfill_clock()
+    course_ids = (row["_id"] for row in db.enrollments.aggregate([
+        {"$project": {"_id": 0, "courseId": 1}},
+        {"$unionWith": {"coll": archive_collection_name("enrollments"),
+                        "pipeline": [{"$project": {"_id": 0, "courseId": 1}}]}},
+        {"$group": {"_id": "$courseId"}}
+    ], allowDiskUse=True))
+    courses = 0
+    while True:
+        batch = list(islice(course_ids, batch_size))
+        if not batch:
+            break
+        for granularity, collection in ROLLUP_COLLECTIONS.items():
+            cutoff = _backfill_clock()
+            db.enrollments.aggregate(_backfill_pipeline(granularity, batch, collection, cutoff, started),
+                                     allowDiskUse=True)
+        courses += len(batch)
+
+    deleted = delete_stale_buckets(db, started)
+    return {"courses": courses,
+            "deleted": deleted,
+            **{granularity: db[collection].estimated_document_count()
+               for granularity, collection in ROLLUP_COLLECTIONS.items()}}
+
+
+
+
+## Trends
+def enrollment_trends_pipeline(start, end, granularity="month", course_id=None, category=None, group_by=None):
+    """Builds the bucket aggregation behind enrollment_trends()."""
+    match = {"period": {"$gte": period_start(start, granularity), "$lt": end}}
+    if course_id is not None:
+        match["courseId"] = course_id
+    if category is not None:
+        match["category"] = category
+
+    key = {"period": "$period"}
+    if group_by:
+        key[group_by] = f"${group_by}"
+
+    return [
+        {"$match": match},
+        {"$group": {"_id": key, "count": {"$sum": "$count"}}},
+        {"$match": {"count": {"$gt": 0}}},
+        {"$sort": {"_id.period": 1}}
+    ]
+
+
+def enrollment_trends(db, start, end, granularity="month", course_id=None, category=None, group_by=None):
+    """
+    Returns enrollment counts per period from the rollup buckets.
+
+    Parameters:
+        db (Database): The connected MongoDB database object.
+        start (datetime): Start of the window (rounded down to its period).
+        end (datetime): End of the window (exclusive).
+        granularity (str): "day" or "month".
+        course_id (str): Optional course filter.
+        category (str): Optional category filter.
+        group_by (str): Optional "courseId" or "category" to split each period.
+
+    Returns:
+        list: Documents of the form {"_id": {"period": datetime[, group_by]}, "count": n}, oldest first.
+    """
+    pipeline = enrollment_trends_pipeline(start, end, granularity, course_id, category, group_by)
+    return list(db[ROLLUP_COLLECTIONS[granularity]].aggregate(pipeline))
+
+
+def monthly_enrollments_rollup(db, now=None):
+    """
+    Section 4.4(a) from the monthly buckets: enrollments per calendar month over
+    the last 12 months (the first month counted whole), as
+    {"_id": {"year", "month"}, "count"}, oldest first.
+    """
+    now = now or datetime.now(timezone.utc)
+    trends = enrollment_trends(db, now - timedelta(days=365), now + timedelta(days=1))
+    return [{"_id": {"year": row["_id"]["period"].year, "month": row["_id"]["period"].month}, "count": row["count"]}
+            for row in trends]
+
+
+
+
+## Command line entry point
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Backfill or query the EduHub enrollment rollups.")
+    parser.add_argument("command", choices=["backfill", "trends"])
+    add_connection_arguments(parser)
+    parser.add_argument("--granularity", choices=sorted(ROLLUP_COLLECTIONS), default="month")
+    parser.add_argument("--days", type=int, default=365, help="Trend window ending now")
+    parser.add_argument("--course")
+    parser.add_argument("--category")
+    parser.add_argument("--group-by", choices=["courseId", "category"])
+    args = parser.parse_args(argv)
+
+    db, _ = connect_from_args(args)
+    if args.command == "backfill":
+        print("✅ Rollups rebuilt:", backfill_enrollment_rollups(db))
+        return
+
+    now = datetime.now(timezone.utc)
+    trends = enrollment_trends(db, now - timedelta(days=args.days), now, args.granularity,
+                               args.course, args.category, args.group_by)
+    print(json.dumps(trends, indent=4, default=str))
+
+
+if __name__ == "__main__":
+    main()
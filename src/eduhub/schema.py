@@ -0,0 +1,249 @@
+
+# ### EduHub Collection Schemas
+# The $jsonSchema validation rules of the six EduHub collections, and an
+# idempotent setup that applies them:
+#
+#   python -m eduhub setup
+#
+# Missing collections are created with their validator; collections that
+# already exist get the validator through collMod, so rerunning setup after a
+# schema change updates the rules instead of failing on "collection exists".
+# The command line setup then syncs the index manifest (see eduhub.indexes)
+# unless --skip-indexes is given.
+#
+# COLLECTION_SCHEMAS is the only definition of the rules: the validators on the
+# server, data/schema_validation.json (write_schema_file) and the client-side
+# validators of eduhub.validation are all derived from it. schema_drift()
+# reports any copy that no longer matches.
+
+
+
+## Importing libraries
+from .indexes import sync_indexes
+from .client import add_connection_arguments, connect_from_args
+from pathlib import Path
+import argparse
+import json
+
+
+
+
+SCHEMA_FILE = Path(__file__).resolve().parents[2] / "data" / "schema_validation.json"
+
+
+
+
+## Schemas
+COLLECTION_SCHEMAS = {
+    "users": {
+        "bsonType": "object",
+        "required": ["userId", "email", "firstName", "lastName", "role"],
+        "properties": {
+            "userId": {"bsonType": "string"},
+            "email": {
+                "bsonType": "string",
+                "pattern": "^.+@.+$"
+            },
+            "firstName": {"bsonType": "string"},
+            "lastName": {"bsonType": "string"},
+            "role": {
+                "enum": ["student", "instructor"]
+            },
+            "dateJoined": {"bsonType": "date"},
+            "profile": {
+                "bsonType": "object",
+                "properties": {
+                    "bio": {"bsonType": "string"},
+                    "avatar": {"bsonType": "string"},
+                    "skills": {
+                        "bsonType": "array",
+                        "items": {"bsonType": "string"}
+                    }
+                }
+            },
+            "isActive": {"bsonType": "bool"}
+        }
+    },
+    "courses": {
+        "bsonType": "object",
+        "required": ["courseId", "title", "instructorId", "level"],
+        "properties": {
+            "courseId": {"bsonType": "string"},
+            "title": {"bsonType": "string"},
+            "description": {"bsonType": "string"},
+            "instructorId": {"bsonType": "string"},
+            "category": {"bsonType": "string"},
+            "level": {
+                "enum": ["beginner", "intermediate", "advanced"]
+            },
+            "duration": {"bsonType": "double"},
+            "price": {"bsonType": "double"},
+            "tags": {
+                "bsonType": "array",
+                "items": {"bsonType": "string"}
+            },
+            "createdAt": {"bsonType": "date"},
+            "updatedAt": {"bsonType": "date"},
+            "isPublished": {"bsonType": "bool"},
+            "rating": {"bsonType": "double"},
+        }
+    },
+    "enrollments": {
+        "bsonType": "object",
+        "required": ["enrollmentId", "studentId", "courseId", "enrolledAt", "status"],
+        "properties": {
+            "enrollmentId": {"bsonType": "string"},
+            "studentId": {"bsonType": "string"},  # Reference to users.userId
+            "courseId": {"bsonType": "string"},   # Reference to courses.courseId
+            "enrolledAt": {"bsonType": "date"},
+            "updatedAt": {"bsonType": "date"},
+            "status": {
+                "enum": ["active", "completed", "dropped"]
+            },
+            "progress": {
+                "bsonType": "double",
+                "minimum": 0,
+                "maximum": 100
+            }
+        }
+    },
+    "lessons": {
+        "bsonType": "object",
+        "required": ["lessonId", "courseId", "title", "content", "order"],
+        "properties": {
+            "lessonId": {"bsonType": "string"},
+            "courseId": {"bsonType": "string"},  # Reference to courses.courseId
+            "title": {"bsonType": "string"},
+            "content": {"bsonType": "string"},
+            "resources": {
+                "bsonType": "array",
+                "items": {"bsonType": "string"}
+            },
+            "order": {"bsonType": "int"},  # Lesson sequence
+            "createdAt": {"bsonType": "date"}
+        }
+    },
+    "assignments": {
+        "bsonType": "object",
+        "required": ["assignmentId", "courseId", "title", "description", "dueDate"],
+        "properties": {
+            "assignmentId": {"bsonType": "string"},
+            "courseId": {"bsonType": "string"},  # Reference to courses.courseId
+            "lessonId": {"bsonType": "string"},  # Optional, for lesson-specific assignments
+            "title": {"bsonType": "string"},
+            "description": {"bsonType": "string"},
+            "dueDate": {"bsonType": "date"},
+            "points": {"bsonType": "int"},
+            "createdAt": {"bsonType": "date"}
+        }
+    },
+    "submissions": {
+        "bsonType": "object",
+        "required": ["submissionId", "assignmentId", "studentId", "submittedAt"],
+        "properties": {
+            "submissionId": {"bsonType": "string"},
+            "assignmentId": {"bsonType": "string"},  # Reference to assignments.assignmentId
+            "studentId": {"bsonType": "string"},     # Reference to users.userId
+            "content": {"bsonType": "string"},
+            "grade": {"bsonType": "double"},
+            "feedback": {"bsonType": "string"},
+            "submittedAt": {"bsonType": "date"}
+        }
+    },
+}
+
+
+
+
+## Setup
+def setup_database(db, schemas=COLLECTION_SCHEMAS, validation_level="strict"):
+    """
+    Creates the EduHub collections with their validators, or updates the
+    validators of collections that already exist.
+
+    Parameters:
+        db (Database): Target database.
+        schemas (dict): Collection name -> $jsonSchema.
+        validation_level (str): "strict", "moderate" or "off".
+
+    Returns:
+        dict: {"created": [names], "updated": [names]}.
+    """
+    existing = set(db.list_collection_names())
+    result = {"created": [], "updated": []}
+    for name, schema in schemas.items():
+        validator = {"$jsonSchema": schema}
+        if name in existing:
+            db.command({"collMod": name, "validator": validator, "validationLevel": validation_level})
+            result["updated"].append(name)
+        else:
+            db.create_collection(name, validator=validator, validationLevel=validation_level)
+            result["created"].append(name)
+    return result
+
+
+
+
+## Stored copies
+def server_schemas(db, collections=None):
+    """Returns collection -> $jsonSchema of the validators stored on the server."""
+    schemas = {}
+    for info in db.list_collections(filter={"name": {"$in": list(collections or COLLECTION_SCHEMAS)}}):
+        validator = info.get("options", {}).get("validator", {})
+        if "$jsonSchema" in validator:
+            schemas[info["name"]] = validator["$jsonSchema"]
+    return schemas
+
+
+def read_schema_file(path=SCHEMA_FILE):
+    """Returns collection -> $jsonSchema from a schema_validation.json file."""
+    with open(path) as f:
+        return {name: validator["$jsonSchema"] for name, validator in json.load(f).items()}
+
+
+def write_schema_file(path=SCHEMA_FILE, schemas=COLLECTION_SCHEMAS):
+    """Writes the schemas in the schema_validation.json layout ({collection: {"$jsonSchema": ...}})."""
+    with open(path, "w") as f:
+        json.dump({name: {"$jsonSchema": schema} for name, schema in schemas.items()}, f, indent=4)
+
+
+def schema_drift(db=None, path=SCHEMA_FILE, schemas=COLLECTION_SCHEMAS):
+    """
+    Compares the stored copies of the schemas with COLLECTION_SCHEMAS.
+
+    Parameters:
+        db (Database): Also compare the server's validators when given.
+        path (str | Path): schema_validation.json to compare (None to skip).
+        schemas (dict): Reference schemas.
+
+    Returns:
+        dict: Source ("file", "server") -> sorted collections whose schema differs or is missing.
+    """
+    copies = {}
+    if path is not None:
+        copies["file"] = read_schema_file(path)
+    if db is not None:
+        copies["server"] = server_schemas(db, schemas)
+    return {source: sorted(name for name, schema in schemas.items() if stored.get(name) != schema)
+            for source, stored in copies.items()}
+
+
+
+
+## Command line entry point
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Create the EduHub collections and apply their validators.")
+    add_connection_arguments(parser)
+    parser.add_argument("--validation-level", default="strict", choices=["strict", "moderate", "off"])
+    parser.add_argument("--skip-indexes", action="store_true")
+    args = parser.parse_args(argv)
+
+    db, _ = connect_from_args(args)
+    print(json.dumps(setup_database(db, validation_level=args.validation_level), indent=4))
+    if not args.skip_indexes:
+        print(json.dumps(sync_indexes(db), indent=4))
+    print("✅ Collections and validators are in place")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,181 @@
+
+# ### EduHub Course Search
+# Ranked, index-backed keyword search over the courses collection.
+
+
+
+## Importing libraries
+from .bulk import bulk_update, DEFAULT_BULK_BATCH_SIZE
+from .cache import query_cache
+import re
+
+
+
+COURSE_TEXT_INDEX = "course_text_search"
+
+# Relative importance of each field in the text score
+COURSE_TEXT_WEIGHTS = {"title": 10, "tags": 5, "description": 1}
+
+# Terms shorter than this are usually word fragments, which $text cannot match
+MIN_TEXT_TERM_LENGTH = 3
+
+DEFAULT_SEARCH_PAGE_SIZE = 20
+
+
+
+
+## Search
+def search_courses(db, keyword, category=None, level=None, page=1,
+                   page_size=DEFAULT_SEARCH_PAGE_SIZE, projection=None):
+    """
+    Searches courses by keyword, best matches first.
+
+    Uses $text over title, description and tags, sorted by textScore. Terms
+    shorter than MIN_TEXT_TERM_LENGTH fall back to a case-insensitive regex on
+    the title, since $text only matches whole (stemmed) words.
+
+    Parameters:
+        db (Database): The connected MongoDB database object.
+        keyword (str): Search terms.
+        category (str): Optional category filter.
+        level (str): Optional level filter.
+        page (int): 1-based page number.
+        page_size (int): Number of courses per page.
+        projection (dict): Optional inclusion projection for the returned courses
+            (default: every field except titleTrigrams).
+
+    Returns:
+        list: Matching course documents; text matches carry a "score" field.
+    """
+    keyword = keyword.strip()
+    if not keyword:
+        return []
+    if projection is None:
+        projection = {TRIGRAM_FIELD: 0}
+
+    query = {}
+    if category is not None:
+        query["category"] = category
+    if level is not None:
+        query["level"] = level
+
+    if len(keyword) < MIN_TEXT_TERM_LENGTH:
+        query["title"] = {"$regex": re.escape(keyword), "$options": "i"}
+        cursor = db.courses.find(query, projection).sort("title", 1)
+    else:
+        query["$text"] = {"$search": keyword}
+        text_projection = dict(projection or {})
+        text_projection["score"] = {"$meta": "textScore"}
+        cursor = db.courses.find(query, text_projection).sort([("score", {"$meta": "textScore"})])
+
+    return list(cursor.skip((max(page, 1) - 1) * page_size).limit(page_size))
+
+
+
+
+## Trigram substring search
+# Each course stores the distinct lower-cased 3-character substrings of its
+# title in an indexed array. An infix search looks up candidates through that
+# multikey index and then verifies them with the regex, instead of running the
+# regex over every course. The array lives on the course document itself, so
+# deleting a course needs no extra bookkeeping; inserts and title changes go
+# through the helpers below.
+TRIGRAM_FIELD = "titleTrigrams"
+TRIGRAM_INDEX = "course_title_trigrams"
+
+
+def title_trigrams(text):
+    """Returns the sorted, distinct lower-cased trigrams of a string."""
+    text = text.lower()
+    return sorted({text[i:i + 3] for i in range(len(text) - 2)})
+
+
+def backfill_title_trigrams(db, batch_size=DEFAULT_BULK_BATCH_SIZE):
+    """
+    Computes titleTrigrams for every course, streaming titles in bulk_write batches.
+
+    Returns:
+        dict: Matched/modified counts from bulk_update().
+    """
+    return bulk_update(
+        db.courses,
+        lambda course: {"$set": {TRIGRAM_FIELD: title_trigrams(course.get("title", ""))}},
+        projection={"title": 1},
+        batch_size=batch_size
+    )
+
+
+def with_title_trigrams(course):
+    """Returns a copy of a course document with its titleTrigrams filled in."""
+    return {**course, TRIGRAM_FIELD: title_trigrams(course.get("title", ""))}
+
+
+def insert_course(db, course):
+    """Inserts a course together with its title trigrams."""
+    result = db.courses.insert_one(with_title_trigrams(course))
+    query_cache.invalidate("courses")
+    return result
+
+
+def insert_courses(db, courses, ordered=False):
+    """Inserts several courses together with their title trigrams."""
+    result = db.courses.insert_many([with_title_trigrams(course) for course in courses], ordered=ordered)
+    query_cache.invalidate("courses")
+    return result
+
+
+def with_trigram_update(update):
+    """Returns a course update document that also refreshes the trigrams when it sets a new title."""
+    title = update.get("$set", {}).get("title")
+    if title is None:
+        return update
+    return {**update, "$set": {**update["$set"], TRIGRAM_FIELD: title_trigrams(title)}}
+
+
+def update_course(db, course_id, update):
+    """
+    Applies an update document to one course, refreshing the trigrams when
+    the update sets a new title.
+    """
+    result = db.courses.update_one({"courseId": course_id}, with_trigram_update(update))
+    query_cache.invalidate("courses")
+    return result
+
+
+def substring_query(term):
+    """Returns the courses filter that matches titles containing term."""
+    # Every candidate must contain all trigrams of the term; the regex then
+    # rejects candidates where those trigrams are not contiguous.
+    query = {"title": {"$regex": re.escape(term), "$options": "i"}}
+    grams = title_trigrams(term)
+    if grams:
+        query[TRIGRAM_FIELD] = {"$all": grams}
+    return query
+
+
+def substring_search_courses(db, term, limit=None, projection=None):
+    """
+    Case-insensitive infix search on course titles, backed by the trigram index.
+
+    Parameters:
+        db (Database): The connected MongoDB database object.
+        term (str): Substring to look for anywhere in the title.
+        limit (int): Optional maximum number of courses to return.
+        projection (dict): Optional projection (titleTrigrams is always excluded).
+
+    Returns:
+        list: Courses whose title contains the term.
+    """
+    term = term.strip()
+    if not term:
+        return []
+
+    query = substring_query(term)
+    projection = dict(projection or {})
+    if not any(projection.values()):
+        projection[TRIGRAM_FIELD] = 0
+
+    cursor = db.courses.find(query, projection)
+    if limit:
+        cursor = cursor.limit(limit)
+    return list(cursor)
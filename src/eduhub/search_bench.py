@@ -0,0 +1,95 @@
+
+# ### Trigram vs Regex Title Search Benchmark
+# Seeds a large courses collection and compares the unindexed regex scan used
+# in Section 3.2 #5 with the trigram-index lookup from eduhub.search.
+#
+#   python -m eduhub search-bench --courses 1000000 --terms data learn "ai-driven"
+
+
+
+## Importing libraries
+from datetime import datetime, timezone
+from .seed import seed_database
+from .search import backfill_title_trigrams, substring_search_courses
+from .indexes import sync_indexes
+from .client import add_connection_arguments, connect_from_args
+import argparse
+import re
+import statistics
+import time
+
+
+
+DEFAULT_TERMS = ["data", "learn", "synergy", "multi-tier", "zzq"]
+
+
+
+
+def _time_query(run, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = run()
+        timings.append(time.perf_counter() - start)
+    return len(result), statistics.median(timings) * 1000
+
+
+def benchmark_title_search(db, terms, repeat=5):
+    """
+    Times regex-scan and trigram lookups for each term.
+
+    Returns:
+        list: One dict per term with match counts and median timings (ms).
+    """
+    rows = []
+    for term in terms:
+        regex_count, regex_ms = _time_query(
+            lambda: list(db.courses.find({"title": {"$regex": re.escape(term), "$options": "i"}}, {"_id": 1})),
+            repeat
+        )
+        trigram_count, trigram_ms = _time_query(
+            lambda: substring_search_courses(db, term, projection={"_id": 1}),
+            repeat
+        )
+        rows.append({
+            "term": term,
+            "matches": trigram_count,
+            "regexMatches": regex_count,
+            "regexMs": round(regex_ms, 2),
+            "trigramMs": round(trigram_ms, 2),
+            "speedup": round(regex_ms / trigram_ms, 1) if trigram_ms else None
+        })
+    return rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark trigram vs regex title search.")
+    add_connection_arguments(parser, database="eduhub_bench")
+    parser.add_argument("--courses", type=int, default=1_000_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--terms", nargs="+", default=DEFAULT_TERMS)
+    parser.add_argument("--skip-seed", action="store_true", help="Reuse the courses already in --db")
+    args = parser.parse_args(argv)
+
+    db, settings = connect_from_args(args)
+
+    if not args.skip_seed:
+        # Both seeded collections are dropped, so reruns do not pile up users
+        db.courses.drop()
+        db.users.drop()
+        users = max(1, args.courses // 10)
+        seed_database(db, counts={"users": users, "courses": args.courses}, seed=7, workers=4,
+                      settings=settings, mode="vectorized",
+                      reference_time=datetime(2025, 1, 1, tzinfo=timezone.utc))
+        start = time.perf_counter()
+        backfill_title_trigrams(db)
+        sync_indexes(db, collections=["courses"])
+        print(f"Trigram backfill + index build: {time.perf_counter() - start:.1f}s")
+
+    print(f"{'term':<14}{'matches':>10}{'regex ms':>12}{'trigram ms':>12}{'speedup':>10}")
+    for row in benchmark_title_search(db, args.terms, args.repeat):
+        print(f"{row['term']:<14}{row['matches']:>10}{row['regexMs']:>12}{row['trigramMs']:>12}{row['speedup']!s:>10}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,605 @@
+
+# ### EduHub Seed Data Generator
+# Streams reproducible synthetic data into the EduHub collections in bounded
+# batches so indexes and pipelines can be load-tested at realistic sizes.
+#
+#   python -m eduhub seed --users 10000 --courses 1000 --workers 4
+
+
+
+## Importing libraries
+from faker import Faker
+from datetime import datetime, timezone, timedelta
+from functools import lru_cache
+from .cache import query_cache
+from .client import add_connection_arguments, connect_from_args, create_client, load_client_settings
+from .denormalize import backfill_enrollment_snapshots
+import numpy as np
+import multiprocessing
+import argparse
+import hashlib
+import random
+import uuid
+
+
+
+# Document counts used by Task 2.1 in eduhub_queries.py
+SAMPLE_COUNTS = {
+    "users": 20,
+    "courses": 8,
+    "enrollments": 15,
+    "lessons": 25,
+    "assignments": 10,
+    "submissions": 12
+}
+
+# Collections are seeded in this order; every foreign key is derived from an
+# index into the referenced collection, so no collection has to be read back.
+SEED_ORDER = ["users", "courses", "enrollments", "lessons", "assignments", "submissions"]
+
+INSTRUCTOR_RATIO = 0.3
+CATEGORIES = ["Data Science", "Web Dev", "Business", "AI", "Cybersecurity"]
+LEVELS = ["beginner", "intermediate", "advanced"]
+STATUSES = ["active", "completed", "dropped"]
+
+DEFAULT_BATCH_SIZE = 5000
+MODES = ("faker", "vectorized")
+
+SECONDS_PER_YEAR = 365 * 24 * 3600
+SECONDS_PER_MONTH = 30 * 24 * 3600
+
+
+
+
+## Deterministic identifiers
+@lru_cache(maxsize=None)
+def _id_prefix(seed, collection):
+    return str(uuid.uuid5(uuid.NAMESPACE_OID, f"eduhub:{seed}:{collection}"))[:23]
+
+
+def make_id(seed, collection, index):
+    """
+    Returns the identifier of the index-th document of a collection.
+
+    The same (seed, collection, index) always produces the same UUID-formatted
+    string, which lets any worker compute a foreign key without querying the
+    database. The last group of the UUID is the index itself, in hex.
+    """
+    return f"{_id_prefix(seed, collection)}-{index:012x}"
+
+
+def make_ids(seed, collection, indexes):
+    """Vectorized make_id(): returns the identifiers for an array of indexes."""
+    prefix = _id_prefix(seed, collection)
+    return [f"{prefix}-{i:012x}" for i in indexes.tolist()]
+
+
+def _chunk_seed(seed, collection, start):
+    digest = hashlib.sha256(f"{seed}:{collection}:{start}".encode()).digest()
+    return int.from_bytes(digest[:8], "big")
+
+
+def role_split(user_count):
+    """
+    Returns (instructor_count, student_count) for a given number of users.
+
+    Users [0, instructor_count) are instructors and the rest are students.
+    """
+    if user_count <= 0:
+        return 0, 0
+    instructor_count = min(user_count, max(1, round(user_count * INSTRUCTOR_RATIO)))
+    return instructor_count, user_count - instructor_count
+
+
+def default_reference_time():
+    """Returns today's midnight (UTC), the anchor all generated dates are relative to."""
+    now = datetime.now(timezone.utc)
+    return now.replace(hour=0, minute=0, second=0, microsecond=0)
+
+
+
+
+## Document builders
+def _user(i, rng, fake, ctx):
+    return {
+        "userId": make_id(ctx["seed"], "users", i),
+        "email": f"{fake.user_name()}.{i}@{fake.free_email_domain()}",
+        "firstName": fake.first_name(),
+        "lastName": fake.last_name(),
+        "role": "instructor" if i < ctx["instructors"] else "student",
+        "dateJoined": ctx["reference_time"] - timedelta(seconds=rng.randrange(SECONDS_PER_YEAR)),
+        "profile": {
+            "bio": fake.text(150),
+            "avatar": fake.image_url(),
+            "skills": [fake.word() for _ in range(rng.randint(1, 4))]
+        },
+        "isActive": rng.random() < 0.5
+    }
+
+
+def _course(i, rng, fake, ctx):
+    return {
+        "courseId": make_id(ctx["seed"], "courses", i),
+        "title": fake.catch_phrase(),
+        "description": fake.text(150),
+        "instructorId": make_id(ctx["seed"], "users", rng.randrange(ctx["instructors"])),
+        "category": rng.choice(CATEGORIES),
+        "level": rng.choice(LEVELS),
+        "duration": round(rng.uniform(1.5, 20.0), 1),
+        "price": round(rng.uniform(10, 100), 2),
+        "tags": fake.words(nb=3),
+        "createdAt": ctx["reference_time"] - timedelta(seconds=rng.randrange(SECONDS_PER_YEAR)),
+        "updatedAt": ctx["reference_time"] - timedelta(seconds=rng.randrange(SECONDS_PER_YEAR)),
+        "isPublished": rng.random() < 0.5
+    }
+
+
+def _enrollment(i, rng, fake, ctx):
+    student = ctx["instructors"] + rng.randrange(ctx["students"])
+    enrolled_at = ctx["reference_time"] - timedelta(seconds=rng.randrange(SECONDS_PER_YEAR))
+    return {
+        "enrollmentId": make_id(ctx["seed"], "enrollments", i),
+        "studentId": make_id(ctx["seed"], "users", student),
+        "courseId": make_id(ctx["seed"], "courses", rng.randrange(ctx["counts"]["courses"])),
+        "enrolledAt": enrolled_at,
+        "updatedAt": enrolled_at,
+        "status": rng.choice(STATUSES),
+        "progress": round(rng.uniform(0, 100), 2)
+    }
+
+
+def _lesson(i, rng, fake, ctx):
+    return {
+        "lessonId": make_id(ctx["seed"], "lessons", i),
+        "courseId": make_id(ctx["seed"], "courses", rng.randrange(ctx["counts"]["courses"])),
+        "title": fake.sentence(),
+        "content": fake.text(300),
+        "resources": [fake.url() for _ in range(rng.randint(0, 3))],
+        "order": rng.randint(1, 10),
+        "createdAt": ctx["reference_time"] - timedelta(seconds=rng.randrange(SECONDS_PER_YEAR))
+    }
+
+
+def _assignment(i, rng, fake, ctx):
+    assignment = {
+        "assignmentId": make_id(ctx["seed"], "assignments", i),
+        "courseId": make_id(ctx["seed"], "courses", rng.randrange(ctx["counts"]["courses"])),
+        "title": fake.sentence(nb_words=6),
+        "description": fake.text(max_nb_chars=100),
+        "dueDate": ctx["reference_time"] + timedelta(seconds=rng.randrange(1, SECONDS_PER_MONTH)),
+        "points": rng.randint(5, 20),
+        "createdAt": ctx["reference_time"] - timedelta(seconds=rng.randrange(SECONDS_PER_YEAR))
+    }
+
+    # Add optional lessonId only if lessons exist and randomly chosen
+    if ctx["counts"]["lessons"] and rng.random() < 0.5:
+        assignment["lessonId"] = make_id(ctx["seed"], "lessons", rng.randrange(ctx["counts"]["lessons"]))
+    return assignment
+
+
+def _submission(i, rng, fake, ctx):
+    student = ctx["instructors"] + rng.randrange(ctx["students"])
+    return {
+        "submissionId": make_id(ctx["seed"], "submissions", i),
+        "assignmentId": make_id(ctx["seed"], "assignments", rng.randrange(ctx["counts"]["assignments"])),
+        "studentId": make_id(ctx["seed"], "users", student),
+        "content": fake.paragraph(nb_sentences=5),
+        "grade": round(rng.uniform(0, 100), 2),
+        "feedback": fake.sentence(),
+        "submittedAt": ctx["reference_time"] - timedelta(seconds=rng.randrange(SECONDS_PER_YEAR))
+    }
+
+
+BUILDERS = {
+    "users": _user,
+    "courses": _course,
+    "enrollments": _enrollment,
+    "lessons": _lesson,
+    "assignments": _assignment,
+    "submissions": _submission
+}
+
+
+
+
+## Vectorized (NumPy) document builders
+# Every numeric, date, enum and foreign-key column of a chunk is drawn in one
+# NumPy call and text is picked from pools generated once per process, so the
+# only per-row Python work left is assembling the dicts.
+POOL_SIZE = 1024
+
+
+@lru_cache(maxsize=4)
+def text_pools(seed, size=POOL_SIZE):
+    """
+    Returns pre-generated Faker text pools for the vectorized mode.
+
+    Parameters:
+        seed (int): Dataset seed; pools are reproducible for a given seed.
+        size (int): Number of entries in each pool.
+
+    Returns:
+        dict: Pool name -> numpy object array of strings.
+    """
+    fake = Faker()
+    fake.seed_instance(_chunk_seed(seed, "pools", size))
+    pools = {
+        "user_names": [fake.user_name() for _ in range(size)],
+        "domains": [fake.free_email_domain() for _ in range(size)],
+        "first_names": [fake.first_name() for _ in range(size)],
+        "last_names": [fake.last_name() for _ in range(size)],
+        "bios": [fake.text(150) for _ in range(size)],
+        "avatars": [fake.image_url() for _ in range(size)],
+        "words": [fake.word() for _ in range(size)],
+        "catch_phrases": [fake.catch_phrase() for _ in range(size)],
+        "descriptions": [fake.text(150) for _ in range(size)],
+        "sentences": [fake.sentence() for _ in range(size)],
+        "titles": [fake.sentence(nb_words=6) for _ in range(size)],
+        "contents": [fake.text(300) for _ in range(size)],
+        "short_texts": [fake.text(max_nb_chars=100) for _ in range(size)],
+        "urls": [fake.url() for _ in range(size)],
+        "paragraphs": [fake.paragraph(nb_sentences=5) for _ in range(size)]
+    }
+    return {name: np.array(values, dtype=object) for name, values in pools.items()}
+
+
+def _pick(rng, pool, n):
+    return pool[rng.integers(0, len(pool), n)].tolist()
+
+
+def _dates(rng, ctx, n, low, high):
+    # Offsets in seconds from the reference time, converted in one pass; numpy
+    # datetimes are naive, so an aware reference time is converted to UTC first
+    reference_time = ctx["reference_time"]
+    if reference_time.tzinfo is not None:
+        reference_time = reference_time.astimezone(timezone.utc).replace(tzinfo=None)
+    reference = np.datetime64(reference_time, "ms")
+    offsets = rng.integers(low, high, n).astype("timedelta64[s]")
+    return (reference + offsets).tolist()
+
+
+def _ragged(rng, pool, n, low, high):
+    # Variable-length lists (skills, resources) drawn as one flat sample
+    lengths = rng.integers(low, high + 1, n)
+    flat = _pick(rng, pool, int(lengths.sum()))
+    bounds = np.concatenate(([0], np.cumsum(lengths))).tolist()
+    return [flat[bounds[k]:bounds[k + 1]] for k in range(n)]
+
+
+def _students(rng, ctx, n):
+    return make_ids(ctx["seed"], "users", ctx["instructors"] + rng.integers(0, ctx["students"], n))
+
+
+def _foreign(rng, ctx, collection, n):
+    return make_ids(ctx["seed"], collection, rng.integers(0, ctx["counts"][collection], n))
+
+
+def _users_columns(index, rng, pools, ctx):
+    n = len(index)
+    return {
+        "userId": make_ids(ctx["seed"], "users", index),
+        "email": [f"{name}.{i}@{domain}" for name, i, domain in
+                  zip(_pick(rng, pools["user_names"], n), index.tolist(), _pick(rng, pools["domains"], n))],
+        "firstName": _pick(rng, pools["first_names"], n),
+        "lastName": _pick(rng, pools["last_names"], n),
+        "role": np.where(index < ctx["instructors"], "instructor", "student").tolist(),
+        "dateJoined": _dates(rng, ctx, n, -SECONDS_PER_YEAR, 0),
+        "profile": [{"bio": bio, "avatar": avatar, "skills": skills} for bio, avatar, skills in
+                    zip(_pick(rng, pools["bios"], n), _pick(rng, pools["avatars"], n),
+                        _ragged(rng, pools["words"], n, 1, 4))],
+        "isActive": (rng.random(n) < 0.5).tolist()
+    }
+
+
+def _courses_columns(index, rng, pools, ctx):
+    n = len(index)
+    return {
+        "courseId": make_ids(ctx["seed"], "courses", index),
+        "title": _pick(rng, pools["catch_phrases"], n),
+        "description": _pick(rng, pools["descriptions"], n),
+        "instructorId": make_ids(ctx["seed"], "users", rng.integers(0, ctx["instructors"], n)),
+        "category": _pick(rng, np.array(CATEGORIES, dtype=object), n),
+        "level": _pick(rng, np.array(LEVELS, dtype=object), n),
+        "duration": np.round(rng.uniform(1.5, 20.0, n), 1).tolist(),
+        "price": np.round(rng.uniform(10, 100, n), 2).tolist(),
+        "tags": _ragged(rng, pools["words"], n, 3, 3),
+        "createdAt": _dates(rng, ctx, n, -SECONDS_PER_YEAR, 0),
+        "updatedAt": _dates(rng, ctx, n, -SECONDS_PER_YEAR, 0),
+        "isPublished": (rng.random(n) < 0.5).tolist()
+    }
+
+
+def _enrollments_columns(index, rng, pools, ctx):
+    n = len(index)
+    enrolled_at = _dates(rng, ctx, n, -SECONDS_PER_YEAR, 0)
+    return {
+        "enrollmentId": make_ids(ctx["seed"], "enrollments", index),
+        "studentId": _students(rng, ctx, n),
+        "courseId": _foreign(rng, ctx, "courses", n),
+        "enrolledAt": enrolled_at,
+        "updatedAt": enrolled_at,
+        "status": _pick(rng, np.array(STATUSES, dtype=object), n),
+        "progress": np.round(rng.uniform(0, 100, n), 2).tolist()
+    }
+
+
+def _lessons_columns(index, rng, pools, ctx):
+    n = len(index)
+    return {
+        "lessonId": make_ids(ctx["seed"], "lessons", index),
+        "courseId": _foreign(rng, ctx, "courses", n),
+        "title": _pick(rng, pools["sentences"], n),
+        "content": _pick(rng, pools["contents"], n),
+        "resources": _ragged(rng, pools["urls"], n, 0, 3),
+        "order": rng.integers(1, 11, n).tolist(),
+        "createdAt": _dates(rng, ctx, n, -SECONDS_PER_YEAR, 0)
+    }
+
+
+def _assignments_columns(index, rng, pools, ctx):
+    n = len(index)
+    columns = {
+        "assignmentId": make_ids(ctx["seed"], "assignments", index),
+        "courseId": _foreign(rng, ctx, "courses", n),
+        "title": _pick(rng, pools["titles"], n),
+        "description": _pick(rng, pools["short_texts"], n),
+        "dueDate": _dates(rng, ctx, n, 1, SECONDS_PER_MONTH),
+        "points": rng.integers(5, 21, n).tolist(),
+        "createdAt": _dates(rng, ctx, n, -SECONDS_PER_YEAR, 0)
+    }
+
+    # Optional lessonId: None marks the rows that should not get one
+    if ctx["counts"]["lessons"]:
+        lesson_ids = _foreign(rng, ctx, "lessons", n)
+        with_lesson = (rng.random(n) < 0.5).tolist()
+        columns["lessonId"] = [lid if keep else None for lid, keep in zip(lesson_ids, with_lesson)]
+    return columns
+
+
+def _submissions_columns(index, rng, pools, ctx):
+    n = len(index)
+    return {
+        "submissionId": make_ids(ctx["seed"], "submissions", index),
+        "assignmentId": _foreign(rng, ctx, "assignments", n),
+        "studentId": _students(rng, ctx, n),
+        "content": _pick(rng, pools["paragraphs"], n),
+        "grade": np.round(rng.uniform(0, 100, n), 2).tolist(),
+        "feedback": _pick(rng, pools["sentences"], n),
+        "submittedAt": _dates(rng, ctx, n, -SECONDS_PER_YEAR, 0)
+    }
+
+
+COLUMN_BUILDERS = {
+    "users": _users_columns,
+    "courses": _courses_columns,
+    "enrollments": _enrollments_columns,
+    "lessons": _lessons_columns,
+    "assignments": _assignments_columns,
+    "submissions": _submissions_columns
+}
+
+
+def generate_documents_vectorized(collection, start, stop, ctx):
+    """
+    Builds documents [start, stop) of a collection column by column with NumPy.
+
+    Produces the same identifiers and referential shape as generate_documents():
+    enrollments and submissions point at real students, courses and assignments.
+
+    Parameters:
+        collection (str): Target collection name.
+        start (int): Index of the first document.
+        stop (int): Index one past the last document.
+        ctx (dict): Context returned by build_context().
+
+    Returns:
+        list: Generated documents.
+    """
+    rng = np.random.default_rng(_chunk_seed(ctx["seed"], collection, start))
+    columns = COLUMN_BUILDERS[collection](np.arange(start, stop), rng, text_pools(ctx["seed"]), ctx)
+
+    names = list(columns)
+    docs = [dict(zip(names, row)) for row in zip(*columns.values())]
+    if "lessonId" in columns:
+        for doc in docs:
+            if doc["lessonId"] is None:
+                del doc["lessonId"]
+    return docs
+
+
+
+
+## Generation and insertion
+def build_context(counts, seed, reference_time=None, mode="faker"):
+    """
+    Validates the requested counts and returns the shared generation context.
+
+    Parameters:
+        counts (dict): Number of documents per collection.
+        seed (int): Dataset seed; the same seed and counts give the same data.
+        reference_time (datetime): Anchor for generated dates (default: today, UTC).
+        mode (str): "faker" (per-document Faker calls) or "vectorized" (NumPy columns).
+
+    Returns:
+        dict: Context passed to every document builder.
+    """
+    if mode not in MODES:
+        raise ValueError(f"Unknown generation mode '{mode}'; expected one of {MODES}.")
+
+    counts = {name: int(counts.get(name, 0)) for name in SEED_ORDER}
+    instructors, students = role_split(counts["users"])
+
+    if counts["courses"] and not instructors:
+        raise ValueError("Seeding courses requires at least one user.")
+    if (counts["enrollments"] or counts["submissions"]) and not students:
+        raise ValueError("Seeding enrollments or submissions requires at least one student user.")
+    for child, parent in [("enrollments", "courses"), ("lessons", "courses"),
+                          ("assignments", "courses"), ("submissions", "assignments")]:
+        if counts[child] and not counts[parent]:
+            raise ValueError(f"Seeding {child} requires at least one document in {parent}.")
+
+    return {
+        "seed": seed,
+        "counts": counts,
+        "instructors": instructors,
+        "students": students,
+        "reference_time": reference_time or default_reference_time(),
+        "mode": mode
+    }
+
+
+def generate_documents(collection, start, stop, ctx, fake=None):
+    """
+    Builds documents [start, stop) of a collection.
+
+    Each chunk gets its own RNG derived from (seed, collection, start), so the
+    output does not depend on how chunks are distributed across workers.
+
+    Parameters:
+        collection (str): Target collection name.
+        start (int): Index of the first document.
+        stop (int): Index one past the last document.
+        ctx (dict): Context returned by build_context().
+        fake (Faker): Optional Faker instance to reuse between chunks.
+
+    Returns:
+        list: Generated documents.
+    """
+    chunk_seed = _chunk_seed(ctx["seed"], collection, start)
+    rng = random.Random(chunk_seed)
+    fake = fake or Faker()
+    fake.seed_instance(chunk_seed)
+
+    build = BUILDERS[collection]
+    return [build(i, rng, fake, ctx) for i in range(start, stop)]
+
+
+def iter_chunks(counts, batch_size=DEFAULT_BATCH_SIZE):
+    """Yields (collection, start, stop) ranges of at most batch_size documents."""
+    for collection in SEED_ORDER:
+        total = counts.get(collection, 0)
+        for start in range(0, total, batch_size):
+            yield collection, start, min(start + batch_size, total)
+
+
+def insert_chunk(db, collection, start, stop, ctx, fake=None):
+    """Generates one chunk and inserts it with an unordered insert_many. Returns (collection, inserted)."""
+    if ctx["mode"] == "vectorized":
+        docs = generate_documents_vectorized(collection, start, stop, ctx)
+    else:
+        docs = generate_documents(collection, start, stop, ctx, fake)
+    result = db[collection].insert_many(docs, ordered=False)
+    return collection, len(result.inserted_ids)
+
+
+# Worker process state (one client and Faker instance per process)
+_worker_db = None
+_worker_fake = None
+
+
+def _init_worker(settings, db_name):
+    global _worker_db, _worker_fake
+    _worker_db = create_client(settings)[db_name]
+    _worker_fake = Faker()
+
+
+def _run_chunk(task):
+    collection, start, stop, ctx = task
+    return insert_chunk(_worker_db, collection, start, stop, ctx, _worker_fake)
+
+
+def _finish_seed(db, inserted):
+    if inserted["enrollments"]:
+        # Generated enrollments carry no course snapshot; copy it on as enroll_student() would
+        backfill_enrollment_snapshots(db)
+    for collection, count in inserted.items():
+        if count:
+            query_cache.invalidate(collection)
+
+
+def seed_database(db, counts=None, seed=0, batch_size=DEFAULT_BATCH_SIZE, workers=1,
+                  settings=None, reference_time=None, mode="faker", progress=None):
+    """
+    Seeds the EduHub collections with reproducible synthetic data.
+
+    Documents are generated and inserted one bounded batch at a time, so memory
+    stays constant no matter how many documents are requested. With workers > 1
+    the batches are spread over a process pool; each worker opens its own client.
+    Seeded enrollments then get the denormalized course snapshot backfilled.
+
+    Parameters:
+        db (Database): The connected MongoDB database object.
+        counts (dict): Number of documents per collection (default: SAMPLE_COUNTS).
+        seed (int): Dataset seed used for identifiers and field values.
+        batch_size (int): Documents per insert_many call.
+        workers (int): Number of worker processes (1 = insert in this process).
+        settings (dict): Client settings the workers connect with (default: load_client_settings()).
+        reference_time (datetime): Anchor for generated dates; pin it to reproduce a dataset exactly.
+        mode (str): "faker" or "vectorized"; the latter draws whole columns with NumPy
+                    and picks text from pre-generated pools, for much faster generation.
+        progress (callable): Optional callback(collection, inserted) invoked after each batch.
+
+    Returns:
+        dict: Number of inserted documents per collection.
+    """
+    if batch_size <= 0:
+        raise ValueError("batch_size must be positive.")
+
+    ctx = build_context(counts or SAMPLE_COUNTS, seed, reference_time, mode)
+    inserted = {name: 0 for name in SEED_ORDER}
+
+    if workers <= 1:
+        fake = Faker()
+        results = (insert_chunk(db, collection, start, stop, ctx, fake)
+                   for collection, start, stop in iter_chunks(ctx["counts"], batch_size))
+        for collection, count in results:
+            inserted[collection] += count
+            if progress:
+                progress(collection, count)
+        _finish_seed(db, inserted)
+        return inserted
+
+    settings = settings or load_client_settings()
+    tasks = ((collection, start, stop, ctx)
+             for collection, start, stop in iter_chunks(ctx["counts"], batch_size))
+    with multiprocessing.Pool(workers, initializer=_init_worker, initargs=(settings, db.name)) as pool:
+        for collection, count in pool.imap_unordered(_run_chunk, tasks):
+            inserted[collection] += count
+            if progress:
+                progress(collection, count)
+    _finish_seed(db, inserted)
+    return inserted
+
+
+
+
+## Command line entry point
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Seed the EduHub database with synthetic data.")
+    add_connection_arguments(parser)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--mode", choices=MODES, default="vectorized")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE)
+    parser.add_argument("--workers", type=int, default=multiprocessing.cpu_count())
+    parser.add_argument("--reference-date", type=datetime.fromisoformat,
+                        help="ISO date all generated dates are relative to (default: today)")
+    for name in SEED_ORDER:
+        parser.add_argument(f"--{name}", type=int, default=SAMPLE_COUNTS[name])
+    args = parser.parse_args(argv)
+
+    reference_time = args.reference_date
+    if reference_time is not None and reference_time.tzinfo is None:
+        reference_time = reference_time.replace(tzinfo=timezone.utc)
+
+    db, settings = connect_from_args(args)
+    counts = {name: getattr(args, name) for name in SEED_ORDER}
+    inserted = seed_database(db, counts=counts, seed=args.seed, batch_size=args.batch_size,
+                             workers=args.workers, settings=settings, reference_time=reference_time,
+                             mode=args.mode)
+
+    for name, count in inserted.items():
+        print(f"✅ Inserted {count} documents into {name}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,351 @@
+
+# ### EduHub Materialized Statistics
+# Keeps per-course and per-student enrollment statistics in the course_stats
+# and student_stats collections, so dashboards read one indexed document
+# instead of regrouping the whole enrollments collection on every call.
+#
+# Enrollments carry an updatedAt timestamp. refresh_stats() only regroups the
+# courses and students that have enrollments changed since the stored
+# watermark, and $merges the new figures in. Deleted and archived enrollments
+# leave a tombstone (courseId, studentId, updatedAt) in stats_tombstones that
+# the refresh picks up the same way; stats of a course or student with no
+# enrollments left are removed.
+#
+#   python -m eduhub stats rebuild | refresh | check
+
+
+
+## Importing libraries
+from bson import Decimal128, ObjectId
+from datetime import datetime, timezone, timedelta
+from itertools import islice
+from .client import add_connection_arguments, connect_from_args
+import argparse
+import math
+
+
+
+COURSE_STATS = "course_stats"
+STUDENT_STATS = "student_stats"
+WATERMARKS = "stats_watermarks"
+TOMBSTONES = "stats_tombstones"
+
+# Tombstones expire (TTL index in eduhub.indexes) after this long; a refresh whose
+# watermark is older may have missed some, so it rebuilds instead
+TOMBSTONE_TTL_SECONDS = 30 * 24 * 3600
+WATERMARK_ID = "enrollment_stats"
+
+# Re-read a few seconds before the watermark so writes that committed with a
+# slightly older updatedAt than the last one seen are not missed.
+WATERMARK_OVERLAP = timedelta(seconds=5)
+
+# Number of courseIds / studentIds regrouped per incremental aggregation
+REFRESH_KEY_BATCH = 1000
+
+COURSE_STATS_STAGES = [
+    {
+        "$group": {
+            "_id": "$courseId",
+            "totalEnrollments": {"$sum": 1},
+            "completedCount": {"$sum": {"$cond": [{"$eq": ["$status", "completed"]}, 1, 0]}},
+            "activeCount": {"$sum": {"$cond": [{"$eq": ["$status", "active"]}, 1, 0]}},
+            "avgProgress": {"$avg": "$progress"}
+        }
+    },
+    {
+        "$set": {
+            "completionRate": {
+                "$cond": [
+                    {"$eq": ["$totalEnrollments", 0]},
+                    0,
+                    {"$multiply": [{"$divide": ["$completedCount", "$totalEnrollments"]}, 100]}
+                ]
+            }
+        }
+    }
+]
+
+STUDENT_STATS_STAGES = [
+    {
+        "$group": {
+            "_id": "$studentId",
+            "totalEnrollments": {"$sum": 1},
+            "completedCount": {"$sum": {"$cond": [{"$eq": ["$status", "completed"]}, 1, 0]}},
+            "avgProgress": {"$avg": "$progress"}
+        }
+    }
+]
+
+STATS_TARGETS = {
+    COURSE_STATS: ("courseId", COURSE_STATS_STAGES),
+    STUDENT_STATS: ("studentId", STUDENT_STATS_STAGES)
+}
+
+
+
+
+## Watermark
+def get_watermark(db):
+    """Returns the updatedAt up to which statistics are known to be current, or None."""
+    state = db[WATERMARKS].find_one({"_id": WATERMARK_ID})
+    return state["watermark"] if state else None
+
+
+def _set_watermark(db, watermark):
+    db[WATERMARKS].update_one(
+        {"_id": WATERMARK_ID},
+        {"$set": {"watermark": watermark, "refreshedAt": datetime.now(timezone.utc)}},
+        upsert=True
+    )
+
+
+def _latest_update(db, query=None):
+    updates = []
+    for collection in ("enrollments", TOMBSTONES):
+        latest = db[collection].find_one(query or {}, {"updatedAt": 1}, sort=[("updatedAt", -1)])
+        if latest and latest.get("updatedAt"):
+            updates.append(latest["updatedAt"])
+    return max(updates) if updates else None
+
+
+def _tombstones_expired(watermark):
+    expired = datetime.now(timezone.utc) - timedelta(seconds=TOMBSTONE_TTL_SECONDS)
+    # Clients without tz_aware decode naive UTC datetimes
+    if watermark.tzinfo is None:
+        expired = expired.replace(tzinfo=None)
+    return watermark < expired
+
+
+def _prune_tombstones(db, watermark):
+    # Tombstones at or before the overlap window are never read again
+    if watermark is not None:
+        db[TOMBSTONES].delete_many({"updatedAt": {"$lte": watermark - WATERMARK_OVERLAP}})
+
+
+
+
+## Removed enrollments
+def removal_tombstones(enrollments):
+    """Returns the stats_tombstones documents of deleted or archived enrollments."""
+    now = datetime.now(timezone.utc)
+    return [{"courseId": enrollment.get("courseId"), "studentId": enrollment.get("studentId"), "updatedAt": now}
+            for enrollment in enrollments]
+
+
+def record_removed_enrollments(db, enrollments):
+    """
+    Records that enrollments were deleted or moved out of the collection, so the
+    next refresh_stats() regroups their courses and students.
+
+    Parameters:
+        db (Database): The connected MongoDB database object.
+        enrollments (list): The removed enrollments (at least courseId and studentId).
+    """
+    tombstones = removal_tombstones(enrollments)
+    if tombstones:
+        db[TOMBSTONES].insert_many(tombstones)
+
+
+
+
+## Refresh
+def rebuild_stats(db):
+    """
+    Recomputes course_stats and student_stats from all enrollments.
+
+    Each collection is replaced atomically with $out, and the watermark is set
+    to the newest updatedAt seen before the rebuild started, so anything that
+    changes while it runs is picked up by the next refresh_stats().
+
+    Returns:
+        dict: Number of documents in each stats collection.
+    """
+    watermark = _latest_update(db)
+    refreshed_at = datetime.now(timezone.utc)
+
+    for target, (_, stages) in STATS_TARGETS.items():
+        db.enrollments.aggregate(
+            stages + [{"$set": {"refreshedAt": refreshed_at}}, {"$out": target}],
+            allowDiskUse=True
+        )
+
+    _set_watermark(db, watermark)
+    _prune_tombstones(db, watermark)
+    return {target: db[target].estimated_document_count() for target in STATS_TARGETS}
+
+
+def refresh_stats(db):
+    """
+    Incrementally refreshes the statistics of courses and students whose
+    enrollments changed, were deleted or were archived since the stored watermark.
+
+    Falls back to rebuild_stats() when no watermark is stored yet, or when it
+    is older than the tombstones' TTL.
+
+    Returns:
+        dict: Number of courses and students that were regrouped.
+    """
+    watermark = get_watermark(db)
+    if watermark is None or _tombstones_expired(watermark):
+        rebuild_stats(db)
+        return {target: None for target in STATS_TARGETS}
+
+    changed = {"updatedAt": {"$gt": watermark - WATERMARK_OVERLAP}}
+    new_watermark = _latest_update(db, changed) or watermark
+    refreshed_at = datetime.now(timezone.utc)
+    refreshed = {}
+
+    for target, (key, stages) in STATS_TARGETS.items():
+        keys = (row["_id"] for row in db.enrollments.aggregate([
+            {"$match": changed},
+            {"$project": {"_id": 0, key: 1}},
+            {"$unionWith": {"coll": TOMBSTONES, "pipeline": [{"$match": changed}, {"$project": {"_id": 0, key: 1}}]}},
+            {"$group": {"_id": f"${key}"}}
+        ], allowDiskUse=True))
+        refreshed[target] = 0
+
+        while True:
+            batch = list(islice(keys, REFRESH_KEY_BATCH))
+            if not batch:
+                break
+            db.enrollments.aggregate(
+                [{"$match": {key: {"$in": batch}}}] + stages + [
+                    {"$set": {"refreshedAt": refreshed_at}},
+                    {"$merge": {"into": target, "on": "_id",
+                                "whenMatched": "replace", "whenNotMatched": "insert"}}
+                ],
+                allowDiskUse=True
+            )
+            # Keys that were not merged just now have no enrollments left
+            db[target].delete_many({"_id": {"$in": batch}, "refreshedAt": {"$ne": refreshed_at}})
+            refreshed[target] += len(batch)
+
+    _set_watermark(db, new_watermark)
+    _prune_tombstones(db, new_watermark)
+    return refreshed
+
+
+
+
+## Reads
+def get_course_stats(db, course_id):
+    """Returns the materialized statistics of one course, or None."""
+    return db[COURSE_STATS].find_one({"_id": course_id})
+
+
+def get_student_stats(db, student_id):
+    """Returns the materialized statistics of one student, or None."""
+    return db[STUDENT_STATS].find_one({"_id": student_id})
+
+
+
+
+## Consistency check
+def _bson_order(value):
+    """
+    Sort key following the server's BSON comparison order (null < numbers <
+    strings < objects < arrays < binary < ObjectId < booleans < dates), so the
+    merge-join below walks both cursors the way they were sorted, even with
+    null or mixed-type _ids.
+    """
+    if value is None:
+        return (1, 0)
+    if isinstance(value, bool):
+        return (8, value)
+    if isinstance(value, (int, float)):
+        return (2, value)
+    if isinstance(value, Decimal128):
+        return (2, value.to_decimal())
+    if isinstance(value, str):
+        return (3, value)
+    if isinstance(value, dict):
+        return (4, repr(sorted(value.items(), key=lambda item: item[0])))
+    if isinstance(value, list):
+        return (5, repr(value))
+    if isinstance(value, bytes):
+        return (6, value)
+    if isinstance(value, ObjectId):
+        return (7, value)
+    if isinstance(value, datetime):
+        return (9, value)
+    return (10, repr(value))
+
+
+def _same(a, b, tolerance=1e-6):
+    if isinstance(a, float) or isinstance(b, float):
+        if a is None or b is None:
+            return a is b
+        return math.isclose(a, b, rel_tol=tolerance, abs_tol=tolerance)
+    return a == b
+
+
+def check_stats_consistency(db, limit=None):
+    """
+    Compares the materialized statistics with the live aggregation.
+
+    Both sides are streamed in _id order and merge-joined, so memory use does
+    not grow with the number of courses or students.
+
+    Parameters:
+        db (Database): The connected MongoDB database object.
+        limit (int): Optional maximum number of mismatches to collect per collection.
+
+    Returns:
+        dict: Per stats collection, a list of mismatches. Each mismatch has the
+              _id and either "missing" / "extra" or the differing fields as
+              {field: (materialized, live)}.
+    """
+    report = {}
+    for target, (_, stages) in STATS_TARGETS.items():
+        live_docs = db.enrollments.aggregate(stages + [{"$sort": {"_id": 1}}], allowDiskUse=True)
+        stored_docs = db[target].find({}, {"refreshedAt": 0}).sort("_id", 1)
+        live, stored = next(live_docs, None), next(stored_docs, None)
+        mismatches = []
+
+        while (live is not None or stored is not None) and not (limit and len(mismatches) >= limit):
+            if stored is None or (live is not None and _bson_order(live["_id"]) < _bson_order(stored["_id"])):
+                mismatches.append({"_id": live["_id"], "missing": True})
+                live = next(live_docs, None)
+            elif live is None or _bson_order(stored["_id"]) < _bson_order(live["_id"]):
+                mismatches.append({"_id": stored["_id"], "extra": True})
+                stored = next(stored_docs, None)
+            else:
+                diff = {field: (stored.get(field), value) for field, value in live.items()
+                        if not _same(stored.get(field), value)}
+                if diff:
+                    mismatches.append({"_id": live["_id"], "fields": diff})
+                live, stored = next(live_docs, None), next(stored_docs, None)
+
+        report[target] = mismatches
+    return report
+
+
+
+## Command line entry point
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Maintain EduHub materialized statistics.")
+    parser.add_argument("command", choices=["rebuild", "refresh", "check"])
+    add_connection_arguments(parser)
+    args = parser.parse_args(argv)
+
+    from .indexes import sync_indexes
+
+    db, _ = connect_from_args(args)
+    sync_indexes(db, collections=["enrollments", TOMBSTONES])
+
+    if args.command == "rebuild":
+        print("✅ Rebuilt statistics:", rebuild_stats(db))
+    elif args.command == "refresh":
+        print("✅ Refreshed statistics:", refresh_stats(db))
+    else:
+        report = check_stats_consistency(db)
+        for target, mismatches in report.items():
+            print(f"{target}: {len(mismatches)} mismatches")
+            for mismatch in mismatches[:20]:
+                print("   ", mismatch)
+        if any(report.values()):
+            raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,429 @@
+
+# ### EduHub Client-Side Schema Validation
+# Compiles the collections' $jsonSchema rules into plain Python checks, so bulk
+# writes can be screened before they reach the server: one bad document no
+# longer costs a round trip and a failed batch, and rejects are written to a
+# dead-letter file with the reasons instead of being lost in an exception.
+#
+#   python -m eduhub validate drift                       # code vs data file vs server
+#   python -m eduhub validate screen exports/today --dead-letter rejects.ndjson
+#   python -m eduhub validate bench --collection enrollments --documents 200000
+#
+# Supported keywords: bsonType (one or a list), required, properties, items,
+# enum, pattern, minimum/maximum (with exclusiveMinimum/exclusiveMaximum),
+# minLength/maxLength, title and description. Compiling a schema that uses
+# anything else raises ValueError rather than silently accepting documents the
+# server would reject. Types follow how PyMongo encodes Python values: an int
+# is "int" when it fits in 32 bits and "long" otherwise, and only floats are
+# "double".
+
+
+
+## Importing libraries
+from bson import Decimal128, Int64, ObjectId, json_util
+from bson.json_util import RELAXED_JSON_OPTIONS
+from collections.abc import Mapping
+from datetime import datetime, timezone
+from functools import lru_cache
+from .schema import COLLECTION_SCHEMAS, SCHEMA_FILE, read_schema_file, server_schemas, schema_drift
+from .client import add_connection_arguments, connect_from_args
+import argparse
+import random
+import re
+import time
+
+
+
+INT32_MIN, INT32_MAX = -2**31, 2**31 - 1
+
+# bsonType -> predicate on the Python value PyMongo would encode
+BSON_TYPES = {
+    "string": lambda value: isinstance(value, str),
+    "double": lambda value: isinstance(value, float),
+    "int": lambda value: type(value) is int and INT32_MIN <= value <= INT32_MAX,
+    "long": lambda value: isinstance(value, Int64) or (type(value) is int and not INT32_MIN <= value <= INT32_MAX),
+    "decimal": lambda value: isinstance(value, Decimal128),
+    "number": lambda value: isinstance(value, (int, float, Decimal128)) and not isinstance(value, bool),
+    "bool": lambda value: isinstance(value, bool),
+    "date": lambda value: isinstance(value, datetime),
+    "object": lambda value: isinstance(value, Mapping),
+    "array": lambda value: isinstance(value, (list, tuple)),
+    "objectId": lambda value: isinstance(value, ObjectId),
+    "null": lambda value: value is None,
+}
+
+# bsonTypes that are a plain isinstance() check (dict first: faster than the Mapping ABC)
+PYTHON_TYPES = {
+    "string": (str,), "double": (float,), "decimal": (Decimal128,), "bool": (bool,), "date": (datetime,),
+    "object": (dict, Mapping), "array": (list, tuple), "objectId": (ObjectId,), "null": (type(None),)
+}
+
+SUPPORTED_KEYWORDS = {"bsonType", "required", "properties", "items", "enum", "pattern", "minimum", "maximum",
+                      "exclusiveMinimum", "exclusiveMaximum", "minLength", "maxLength", "title", "description"}
+
+SCHEMA_SOURCES = ("code", "file", "server")
+# Dead-letter lines buffered before each append while screening a dump
+DEAD_LETTER_FLUSH = 1000
+
+
+
+
+## Compiling
+def _compile_node(node, where):
+    unsupported = set(node) - SUPPORTED_KEYWORDS
+    if unsupported:
+        raise ValueError(f"{where or 'document'}: unsupported $jsonSchema keywords {sorted(unsupported)}")
+
+    checks = []
+
+    if "bsonType" in node:
+        names = [node["bsonType"]] if isinstance(node["bsonType"], str) else list(node["bsonType"])
+        unknown = [name for name in names if name not in BSON_TYPES]
+        if unknown:
+            raise ValueError(f"{where or 'document'}: unknown bsonType {unknown}")
+        expected = " or ".join(names)
+        if all(name in PYTHON_TYPES for name in names):
+            types = tuple(python_type for name in names for python_type in PYTHON_TYPES[name])
+
+            def check_type(value, path, errors):
+                if not isinstance(value, types):
+                    errors.append(f"{path}: expected {expected}, got {type(value).__name__}")
+                    return False
+                return True
+        else:
+            predicates = [BSON_TYPES[name] for name in names]
+
+            def check_type(value, path, errors):
+                if not any(predicate(value) for predicate in predicates):
+                    errors.append(f"{path}: expected {expected}, got {type(value).__name__}")
+                    return False
+                return True
+        checks.append(check_type)
+
+    if "enum" in node:
+        allowed = list(node["enum"])
+
+        def check_enum(value, path, errors):
+            if value not in allowed:
+                errors.append(f"{path}: {value!r} is not one of {allowed}")
+                return False
+            return True
+        checks.append(check_enum)
+
+    if "pattern" in node:
+        regex = re.compile(node["pattern"])
+
+        def check_pattern(value, path, errors):
+            if isinstance(value, str) and not regex.search(value):
+                errors.append(f"{path}: {value!r} does not match {node['pattern']!r}")
+                return False
+            return True
+        checks.append(check_pattern)
+
+    if "minLength" in node or "maxLength" in node:
+        min_length, max_length = node.get("minLength", 0), node.get("maxLength")
+
+        def check_length(value, path, errors):
+            if isinstance(value, str) and (len(value) < min_length
+                                           or (max_length is not None and len(value) > max_length)):
+                errors.append(f"{path}: length {len(value)} is outside [{min_length}, {max_length}]")
+                return False
+            return True
+        checks.append(check_length)
+
+    if "minimum" in node or "maximum" in node:
+        minimum, maximum = node.get("minimum"), node.get("maximum")
+        exclusive_min, exclusive_max = node.get("exclusiveMinimum", False), node.get("exclusiveMaximum", False)
+
+        def check_range(value, path, errors):
+            if isinstance(value, bool) or not isinstance(value, (int, float)):
+                return True
+            if minimum is not None and (value <= minimum if exclusive_min else value < minimum):
+                errors.append(f"{path}: {value} is below the minimum {minimum}")
+                return False
+            if maximum is not None and (value >= maximum if exclusive_max else value > maximum):
+                errors.append(f"{path}: {value} is above the maximum {maximum}")
+                return False
+            return True
+        checks.append(check_range)
+
+    if "required" in node or "properties" in node:
+        required = list(node.get("required", []))
+        properties = [(name, _compile_node(child, f"{where}.{name}" if where else name))
+                      for name, child in node.get("properties", {}).items()]
+
+        def check_object(value, path, errors):
+            if not isinstance(value, (dict, Mapping)):
+                return True
+            ok = True
+            for name in required:
+                if name not in value:
+                    errors.append(f"{path + '.' if path else ''}{name}: required field is missing")
+                    ok = False
+            for name, check in properties:
+                if name in value:
+                    ok = check(value[name], f"{path}.{name}" if path else name, errors) and ok
+            return ok
+        checks.append(check_object)
+
+    if "items" in node:
+        check_item = _compile_node(node["items"], f"{where}[]")
+
+        def check_items(value, path, errors):
+            if not isinstance(value, (list, tuple)):
+                return True
+            ok = True
+            for position, item in enumerate(value):
+                ok = check_item(item, f"{path}[{position}]", errors) and ok
+            return ok
+        checks.append(check_items)
+
+    if len(checks) == 1:
+        return checks[0]
+
+    def check(value, path, errors):
+        # Stop at the first failing keyword, as nested checks assume the type held
+        for step in checks:
+            if not step(value, path, errors):
+                return False
+        return True
+    return check
+
+
+def compile_schema(schema):
+    """
+    Compiles a $jsonSchema into a validator.
+
+    Parameters:
+        schema (dict): The $jsonSchema document (without the "$jsonSchema" key).
+
+    Returns:
+        callable: validate(document) -> list of error strings (empty when valid).
+
+    Raises:
+        ValueError: If the schema uses keywords or types the compiler does not support.
+    """
+    root = _compile_node(schema, "")
+
+    def validate(document):
+        errors = []
+        root(document, "", errors)
+        return errors
+    return validate
+
+
+def load_schemas(source="code", db=None, path=SCHEMA_FILE):
+    """Returns collection -> $jsonSchema from the code, the schema file or the server validators."""
+    if source == "code":
+        return dict(COLLECTION_SCHEMAS)
+    if source == "file":
+        return read_schema_file(path)
+    if source == "server":
+        if db is None:
+            raise ValueError("Reading the server schemas needs a database.")
+        return server_schemas(db)
+    raise ValueError(f"Unknown schema source: {source}")
+
+
+def compile_schemas(schemas=None):
+    """Compiles each collection's schema. Returns collection -> validator."""
+    return {name: compile_schema(schema) for name, schema in (schemas or COLLECTION_SCHEMAS).items()}
+
+
+@lru_cache(maxsize=None)
+def default_validators():
+    """Validators compiled from COLLECTION_SCHEMAS, once per process."""
+    return compile_schemas()
+
+
+
+
+## Screening
+def screen_documents(docs, validate):
+    """
+    Splits documents into those that pass the validator and the rejects.
+
+    Returns:
+        tuple: (valid documents, [(document, errors), ...]).
+    """
+    valid, rejects = [], []
+    for doc in docs:
+        errors = validate(doc)
+        if errors:
+            rejects.append((doc, errors))
+        else:
+            valid.append(doc)
+    return valid, rejects
+
+
+def dead_letter_line(collection, doc, errors):
+    """One dead-letter record as a relaxed Extended JSON line."""
+    return json_util.dumps({"collection": collection, "errors": errors,
+                            "rejectedAt": datetime.now(timezone.utc), "document": doc},
+                           json_options=RELAXED_JSON_OPTIONS)
+
+
+def write_dead_letters(path, lines):
+    """Appends dead-letter lines to an NDJSON file."""
+    if not lines:
+        return
+    with open(path, "a") as f:
+        f.writelines(line + "\n" for line in lines)
+
+
+def validated_insert_many(db, collection, docs, validate=None, dead_letter_path=None, **insert_options):
+    """
+    Screens documents against the collection's compiled schema and inserts the valid ones.
+
+    Parameters:
+        db (Database): Target database.
+        collection (str): Target collection.
+        docs (list): Documents to insert.
+        validate (callable): Validator (default: compiled from COLLECTION_SCHEMAS; none if the collection has no schema).
+        dead_letter_path (str): NDJSON file the rejects are appended to.
+        **insert_options: Passed to insert_many (e.g. ordered=False).
+
+    Returns:
+        dict: {"inserted": count, "rejected": [(document, errors), ...]}.
+    """
+    validate = validate or default_validators().get(collection)
+    valid, rejects = screen_documents(docs, validate) if validate else (list(docs), [])
+    if dead_letter_path:
+        write_dead_letters(dead_letter_path, [dead_letter_line(collection, doc, errors) for doc, errors in rejects])
+    inserted = len(db[collection].insert_many(valid, **insert_options).inserted_ids) if valid else 0
+    return {"inserted": inserted, "rejected": rejects}
+
+
+
+
+## Benchmark
+def corrupt_document(doc, schema, rng):
+    """Returns a copy of doc broken in one of the ways the schema forbids."""
+    doc = dict(doc)
+    properties = schema.get("properties", {})
+    ways = []
+    if schema.get("required"):
+        ways.append("missing")
+    if any("enum" in rule for rule in properties.values()):
+        ways.append("enum")
+    if any("bsonType" in rule and rule["bsonType"] != "string" for rule in properties.values()):
+        ways.append("type")
+    if any("maximum" in rule for rule in properties.values()):
+        ways.append("range")
+
+    way = rng.choice(ways)
+    if way == "missing":
+        doc.pop(rng.choice(schema["required"]), None)
+    elif way == "enum":
+        doc[rng.choice([name for name, rule in properties.items() if "enum" in rule])] = "not-a-valid-value"
+    elif way == "type":
+        doc[rng.choice([name for name, rule in properties.items()
+                        if "bsonType" in rule and rule["bsonType"] != "string"])] = "2025-06-12"
+    else:
+        name = rng.choice([name for name, rule in properties.items() if "maximum" in rule])
+        doc[name] = float(properties[name]["maximum"]) * 2 + 1
+    return doc
+
+
+def benchmark_validation(docs, validate, iterations=3):
+    """
+    Measures validator throughput.
+
+    Returns:
+        dict: {"documents", "rejected", "seconds" (best run), "docsPerSecond"}.
+    """
+    best, rejected = None, 0
+    for _ in range(iterations):
+        started = time.perf_counter()
+        rejected = sum(1 for doc in docs if validate(doc))
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return {
+        "documents": len(docs),
+        "rejected": rejected,
+        "seconds": round(best, 4),
+        "docsPerSecond": round(len(docs) / best) if best else None
+    }
+
+
+def _benchmark_documents(collection, count, bad_fraction, seed):
+    from .seed import SAMPLE_COUNTS, build_context, generate_documents_vectorized
+
+    counts = dict(SAMPLE_COUNTS)
+    counts[collection] = count
+    ctx = build_context(counts, seed, mode="vectorized")
+    docs = generate_documents_vectorized(collection, 0, count, ctx)
+    rng = random.Random(seed)
+    schema = COLLECTION_SCHEMAS[collection]
+    return [corrupt_document(doc, schema, rng) if rng.random() < bad_fraction else doc for doc in docs]
+
+
+
+
+## Command line entry point
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Check schema drift, screen a dump, or benchmark the validators.")
+    parser.add_argument("command", choices=["drift", "screen", "bench"])
+    parser.add_argument("path", nargs="?", help="screen: export directory or dump file")
+    add_connection_arguments(parser)
+    parser.add_argument("--no-server", action="store_true", help="drift: skip the server validators")
+    parser.add_argument("--schema-source", choices=SCHEMA_SOURCES, default="code")
+    parser.add_argument("--dead-letter", help="screen: NDJSON file for rejected documents")
+    parser.add_argument("--collection", default="enrollments", choices=sorted(COLLECTION_SCHEMAS))
+    parser.add_argument("--documents", type=int, default=100_000)
+    parser.add_argument("--bad-fraction", type=float, default=0.01)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    db = None if args.command != "drift" and args.schema_source != "server" else connect_from_args(args)[0]
+
+    if args.command == "drift":
+        drift = schema_drift(None if args.no_server else db)
+        for source, collections in drift.items():
+            print(f"❌ {source} differs for: {', '.join(collections)}" if collections
+                  else f"✅ {source} matches eduhub.schema")
+        if any(drift.values()):
+            raise SystemExit(1)
+        return
+
+    validators = compile_schemas(load_schemas(args.schema_source, db))
+
+    if args.command == "bench":
+        docs = _benchmark_documents(args.collection, args.documents, args.bad_fraction, args.seed)
+        result = benchmark_validation(docs, validators[args.collection])
+        print(f"✅ {args.collection}: {result['docsPerSecond']:,} docs/s "
+              f"({result['documents']} documents, {result['rejected']} rejected, {result['seconds']}s)")
+        return
+
+    if not args.path:
+        parser.error("screen needs the path of an export directory or dump file")
+    from .load import plan_inputs
+    from .export import iter_export_documents
+
+    for source in plan_inputs(args.path):
+        validate = validators.get(source["collection"])
+        if validate is None:
+            print(f"{source['collection']}: no schema, skipped")
+            continue
+        docs = source["docs"] if source["format"] == "json" else \
+            iter_export_documents(source["path"], source["format"], source["compression"], source["jsonMode"])
+        checked = rejected = 0
+        lines = []
+        for doc in docs:
+            checked += 1
+            errors = validate(doc)
+            if errors:
+                rejected += 1
+                lines.append(dead_letter_line(source["collection"], doc, errors))
+            if len(lines) >= DEAD_LETTER_FLUSH:
+                if args.dead_letter:
+                    write_dead_letters(args.dead_letter, lines)
+                lines = []
+        if args.dead_letter:
+            write_dead_letters(args.dead_letter, lines)
+        status = "✅" if not rejected else "❌"
+        print(f"{status} {source['collection']}: {checked} checked, {rejected} rejected")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+
+# ### EduHub Write Helpers
+# Section 3.3 update and delete operations as functions. Each helper
+# invalidates the cached reads of the collection it touches; course updates go
+# through eduhub.denormalize.update_course_with_snapshots() so the enrollment
+# snapshot follows category / instructorId changes. The filter and
+# update builders are shared with the async API (eduhub.aio).
+
+
+
+## Importing libraries
+from datetime import datetime, timezone
+from .cache import query_cache
+from .denormalize import update_course_with_snapshots
+from .rollups import record_enrollment
+from .stats import record_removed_enrollments
+
+
+
+# Fields of a deleted enrollment needed to update the rollups and stats
+DELETED_ENROLLMENT_PROJECTION = {"courseId": 1, "studentId": 1, "enrolledAt": 1, "category": 1}
+
+
+
+
+## Filter and update builders
+def profile_update(profile):
+    """Returns the update document setting fields of a user's embedded profile."""
+    return {"$set": {f"profile.{field}": value for field, value in profile.items()}}
+
+
+def publish_update():
+    """Returns the update document marking a course as published."""
+    return {"$set": {"isPublished": True, "updatedAt": datetime.now(timezone.utc)}}
+
+
+def course_tags_update(tags):
+    """Returns the update document adding tags a course does not have yet."""
+    return {"$addToSet": {"tags": {"$each": list(tags)}}}
+
+
+def grade_update(grade, feedback=None):
+    """Returns the update document recording a submission's grade and optional feedback."""
+    fields = {"grade": float(grade)}
+    if feedback is not None:
+        fields["feedback"] = feedback
+    return {"$set": fields}
+
+
+def enrollment_filter(student_id, course_id):
+    """Returns the filter of a student's enrollment in a course."""
+    return {"studentId": student_id, "courseId": course_id}
+
+
+def lesson_filter(course_id, order):
+    """Returns the filter of the lesson at a given position of a course."""
+    return {"courseId": course_id, "order": order}
+
+
+
+
+## Updates
+def update_user_profile(db, user_id, profile):
+    """
+    Sets fields of a user's embedded profile.
+
+    Parameters:
+        db (Database): The connected MongoDB database object.
+        user_id (str): The userId to update.
+        profile (dict): Profile fields to set, e.g. {"bio": "...", "skills": [...]}.
+    """
+    result = db.users.update_one({"userId": user_id}, profile_update(profile))
+    query_cache.invalidate("users")
+    return result
+
+
+def update_course(db, course_id, update):
+    """
+    Applies an update to one course, refreshing its title trigrams and copying
+    category / instructorId changes onto its enrollments.
+    """
+    return update_course_with_snapshots(db, course_id, update)
+
+
+def publish_course(db, course_id):
+    """Marks a course as published."""
+    return update_course(db, course_id, publish_update())
+
+
+def add_course_tags(db, course_id, tags):
+    """Adds tags to a course, skipping the ones it already has."""
+    return update_course(db, course_id, course_tags_update(tags))
+
+
+def grade_submission(db, submission_id, grade, feedback=None):
+    """Records the grade (and optional feedback) of a submission."""
+    result = db.submissions.update_one({"submissionId": submission_id}, grade_update(grade, feedback))
+    query_cache.invalidate("submissions")
+    return result
+
+
+
+
+## Deletes
+def soft_delete_user(db, user_id):
+    """Deactivates a user instead of removing the document."""
+    result = db.users.update_one({"userId": user_id}, {"$set": {"isActive": False}})
+    query_cache.invalidate("users")
+    return result
+
+
+def delete_enrollment(db, student_id, course_id):
+    """
+    Removes a student's enrollment in a course, takes it out of the enrollment
+    rollups and leaves a stats tombstone for refresh_stats(). Returns the
+    deleted enrollment, or None.
+    """
+    deleted = db.enrollments.find_one_and_delete(enrollment_filter(student_id, course_id),
+                                                 DELETED_ENROLLMENT_PROJECTION)
+    if deleted is not None:
+        record_removed_enrollments(db, [deleted])
+    if deleted is not None and "enrolledAt" in deleted:
+        record_enrollment(db, deleted, delta=-1)
+    query_cache.invalidate("enrollments")
+    return deleted
+
+
+def remove_lesson(db, course_id, order):
+    """Removes the lesson at a given position of a course."""
+    result = db.lessons.delete_one(lesson_filter(course_id, order))
+    query_cache.invalidate("lessons")
+    return result
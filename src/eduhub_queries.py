@@ -4,8 +4,6 @@
 
 
 ## Importing libraries
-from pymongo import MongoClient
-from faker import Faker
 from datetime import datetime, timezone, timedelta
 import pandas as pd
 
@@ -21,173 +19,26 @@ import random
 
 
 # Connect to MongoDB
-client = MongoClient("mongodb://localhost:27017/")
-db = client["eduhub_db"]
-
-
-
-
-# users Collection — with Validation Rules
-db.create_collection(
-    "users",
-    validator={
-        "$jsonSchema": {
-            "bsonType": "object",
-            "required": ["userId", "email", "firstName", "lastName", "role"],
-            "properties": {
-                "userId": {"bsonType": "string"},
-                "email": {
-                    "bsonType": "string",
-                    "pattern": "^.+@.+$"
-                },
-                "firstName": {"bsonType": "string"},
-                "lastName": {"bsonType": "string"},
-                "role": {
-                    "enum": ["student", "instructor"]
-                },
-                "dateJoined": {"bsonType": "date"},
-                "profile": {
-                    "bsonType": "object",
-                    "properties": {
-                        "bio": {"bsonType": "string"},
-                        "avatar": {"bsonType": "string"},
-                        "skills": {
-                            "bsonType": "array",
-                            "items": {"bsonType": "string"}
-                        }
-                    }
-                },
-                "isActive": {"bsonType": "bool"}
-            }
-        }
-    }
-)
+# URI, database, pool sizes, timeouts and compressors come from eduhub.client
+# (defaults, EDUHUB_CONFIG file, EDUHUB_* environment variables); pool_metrics
+# records connection checkouts so maxPoolSize can be sized from real load.
+from eduhub.client import load_client_settings, create_client, PoolMetrics, pool_sizing_hint
 
+client_settings = load_client_settings()
+pool_metrics = PoolMetrics()
+client = create_client(client_settings, metrics=pool_metrics)
+db = client[client_settings["database"]]
 
 
 
-# courses Collection — with Validation Rules
-db.create_collection(
-    "courses",
-    validator={
-        "$jsonSchema": {
-            "bsonType": "object",
-            "required": ["courseId", "title", "instructorId", "level"],
-            "properties": {
-                "courseId": {"bsonType": "string"},
-                "title": {"bsonType": "string"},
-                "description": {"bsonType": "string"},
-                "instructorId": {"bsonType": "string"},
-                "category": {"bsonType": "string"},
-                "level": {
-                    "enum": ["beginner", "intermediate", "advanced"]
-                },
-                "duration": {"bsonType": "double"},
-                "price": {"bsonType": "double"},
-                "tags": {
-                    "bsonType": "array",
-                    "items": {"bsonType": "string"}
-                },
-                "createdAt": {"bsonType": "date"},
-                "updatedAt": {"bsonType": "date"},
-                "isPublished": {"bsonType": "bool"},
-                "rating": {"bsonType": "double"},
-            }
-        }
-    }
-)
 
+# Collections with $jsonSchema validation rules
+# The schemas live in eduhub.schema (COLLECTION_SCHEMAS); setup_database creates
+# missing collections and applies the validators to existing ones with collMod,
+# so this cell can be rerun against a database that is already set up.
+from eduhub.schema import setup_database
 
-
-
-enrollments_schema = {
-    "validator": {
-        "$jsonSchema": {
-            "bsonType": "object",
-            "required": ["enrollmentId", "studentId", "courseId", "enrolledAt", "status"],
-            "properties": {
-                "enrollmentId": {"bsonType": "string"},
-                "studentId": {"bsonType": "string"},  # Reference to users.userId
-                "courseId": {"bsonType": "string"},   # Reference to courses.courseId
-                "enrolledAt": {"bsonType": "date"},
-                "status": {
-                    "enum": ["active", "completed", "dropped"]
-                },
-                "progress": {
-                    "bsonType": "double",
-                    "minimum": 0,
-                    "maximum": 100
-                }
-            }
-        }
-    }
-}
-
-lessons_schema = {
-    "validator": {
-        "$jsonSchema": {
-            "bsonType": "object",
-            "required": ["lessonId", "courseId", "title", "content", "order"],
-            "properties": {
-                "lessonId": {"bsonType": "string"},
-                "courseId": {"bsonType": "string"},  # Reference to courses.courseId
-                "title": {"bsonType": "string"},
-                "content": {"bsonType": "string"},
-                "resources": {
-                    "bsonType": "array",
-                    "items": {"bsonType": "string"}
-                },
-                "order": {"bsonType": "int"},  # Lesson sequence
-                "createdAt": {"bsonType": "date"}
-            }
-        }
-    }
-}
-
-assignments_schema = {
-    "validator": {
-        "$jsonSchema": {
-            "bsonType": "object",
-            "required": ["assignmentId", "courseId", "title", "description", "dueDate"],
-            "properties": {
-                "assignmentId": {"bsonType": "string"},
-                "courseId": {"bsonType": "string"},  # Reference to courses.courseId
-                "lessonId": {"bsonType": "string"},  # Optional, for lesson-specific assignments
-                "title": {"bsonType": "string"},
-                "description": {"bsonType": "string"},
-                "dueDate": {"bsonType": "date"},
-                "points": {"bsonType": "int"},
-                "createdAt": {"bsonType": "date"}
-            }
-        }
-    }
-}
-
-submissions_schema = {
-    "validator": {
-        "$jsonSchema": {
-            "bsonType": "object",
-            "required": ["submissionId", "assignmentId", "studentId", "submittedAt"],
-            "properties": {
-                "submissionId": {"bsonType": "string"},
-                "assignmentId": {"bsonType": "string"},  # Reference to assignments.assignmentId
-                "studentId": {"bsonType": "string"},     # Reference to users.userId
-                "content": {"bsonType": "string"},
-                "grade": {"bsonType": "double"},
-                "feedback": {"bsonType": "string"},
-                "submittedAt": {"bsonType": "date"}
-            }
-        }
-    }
-}
-
-
-
-
-db.create_collection("enrollments", validator=enrollments_schema["validator"])
-db.create_collection("lessons", validator=lessons_schema["validator"])
-db.create_collection("assignments", validator=assignments_schema["validator"])
-db.create_collection("submissions", validator=submissions_schema["validator"])
+setup_database(db)
 
 
 # ### Section Title: Task 1.2 – Document Schema Design
@@ -236,6 +87,7 @@ enrollment_schema = {
     "studentId": "string (reference to users)",
     "courseId": "string (reference to courses)",
     "enrolledAt": "datetime",
+    "updatedAt": "datetime (last change, drives incremental statistics)",
     "status": "string (enum: ['active', 'completed', 'dropped'])",
     "progress": "number"
 }
@@ -281,160 +133,26 @@ submission_schema = {
 # 
 
 # Task 2.1: Insert Sample Data
-
-
-
-faker = Faker()
-
-
-
-
-
-#Inserting sample data in users collection
-roles = ["student"] * 14 + ["instructor"] * 6
-random.shuffle(roles)
-
-users = []
-for i in range(20):
-    user = {
-        "userId": str(uuid.uuid4()),
-        "email": faker.email(),
-        "firstName": faker.first_name(),
-        "lastName": faker.last_name(),
-        "role": roles[i],
-        "dateJoined": faker.date_time_this_year(),
-        "profile": {
-            "bio": faker.text(150),
-            "avatar": faker.image_url(),
-            "skills": [faker.word() for _ in range(random.randint(1, 4))]
-        },
-        "isActive": random.choice([True, False])
-    }
-    users.append(user)
-
-db.users.insert_many(users)
-
-
-
-
-# Inserting sample data in courses collection
-
-instructors = [u for u in users if u["role"] == "instructor"]
-categories = ["Data Science", "Web Dev", "Business", "AI", "Cybersecurity"]
-levels = ["beginner", "intermediate", "advanced"]
-
-courses = []
-for _ in range(8):
-    instructor = random.choice(instructors)
-    course = {
-        "courseId": str(uuid.uuid4()),
-        "title": faker.catch_phrase(),
-        "description": faker.text(150),
-        "instructorId": instructor["userId"],
-        "category": random.choice(categories),
-        "level": random.choice(levels),
-        "duration": round(random.uniform(1.5, 20.0), 1),
-        "price": round(random.uniform(10, 100), 2),
-        "tags": faker.words(nb=3),
-        "createdAt": faker.date_time_this_year(),
-        "updatedAt": faker.date_time_this_year(),
-        "isPublished": random.choice([True, False])
-    }
-    courses.append(course)
-
-db.courses.insert_many(courses)
-
-
-
-
-## Inserting 15 Enrollments (studentId + courseId)
-students = [u for u in users if u["role"] == "student"]
-statuses = ["active", "completed", "dropped"]
-
-enrollments = []
-for _ in range(15):
-    student = random.choice(students)
-    course = random.choice(courses)
-    enrollment = {
-        "enrollmentId": str(uuid.uuid4()),
-        "studentId": student["userId"],
-        "courseId": course["courseId"],
-        "enrolledAt": faker.date_time_this_year(),
-        "status": random.choice(statuses),
-        "progress": round(random.uniform(0, 100), 2)
-    }
-    enrollments.append(enrollment)
-
-db.enrollments.insert_many(enrollments)
-
-
-
-
-# Inserting sample data in lessons collection
-lessons = []
-for _ in range(25):
-    course = random.choice(courses)
-    lesson = {
-        "lessonId": str(uuid.uuid4()),
-        "courseId": course["courseId"],
-        "title": faker.sentence(),
-        "content": faker.text(300),
-        "resources": [faker.url() for _ in range(random.randint(0, 3))],
-        "order": random.randint(1, 10),
-        "createdAt": faker.date_time_this_year()
-    }
-    lessons.append(lesson)
-
-db.lessons.insert_many(lessons)
-
-
-
-
-# Inserting sample data in assignments collection
-assignments = []
-
-for _ in range(10):  # Generate 10 sample assignments
-    course = random.choice(courses)
-
-    assignment = {
-        "assignmentId": str(uuid.uuid4()),
-        "courseId": course["courseId"],
-        "title": faker.sentence(nb_words=6),
-        "description": faker.text(max_nb_chars=100),
-        "dueDate": faker.future_datetime(end_date="+30d"),
-        "points": faker.random_int(min=5, max=20),
-        "createdAt": faker.date_time_this_year()
-    }
-
-    # Add optional lessonId only if lessons exist and randomly chosen
-    if lessons and random.choice([True, False]):
-        lesson = random.choice(lessons)
-        if "lessonId" in lesson:
-            assignment["lessonId"] = lesson["lessonId"]
-
-    assignments.append(assignment)
-db.assignments.insert_many(assignments)
-
-
-
-
-# Inserting sample data in submissions collection
-submissions = []
-for _ in range(12):
-    student = random.choice(students)
-    assignment = random.choice(assignments)
-    submission = {
-        "submissionId": str(uuid.uuid4()),
-        "assignmentId": assignment["assignmentId"],
-        "studentId": student["userId"],
-        "content": faker.paragraph(nb_sentences=5),
-        "grade": round(random.uniform(0, 100), 2),
-        "feedback": faker.sentence(),
-        "submittedAt": faker.date_time_this_year()
-    }
-    submissions.append(submission)
-
-db.submissions.insert_many(submissions)
+# Documents are generated by eduhub.seed in bounded, reproducible batches.
+# Raise the counts (or run `python -m eduhub seed --help`) to load-test at scale.
+# The same seed gives the same ids, so the collections it fills and the ones
+# derived from them are emptied first and a rerun of the notebook starts clean;
+# delete_many keeps the validators and indexes set up above.
+from eduhub.seed import seed_database, SAMPLE_COUNTS, SEED_ORDER
+from eduhub.rollups import ROLLUP_COLLECTIONS
+from eduhub.stats import COURSE_STATS, STUDENT_STATS, WATERMARKS, TOMBSTONES
+from eduhub.archive import ARCHIVE_POLICIES, CHECKPOINTS
+from eduhub.cache import query_cache
+
+derived_collections = (list(ROLLUP_COLLECTIONS.values())
+                       + [COURSE_STATS, STUDENT_STATS, WATERMARKS, TOMBSTONES, CHECKPOINTS]
+                       + [policy["target"] for policy in ARCHIVE_POLICIES.values()])
+for collection in list(SEED_ORDER) + derived_collections:
+    db[collection].delete_many({})
+query_cache.invalidate()
+
+seeded = seed_database(db, counts=SAMPLE_COUNTS, seed=42)
+print("Seeded collections:", seeded)
 
 
 # ### Section 3: Basic CRUD Operations
@@ -474,7 +192,10 @@ new_course = {
     "updatedAt": datetime.now(timezone.utc),
     "isPublished": False
 }
-db.courses.insert_one(new_course)
+# insert_course also stores the title trigrams used for substring search (Section 3.2 #5)
+from eduhub.search import insert_course
+
+insert_course(db, new_course)
 
 # 3. Enroll a student in a course
 new_enrollment = {
@@ -482,10 +203,14 @@ new_enrollment = {
     "studentId": new_student["userId"],
     "courseId": new_course["courseId"],
     "enrolledAt": datetime.now(timezone.utc),
+    "updatedAt": datetime.now(timezone.utc),
     "status": "active",
     "progress": 0.0
 }
-db.enrollments.insert_one(new_enrollment)
+# enroll_student also stores the course snapshot used by the Section 4 reports
+from eduhub.denormalize import enroll_student
+
+enroll_student(db, new_enrollment)
 
 # 4. Add a new lesson to an existing course
 new_lesson = {
@@ -503,16 +228,27 @@ db.lessons.insert_one(new_lesson)
 
 
 ### Section 3.2 Read Operations
+# Catalogue reads go through a read-through cache (see eduhub.cache) that the
+# Section 3.3 write helpers invalidate.
+# List views ask for a projection profile (eduhub.projections) instead of
+# whole documents: "card" drops the bio, skills and other profile details.
+from eduhub.reads import find_active_students, find_courses_by_category
+from eduhub.projections import projection, to_records
+
 # 1. Find all active students
-active_students = list(db.users.find({"role": "student", "isActive": True}))
+active_students = find_active_students(db, projection=projection("users", "card"))
+student_cards = list(to_records(active_students, "users", "card"))
+print(student_cards[:3])
 
 # 2. Retrieve course details with instructor info
 course_with_instructor = db.courses.aggregate([
+    {"$project": projection("courses", "detail")},
     {
         "$lookup": {
             "from": "users",
             "localField": "instructorId",
             "foreignField": "userId",
+            "pipeline": [{"$project": projection("users", "summary")}],
             "as": "instructor"
         }
     },
@@ -521,62 +257,65 @@ course_with_instructor = db.courses.aggregate([
 print(list(course_with_instructor))
 
 # 3. Get all courses in a specific category
-data_science_courses = list(db.courses.find({"category": "Data Science"}))
+data_science_courses = find_courses_by_category(db, "Data Science")
+
+# 4. Find students enrolled in a particular course (one $lookup aggregation, paged)
+# The roster indexes (enrollments courseId/status/enrollmentId, users userId) come
+# from eduhub.indexes.INDEX_MANIFEST
+from eduhub.reads import course_roster
+from eduhub.indexes import sync_indexes
 
-# 4. Find students enrolled in a particular course
+sync_indexes(db, collections=["enrollments", "users"])
 course_id = new_course["courseId"]
-student_ids = db.enrollments.find({"courseId": course_id}, {"studentId": 1})
-student_ids = [enr["studentId"] for enr in student_ids]
-students = list(db.users.find({"userId": {"$in": student_ids}}))
+students = course_roster(db, course_id)
+
+# 5. Search courses by title (case-insensitive, partial match) through the trigram index
+from eduhub.search import backfill_title_trigrams, substring_search_courses
 
-# 5. Search courses by title (case-insensitive, partial match)
+backfill_title_trigrams(db)  # seeded courses were inserted without trigrams
+sync_indexes(db, collections=["courses"])
 search_term = "data"
-matched_courses = list(db.courses.find({"title": {"$regex": search_term, "$options": "i"}}))
+matched_courses = substring_search_courses(db, search_term)
 
 
 
 
 ### Section 3.3: Update Operatiosn
-# 1. Update a user's profile information
-db.users.update_one(
-    {"userId": new_student["userId"]},
-    {"$set": {"profile.bio": "Updated bio for student", "profile.skills": ["Python", "MongoDB"]}}
+from eduhub.writes import (
+    update_user_profile,
+    publish_course,
+    grade_submission,
+    add_course_tags,
+    soft_delete_user,
+    delete_enrollment,
+    remove_lesson
 )
 
+# 1. Update a user's profile information
+update_user_profile(db, new_student["userId"], {"bio": "Updated bio for student", "skills": ["Python", "MongoDB"]})
+
 # 2. Mark a course as published
-db.courses.update_one(
-    {"courseId": new_course["courseId"]},
-    {"$set": {"isPublished": True, "updatedAt": datetime.utcnow()}}
-)
+publish_course(db, new_course["courseId"])
 
 # 3. Update assignment grades
 submission = db.submissions.find_one()
-db.submissions.update_one(
-    {"submissionId": submission["submissionId"]},
-    {"$set": {"grade": 85.0, "feedback": "Great work!"}}
-)
+grade_submission(db, submission["submissionId"], 85.0, "Great work!")
 
 # 4. Add tags to an existing course
-db.courses.update_one(
-    {"courseId": new_course["courseId"]},
-    {"$addToSet": {"tags": {"$each": ["analysis", "beginner"]}}}
-)
+add_course_tags(db, new_course["courseId"], ["analysis", "beginner"])
 
 
 
 
 ## Section 3.3: Delete Operations
 # 1. Remove a user (soft delete)
-db.users.update_one(
-    {"userId": new_student["userId"]},
-    {"$set": {"isActive": False}}
-)
+soft_delete_user(db, new_student["userId"])
 
 # 2. Delete an enrollment
-db.enrollments.delete_one({"studentId": new_student["userId"], "courseId": new_course["courseId"]})
+delete_enrollment(db, new_student["userId"], new_course["courseId"])
 
 # 3. Remove a lesson from a course
-db.lessons.delete_one({"courseId": new_course["courseId"], "order": 1})
+remove_lesson(db, new_course["courseId"], 1)
 
 
 # ### Section 4: Advanced Queries and Aggregation
@@ -584,10 +323,11 @@ db.lessons.delete_one({"courseId": new_course["courseId"], "order": 1})
 
 
 ## Section 4.1 Complex Queries
+from eduhub.reads import find_courses_in_price_range, find_courses_with_tags
+from eduhub.cache import query_cache
+
 ## 1. Find courses with price between $50 and $200
-courses_in_price_range = list(db.courses.find({
-    "price": {"$gte": 50, "$lte": 200}
-}))
+courses_in_price_range = find_courses_in_price_range(db, 50, 200)
 
 ## 2. Get users who joined in the last 6 months
 from datetime import timedelta
@@ -600,9 +340,7 @@ recent_users = list(db.users.find({
 ## 3. Find courses that have specific tags using $in operator
 tags_to_search = ["python", "data science"]
 
-courses_with_tags = list(db.courses.find({
-    "tags": {"$in": tags_to_search}
-}))
+courses_with_tags = find_courses_with_tags(db, tags_to_search)
 
 ## 4. Retrieve assignments with due dates in the next week
 today = datetime.now(timezone.utc)
@@ -635,16 +373,49 @@ upcoming_assignments
 
 
 
+# Repeated catalogue reads are now served from the cache
+find_courses_in_price_range(db, 50, 200)
+find_courses_with_tags(db, reversed(tags_to_search))  # same normalized key
+print("Query cache:", query_cache.stats())
+
+
+
+
+# Catalogue pages: keyset pagination with opaque continuation tokens instead of
+# skip(), so every page costs one index range scan of page_size entries
+from eduhub.pagination import courses_by_category_page, courses_in_price_range_page, iter_pages
+
+first_page = courses_by_category_page(db, "Data Science", order="top_rated", page_size=10,
+                                      projection={"title": 1, "rating": 1})
+second_page = courses_by_category_page(db, "Data Science", order="top_rated", page_size=10,
+                                       projection={"title": 1, "rating": 1}, token=first_page["next"])
+print([course["title"] for course in second_page["items"]])
+
+price_range_total = sum(len(page["items"]) for page in iter_pages(
+    courses_in_price_range_page, db=db, min_price=50, max_price=200, page_size=100))
+print(f"✅ {price_range_total} courses between $50 and $200, read page by page")
+
+
+
+
 ## Section 4.2: Aggregation Pipelines
+## The pipelines live in eduhub.analytics so they can be benchmarked and explained.
+from eduhub.analytics import (
+    enrollments_per_course as enrollments_per_course_report,
+    avg_course_rating as avg_course_rating_report,
+    avg_grade_per_student as avg_grade_per_student_report,
+    completion_rate_by_course as completion_rate_by_course_report,
+    top_students as top_students_report,
+    avg_rating_per_instructor as avg_rating_per_instructor_report,
+    avg_progress_per_student as avg_progress_per_student_report,
+    enrollment_by_category as enrollment_by_category_report,
+    students_per_instructor as students_per_instructor_report,
+    revenue_per_instructor as revenue_per_instructor_report,
+    popular_categories as popular_categories_report
+)
+
 ## 1a. Course Enrollment Statistics
-enrollments_per_course = list(db.enrollments.aggregate([
-    {
-        "$group": {
-            "_id": "$courseId",
-            "totalEnrollments": {"$sum": 1}
-        }
-    }
-]))
+enrollments_per_course = enrollments_per_course_report(db)
 enrollments_per_course
 
 
@@ -654,54 +425,33 @@ enrollments_per_course
 ## Updating courses collections to include ratings first
 
 
-# Fetch all courses
-courses = list(db.courses.find({}))
+# Stream course _ids and send the updates in bulk_write batches
+from eduhub.bulk import bulk_update
 
-for course in courses:
-    rating = round(random.uniform(1, 5), 1)  # e.g., 3.7
-    db.courses.update_one(
-        {"_id": course["_id"]},
-        {"$set": {"rating": rating}}
-    )
-print("Assigned random ratings to all courses.")
+rating_backfill = bulk_update(
+    db.courses,
+    lambda course: {"$set": {"rating": round(random.uniform(1, 5), 1)}},  # e.g., 3.7
+    projection={"_id": 1}
+)
+print("Assigned random ratings to all courses:", rating_backfill)
 
 
 
 
-avg_course_rating = list(db.courses.aggregate([
-    {
-        "$unwind": "$rating"
-    },
-    {
-        "$group": {
-            "_id": "$courseId",
-            "avgRating": {"$avg": "$rating"}
-        }
-    }
-]))
+avg_course_rating = avg_course_rating_report(db)
 avg_course_rating
 
 
 
 
 ## c. Group by course category with enrollment count
-enrollment_by_category = list(db.enrollments.aggregate([
-    {
-        "$lookup": {
-            "from": "courses",
-            "localField": "courseId",
-            "foreignField": "courseId",
-            "as": "course"
-        }
-    },
-    {"$unwind": "$course"},
-    {
-        "$group": {
-            "_id": "$course.category",
-            "totalEnrollments": {"$sum": 1}
-        }
-    }
-]))
+## Enrollments carry a snapshot of category / instructorId / pricePaid, so the
+## course-attribute reports below run as a single $group without $lookup. The
+## seeder already stores it; the backfill only covers enrollments written otherwise.
+from eduhub.denormalize import backfill_enrollment_snapshots
+
+backfill_enrollment_snapshots(db)
+enrollment_by_category = enrollment_by_category_report(db, denormalized=True)
 enrollment_by_category
 
 
@@ -709,60 +459,29 @@ enrollment_by_category
 
 ##4.3 Student Performance Analysis
 #2a. Average grade per student
-avg_grade_per_student = list(db.submissions.aggregate([
-    {
-        "$group": {
-            "_id": "$studentId",
-            "averageGrade": {"$avg": "$grade"}
-        }
-    }
-]))
+avg_grade_per_student = avg_grade_per_student_report(db)
 avg_grade_per_student
 
+# Columnar mode (eduhub.columnar): the same report read in Arrow chunks into a
+# DataFrame with explicit column types, and streamed to Parquet for reporting
+from eduhub.columnar import iter_report_frames, write_parquet
+
+avg_grade_frame = pd.concat(iter_report_frames(db, "avg_grade_per_student", chunk_size=10_000), ignore_index=True)
+print(avg_grade_frame["averageGrade"].describe())
+print(write_parquet(db, "avg_grade_per_student", "reports/avg_grade_per_student.parquet"))
+
 
 
 
 ##b. Completion rate by course
-completion_rate_by_course = list(db.enrollments.aggregate([
-    {
-        "$group": {
-            "_id": "$courseId",
-            "totalEnrolled": {"$sum": 1},
-            "completedCount": {
-                "$sum": {
-                    "$cond": [{"$eq": ["$status", "completed"]}, 1, 0]
-                }
-            }
-        }
-    },
-    {
-        "$project": {
-            "completionRate": {
-                "$cond": [
-                    {"$eq": ["$totalEnrolled", 0]},
-                    0,
-                    {"$multiply": [{"$divide": ["$completedCount", "$totalEnrolled"]}, 100]}
-                ]
-            }
-        }
-    }
-]))
+completion_rate_by_course = completion_rate_by_course_report(db)
 completion_rate_by_course
 
 
 
 
 ##c. Top-performing students
-top_students = list(db.submissions.aggregate([
-    {
-        "$group": {
-            "_id": "$studentId",
-            "avgGrade": {"$avg": "$grade"}
-        }
-    },
-    {"$sort": {"avgGrade": -1}},
-    {"$limit": 5}
-]))
+top_students = top_students_report(db)
 top_students
 
 
@@ -770,28 +489,7 @@ top_students
 
 ## 3. Instructor Analytics
 ## a. Total students taught by each instructor
-students_per_instructor = list(db.enrollments.aggregate([
-    {
-        "$lookup": {
-            "from": "courses",
-            "localField": "courseId",
-            "foreignField": "courseId",
-            "as": "course"
-        }
-    },
-    {"$unwind": "$course"},
-    {
-        "$group": {
-            "_id": "$course.instructorId",
-            "uniqueStudents": {"$addToSet": "$studentId"}
-        }
-    },
-    {
-        "$project": {
-            "totalStudents": {"$size": "$uniqueStudents"}
-        }
-    }
-]))
+students_per_instructor = students_per_instructor_report(db, denormalized=True)
 
 students_per_instructor
 
@@ -799,40 +497,14 @@ students_per_instructor
 
 
 ## b. Average course rating per instructor
-avg_rating_per_instructor = list(db.courses.aggregate([
-    {
-        "$unwind": "$rating"
-    },
-    {
-        "$group": {
-            "_id": "$instructorId",
-            "avgRating": {"$avg": "$rating"}
-        }
-    }
-]))
+avg_rating_per_instructor = avg_rating_per_instructor_report(db)
 avg_rating_per_instructor
 
 
 
 
 ## c. Revenue generated per instructor
-revenue_per_instructor = list(db.enrollments.aggregate([
-    {
-        "$lookup": {
-            "from": "courses",
-            "localField": "courseId",
-            "foreignField": "courseId",
-            "as": "course"
-        }
-    },
-    {"$unwind": "$course"},
-    {
-        "$group": {
-            "_id": "$course.instructorId",
-            "totalRevenue": {"$sum": "$course.price"}
-        }
-    }
-]))
+revenue_per_instructor = revenue_per_instructor_report(db, denormalized=True)
 revenue_per_instructor
 
 
@@ -840,122 +512,147 @@ revenue_per_instructor
 
 ##4. Advanced Analytics
 ##a. Monthly enrollment trends (last 12 months)
-monthly_enrollments = list(db.enrollments.aggregate([
-    {
-        "$match": {
-            "enrolledAt": {
-                "$gte": datetime.now(timezone.utc) - timedelta(days=365)
-            }
-        }
-    },
-    {
-        "$group": {
-            "_id": {
-                "year": {"$year": "$enrolledAt"},
-                "month": {"$month": "$enrolledAt"}
-            },
-            "count": {"$sum": 1}
-        }
-    },
-    {"$sort": {"_id.year": 1, "_id.month": 1}}
-]))
+## Read from the monthly rollup buckets (one document per month, course and
+## category) instead of grouping a year of raw enrollments. enroll_student keeps
+## the buckets current; the backfill covers the seeded enrollments.
+from eduhub.rollups import backfill_enrollment_rollups, monthly_enrollments_rollup, enrollment_trends, ROLLUP_COLLECTIONS
+from eduhub.indexes import sync_indexes
+
+sync_indexes(db, collections=list(ROLLUP_COLLECTIONS.values()))
+backfill_enrollment_rollups(db)
+monthly_enrollments = monthly_enrollments_rollup(db)
 monthly_enrollments
 
+# Daily trend of the last 30 days per category
+enrollment_trends(db, datetime.now(timezone.utc) - timedelta(days=30), datetime.now(timezone.utc),
+                  granularity="day", group_by="category")
+
 
 
 
 ##b. Most popular course categories (by enrollment count)
-popular_categories = list(db.enrollments.aggregate([
-    {
-        "$lookup": {
-            "from": "courses",
-            "localField": "courseId",
-            "foreignField": "courseId",
-            "as": "course"
-        }
-    },
-    {"$unwind": "$course"},
-    {
-        "$group": {
-            "_id": "$course.category",
-            "enrollmentCount": {"$sum": 1}
-        }
-    },
-    {"$sort": {"enrollmentCount": -1}}
-]))
+popular_categories = popular_categories_report(db, denormalized=True)
 popular_categories
 
 
 
 
 ##c. Student engagement metrics
-avg_progress_per_student = list(db.enrollments.aggregate([
-    {
-        "$group": {
-            "_id": "$studentId",
-            "avgProgress": {"$avg": "$progress"}
-        }
-    }
-]))
+avg_progress_per_student = avg_progress_per_student_report(db)
 avg_progress_per_student
 
 
-# ### Section 5: Indexing and Performance
 
 
+##e. Instructor dashboard with the async API
+## The four dashboard reports run concurrently (bounded concurrency, per-report
+## timeout) instead of back to back. `python -m eduhub async bench`
+## compares the latency with the sequential version. The async API is optional
+## (PyMongo 4.9+ or Motor); without it the same reports run one after another.
+import asyncio
+from eduhub.aio import close_async_client, instructor_dashboard, sequential_dashboard
 
-## a. Creating appropriate indexes
-# Index for user email lookup (unique for quick lookup)
-db.users.create_index("email", unique=True)
 
-# Indexes for course search by title (text index) and category
-db.courses.create_index([("title", "text"), ("category", 1)])
+async def load_dashboard():
+    async_client = create_client(client_settings, async_client=True)
+    try:
+        return await instructor_dashboard(async_client[client_settings["database"]], timeout=5.0, max_concurrency=4)
+    finally:
+        await close_async_client(async_client)
 
-# Index for assignment queries by due date
-db.assignments.create_index("dueDate")
 
-# Compound index for enrollment queries by student and course
-db.enrollments.create_index([("studentId", 1), ("courseId", 1)])
+try:
+    dashboard = asyncio.run(load_dashboard())
+    print("Dashboard timings (ms):", dashboard["timings"], "total:", dashboard["elapsedMs"], "errors:", dashboard["errors"])
+except ImportError as exc:
+    print(f"❌ {exc} Running the dashboard reports sequentially instead.")
+    dashboard = {"results": sequential_dashboard(db), "errors": {}}
+print("Dashboard reports:", {name: len(rows) for name, rows in dashboard["results"].items()})
 
 
 
 
-##  Task 5.2: Query Optimization
-import time
+##d. Materialized course/student statistics for dashboards
+## (built once with $out, then refreshed incrementally with $merge)
+from eduhub.stats import rebuild_stats, refresh_stats, get_course_stats, check_stats_consistency, TOMBSTONES
 
-# Before: Check performance without index (you’ve already created the index, but let’s simulate it anyway)
-start = time.time()
-result = db.users.find_one({"email": "student@example.com"})
-end = time.time()
-print("User lookup time:", end - start)
-print("Explain plan:", db.users.find({"email": "student@example.com"}).explain())
+sync_indexes(db, collections=["enrollments", TOMBSTONES])
+rebuild_stats(db)
+refresh_stats(db)
+print("Course stats:", get_course_stats(db, enrollments_per_course[0]["_id"]))
+print("Stats mismatches:", {name: len(found) for name, found in check_stats_consistency(db).items()})
 
 
+# ### Section 5: Indexing and Performance
 
 
-# b. Search courses by title (partial match)
-start = time.time()
-courses = list(db.courses.find({"$text": {"$search": "python"}}))
-end = time.time()
-print("Course search time:", end - start)
-print("Explain plan:", db.courses.find({"$text": {"$search": "python"}}).explain())
 
+## a. Creating appropriate indexes
+# Every index (unique, text, compound) is declared once in eduhub.indexes.INDEX_MANIFEST;
+# the sync builds whatever is missing and reports the build time of each index.
+# `python -m eduhub indexes diff` verifies an environment against it.
+from eduhub.indexes import sync_indexes, verify_indexes
+from eduhub.search import search_courses
 
+index_sync = sync_indexes(db)
+for collection, result in index_sync.items():
+    print(f"{collection}: built {result['built']}, unlisted {result['unlisted']}")
+print("✅ Indexes match the manifest:", verify_indexes(db))
 
 
-#c. Find assignments due within a week
-today = datetime.now(timezone.utc)
-next_week = today + timedelta(days=7)
+# b. Index advisor: derives ESR-ordered (equality, sort, range) indexes from the
+#    registered query shapes and flags redundant prefix indexes. With the
+#    manifest in place it should propose nothing; a proposal means a new query
+#    shape needs a manifest entry. Proposals are only printed unless
+#    APPLY_INDEX_PROPOSALS is set; `python -m eduhub index-advisor --apply`
+#    does the same, and `--source profiler` works from the profiler instead.
+from eduhub.index_advisor import advise_indexes, apply_recommendations
 
-start = time.time()
-assignments = list(db.assignments.find({
-    "dueDate": {"$gte": today, "$lte": next_week}
-}))
-end = time.time()
-print("Upcoming assignment query time:", end - start)
-print("Explain plan:", db.assignments.find({
-    "dueDate": {"$gte": today, "$lte": next_week}
-}).explain())
+APPLY_INDEX_PROPOSALS = False
+
+index_advice = advise_indexes(db)
+for proposal in index_advice["proposals"]:
+    print(f"Proposed {proposal['collection']} {proposal['keys']} "
+          f"(~{proposal['estimatedBytes'] / 1024:.1f} KiB) for {', '.join(proposal['queries'])}")
+print("Redundant indexes:", index_advice["redundant"])
+if APPLY_INDEX_PROPOSALS:
+    print("✅ Applied:", apply_recommendations(db, index_advice))
+
+
+
+
+##  Task 5.2: Query Optimization
+# Each query runs with warmup and many timed iterations; the report shows
+# p50/p95/p99 latency, throughput and the winning plan. For realistic sizes and
+# baseline comparisons run `python -m eduhub benchmark --scale small --baseline baselines.json`.
+from eduhub.registry import build_query_registry, select_queries
+from eduhub.benchmark import run_benchmark, print_report
+
+# a. Find user by email, b. search courses by text, c. assignments due within a week
+task_5_2_queries = select_queries(
+    build_query_registry(db),
+    ["user_by_email", "course_text_search", "upcoming_assignments"]
+)
+print_report(run_benchmark(db, task_5_2_queries, warmup=3, iterations=30))
+
+# Connection pool behaviour over the whole run so far
+pool_snapshot = pool_metrics.snapshot()
+print("Pool metrics:", pool_snapshot)
+print(pool_sizing_hint(pool_snapshot, client_settings["options"]["maxPoolSize"]))
+
+
+
+
+# d. Explain-plan audit of every registered query (COLLSCAN, in-memory SORT,
+#    examined/returned ratio, unindexed $lookup, blocking $group).
+#    `python -m eduhub audit --fail-on error` gates deployments on it.
+from eduhub.audit import audit_queries
+
+plan_audit = audit_queries(db)
+print("Explain audit:", plan_audit["summary"])
+for record in plan_audit["queries"]:
+    for finding in record["findings"]:
+        print(f"  [{finding['severity']}] {record['name']}: {finding['message']}")
 
 
 # ### Section 6: Data Validation and Error Handling
@@ -963,173 +660,29 @@ print("Explain plan:", db.assignments.find({
 
 
 ## 6.1 Schema Validation
-# Define validation rules for each collection
-validation_commands = [
-    {
-        "collMod": "users",
-        "validator": {
-            "$jsonSchema": {
-                "bsonType": "object",
-                "required": ["userId", "email", "firstName", "lastName", "role"],
-                "properties": {
-                    "userId": {"bsonType": "string"},
-                    "email": {
-                        "bsonType": "string",
-                        "pattern": "^.+@.+$"
-                    },
-                    "firstName": {"bsonType": "string"},
-                    "lastName": {"bsonType": "string"},
-                    "role": {"enum": ["student", "instructor"]},
-                    "dateJoined": {"bsonType": "date"},
-                    "profile": {
-                        "bsonType": "object",
-                        "properties": {
-                            "bio": {"bsonType": "string"},
-                            "avatar": {"bsonType": "string"},
-                            "skills": {
-                                "bsonType": "array",
-                                "items": {"bsonType": "string"}
-                            }
-                        }
-                    },
-                    "isActive": {"bsonType": "bool"}
-                }
-            }
-        },
-        "validationLevel": "strict"
-    },
-    {
-        "collMod": "courses",
-        "validator": {
-            "$jsonSchema": {
-                "bsonType": "object",
-                "required": ["courseId", "title", "instructorId", "level"],
-                "properties": {
-                    "courseId": {"bsonType": "string"},
-                    "title": {"bsonType": "string"},
-                    "description": {"bsonType": "string"},
-                    "instructorId": {"bsonType": "string"},
-                    "category": {"bsonType": "string"},
-                    "level": {"enum": ["beginner", "intermediate", "advanced"]},
-                    "duration": {"bsonType": "double"},
-                    "price": {"bsonType": "double"},
-                    "tags": {
-                        "bsonType": "array",
-                        "items": {"bsonType": "string"}
-                    },
-                    "createdAt": {"bsonType": "date"},
-                    "updatedAt": {"bsonType": "date"},
-                    "isPublished": {"bsonType": "bool"},
-                    "rating": {"bsonType": "double"}
-                }
-            }
-        },
-        "validationLevel": "strict"
-    },
-    {
-        "collMod": "assignments",
-        "validator": {
-            "$jsonSchema": {
-                "bsonType": "object",
-                "required": ["assignmentId", "courseId", "title", "description", "dueDate"],
-                "properties": {
-                    "assignmentId": {"bsonType": "string"},
-                    "courseId": {"bsonType": "string"},
-                    "lessonId": {"bsonType": "string"},
-                    "title": {"bsonType": "string"},
-                    "description": {"bsonType": "string"},
-                    "dueDate": {"bsonType": "date"},
-                    "points": {"bsonType": "int"},
-                    "createdAt": {"bsonType": "date"}
-                }
-            }
-        },
-        "validationLevel": "strict"
-    },
-    {
-        "collMod": "submissions",
-        "validator": {
-            "$jsonSchema": {
-                "bsonType": "object",
-                "required": ["submissionId", "assignmentId", "studentId", "submittedAt"],
-                "properties": {
-                    "submissionId": {"bsonType": "string"},
-                    "assignmentId": {"bsonType": "string"},
-                    "studentId": {"bsonType": "string"},
-                    "content": {"bsonType": "string"},
-                    "grade": {"bsonType": "double"},
-                    "feedback": {"bsonType": "string"},
-                    "submittedAt": {"bsonType": "date"}
-                }
-            }
-        },
-        "validationLevel": "strict"
-    },
-    {
-        "collMod": "enrollments",
-        "validator": {
-            "$jsonSchema": {
-                "bsonType": "object",
-                "required": ["enrollmentId", "studentId", "courseId", "enrolledAt", "status"],
-                "properties": {
-                    "enrollmentId": {"bsonType": "string"},
-                    "studentId": {"bsonType": "string"},
-                    "courseId": {"bsonType": "string"},
-                    "enrolledAt": {"bsonType": "date"},
-                    "status": {
-                        "enum": ["active", "completed", "dropped"]
-                    },
-                    "progress": {
-                        "bsonType": "double",
-                        "minimum": 0,
-                        "maximum": 100
-                    }
-                }
-            }
-        },
-        "validationLevel": "strict"
-    },
-    {
-        "collMod": "lessons",
-        "validator": {
-            "$jsonSchema": {
-                "bsonType": "object",
-                "required": ["lessonId", "courseId", "title", "content", "order"],
-                "properties": {
-                    "lessonId": {"bsonType": "string"},
-                    "courseId": {"bsonType": "string"},
-                    "title": {"bsonType": "string"},
-                    "content": {"bsonType": "string"},
-                    "resources": {
-                        "bsonType": "array",
-                        "items": {"bsonType": "string"}
-                    },
-                    "order": {"bsonType": "int"},
-                    "createdAt": {"bsonType": "date"}
-                }
-            }
-        },
-        "validationLevel": "strict"
-    }
-]
-
-# Apply validation to each collection
-for command in validation_commands:
-    db.command(command)
+# The rules are defined once in eduhub.schema.COLLECTION_SCHEMAS; setup_database
+# applies them with collMod (validationLevel strict). The same schemas compile
+# into client-side validators that screen documents before bulk writes.
+from eduhub.validation import compile_schemas, screen_documents
 
+setup_database(db, validation_level="strict")
 print("Validation rules successfully applied to all collections.")
 
+validators = compile_schemas()
+sample_enrollments = list(db.enrollments.find({}, {"_id": 0}).limit(1000))
+sample_enrollments.append({"enrollmentId": "bad-1", "studentId": "s", "courseId": "c", "status": "paused", "progress": 120.0})
+valid_enrollments, rejected_enrollments = screen_documents(sample_enrollments, validators["enrollments"])
+print(f"✅ {len(valid_enrollments)} enrollments pass, ❌ {len(rejected_enrollments)} rejected")
+for doc, reasons in rejected_enrollments[:3]:
+    print(f"   {doc.get('enrollmentId')}: {reasons}")
 
 
 
-## 6.2 Error Handling
-from pymongo import errors
-
 
+## 6.2 Error Handling
 users = db["users"]
 
-# Ensure unique index on userId to trigger duplicate key errors
-users.create_index("userId", unique=True)
+# The unique userId index from the manifest (Section 5) triggers the duplicate key errors
 
 # Sample user document
 valid_user = {
@@ -1155,84 +708,67 @@ missing_field_user = valid_user.copy()
 missing_field_user["userId"] = "user125"
 del missing_field_user["email"]
 
-# Insert and handle errors
-for user in [valid_user, duplicate_user, invalid_type_user, missing_field_user]:
-    try:
-        users.insert_one(user)
-        print(f"✅ Inserted user: {user['userId']}")
-    except errors.DuplicateKeyError as e:
-        print(f"❌ Duplicate Key Error for userId '{user['userId']}': {e.details['errmsg']}")
-    except errors.WriteError as e:
-        print(f"❌ Write Error for userId '{user['userId']}': {e.details['errmsg']}")
-    except Exception as e:
-        print(f"❌ Unexpected Error for userId '{user.get('userId', 'UNKNOWN')}': {str(e)}")
-
-
+# Insert in unordered batches; each failure comes back mapped to its document
+# with a classified reason (duplicate_key, type, validation, other) instead of
+# one exception per insert_one call
+from eduhub.bulk import insert_with_report
 
+insert_report = insert_with_report(users, [valid_user, duplicate_user, invalid_type_user, missing_field_user],
+                                   key_field="userId")
+print(f"✅ Inserted {insert_report['inserted']} users, ❌ {insert_report['failed']} failed: {insert_report['byReason']}")
+for failure in insert_report["failures"]:
+    print(f"❌ {failure['reason']} for userId '{failure['key']}' (fields: {failure['fields']}): {failure['message']}")
 
-## exporting data to a sample_data.json file"
-import json
 
 
-# Define all your collections
-collections = ["users", "courses", "assignments", "submissions", "enrollments", "lessons"]
 
-# Create a dictionary to hold all data
-data_export = {}
+## exporting data to the sample_data export
+# Full documents, streamed per collection as gzip-compressed Extended JSON
+# lines (types survive a reload), plus a manifest with counts and checksums.
+from eduhub.export import export_database, verify_export
 
-for col in collections:
-    data_export[col] = list(db[col].find({}, {'_id': True}))  # Include ObjectId
-
-# Export to a single JSON file
-with open("sample_data.json", "w") as f:
-    json.dump(data_export, f, indent=4, default=str)
-
-print("✅ Exported all collections to sample_data.json")
+export_manifest = export_database(db, "sample_data", compression="gzip", workers=1)
+for col, entry in export_manifest["collections"].items():
+    print(f"✅ Exported {entry['documents']} {col} documents to sample_data/{entry['file']}")
+print("✅ Export verified" if not any(verify_export("sample_data").values()) else "❌ Export does not match its manifest")
 
 
 
 
 ## exporting schema validation
+# schema_validation.json is generated from eduhub.schema; schema_drift reports
+# whether the file or the server validators no longer match it.
+from eduhub.schema import write_schema_file, schema_drift
 
-# List of collections to export validation for
-collections = ["users", "courses", "assignments", "submissions", "enrollments", "lessons"]
-
-# Dict to hold validation rules
-schema_validations = {}
-
-# Get validation rules for each collection
-for collection_name in collections:
-    options = db.command("listCollections", filter={"name": collection_name})
-    if options["ok"] and options["cursor"]["firstBatch"]:
-        coll_info = options["cursor"]["firstBatch"][0]
-        validator = coll_info.get("options", {}).get("validator")
-        if validator:
-            schema_validations[collection_name] = validator
-
-# Save to JSON file
-with open("schema_validation.json", "w") as f:
-    json.dump(schema_validations, f, indent=4)
-
+write_schema_file("schema_validation.json")
 print("✅ Schema validation exported to schema_validation.json")
+print(f"Schema drift: {schema_drift(db, 'schema_validation.json')}")
 
 
 # ### Task 1: Design a Data Archiving Strategy for Old Enrollments
-# Soft Archiving (Mark as Archived)
-# 
+# Archive-and-move: completed/dropped enrollments older than a year and
+# assignments due more than six months ago are moved into archived_enrollments
+# and archived_assignments in _id-ranged, checkpointed chunks, so the hot
+# collections actually shrink. `python -m eduhub archive run` resumes an
+# interrupted run.
 # 
 
 
 
+from eduhub.archive import archive_old_records, find_with_archive, count_with_archive
+
 # Define cutoff date (1 year ago)
 cutoff_date = datetime.now(timezone.utc) - timedelta(days=365)
 
-db.enrollments.update_many(
-    {
-        "status": {"$in": ["completed", "dropped"]},
-        "enrolledAt": {"$lt": cutoff_date}
-    },
-    {"$set": {"archived": True}}
-)
+for collection in ["enrollments", "assignments"]:
+    archived = archive_old_records(db, collection, max_docs_per_second=10_000,
+                                   cutoff=cutoff_date if collection == "enrollments" else None)
+    print(f"✅ Moved {archived['moved']} {collection} to {archived['archive']}")
+
+# Audit reads still see every enrollment of a student, hot or archived
+audit_student = db.users.find_one({"role": "student"})["userId"]
+print("Enrollments (hot + archived):", count_with_archive(db, "enrollments", {"studentId": audit_student}))
+print(find_with_archive(db, "enrollments", {"studentId": audit_student}, sort={"enrolledAt": -1}, limit=5))
 
 
 # ### Task 2: Implement Text Search Functionality for Course Content
@@ -1240,27 +776,22 @@ db.enrollments.update_many(
 
 
 
-def search_courses_by_keyword(db, keyword):
+def search_courses_by_keyword(db, keyword, category=None, level=None, page=1):
     """
-    Searches the 'courses' collection for documents where the keyword appears
-    in either the 'title' or 'description' fields (case-insensitive).
+    Searches the 'courses' collection for documents matching the keyword in
+    'title', 'description' or 'tags', ranked by text score.
 
     Parameters:
         db (Database): The connected MongoDB database object.
         keyword (str): The keyword to search for.
+        category (str): Optional category filter.
+        level (str): Optional level filter.
+        page (int): 1-based page number.
 
     Returns:
-        list: List of matching course documents.
+        list: List of matching course documents, best matches first.
     """
-    query = {
-        "$or": [
-            {"title": {"$regex": keyword, "$options": "i"}},
-            {"description": {"$regex": keyword, "$options": "i"}}
-        ]
-    }
-
-    results = list(db.courses.find(query))
-    return results
+    return search_courses(db, keyword, category=category, level=level, page=page)
 
 
 
@@ -0,0 +1,72 @@
+
+# ### Test fixtures
+# The tests run against mongomock, so they need no MongoDB server:
+#
+#   python -m pytest -q
+#
+# mongomock has no $unionWith or $merge; the server_stages fixture emulates
+# them for the tests of the archive reads and the incremental stats refresh.
+
+
+
+## Importing libraries
+from pathlib import Path
+import sys
+
+import mongomock
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+
+
+
+@pytest.fixture
+def db():
+    """An empty in-memory database."""
+    return mongomock.MongoClient().eduhub_test
+
+
+@pytest.fixture
+def server_stages(monkeypatch):
+    """
+    Emulates the $unionWith and $merge stages. For $unionWith, both sides run
+    separately and the rest of the pipeline runs over their union, staged in a
+    scratch collection. For $merge, only the string whenMatched / whenNotMatched
+    modes are emulated.
+    """
+    aggregate = mongomock.collection.Collection.aggregate
+
+    def emulated(self, pipeline, session=None, **kwargs):
+        if pipeline and "$merge" in pipeline[-1]:
+            _merge(self.database, emulated(self, pipeline[:-1]), pipeline[-1]["$merge"])
+            return iter([])
+        for position, stage in enumerate(pipeline):
+            if "$unionWith" in stage:
+                spec = stage["$unionWith"]
+                docs = (list(emulated(self, pipeline[:position]))
+                        + list(emulated(self.database[spec["coll"]], spec.get("pipeline", []))))
+                scratch = self.database["union_with_scratch"]
+                scratch.drop()
+                if docs:
+                    # Wrapped, so documents keep their own _id (or lack of one)
+                    scratch.insert_many([{"doc": doc} for doc in docs])
+                return emulated(scratch, [{"$replaceRoot": {"newRoot": "$doc"}}] + pipeline[position + 1:])
+        return aggregate(self, pipeline, session, **kwargs)
+
+    monkeypatch.setattr(mongomock.collection.Collection, "aggregate", emulated)
+
+
+def _merge(database, docs, spec):
+    target = database[spec["into"]]
+    on = spec.get("on", "_id")
+    on = [on] if isinstance(on, str) else on
+    for doc in docs:
+        existing = target.find_one({field: doc.get(field) for field in on})
+        if existing is None:
+            if spec.get("whenNotMatched", "insert") == "insert":
+                target.insert_one(doc)
+        elif spec.get("whenMatched", "merge") == "replace":
+            target.replace_one({"_id": existing["_id"]}, {**doc, "_id": existing["_id"]})
+        elif spec.get("whenMatched", "merge") == "merge":
+            target.update_one({"_id": existing["_id"]}, {"$set": {k: v for k, v in doc.items() if k != "_id"}})
@@ -0,0 +1,113 @@
+
+# ### Async API: the same writes as the synchronous helpers
+# The async helpers run against mongomock through a thin coroutine adapter,
+# so no async driver or server is needed.
+
+
+
+## Importing libraries
+from datetime import datetime, timezone
+from eduhub import aio, writes
+from eduhub.rollups import record_enrollment, ROLLUP_COLLECTIONS
+from eduhub.search import insert_course
+
+import asyncio
+import pytest
+
+
+
+class AsyncCursor:
+    def __init__(self, cursor):
+        self.cursor = cursor
+
+    def limit(self, count):
+        self.cursor = self.cursor.limit(count)
+        return self
+
+    async def to_list(self, length=None):
+        return list(self.cursor)
+
+
+class AsyncCollection:
+    def __init__(self, collection):
+        self.collection = collection
+
+    def __getattr__(self, name):
+        method = getattr(self.collection, name)
+
+        async def call(*args, **kwargs):
+            return method(*args, **kwargs)
+        return call
+
+    def find(self, *args, **kwargs):
+        return AsyncCursor(self.collection.find(*args, **kwargs))
+
+
+class AsyncDatabase:
+    def __init__(self, db):
+        self.db = db
+
+    def __getitem__(self, name):
+        return AsyncCollection(self.db[name])
+
+    def __getattr__(self, name):
+        return self[name]
+
+
+COURSE = {"courseId": "c1", "title": "Data Analysis", "category": "AI", "instructorId": "u1", "price": 10.0}
+
+
+
+
+def test_course_updates_match_the_sync_helpers(db):
+    insert_course(db, dict(COURSE))
+    asyncio.run(aio.add_course_tags(AsyncDatabase(db), "c1", ["python"]))
+    asyncio.run(aio.update_course(AsyncDatabase(db), "c1", {"$set": {"title": "Machine Learning"}}))
+    async_course = db.courses.find_one({"courseId": "c1"}, {"_id": 0})
+
+    db.courses.delete_many({})
+    insert_course(db, dict(COURSE))
+    writes.add_course_tags(db, "c1", ["python"])
+    writes.update_course(db, "c1", {"$set": {"title": "Machine Learning"}})
+    assert db.courses.find_one({"courseId": "c1"}, {"_id": 0}) == async_course
+    assert "lea" in async_course["titleTrigrams"]
+
+
+def test_course_update_propagates_the_snapshot(db):
+    insert_course(db, dict(COURSE))
+    db.enrollments.insert_one({"enrollmentId": "e1", "studentId": "s1", "courseId": "c1",
+                               "category": "AI", "instructorId": "u1", "pricePaid": 10.0})
+    asyncio.run(aio.update_course(AsyncDatabase(db), "c1", {"$set": {"instructorId": "u2"}}))
+    assert db.enrollments.find_one({"enrollmentId": "e1"})["instructorId"] == "u2"
+
+
+def test_category_change_moves_the_rollup_buckets(db):
+    insert_course(db, dict(COURSE))
+    record_enrollment(db, {"courseId": "c1", "category": "AI", "enrolledAt": datetime(2025, 1, 1)})
+    asyncio.run(aio.update_course(AsyncDatabase(db), "c1", {"$set": {"category": "Data"}}))
+    assert [(bucket["category"], bucket["count"]) for bucket in db[ROLLUP_COLLECTIONS["month"]].find()] == \
+        [("Data", 1)]
+
+
+def test_insert_and_remove_lesson(db):
+    lesson = {"lessonId": "l1", "courseId": "c1", "title": "Intro", "order": 1}
+    asyncio.run(aio.insert_lesson(AsyncDatabase(db), lesson))
+    assert db.lessons.count_documents({"courseId": "c1"}) == 1
+    asyncio.run(aio.remove_lesson(AsyncDatabase(db), "c1", 1))
+    assert db.lessons.count_documents({}) == 0
+
+
+def test_delete_enrollment_leaves_a_tombstone(db):
+    db.enrollments.insert_one({"enrollmentId": "e1", "studentId": "s1", "courseId": "c1",
+                               "enrolledAt": datetime(2025, 1, 1, tzinfo=timezone.utc), "category": "AI"})
+    deleted = asyncio.run(aio.delete_enrollment(AsyncDatabase(db), "s1", "c1"))
+    assert deleted["courseId"] == "c1"
+    assert db.stats_tombstones.count_documents({"courseId": "c1", "studentId": "s1"}) == 1
+    # No bucket existed, so the guarded decrement creates none
+    assert db.enrollment_rollups_monthly.count_documents({}) == 0
+
+
+def test_missing_driver_raises_import_error(monkeypatch):
+    monkeypatch.setattr(aio, "AsyncMongoClient", None)
+    with pytest.raises(ImportError):
+        aio.get_async_client()
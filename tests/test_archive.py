@@ -0,0 +1,101 @@
+
+# ### Archiving: chunked moves, checkpoints and reads across hot and archived data
+
+
+
+## Importing libraries
+from datetime import datetime
+from eduhub.archive import (
+    _move_chunk,
+    archive_filter,
+    archive_old_records,
+    count_with_archive,
+    find_with_archive,
+    get_checkpoint
+)
+from eduhub.stats import TOMBSTONES
+
+import mongomock
+import pytest
+
+
+
+CUTOFF = datetime(2024, 1, 1)
+
+
+
+
+@pytest.fixture
+def enrollments(db):
+    db.enrollments.insert_many([
+        {"_id": 1, "courseId": "c1", "studentId": "s1", "status": "completed", "enrolledAt": datetime(2023, 1, 5)},
+        {"_id": 2, "courseId": "c1", "studentId": "s2", "status": "dropped", "enrolledAt": datetime(2023, 2, 5)},
+        {"_id": 3, "courseId": "c2", "studentId": "s1", "status": "active", "enrolledAt": datetime(2023, 3, 5)},
+        {"_id": 4, "courseId": "c2", "studentId": "s3", "status": "completed", "enrolledAt": datetime(2023, 4, 5)},
+        {"_id": 5, "courseId": "c2", "studentId": "s4", "status": "completed", "enrolledAt": datetime(2024, 5, 5)}
+    ])
+    return db
+
+
+def test_archive_moves_qualifying_documents(enrollments):
+    db = enrollments
+    result = archive_old_records(db, "enrollments", cutoff=CUTOFF)
+    assert (result["moved"], result["finished"]) == (3, True)
+    assert sorted(doc["_id"] for doc in db.enrollments.find()) == [3, 5]
+    assert sorted(doc["_id"] for doc in db.archived_enrollments.find()) == [1, 2, 4]
+    assert db[TOMBSTONES].count_documents({}) == 3
+    assert get_checkpoint(db, "enrollments")["finishedAt"] is not None
+
+
+def test_resume_from_the_checkpoint_with_its_cutoff(enrollments):
+    db = enrollments
+    first = archive_old_records(db, "enrollments", cutoff=CUTOFF, batch_size=1, max_batches=2)
+    assert (first["moved"], first["finished"]) == (2, False)
+    assert get_checkpoint(db, "enrollments")["lastId"] == 2
+
+    # The unfinished run resumes with the cutoff it started with
+    second = archive_old_records(db, "enrollments", cutoff=datetime(2030, 1, 1), batch_size=1)
+    assert (second["moved"], second["finished"], second["cutoff"]) == (1, True, CUTOFF)
+    assert db.archived_enrollments.count_documents({}) == 3
+    assert get_checkpoint(db, "enrollments")["moved"] == 3
+
+
+def test_document_updated_since_it_was_read_stays_hot(enrollments):
+    db = enrollments
+    query = archive_filter("enrollments", CUTOFF)
+    docs = list(db.enrollments.find(query).sort("_id", 1))
+    db.enrollments.update_one({"_id": 2}, {"$set": {"status": "active"}})
+
+    assert _move_chunk(db, "enrollments", "archived_enrollments", docs, query) == 2
+    assert db.enrollments.find_one({"_id": 2})["status"] == "active"
+    assert sorted(doc["_id"] for doc in db.archived_enrollments.find()) == [1, 4]
+
+
+def test_tombstones_are_written_before_the_delete(enrollments, monkeypatch):
+    db = enrollments
+
+    def crash(self, *args, **kwargs):
+        raise RuntimeError("connection lost")
+
+    monkeypatch.setattr(mongomock.collection.Collection, "delete_many", crash)
+    with pytest.raises(RuntimeError):
+        archive_old_records(db, "enrollments", cutoff=CUTOFF)
+    monkeypatch.undo()
+    assert db[TOMBSTONES].count_documents({}) == 3
+
+    # The rerun repeats the chunk: the upserts and tombstones are idempotent
+    assert archive_old_records(db, "enrollments")["moved"] == 3
+    assert db.archived_enrollments.count_documents({}) == 3
+    assert db.enrollments.count_documents({}) == 2
+
+
+def test_reads_across_hot_and_archived_data(enrollments, server_stages):
+    db = enrollments
+    archive_old_records(db, "enrollments", cutoff=CUTOFF)
+    rows = find_with_archive(db, "enrollments", {"courseId": "c2"}, sort={"_id": 1})
+    assert [(row["_id"], row["archived"]) for row in rows] == [(3, False), (4, True), (5, False)]
+
+    rows = find_with_archive(db, "enrollments", {"studentId": "s1"}, projection={"_id": 1},
+                             sort={"_id": -1}, limit=1, mark_archived=False)
+    assert rows == [{"_id": 3}]
+    assert count_with_archive(db, "enrollments", {"status": "completed"}) == 3
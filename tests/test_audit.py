@@ -0,0 +1,87 @@
+
+# ### Explain-plan auditor: findings from canned explain output
+# mongomock has no explain, so audit_query() reads prepared explain documents.
+
+
+
+## Importing libraries
+from eduhub import audit
+
+import pytest
+
+
+
+COLLSCAN = {"queryPlanner": {"winningPlan": {"stage": "COLLSCAN"}},
+            "executionStats": {"nReturned": 5, "totalDocsExamined": 5000, "totalKeysExamined": 0}}
+
+SORTED_IXSCAN = {"queryPlanner": {"winningPlan": {"stage": "SORT", "sortPattern": {"price": 1}, "inputStage": {
+                     "stage": "FETCH", "inputStage": {"stage": "IXSCAN", "indexName": "category_1"}}}},
+                 "executionStats": {"nReturned": 10, "totalDocsExamined": 10, "totalKeysExamined": 10}}
+
+# An aggregation explain wraps the find layer in a $cursor stage
+AGGREGATE = {"stages": [{"$cursor": {"queryPlanner": {"winningPlan": {"stage": "IXSCAN", "indexName": "courseId_1"}},
+                                     "executionStats": {"nReturned": 3, "totalDocsExamined": 3}}}]}
+
+
+
+
+@pytest.fixture
+def explain_with(monkeypatch):
+    def use(explain):
+        monkeypatch.setattr(audit, "explain_query", lambda db, spec, verbosity: explain)
+    return use
+
+
+def _codes(record):
+    return [(finding["code"], finding["severity"]) for finding in record["findings"]]
+
+
+def test_collection_scan_and_examined_ratio(db, explain_with):
+    explain_with(COLLSCAN)
+    record = audit.audit_query(db, {"name": "q", "collection": "users", "op": "find"})
+    assert _codes(record) == [("COLLSCAN", "error"), ("EXAMINED_RATIO", "error")]
+    assert (record["plan"], record["nReturned"], record["totalDocsExamined"]) == ("COLLSCAN", 5, 5000)
+
+
+def test_small_collection_scan_is_a_warning(db, explain_with):
+    explain_with({"queryPlanner": {"winningPlan": {"stage": "COLLSCAN"}},
+                  "executionStats": {"nReturned": 10, "totalDocsExamined": 20}})
+    assert _codes(audit.audit_query(db, {"name": "q", "collection": "users", "op": "find"})) == \
+        [("COLLSCAN", "warning")]
+
+
+def test_blocking_sort(db, explain_with):
+    explain_with(SORTED_IXSCAN)
+    record = audit.audit_query(db, {"name": "q", "collection": "courses", "op": "find"})
+    assert _codes(record) == [("IN_MEMORY_SORT", "warning")]
+    assert record["plan"] == "SORT > FETCH > IXSCAN(category_1)"
+
+
+def test_pipeline_checks(db, explain_with):
+    explain_with(AGGREGATE)
+    db.users.create_index("email")
+    pipeline = [
+        {"$lookup": {"from": "users", "localField": "studentId", "foreignField": "userId", "as": "student",
+                     "pipeline": [{"$match": {"isActive": True}}]}},
+        {"$group": {"_id": "$courseId"}}
+    ]
+    record = audit.audit_query(db, {"name": "q", "collection": "enrollments", "op": "aggregate",
+                                    "pipeline": pipeline})
+    # The $match inside the $lookup does not narrow what the $group reads
+    assert _codes(record) == [("LOOKUP_NO_INDEX", "error"), ("BLOCKING_GROUP", "warning")]
+
+    db.users.create_index("userId")
+    pipeline = [{"$match": {"courseId": "c1"}}] + pipeline
+    record = audit.audit_query(db, {"name": "q", "collection": "enrollments", "op": "aggregate",
+                                    "pipeline": pipeline})
+    assert _codes(record) == [("BLOCKING_GROUP", "info")]
+
+
+def test_report_summary_and_gate(db, explain_with):
+    explain_with(SORTED_IXSCAN)
+    specs = [{"name": "a", "collection": "courses", "op": "find"},
+             {"name": "b", "collection": "courses", "op": "find"}]
+    report = audit.audit_queries(db, specs)
+    assert report["summary"] == {"queries": 2, "info": 0, "warning": 2, "error": 0, "clean": 0}
+    assert audit.gate(report, "error")
+    assert not audit.gate(report, "warning")
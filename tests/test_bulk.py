@@ -0,0 +1,98 @@
+
+# ### Bulk writes: batched updates and insert error attribution
+
+
+
+## Importing libraries
+from pymongo import InsertOne, UpdateOne
+from eduhub.bulk import bulk_update, classify_write_error, insert_with_report, write_in_batches
+from eduhub.cache import query_cache
+
+import pytest
+
+
+
+# A writeErrors entry as the server reports a $jsonSchema failure (code 121)
+VALIDATION_ERROR = {
+    "index": 3,
+    "code": 121,
+    "errmsg": "Document failed validation",
+    "errInfo": {"details": {"schemaRulesNotSatisfied": [
+        {"operatorName": "required", "missingProperties": ["email"]},
+        {"operatorName": "properties", "propertiesNotSatisfied": [
+            {"propertyName": "role", "details": [{"operatorName": "enum"}]},
+            {"propertyName": "profile", "details": [{"operatorName": "properties", "schemaRulesNotSatisfied": [
+                {"operatorName": "properties", "propertiesNotSatisfied": [
+                    {"propertyName": "skills", "details": [{"operatorName": "bsonType"}]}
+                ]}
+            ]}]}
+        ]}
+    ]}}
+}
+
+
+
+
+def test_write_in_batches_counts_every_batch(db):
+    counts = write_in_batches(db.courses, (InsertOne({"courseId": i}) for i in range(5)), batch_size=2)
+    assert (counts["inserted"], counts["batches"]) == (5, 3)
+
+    updates = (UpdateOne({"courseId": i}, {"$set": {"rating": 4.0}}) for i in range(0, 8, 2))
+    counts = write_in_batches(db.courses, updates, batch_size=2)
+    assert (counts["matched"], counts["modified"], counts["batches"]) == (3, 3, 2)
+
+    with pytest.raises(ValueError):
+        write_in_batches(db.courses, [], batch_size=0)
+
+
+def test_write_in_batches_invalidates_cached_reads(db):
+    query_cache.get_or_load("count", ["courses"], lambda: 0)
+    write_in_batches(db.courses, [InsertOne({"courseId": "c1"})])
+    assert query_cache.get_or_load("count", ["courses"], lambda: 1) == 1
+
+
+def test_bulk_update_skips_documents_without_an_update(db):
+    db.courses.insert_many([{"courseId": f"c{i}", "rating": None if i % 2 else 3.0} for i in range(5)])
+    counts = bulk_update(db.courses, lambda doc: {"$set": {"rating": 0.0}} if doc["rating"] is None else None,
+                         projection={"rating": 1}, batch_size=1)
+    assert (counts["modified"], counts["batches"]) == (2, 2)
+    assert sorted(doc["rating"] for doc in db.courses.find()) == [0.0, 0.0, 3.0, 3.0, 3.0]
+
+
+def test_bulk_update_honours_the_filter(db):
+    db.courses.insert_many([{"courseId": "c1", "isPublished": True}, {"courseId": "c2", "isPublished": False}])
+    bulk_update(db.courses, lambda doc: {"$set": {"featured": True}}, filter={"isPublished": True})
+    assert [doc["courseId"] for doc in db.courses.find({"featured": True})] == ["c1"]
+
+
+def test_duplicate_key():
+    failure = classify_write_error({"index": 0, "code": 11000, "errmsg": "E11000 duplicate key",
+                                    "keyValue": {"userId": "u1", "email": "a@b.c"}})
+    assert failure == {"reason": "duplicate_key", "code": 11000, "message": "E11000 duplicate key",
+                       "fields": ["email", "userId"]}
+
+
+def test_schema_type_failure_names_nested_fields():
+    failure = classify_write_error(VALIDATION_ERROR)
+    assert failure["reason"] == "type"
+    assert failure["fields"] == ["email", "profile.skills", "role"]
+
+
+def test_schema_failure_without_type_rules():
+    details = {"schemaRulesNotSatisfied": [{"operatorName": "required", "missingProperties": ["title"]}]}
+    failure = classify_write_error({"index": 1, "code": 121, "errmsg": "failed", "errInfo": {"details": details}})
+    assert (failure["reason"], failure["fields"]) == ("validation", ["title"])
+
+
+def test_other_errors():
+    failure = classify_write_error({"index": 2, "code": 2, "errmsg": "bad value"})
+    assert failure == {"reason": "other", "code": 2, "message": "bad value", "fields": []}
+
+
+def test_insert_with_report_attributes_failures_across_batches(db):
+    db.users.create_index("userId", unique=True)
+    docs = [{"userId": user} for user in ["a", "b", "a", "c", "b"]]
+    report = insert_with_report(db.users, docs, batch_size=2, key_field="userId")
+    assert (report["inserted"], report["failed"], report["batches"]) == (3, 2, 3)
+    assert report["byReason"] == {"duplicate_key": 2}
+    assert [(failure["index"], failure["key"]) for failure in report["failures"]] == [(2, "a"), (4, "b")]
@@ -0,0 +1,97 @@
+
+# ### Query cache: eviction, expiry and invalidation
+
+
+
+## Importing libraries
+from eduhub.cache import QueryCache, make_key
+
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+
+
+def _loader(value, calls):
+    def load():
+        calls.append(value)
+        return value
+    return load
+
+
+def test_hits_and_misses():
+    cache, calls = QueryCache(), []
+    assert cache.get_or_load("k", ["courses"], _loader(1, calls)) == 1
+    assert cache.get_or_load("k", ["courses"], _loader(2, calls)) == 1
+    assert calls == [1]
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["size"], stats["hitRatio"]) == (1, 1, 1, 0.5)
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache, calls = QueryCache(max_entries=2), []
+    cache.get_or_load("a", ["courses"], _loader("a", calls))
+    cache.get_or_load("b", ["courses"], _loader("b", calls))
+    cache.get_or_load("a", ["courses"], _loader("a", calls))  # a is now the most recent
+    cache.get_or_load("c", ["courses"], _loader("c", calls))
+    cache.get_or_load("a", ["courses"], _loader("a", calls))
+    cache.get_or_load("b", ["courses"], _loader("b", calls))
+    assert calls == ["a", "b", "c", "b"]
+    assert cache.stats()["evictions"] == 2
+
+
+def test_entries_expire_after_the_ttl():
+    clock, calls = FakeClock(), []
+    cache = QueryCache(ttl=10, clock=clock)
+    cache.get_or_load("k", ["courses"], _loader(1, calls))
+    clock.now = 9.9
+    cache.get_or_load("k", ["courses"], _loader(2, calls))
+    clock.now = 10.0
+    assert cache.get_or_load("k", ["courses"], _loader(3, calls)) == 3
+    assert cache.stats()["expirations"] == 1
+
+
+def test_invalidate_drops_entries_of_a_collection():
+    cache, calls = QueryCache(), []
+    cache.get_or_load("roster", ["enrollments", "users"], _loader("roster", calls))
+    cache.get_or_load("catalogue", ["courses"], _loader("catalogue", calls))
+    assert cache.invalidate("users") == 1
+    assert cache.get_or_load("catalogue", ["courses"], _loader("other", calls)) == "catalogue"
+    assert cache.invalidate() == 1
+    assert cache.stats()["size"] == 0
+
+
+def test_load_overlapping_an_invalidation_is_not_cached():
+    cache, calls = QueryCache(), []
+
+    def stale_load():
+        cache.invalidate("courses")  # a write lands while the query runs
+        return "stale"
+
+    assert cache.get_or_load("k", ["courses"], stale_load) == "stale"
+    assert cache.get_or_load("k", ["courses"], _loader("fresh", calls)) == "fresh"
+    assert cache.get_or_load("k", ["courses"], _loader("again", calls)) == "fresh"
+
+
+def test_invalidating_another_collection_does_not_block_caching():
+    cache, calls = QueryCache(), []
+
+    def load_users():
+        cache.invalidate("courses")
+        return "users"
+
+    cache.get_or_load("k", ["users"], load_users)
+    assert cache.get_or_load("k", ["users"], _loader("reloaded", calls)) == "users"
+    assert calls == []
+
+
+def test_make_key_normalizes_equivalent_queries():
+    assert make_key("q", "courses", {"a": 1, "b": {"$in": [3, 1, 2]}}) == \
+        make_key("q", "courses", {"b": {"$in": [1, 2, 3]}, "a": 1})
+    assert make_key("q", "courses", sort=[("a", 1), ("b", 1)]) != make_key("q", "courses", sort=[("b", 1), ("a", 1)])
@@ -0,0 +1,66 @@
+
+# ### Package and command line: lazy imports, dispatch and the shared client
+
+
+
+## Importing libraries
+from datetime import datetime, timezone
+from eduhub import cli, client
+
+import eduhub
+import json
+import pytest
+import sys
+
+
+
+COUNTS = {"users": 20, "courses": 4, "enrollments": 30, "lessons": 0, "assignments": 0, "submissions": 0}
+
+
+
+
+@pytest.fixture
+def fresh_client(monkeypatch):
+    for variable in ("EDUHUB_CONFIG", "EDUHUB_MONGO_URI", "EDUHUB_DB"):
+        monkeypatch.delenv(variable, raising=False)
+    client.close_shared_client()
+    yield
+    client.close_shared_client()
+
+
+def test_importing_the_package_opens_no_client(fresh_client):
+    assert client._shared["client"] is None
+    assert eduhub.get_db().name == client.DEFAULT_SETTINGS["database"]
+    eduhub.close()
+    assert client._shared["client"] is None
+
+
+def test_operations_accept_a_database(db):
+    eduhub.seed_data(db, counts=COUNTS, seed=1, reference_time=datetime(2025, 1, 1, tzinfo=timezone.utc))
+    rows = eduhub.report("enrollments_per_course", db=db)
+    assert sum(row["totalEnrollments"] for row in rows) == COUNTS["enrollments"]
+
+
+def test_usage_lists_every_command(capsys):
+    cli.main([])
+    out = capsys.readouterr().out
+    assert all(name in out for name in cli.COMMANDS)
+
+    with pytest.raises(SystemExit) as error:
+        cli.main(["nope"])
+    assert error.value.code == 2
+    assert "Unknown command: nope" in capsys.readouterr().err
+
+
+def test_command_forwards_its_arguments_and_closes_the_client(fresh_client, capsys, monkeypatch):
+    monkeypatch.setattr(sys, "argv", ["eduhub"])
+    cli.main(["client", "settings", "--db", "cli_db", "--uri", "mongodb://cli:27017/"])
+    settings = json.loads(capsys.readouterr().out)
+    assert (settings["uri"], settings["database"]) == ("mongodb://cli:27017/", "cli_db")
+    assert sys.argv[0] == "python -m eduhub client"
+
+    client.get_shared_client()
+    with pytest.raises(SystemExit):
+        cli.main(["client", "--bad-option"])
+    # The shared client is closed even when the command fails
+    assert client._shared["client"] is None
@@ -0,0 +1,109 @@
+
+# ### Client factory: settings precedence, compressors and pool metrics
+
+
+
+## Importing libraries
+from eduhub.client import (
+    available_compressors,
+    close_shared_client,
+    DEFAULT_SETTINGS,
+    get_shared_client,
+    load_client_settings,
+    pool_sizing_hint,
+    PoolMetrics,
+    resolve_client_settings
+)
+from types import SimpleNamespace
+
+import json
+import pytest
+
+
+
+CONFIG = {"uri": "mongodb://config:27017/", "database": "config_db",
+          "options": {"maxPoolSize": 50, "minPoolSize": 2, "compressors": "zlib"}}
+
+
+
+
+@pytest.fixture
+def shared_client():
+    close_shared_client()
+    yield
+    close_shared_client()
+
+
+def test_defaults_without_config_or_environment():
+    settings = load_client_settings(environ={})
+    assert (settings["uri"], settings["database"]) == (DEFAULT_SETTINGS["uri"], DEFAULT_SETTINGS["database"])
+    assert settings["options"]["maxPoolSize"] == DEFAULT_SETTINGS["options"]["maxPoolSize"]
+    # The defaults themselves are never modified
+    settings["options"]["maxPoolSize"] = 1
+    assert DEFAULT_SETTINGS["options"]["maxPoolSize"] == 100
+
+
+def test_environment_overrides_the_config_file(tmp_path):
+    path = tmp_path / "client.json"
+    path.write_text(json.dumps(CONFIG))
+    environ = {"EDUHUB_CONFIG": str(path), "EDUHUB_DB": "env_db", "EDUHUB_MAX_POOL_SIZE": "200"}
+    settings = load_client_settings(environ=environ)
+    assert (settings["uri"], settings["database"]) == ("mongodb://config:27017/", "env_db")
+    assert (settings["options"]["maxPoolSize"], settings["options"]["minPoolSize"]) == (200, 2)
+    # Options the config does not set keep their defaults
+    assert settings["options"]["appname"] == "eduhub"
+
+
+def test_explicit_overrides_apply_last(monkeypatch):
+    monkeypatch.setenv("EDUHUB_MONGO_URI", "mongodb://env:27017/")
+    monkeypatch.setenv("EDUHUB_DB", "env_db")
+    settings = resolve_client_settings(database="cli_db", config=CONFIG)
+    assert (settings["uri"], settings["database"]) == ("mongodb://env:27017/", "cli_db")
+    settings = resolve_client_settings(uri="mongodb://cli:27017/", config=CONFIG)
+    assert (settings["uri"], settings["database"]) == ("mongodb://cli:27017/", "env_db")
+
+
+def test_unavailable_compressors_are_dropped():
+    assert available_compressors(" zlib, lz4 ,") == "zlib"
+    assert available_compressors("") == ""
+    settings = load_client_settings(config={"options": {"compressors": "lz4"}}, environ={})
+    assert "compressors" not in settings["options"]
+
+
+def test_pool_metrics_snapshot_and_reset():
+    metrics = PoolMetrics()
+    for duration in (0.001, 0.002, 0.010):
+        metrics.connection_checked_out(SimpleNamespace(duration=duration))
+    metrics.connection_checked_in(SimpleNamespace())
+    metrics.connection_check_out_failed(SimpleNamespace(reason="timeout", duration=0.5))
+    snapshot = metrics.snapshot()
+    assert (snapshot["checkouts"], snapshot["checkins"], snapshot["inUse"], snapshot["peakInUse"]) == (3, 1, 2, 3)
+    assert snapshot["failuresByReason"] == {"timeout": 1}
+    assert (snapshot["checkoutWaitMs"]["p50"], snapshot["checkoutWaitMs"]["max"]) == (2.0, 500.0)
+
+    metrics.reset()
+    snapshot = metrics.snapshot()
+    assert (snapshot["checkouts"], snapshot["peakInUse"], snapshot["checkoutWaitMs"]["p99"]) == (0, 2, 0.0)
+
+
+def test_pool_sizing_hint():
+    def snapshot(p95=1.0, timeouts=0, peak=10):
+        return {"checkoutWaitMs": {"p95": p95}, "failuresByReason": {"timeout": timeouts} if timeouts else {},
+                "peakInUse": peak}
+
+    assert "raise maxPoolSize" in pool_sizing_hint(snapshot(p95=12.0), 100)
+    assert "raise maxPoolSize" in pool_sizing_hint(snapshot(timeouts=3, peak=100), 100)
+    assert "shrink towards 20" in pool_sizing_hint(snapshot(peak=10), 100)
+    assert "fits" in pool_sizing_hint(snapshot(peak=80), 100)
+
+
+def test_shared_client_is_reused_until_closed(shared_client):
+    settings = load_client_settings(config=CONFIG, environ={})
+    client, _, metrics = get_shared_client(settings)
+    assert get_shared_client() == (client, settings, metrics)
+    assert get_shared_client(settings)[0] is client
+
+    with pytest.raises(ValueError):
+        get_shared_client({**settings, "database": "other_db"})
+    close_shared_client()
+    assert get_shared_client({**settings, "database": "other_db"})[0] is not client
@@ -0,0 +1,78 @@
+
+# ### Columnar reports: explicit schemas, record batches and Parquet
+# PyMongoArrow needs a real server, so report_table is exercised through its
+# record batch path.
+
+
+
+## Importing libraries
+from eduhub import columnar
+from eduhub.analytics import REPORT_PIPELINES
+from eduhub.columnar import (
+    arrow_schema,
+    iter_record_batches,
+    iter_report_frames,
+    report_frame,
+    REPORT_SCHEMAS,
+    write_parquet
+)
+
+import pytest
+
+pyarrow = pytest.importorskip("pyarrow")
+pytest.importorskip("pandas")
+import pyarrow.parquet
+
+
+
+ENROLLMENTS = [{"courseId": f"c{index % 5}", "studentId": f"s{index}"} for index in range(12)]
+
+
+
+
+@pytest.fixture
+def enrollments(db, monkeypatch):
+    monkeypatch.setattr(columnar, "aggregate_arrow_all", None)
+    db.enrollments.insert_many([dict(enrollment) for enrollment in ENROLLMENTS])
+    return db
+
+
+def test_every_report_has_a_schema():
+    assert set(REPORT_SCHEMAS) == set(REPORT_PIPELINES)
+    schema = arrow_schema("monthly_enrollments")
+    assert schema.field("_id").type == pyarrow.struct([("year", pyarrow.int32()), ("month", pyarrow.int32())])
+    assert schema.field("count").type == pyarrow.int64()
+    with pytest.raises(ValueError):
+        arrow_schema("nope")
+
+
+def test_record_batches_follow_the_schema(enrollments):
+    batches = list(iter_record_batches(enrollments, "enrollments_per_course", chunk_size=2))
+    assert [batch.num_rows for batch in batches] == [2, 2, 1]
+    assert all(batch.schema == arrow_schema("enrollments_per_course") for batch in batches)
+    counts = {row["_id"]: row["totalEnrollments"] for batch in batches for row in batch.to_pylist()}
+    assert counts == {"c0": 3, "c1": 3, "c2": 2, "c3": 2, "c4": 2}
+
+
+def test_empty_report_keeps_its_schema(db, monkeypatch):
+    monkeypatch.setattr(columnar, "aggregate_arrow_all", None)
+    table = columnar.report_table(db, "avg_grade_per_student")
+    assert (table.num_rows, table.schema) == (0, arrow_schema("avg_grade_per_student"))
+
+
+def test_frames_match_the_table(enrollments):
+    frame = report_frame(enrollments, "enrollments_per_course")
+    assert list(frame.columns) == ["_id", "totalEnrollments"]
+    assert str(frame["totalEnrollments"].dtype) == "int64"
+    chunks = list(iter_report_frames(enrollments, "enrollments_per_course", chunk_size=3))
+    assert [len(chunk) for chunk in chunks] == [3, 2]
+    assert sum(chunk["totalEnrollments"].sum() for chunk in chunks) == len(ENROLLMENTS)
+
+
+def test_write_parquet_one_row_group_per_chunk(enrollments, tmp_path):
+    path = tmp_path / "reports" / "per_course.parquet"
+    result = write_parquet(enrollments, "enrollments_per_course", path, chunk_size=2, compression="gzip")
+    assert (result["rows"], result["rowGroups"]) == (5, 3)
+    parquet = pyarrow.parquet.ParquetFile(path)
+    assert parquet.metadata.num_row_groups == 3
+    assert parquet.schema_arrow == arrow_schema("enrollments_per_course")
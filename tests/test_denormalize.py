@@ -0,0 +1,76 @@
+
+# ### Denormalized enrollment snapshot: writers, propagation and reports
+
+
+
+## Importing libraries
+from datetime import datetime, timezone
+from eduhub import writes
+from eduhub.analytics import enrollment_by_category, students_per_instructor
+from eduhub.denormalize import backfill_enrollment_snapshots, enroll_student, snapshot_update
+from eduhub.search import insert_course
+from eduhub.seed import seed_database
+
+import pytest
+
+
+
+COURSE = {"courseId": "c1", "title": "Data Analysis", "category": "AI", "instructorId": "u1", "price": 10.0}
+
+ENROLLED_AT = datetime(2025, 1, 1, tzinfo=timezone.utc)
+
+
+
+
+def _sorted(rows):
+    return sorted(rows, key=lambda row: str(row["_id"]))
+
+
+def test_enroll_student_stores_the_snapshot(db):
+    insert_course(db, dict(COURSE))
+    enroll_student(db, {"enrollmentId": "e1", "studentId": "s1", "courseId": "c1", "enrolledAt": ENROLLED_AT})
+    enrollment = db.enrollments.find_one({"enrollmentId": "e1"})
+    assert (enrollment["category"], enrollment["instructorId"], enrollment["pricePaid"]) == ("AI", "u1", 10.0)
+
+    with pytest.raises(ValueError):
+        enroll_student(db, {"enrollmentId": "e2", "studentId": "s1", "courseId": "missing"})
+
+
+def test_seeded_enrollments_match_the_lookup_reports(db):
+    counts = {"users": 30, "courses": 6, "enrollments": 50, "lessons": 0, "assignments": 0, "submissions": 0}
+    seed_database(db, counts=counts, seed=5, reference_time=ENROLLED_AT)
+    assert db.enrollments.count_documents({"instructorId": {"$exists": False}}) == 0
+    for report in (enrollment_by_category, students_per_instructor):
+        assert _sorted(report(db, denormalized=True)) == _sorted(report(db))
+
+
+def test_backfill_only_fills_missing_snapshots(db):
+    insert_course(db, dict(COURSE))
+    db.enrollments.insert_many([
+        {"enrollmentId": "e1", "studentId": "s1", "courseId": "c1"},
+        {"enrollmentId": "e2", "studentId": "s2", "courseId": "c1", "category": "AI", "instructorId": "u1",
+         "pricePaid": 5.0}
+    ])
+    backfill_enrollment_snapshots(db)
+    assert db.enrollments.find_one({"enrollmentId": "e1"})["pricePaid"] == 10.0
+    # The price paid at enrollment time is kept
+    assert db.enrollments.find_one({"enrollmentId": "e2"})["pricePaid"] == 5.0
+
+
+def test_course_updates_propagate_to_enrollments(db):
+    insert_course(db, dict(COURSE))
+    enroll_student(db, {"enrollmentId": "e1", "studentId": "s1", "courseId": "c1", "enrolledAt": ENROLLED_AT})
+
+    writes.update_course(db, "c1", {"$set": {"category": "Data", "instructorId": "u2", "price": 99.0}})
+    enrollment = db.enrollments.find_one({"enrollmentId": "e1"})
+    assert (enrollment["category"], enrollment["instructorId"], enrollment["pricePaid"]) == ("Data", "u2", 10.0)
+    assert enrollment_by_category(db, denormalized=True) == [{"_id": "Data", "totalEnrollments": 1}]
+
+    writes.publish_course(db, "c1")
+    assert db.courses.find_one({"courseId": "c1"})["isPublished"]
+    assert db.enrollments.find_one({"enrollmentId": "e1"})["category"] == "Data"
+
+
+def test_snapshot_update_ignores_other_fields():
+    assert snapshot_update({"title": "New", "price": 1.0}) is None
+    assert snapshot_update({"category": "AI", "title": "New"}) == {"$set": {"category": "AI"}}
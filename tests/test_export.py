@@ -0,0 +1,80 @@
+
+# ### Export: typed NDJSON round trip, reproducible files and verification
+
+
+
+## Importing libraries
+from bson import Decimal128, Int64, ObjectId
+from datetime import datetime
+from eduhub.export import (
+    export_database,
+    iter_export_documents,
+    load_manifest,
+    MANIFEST_NAME,
+    verify_export
+)
+
+import json
+import pytest
+
+
+
+DOCUMENTS = [
+    {"_id": ObjectId("665a1b2c3d4e5f6a7b8c9d01"), "userId": "u1", "visits": Int64(3),
+     "joinedAt": datetime(2025, 1, 2, 3, 4, 5, 678000), "balance": Decimal128("10.50"), "score": 1.0},
+    {"_id": ObjectId("665a1b2c3d4e5f6a7b8c9d02"), "userId": "u2", "visits": 7, "tags": ["a", "b"]}
+]
+
+
+
+
+@pytest.fixture
+def users(db):
+    db.users.insert_many([dict(doc) for doc in DOCUMENTS])
+    return db
+
+
+def test_canonical_round_trip_keeps_the_types(users, tmp_path):
+    manifest = export_database(users, tmp_path, collections=["users"])
+    entry = manifest["collections"]["users"]
+    assert (entry["file"], entry["documents"]) == ("users.ndjson.gz", 2)
+    assert load_manifest(tmp_path) == manifest
+
+    documents = list(iter_export_documents(tmp_path / entry["file"], "ndjson", "gzip"))
+    assert documents == DOCUMENTS
+    assert isinstance(documents[0]["visits"], Int64) and isinstance(documents[0]["score"], float)
+
+
+def test_unchanged_data_reproduces_the_checksums(users, tmp_path):
+    first = export_database(users, tmp_path / "first", collections=["users"], compression="none")
+    second = export_database(users, tmp_path / "second", collections=["users"], compression="none")
+    assert first["collections"]["users"]["sha256"] == second["collections"]["users"]["sha256"]
+    # gzip headers carry no timestamp, so compressed files match too
+    first = export_database(users, tmp_path / "first_gzip", collections=["users"])
+    second = export_database(users, tmp_path / "second_gzip", collections=["users"])
+    assert first["collections"]["users"]["sha256"] == second["collections"]["users"]["sha256"]
+
+
+def test_verify_detects_tampering(users, tmp_path):
+    export_database(users, tmp_path, collections=["users", "courses"], compression="none")
+    assert verify_export(tmp_path) == {"users": [], "courses": []}
+
+    with open(tmp_path / "users.ndjson", "ab") as f:
+        f.write(b'{"_id": 3}\n')
+    (tmp_path / "courses.ndjson").unlink()
+    problems = verify_export(tmp_path)
+    assert problems == {"users": ["checksum mismatch", "3 documents, manifest lists 2"],
+                        "courses": ["file is missing"]}
+    assert verify_export(tmp_path, count_documents=False)["users"] == ["checksum mismatch"]
+
+
+def test_manifest_records_the_json_mode(users, tmp_path):
+    export_database(users, tmp_path, collections=["users"], json_mode="relaxed")
+    manifest = json.loads((tmp_path / MANIFEST_NAME).read_text())
+    assert (manifest["format"], manifest["jsonMode"]) == ("ndjson", "relaxed")
+    assert verify_export(tmp_path) == {"users": []}
+
+
+def test_unknown_format_is_rejected(users, tmp_path):
+    with pytest.raises(ValueError):
+        export_database(users, tmp_path, collections=["users"], fmt="csv")
@@ -0,0 +1,91 @@
+
+# ### Index advisor: ESR ordering, coverage and redundant indexes
+
+
+
+## Importing libraries
+from eduhub.index_advisor import (
+    advise_indexes,
+    apply_recommendations,
+    covers,
+    esr_keys,
+    redundant_indexes,
+    shapes_from_spec
+)
+
+
+
+UPCOMING = {"name": "upcoming", "collection": "assignments", "op": "find",
+            "filter": {"courseId": "c1", "dueDate": {"$gte": 1, "$lte": 2}}, "sort": {"points": -1}}
+
+
+
+
+def _shape(spec):
+    [shape] = shapes_from_spec(spec)
+    return shape
+
+
+def test_fields_are_ordered_equality_sort_range():
+    shape = _shape(UPCOMING)
+    assert (shape["equality"], shape["sort"], shape["range"]) == (["courseId"], [("points", -1)], ["dueDate"])
+    assert esr_keys(shape) == [("courseId", 1), ("points", -1), ("dueDate", 1)]
+
+
+def test_operator_classification():
+    shape = _shape({"name": "q", "collection": "users", "op": "find", "filter": {
+        "$and": [{"role": "student"}, {"tags": {"$in": ["a"]}}],
+        "email": {"$regex": "x", "$options": "i"},
+        "$text": {"$search": "python"},
+        "_id": 1
+    }})
+    assert (shape["equality"], shape["range"]) == (["role", "tags"], ["email"])
+    # Filters an index cannot serve give no shape
+    assert shapes_from_spec({"name": "q", "collection": "c", "op": "find", "filter": {"$text": {"$search": "x"}}}) == []
+
+
+def test_aggregation_shapes_include_lookups():
+    spec = {"name": "roster", "collection": "enrollments", "op": "aggregate", "pipeline": [
+        {"$match": {"courseId": "c1"}},
+        {"$sort": {"enrollmentId": 1}},
+        {"$lookup": {"from": "users", "localField": "studentId", "foreignField": "userId", "as": "student"}}
+    ]}
+    leading, lookup = shapes_from_spec(spec)
+    assert esr_keys(leading) == [("courseId", 1), ("enrollmentId", 1)]
+    assert (lookup["collection"], lookup["equality"]) == ("users", ["userId"])
+
+
+def test_covers():
+    shape = _shape(UPCOMING)
+    assert covers([("courseId", 1), ("points", -1), ("dueDate", 1)], shape)
+    # A sort can be served by walking the index backwards
+    assert covers([("courseId", 1), ("points", 1), ("dueDate", 1)], shape)
+    assert not covers([("courseId", 1), ("dueDate", 1)], shape)
+    assert not covers([("points", -1), ("courseId", 1)], shape)
+
+
+def test_redundant_prefix_indexes():
+    indexes = [
+        {"name": "_id_", "keys": [("_id", 1)], "options": {}},
+        {"name": "a_1", "keys": [("a", 1)], "options": {}},
+        {"name": "a_1_b_1", "keys": [("a", 1), ("b", 1)], "options": {}},
+        {"name": "a_unique", "keys": [("a", 1)], "options": {"unique": True}}
+    ]
+    assert redundant_indexes(indexes) == [{"name": "a_1", "keys": [("a", 1)], "coveredBy": "a_1_b_1"}]
+
+
+def test_advise_skips_served_shapes_and_folds_prefixes(db):
+    db.assignments.create_index([("courseId", 1), ("points", -1), ("dueDate", 1)])
+    by_course = {"name": "by_course", "collection": "assignments", "op": "find", "filter": {"courseId": "c1"}}
+    by_lesson = {"name": "by_lesson", "collection": "lessons", "op": "find", "filter": {"courseId": "c1"}}
+    ordered = {"name": "ordered", "collection": "lessons", "op": "find",
+               "filter": {"courseId": "c1"}, "sort": {"order": 1}}
+    shapes = [shape for spec in (UPCOMING, by_course, by_lesson, ordered) for shape in shapes_from_spec(spec)]
+
+    advice = advise_indexes(db, shapes, estimate_sizes=False)
+    assert advice["served"] == ["upcoming", "by_course"]
+    assert advice["proposals"] == [{"collection": "lessons", "keys": [("courseId", 1), ("order", 1)],
+                                    "queries": ["ordered", "by_lesson"]}]
+
+    assert apply_recommendations(db, advice)["created"] == ["courseId_1_order_1"]
+    assert advise_indexes(db, shapes, estimate_sizes=False)["proposals"] == []
@@ -0,0 +1,82 @@
+
+# ### Index manifest diff and sync
+
+
+
+## Importing libraries
+from eduhub.indexes import INDEX_MANIFEST, describe, diff_indexes, index_name, sync_indexes, verify_indexes
+
+
+
+MANIFEST = {
+    "enrollments": [
+        {"keys": [("enrollmentId", 1)], "unique": True},
+        {"name": "active_roster", "keys": [("courseId", 1), ("enrollmentId", 1)],
+         "partialFilterExpression": {"status": "active"}},
+        {"keys": [("updatedAt", 1)], "expireAfterSeconds": 3600}
+    ]
+}
+
+
+
+
+def test_index_name_matches_the_server_default():
+    assert index_name({"keys": [("category", 1), ("createdAt", -1), ("_id", -1)]}) == "category_1_createdAt_-1__id_-1"
+    assert index_name(MANIFEST["enrollments"][1]) == "active_roster"
+
+
+def test_text_index_is_compared_in_its_stored_form():
+    entry = {"keys": [("title", "text"), ("tags", "text"), ("category", 1)], "weights": {"title": 10, "tags": 5}}
+    stored = {"key": {"_fts": "text", "_ftsx": 1, "category": 1}, "weights": {"tags": 5, "title": 10}}
+    assert describe(entry) == describe(stored)
+
+
+def test_empty_collection_reports_everything_missing(db):
+    report = diff_indexes(db, MANIFEST)
+    assert report["enrollments"]["missing"] == ["enrollmentId_1", "active_roster", "updatedAt_1"]
+    assert not verify_indexes(db, MANIFEST)
+
+
+def test_sync_builds_missing_indexes_and_is_idempotent(db):
+    report = sync_indexes(db, MANIFEST)
+    assert sorted(report["enrollments"]["built"]) == ["active_roster", "enrollmentId_1", "updatedAt_1"]
+    assert verify_indexes(db, MANIFEST)
+    again = sync_indexes(db, MANIFEST)["enrollments"]
+    assert again["built"] == {} and len(again["ok"]) == 3
+
+
+def test_changed_and_unlisted_indexes(db):
+    db.enrollments.create_index([("enrollmentId", 1)])  # not unique
+    db.enrollments.create_index([("courseId", 1), ("enrollmentId", 1)], name="roster_v1")
+    db.enrollments.create_index([("progress", 1)])
+    report = diff_indexes(db, MANIFEST)["enrollments"]
+    assert report == {"missing": ["updatedAt_1"], "changed": ["enrollmentId_1", "active_roster"],
+                      "unlisted": ["progress_1"], "ok": []}
+
+    # Changed indexes are left alone unless asked, unlisted ones are only reported
+    summary = sync_indexes(db, MANIFEST)["enrollments"]
+    assert summary["changed"] == ["enrollmentId_1", "active_roster"]
+    assert summary["unlisted"] == ["progress_1"]
+    assert not verify_indexes(db, MANIFEST)
+
+    summary = sync_indexes(db, MANIFEST, rebuild_changed=True, drop_unlisted=True)["enrollments"]
+    assert sorted(summary["rebuilt"]) == ["active_roster", "enrollmentId_1"]
+    assert summary["dropped"] == ["progress_1"]
+    assert verify_indexes(db, MANIFEST)
+    assert sorted(index["name"] for index in db.enrollments.list_indexes()) == \
+        ["_id_", "active_roster", "enrollmentId_1", "updatedAt_1"]
+
+
+def test_dry_run_changes_nothing(db):
+    report = sync_indexes(db, MANIFEST, dry_run=True)
+    assert report["enrollments"]["built"] == {"enrollmentId_1": None, "active_roster": None, "updatedAt_1": None}
+    assert [index["name"] for index in db.enrollments.list_indexes()] == []
+
+
+def test_manifest_entries_are_well_formed():
+    for collection, entries in INDEX_MANIFEST.items():
+        names = [index_name(entry) for entry in entries]
+        assert len(names) == len(set(names)), collection
+        for entry in entries:
+            assert set(entry) <= {"keys", "name", "unique", "sparse", "partialFilterExpression",
+                                  "expireAfterSeconds", "weights"}, entry
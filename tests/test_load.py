@@ -0,0 +1,76 @@
+
+# ### Bulk loader: export round trip, --drop and --defer-indexes
+
+
+
+## Importing libraries
+from datetime import datetime, timezone
+from eduhub.export import export_database
+from eduhub.load import index_spec, load_dump
+from eduhub.seed import seed_database
+
+import mongomock
+import pytest
+
+
+
+COUNTS = {"users": 30, "courses": 6, "enrollments": 50, "lessons": 10, "assignments": 8, "submissions": 20}
+
+
+
+
+@pytest.fixture
+def export_dir(tmp_path):
+    source = mongomock.MongoClient().source
+    seed_database(source, counts=COUNTS, seed=3, reference_time=datetime(2025, 1, 1, tzinfo=timezone.utc))
+    export_database(source, tmp_path / "export", compression="gzip")
+    return source, tmp_path / "export"
+
+
+def _documents(db, name):
+    return list(db[name].find().sort("_id", 1))
+
+
+def test_export_load_round_trip(db, export_dir):
+    source, path = export_dir
+    report = load_dump(db, path)
+    assert report["documents"] == sum(COUNTS.values())
+    for name, count in COUNTS.items():
+        assert report["collections"][name]["inserted"] == report["collections"][name]["expected"] == count
+        assert _documents(db, name) == _documents(source, name)
+
+
+def test_reload_counts_duplicates_unless_dropped(db, export_dir):
+    _, path = export_dir
+    db.users.create_index("userId", unique=True)
+    load_dump(db, path)
+
+    again = load_dump(db, path)["collections"]["users"]
+    assert (again["inserted"], again["duplicates"]) == (0, COUNTS["users"])
+
+    dropped = load_dump(db, path, drop=True)["collections"]["users"]
+    assert (dropped["inserted"], dropped["duplicates"]) == (COUNTS["users"], 0)
+    # The collection was emptied, not dropped: its unique index is still there
+    assert db.users.index_information()["userId_1"]["unique"]
+    assert db.users.count_documents({}) == COUNTS["users"]
+
+
+def test_deferred_indexes_are_recreated_exactly(db, export_dir):
+    _, path = export_dir
+    # An index outside the manifest, e.g. one applied by the index advisor
+    db.users.create_index([("lastName", 1), ("firstName", 1)], name="advisor_name", sparse=True)
+    report = load_dump(db, path, defer_indexes=True)
+    assert report["indexSeconds"] is not None
+
+    indexes = db.users.index_information()
+    assert indexes["advisor_name"]["key"] == [("lastName", 1), ("firstName", 1)]
+    assert indexes["advisor_name"]["sparse"]
+    assert "email_1" in indexes  # synced from the manifest afterwards
+
+
+def test_index_spec_rebuilds_text_fields():
+    stored = {"v": 2, "key": {"_fts": "text", "_ftsx": 1, "category": 1}, "name": "course_text",
+              "weights": {"title": 10, "tags": 5}, "default_language": "english"}
+    keys, options = index_spec(stored)
+    assert keys == [("title", "text"), ("tags", "text"), ("category", 1)]
+    assert options == {"name": "course_text", "weights": {"title": 10, "tags": 5}, "default_language": "english"}
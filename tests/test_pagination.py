@@ -0,0 +1,69 @@
+
+# ### Keyset pagination: filters and page tokens
+
+
+
+## Importing libraries
+from bson import ObjectId
+from eduhub.pagination import (SORT_ORDERS, decode_token, encode_token, find_page, iter_pages,
+                               keyset_filter, query_fingerprint)
+
+import pytest
+
+
+
+# Ratings with ties, a null and a missing value, so every keyset branch is exercised
+RATINGS = [4.5, 3.0, None, 4.5, 5.0, 3.0, "missing", 4.5, 1.0, 3.0, None, 2.5]
+
+
+
+
+@pytest.fixture
+def courses(db):
+    for position, rating in enumerate(RATINGS):
+        doc = {"_id": ObjectId(f"{position + 1:024x}"), "category": "AI", "price": position % 4 * 10.0}
+        if rating != "missing":
+            doc["rating"] = rating
+        db.courses.insert_one(doc)
+    return db
+
+
+def _page_ids(db, order, page_size):
+    def fetch(token):
+        return find_page(db, "courses", {"category": "AI"}, order, page_size, token)
+    return [doc["_id"] for page in iter_pages(fetch) for doc in page["items"]]
+
+
+@pytest.mark.parametrize("order", sorted(SORT_ORDERS))
+@pytest.mark.parametrize("page_size", [1, 3, 5, 50])
+def test_pages_follow_the_sort_order(courses, order, page_size):
+    expected = [doc["_id"] for doc in courses.courses.find({"category": "AI"}).sort(SORT_ORDERS[order])]
+    assert _page_ids(courses, order, page_size) == expected
+
+
+def test_keyset_filter_after_each_row(courses):
+    sort = SORT_ORDERS["top_rated"]
+    rows = list(courses.courses.find().sort(sort))
+    for position, row in enumerate(rows):
+        after = keyset_filter(sort, [row.get("rating"), row["_id"]])
+        found = [doc["_id"] for doc in courses.courses.find(after).sort(sort)]
+        assert found == [doc["_id"] for doc in rows[position + 1:]]
+
+
+def test_token_round_trip():
+    fingerprint = query_fingerprint("courses", {"category": "AI"}, "newest")
+    values = [None, ObjectId("0" * 23 + "7")]
+    token = encode_token("newest", values, fingerprint)
+    assert "=" not in token
+    assert decode_token(token, "newest", fingerprint) == values
+
+
+def test_token_is_bound_to_its_query():
+    fingerprint = query_fingerprint("courses", {"category": "AI"}, "newest")
+    token = encode_token("newest", [None, ObjectId()], fingerprint)
+    with pytest.raises(ValueError):
+        decode_token(token, "newest", query_fingerprint("courses", {"category": "Web Dev"}, "newest"))
+    with pytest.raises(ValueError):
+        decode_token(token, "top_rated", fingerprint)
+    with pytest.raises(ValueError):
+        decode_token("not a token", "newest", fingerprint)
@@ -0,0 +1,79 @@
+
+# ### Projection profiles: projections, profiled finds and slotted records
+
+
+
+## Importing libraries
+from datetime import datetime
+from eduhub.projections import (
+    find_profiled,
+    projection,
+    PROJECTION_PROFILES,
+    record_type,
+    to_records
+)
+
+import pytest
+
+
+
+USERS = [
+    {"userId": "u2", "firstName": "Ada", "lastName": "Byron", "role": "student", "email": "ada@example.com",
+     "isActive": True, "dateJoined": datetime(2025, 1, 1), "profile": {"avatar": "a.png", "bio": "x" * 500}},
+    {"userId": "u1", "firstName": "Alan", "lastName": "Turing", "role": "instructor", "email": "alan@example.com",
+     "isActive": False, "dateJoined": datetime(2024, 1, 1), "profile": {"bio": "y" * 500}}
+]
+
+
+
+
+@pytest.fixture
+def users(db):
+    db.users.insert_many([dict(user) for user in USERS])
+    return db
+
+
+def test_projection_shapes():
+    assert projection("users", "summary") == {"_id": 0, "userId": 1, "firstName": 1, "lastName": 1, "role": 1}
+    assert projection("courses", "detail") == {"titleTrigrams": 0}
+    assert projection("users", "detail") is None
+    # Callers may modify the projection without touching the profile
+    projection("courses", "detail")["title"] = 0
+    assert PROJECTION_PROFILES["courses"]["detail"] == {"titleTrigrams": 0}
+
+    with pytest.raises(ValueError):
+        projection("users", "tiny")
+    with pytest.raises(ValueError):
+        projection("payments", "summary")
+
+
+def test_find_profiled_returns_only_the_profile_fields(users):
+    rows = find_profiled(users, "users", {"role": "student"}, profile="card")
+    assert rows == [{"userId": "u2", "firstName": "Ada", "lastName": "Byron", "role": "student",
+                     "email": "ada@example.com", "isActive": True, "dateJoined": datetime(2025, 1, 1),
+                     "profile": {"avatar": "a.png"}}]
+    detail = find_profiled(users, "users", profile="detail", sort=[("userId", 1)], limit=1)
+    assert detail[0]["profile"]["bio"] == "y" * 500 and "_id" in detail[0]
+
+
+def test_records_hold_the_profile_fields(users):
+    records = find_profiled(users, "users", profile="card", sort=[("userId", 1)], as_records=True)
+    UserCard = record_type("users", "card")
+    assert [type(record) for record in records] == [UserCard, UserCard]
+    assert UserCard.__name__ == "UserCard" and record_type("users", "card") is UserCard
+    assert (records[0].userId, records[0].profile_avatar) == ("u1", None)
+    assert records[1].profile_avatar == "a.png"
+    assert not hasattr(records[0], "__dict__")
+    with pytest.raises(AttributeError):
+        records[0].bio = "no slot"
+
+    summary = next(to_records([USERS[0]], "users", "summary"))
+    assert summary.as_dict() == {"userId": "u2", "firstName": "Ada", "lastName": "Byron", "role": "student"}
+    assert summary == record_type("users", "summary")("u2", "Ada", "Byron", "student")
+    assert repr(summary).startswith("UserSummary(userId='u2'")
+
+
+def test_detail_profile_has_no_record_type():
+    with pytest.raises(ValueError):
+        record_type("courses", "detail")
+
@@ -0,0 +1,38 @@
+
+# ### Course roster: one paged $lookup aggregation
+# mongomock cannot run a $lookup with both localField and a pipeline, so these
+# tests check the pipeline the roster sends.
+
+
+
+## Importing libraries
+from eduhub.reads import course_roster_pipeline, ENROLLMENT_STATUSES, ROSTER_STUDENT_FIELDS
+
+
+
+
+def _stages(pipeline):
+    return [next(iter(stage)) for stage in pipeline]
+
+
+def test_page_is_cut_before_the_lookup():
+    pipeline = course_roster_pipeline("c1", page_size=20)
+    assert _stages(pipeline) == ["$match", "$sort", "$limit", "$lookup", "$unwind", "$limit", "$project"]
+    assert pipeline[0]["$match"] == {"courseId": "c1", "status": {"$in": ENROLLMENT_STATUSES}}
+    assert pipeline[2]["$limit"] == 20
+    lookup = pipeline[3]["$lookup"]
+    assert (lookup["localField"], lookup["foreignField"]) == ("studentId", "userId")
+    assert lookup["pipeline"] == [{"$project": ROSTER_STUDENT_FIELDS}]
+
+
+def test_active_users_filter_limits_after_the_lookup():
+    # Inactive users drop rows after the $lookup, so the page is only cut once they are gone
+    pipeline = course_roster_pipeline("c1", active_users_only=True, page_size=20)
+    assert _stages(pipeline) == ["$match", "$sort", "$lookup", "$unwind", "$limit", "$project"]
+    assert pipeline[2]["$lookup"]["pipeline"][0] == {"$match": {"isActive": True}}
+
+
+def test_active_enrollments_and_keyset_page():
+    pipeline = course_roster_pipeline("c1", active_enrollments_only=True, after="e42")
+    assert pipeline[0]["$match"] == {"courseId": "c1", "status": "active", "enrollmentId": {"$gt": "e42"}}
+    assert pipeline[1]["$sort"] == {"enrollmentId": 1}
@@ -0,0 +1,68 @@
+
+# ### Query registry and benchmark baselines
+
+
+
+## Importing libraries
+from datetime import datetime, timezone
+from eduhub.benchmark import compare_to_baseline, load_baselines, main, percentile, save_baseline
+from eduhub.registry import build_query_registry, select_queries
+from eduhub.seed import seed_database
+
+import pytest
+
+
+
+COUNTS = {"users": 30, "courses": 6, "enrollments": 50, "lessons": 10, "assignments": 8, "submissions": 20}
+
+
+
+
+def _filters(db):
+    return {spec["name"]: spec.get("filter") for spec in build_query_registry(db)}
+
+
+def test_per_role_queries_sample_their_role(db):
+    seed_database(db, counts=COUNTS, seed=3, reference_time=datetime(2025, 1, 1, tzinfo=timezone.utc))
+    filters = _filters(db)
+    role = {user["userId"]: user["role"] for user in db.users.find()}
+    assert role[filters["courses_by_instructor"]["instructorId"]] == "instructor"
+    assert role[filters["submissions_by_student"]["studentId"]] == "student"
+    # The pair comes from a real enrollment, so the lookup returns a document
+    assert db.enrollments.count_documents(filters["enrollment_by_student_course"]) == 1
+    assert db.courses.count_documents(filters["courses_by_instructor"]) > 0
+    assert db.submissions.count_documents(filters["submissions_by_student"]) > 0
+
+
+def test_empty_database_uses_placeholders(db):
+    filters = _filters(db)
+    assert filters["courses_by_instructor"] == {"instructorId": "missing-instructor"}
+    assert filters["enrollment_by_student_course"] == {"studentId": "missing-student", "courseId": "missing-course"}
+
+
+def test_select_queries(db):
+    registry = build_query_registry(db)
+    assert [spec["name"] for spec in select_queries(registry, ["course_by_id"])] == ["course_by_id"]
+    with pytest.raises(ValueError):
+        select_queries(registry, ["nope"])
+
+
+def test_percentile_is_nearest_rank():
+    values = list(range(1, 101))
+    assert (percentile(values, 0.5), percentile(values, 0.95), percentile([], 0.5)) == (50, 95, 0.0)
+
+
+def test_baseline_round_trip_and_regressions(tmp_path):
+    path = tmp_path / "baselines.json"
+    assert load_baselines(path) == {}
+    save_baseline([{"name": "q", "p50": 1.0, "p95": 10.0, "p99": 12.0, "plan": "IXSCAN"}], "small", {}, path)
+    baseline = load_baselines(path)["small"]
+
+    assert compare_to_baseline([{"name": "q", "p95": 12.0, "plan": "IXSCAN"}], baseline) == []
+    regressions = compare_to_baseline([{"name": "q", "p95": 20.0, "plan": "COLLSCAN"}], baseline)
+    assert [regression["reason"] for regression in regressions] == ["latency", "plan"]
+
+
+def test_baseline_file_is_required():
+    with pytest.raises(SystemExit):
+        main(["--scale", "sample"])
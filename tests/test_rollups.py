@@ -0,0 +1,112 @@
+
+# ### Enrollment rollups: increments, category moves and backfill bookkeeping
+
+
+
+## Importing libraries
+from datetime import datetime, timedelta, timezone
+from eduhub import writes
+from eduhub.rollups import (
+    _backfill_pipeline,
+    delete_stale_buckets,
+    enrollment_trends,
+    move_course_category,
+    record_enrollment,
+    ROLLUP_COLLECTIONS,
+    UNCATEGORIZED
+)
+from eduhub.search import insert_course
+
+
+
+DAILY = ROLLUP_COLLECTIONS["day"]
+MONTHLY = ROLLUP_COLLECTIONS["month"]
+
+ENROLLMENT = {"courseId": "c1", "studentId": "s1", "category": "AI",
+              "enrolledAt": datetime(2025, 3, 14, 15, 30, tzinfo=timezone.utc)}
+
+
+
+
+def _counts(db, collection):
+    return {(bucket["period"], bucket["category"]): bucket["count"] for bucket in db[collection].find()}
+
+
+def test_increment_and_decrement(db):
+    record_enrollment(db, ENROLLMENT)
+    record_enrollment(db, {**ENROLLMENT, "studentId": "s2", "enrolledAt": datetime(2025, 3, 20)})
+    assert _counts(db, DAILY) == {(datetime(2025, 3, 14), "AI"): 1, (datetime(2025, 3, 20), "AI"): 1}
+    assert _counts(db, MONTHLY) == {(datetime(2025, 3, 1), "AI"): 2}
+
+    record_enrollment(db, ENROLLMENT, delta=-1)
+    assert _counts(db, MONTHLY) == {(datetime(2025, 3, 1), "AI"): 1}
+    assert _counts(db, DAILY)[(datetime(2025, 3, 14), "AI")] == 0
+
+
+def test_decrement_never_creates_or_overdraws_a_bucket(db):
+    record_enrollment(db, {**ENROLLMENT, "category": None}, delta=-1)
+    assert db[MONTHLY].count_documents({}) == 0
+
+    record_enrollment(db, ENROLLMENT)
+    record_enrollment(db, ENROLLMENT, delta=-1)
+    record_enrollment(db, ENROLLMENT, delta=-1)
+    assert _counts(db, MONTHLY) == {(datetime(2025, 3, 1), "AI"): 0}
+
+
+def test_trends_read_the_buckets(db):
+    for day in (1, 2, 40):
+        record_enrollment(db, {**ENROLLMENT, "enrolledAt": datetime(2025, 1, 1) + timedelta(days=day)})
+    trends = enrollment_trends(db, datetime(2025, 1, 1), datetime(2025, 3, 1))
+    assert [(row["_id"]["period"], row["count"]) for row in trends] == \
+        [(datetime(2025, 1, 1), 2), (datetime(2025, 2, 1), 1)]
+
+
+def test_category_change_moves_the_buckets(db):
+    insert_course(db, {"courseId": "c1", "title": "Data Analysis", "category": "AI", "instructorId": "u1"})
+    record_enrollment(db, ENROLLMENT)
+    record_enrollment(db, {**ENROLLMENT, "studentId": "s2"})
+    record_enrollment(db, {**ENROLLMENT, "courseId": "c1", "category": "Data"})
+
+    writes.update_course(db, "c1", {"$set": {"category": "Data"}})
+    assert _counts(db, MONTHLY) == {(datetime(2025, 3, 1), "Data"): 3}
+    assert _counts(db, DAILY) == {(datetime(2025, 3, 14), "Data"): 3}
+    # Updates that keep the category leave the buckets alone
+    writes.update_course(db, "c1", {"$set": {"category": "Data", "title": "Data Analysis II"}})
+    assert _counts(db, MONTHLY) == {(datetime(2025, 3, 1), "Data"): 3}
+
+
+def test_move_to_and_from_uncategorized(db):
+    record_enrollment(db, {**ENROLLMENT, "category": None})
+    assert move_course_category(db, "c1", None, "AI") == 2
+    assert _counts(db, MONTHLY) == {(datetime(2025, 3, 1), "AI"): 1}
+    assert move_course_category(db, "c1", "AI", None) == 2
+    assert _counts(db, MONTHLY) == {(datetime(2025, 3, 1), UNCATEGORIZED): 1}
+    assert move_course_category(db, "c1", UNCATEGORIZED, None) == 0
+
+
+def test_stale_buckets_are_deleted(db):
+    started = datetime(2025, 6, 1, 12, tzinfo=timezone.utc)
+    key = {"courseId": "c1", "category": "AI"}
+    db[MONTHLY].insert_many([
+        # Refreshed by this run
+        {**key, "period": datetime(2025, 1, 1), "count": 3, "backfilledAt": started, "updatedAt": started},
+        # Updated by a live writer during the run
+        {**key, "period": datetime(2025, 2, 1), "count": 1, "updatedAt": started + timedelta(seconds=1)},
+        # Left over from an earlier run: no enrollment falls into it any more
+        {**key, "period": datetime(2025, 3, 1), "count": 2, "backfilledAt": started - timedelta(days=1),
+         "updatedAt": started - timedelta(days=1)}
+    ])
+    assert delete_stale_buckets(db, started) == 1
+    assert sorted(bucket["period"].month for bucket in db[MONTHLY].find()) == [1, 2]
+
+
+def test_backfill_merge_keeps_buckets_updated_after_the_cutoff():
+    started = datetime(2025, 6, 1, 12, tzinfo=timezone.utc)
+    cutoff = started + timedelta(seconds=30)
+    pipeline = _backfill_pipeline("month", ["c1"], MONTHLY, cutoff, started)
+    project, merge = pipeline[-2]["$project"], pipeline[-1]["$merge"]
+    assert (project["updatedAt"], project["backfilledAt"]) == (cutoff, started)
+    assert merge["on"] == ["period", "courseId", "category"]
+    condition, keep, replace = merge["whenMatched"][0]["$replaceWith"]["$cond"]
+    assert (condition, keep) == ({"$gt": ["$updatedAt", cutoff]}, "$$ROOT")
+    assert replace == {"$mergeObjects": ["$$new", {"_id": "$_id"}]}
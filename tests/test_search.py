@@ -0,0 +1,129 @@
+
+# ### Course search: ranked $text queries, the short-term fallback and
+# trigram substring search
+# mongomock has no $text, so the ranked path is checked against a recording
+# stand-in for the courses collection.
+
+
+
+## Importing libraries
+from eduhub.indexes import INDEX_MANIFEST
+from eduhub.search import (
+    backfill_title_trigrams,
+    COURSE_TEXT_INDEX,
+    COURSE_TEXT_WEIGHTS,
+    insert_course,
+    insert_courses,
+    search_courses,
+    substring_query,
+    substring_search_courses,
+    title_trigrams,
+    TRIGRAM_FIELD,
+    update_course
+)
+
+import pytest
+
+
+
+COURSES = [
+    {"courseId": "c1", "title": "Intro to R", "category": "Data Science", "level": "beginner"},
+    {"courseId": "c2", "title": "R for Statistics", "category": "Data Science", "level": "advanced"},
+    {"courseId": "c3", "title": "Web Design", "category": "Design", "level": "beginner"}
+]
+
+
+class RecordingCursor:
+    def __init__(self, calls):
+        self.calls = calls
+
+    def __getattr__(self, name):
+        def record(*args):
+            self.calls.append((name, args))
+            return self
+        return record
+
+    def __iter__(self):
+        return iter([])
+
+
+class RecordingDatabase:
+    def __init__(self):
+        self.calls = []
+        self.courses = self
+
+    def find(self, *args):
+        self.calls.append(("find", args))
+        return RecordingCursor(self.calls)
+
+
+
+
+@pytest.fixture
+def courses(db):
+    insert_courses(db, [dict(course) for course in COURSES])
+    return db
+
+
+def test_text_search_is_ranked_and_paged():
+    db = RecordingDatabase()
+    search_courses(db, "  python data ", category="Data Science", page=3, page_size=10)
+    (_, (query, projection)), sort, skip, limit = db.calls
+    assert query == {"category": "Data Science", "$text": {"$search": "python data"}}
+    assert projection == {TRIGRAM_FIELD: 0, "score": {"$meta": "textScore"}}
+    assert sort == ("sort", ([("score", {"$meta": "textScore"})],))
+    assert (skip, limit) == (("skip", (20,)), ("limit", (10,)))
+
+
+def test_short_terms_fall_back_to_a_title_regex(courses):
+    assert [course["courseId"] for course in search_courses(courses, "r ")] == ["c1", "c2"]
+    assert [course["courseId"] for course in search_courses(courses, "r", level="advanced")] == ["c2"]
+    assert TRIGRAM_FIELD not in search_courses(courses, "R")[0]
+
+
+def test_short_term_regex_is_escaped(courses):
+    assert search_courses(courses, ".*") == []
+
+
+def test_blank_keyword_returns_nothing(courses):
+    assert search_courses(courses, "   ") == []
+
+
+def test_manifest_text_index_covers_the_weighted_fields():
+    entry = next(entry for entry in INDEX_MANIFEST["courses"] if entry.get("name") == COURSE_TEXT_INDEX)
+    assert entry["weights"] == COURSE_TEXT_WEIGHTS
+    assert {key for key, kind in entry["keys"] if kind == "text"} == set(COURSE_TEXT_WEIGHTS)
+
+
+def test_title_trigrams():
+    assert title_trigrams("Data") == ["ata", "dat"]
+    assert title_trigrams("ab") == []
+
+
+def test_substring_query_needs_every_trigram():
+    assert substring_query("Sign") == {"title": {"$regex": "Sign", "$options": "i"},
+                                       TRIGRAM_FIELD: {"$all": ["ign", "sig"]}}
+    # Terms under three characters only have the regex
+    assert TRIGRAM_FIELD not in substring_query("to")
+
+
+def test_substring_search_matches_infixes(courses):
+    assert [course["courseId"] for course in substring_search_courses(courses, "STAT")] == ["c2"]
+    assert [course["courseId"] for course in substring_search_courses(courses, "es")] == ["c3"]
+    assert [course["courseId"] for course in substring_search_courses(courses, "o to")] == ["c1"]
+    assert substring_search_courses(courses, "  ") == []
+    assert TRIGRAM_FIELD not in substring_search_courses(courses, "web", projection={"title": 0})[0]
+
+
+def test_trigrams_follow_title_changes(db):
+    insert_course(db, {"courseId": "c1", "title": "Web Design"})
+    update_course(db, "c1", {"$set": {"title": "Machine Learning"}})
+    assert substring_search_courses(db, "learn")[0]["courseId"] == "c1"
+    assert substring_search_courses(db, "design") == []
+
+
+def test_backfill_fills_missing_trigrams(db):
+    db.courses.insert_many([{"courseId": "c1", "title": "Web Design"}, {"courseId": "c2"}])
+    assert backfill_title_trigrams(db)["modified"] == 2
+    assert db.courses.find_one({"courseId": "c1"})[TRIGRAM_FIELD] == title_trigrams("Web Design")
+    assert db.courses.find_one({"courseId": "c2"})[TRIGRAM_FIELD] == []
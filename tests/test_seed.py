@@ -0,0 +1,104 @@
+
+# ### Seed generator: determinism and foreign keys
+
+
+
+## Importing libraries
+from datetime import datetime, timedelta, timezone
+from eduhub.seed import (
+    build_context,
+    generate_documents,
+    generate_documents_vectorized,
+    make_id,
+    role_split,
+    seed_database
+)
+
+import mongomock
+import pytest
+
+
+
+COUNTS = {"users": 40, "courses": 8, "enrollments": 120, "lessons": 20, "assignments": 15, "submissions": 60}
+REFERENCE_TIME = datetime(2025, 1, 1, tzinfo=timezone.utc)
+
+# Child collection, reference field -> parent collection, key field
+FOREIGN_KEYS = [
+    ("courses", "instructorId", "users", "userId"),
+    ("enrollments", "studentId", "users", "userId"),
+    ("enrollments", "courseId", "courses", "courseId"),
+    ("lessons", "courseId", "courses", "courseId"),
+    ("assignments", "courseId", "courses", "courseId"),
+    ("submissions", "assignmentId", "assignments", "assignmentId"),
+    ("submissions", "studentId", "users", "userId"),
+]
+
+
+
+
+def _snapshot(db):
+    return {name: list(db[name].find({}, {"_id": 0}).sort("_id", 1)) for name in COUNTS}
+
+
+def _seed(db, mode):
+    return seed_database(db, counts=COUNTS, seed=11, batch_size=25, reference_time=REFERENCE_TIME, mode=mode)
+
+
+@pytest.mark.parametrize("mode", ["faker", "vectorized"])
+def test_same_seed_gives_same_documents(mode):
+    first, second = mongomock.MongoClient().a, mongomock.MongoClient().b
+    assert _seed(first, mode) == COUNTS
+    _seed(second, mode)
+    assert _snapshot(first) == _snapshot(second)
+
+
+def test_chunks_do_not_depend_on_order():
+    # A worker generating a chunk on its own gets the same documents as a sequential run
+    ctx = build_context(COUNTS, 11, REFERENCE_TIME)
+    later = generate_documents("enrollments", 50, 75, ctx)
+    generate_documents("enrollments", 0, 50, ctx)
+    assert generate_documents("enrollments", 50, 75, ctx) == later
+
+
+def test_vectorized_dates_are_utc_whatever_the_reference_zone():
+    # The same instant written in another zone gives the same (naive UTC) dates
+    shifted = REFERENCE_TIME.astimezone(timezone(timedelta(hours=-5)))
+    utc = generate_documents_vectorized("enrollments", 0, 10, build_context(COUNTS, 11, REFERENCE_TIME, "vectorized"))
+    local = generate_documents_vectorized("enrollments", 0, 10, build_context(COUNTS, 11, shifted, "vectorized"))
+    assert [doc["enrolledAt"] for doc in local] == [doc["enrolledAt"] for doc in utc]
+    assert all(doc["enrolledAt"] <= datetime(2025, 1, 1) for doc in utc)
+
+
+def test_different_seeds_differ():
+    a = generate_documents("courses", 0, 5, build_context(COUNTS, 1, REFERENCE_TIME))
+    b = generate_documents("courses", 0, 5, build_context(COUNTS, 2, REFERENCE_TIME))
+    assert [doc["courseId"] for doc in a] != [doc["courseId"] for doc in b]
+
+
+@pytest.mark.parametrize("mode", ["faker", "vectorized"])
+def test_foreign_keys_resolve(db, mode):
+    _seed(db, mode)
+    instructors, _ = role_split(COUNTS["users"])
+    roles = {doc["userId"]: doc["role"] for doc in db.users.find()}
+
+    for child, field, parent, key in FOREIGN_KEYS:
+        parents = set(db[parent].distinct(key))
+        references = set(db[child].distinct(field))
+        assert references and references <= parents, f"{child}.{field} -> {parent}.{key}"
+
+    assert {roles[user] for user in db.courses.distinct("instructorId")} == {"instructor"}
+    assert {roles[user] for user in db.enrollments.distinct("studentId")} == {"student"}
+    assert sum(role == "instructor" for role in roles.values()) == instructors
+
+
+def test_make_id_is_stable_and_unique():
+    assert make_id(3, "users", 5) == make_id(3, "users", 5)
+    assert make_id(3, "users", 5).endswith("-000000000005")
+    assert len({make_id(3, "users", i) for i in range(1000)}) == 1000
+
+
+def test_build_context_rejects_orphans():
+    with pytest.raises(ValueError):
+        build_context({"courses": 3}, 0)
+    with pytest.raises(ValueError):
+        build_context({"users": 5, "submissions": 3}, 0)
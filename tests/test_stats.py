@@ -0,0 +1,112 @@
+
+# ### Materialized statistics: rebuild, watermark refresh and tombstones
+
+
+
+## Importing libraries
+from datetime import datetime, timedelta, timezone
+from eduhub import writes
+from eduhub.archive import archive_old_records
+from eduhub.stats import (
+    check_stats_consistency,
+    get_course_stats,
+    get_student_stats,
+    get_watermark,
+    rebuild_stats,
+    refresh_stats,
+    TOMBSTONE_TTL_SECONDS,
+    TOMBSTONES,
+    WATERMARKS
+)
+
+import pytest
+
+
+
+# Recent enough that the watermark is within the tombstones' TTL
+START = datetime.now(timezone.utc).replace(microsecond=0) - timedelta(days=1)
+
+
+
+
+def _enrollment(number, course, student, status="active", progress=0.0, minutes=0):
+    return {"enrollmentId": f"e{number}", "courseId": course, "studentId": student, "status": status,
+            "progress": progress, "enrolledAt": datetime(2023, 1, 1),
+            "updatedAt": START + timedelta(minutes=minutes)}
+
+
+@pytest.fixture
+def stats_db(db, server_stages):
+    db.enrollments.insert_many([
+        _enrollment(1, "c1", "s1", "completed", 100.0, minutes=-20),
+        _enrollment(2, "c1", "s2", "active", 50.0, minutes=-30),
+        _enrollment(3, "c2", "s1", "active", 20.0, minutes=-60)
+    ])
+    rebuild_stats(db)
+    return db
+
+
+def test_rebuild_materializes_both_collections(stats_db):
+    course = get_course_stats(stats_db, "c1")
+    assert (course["totalEnrollments"], course["completedCount"], course["completionRate"]) == (2, 1, 50.0)
+    assert get_student_stats(stats_db, "s1")["totalEnrollments"] == 2
+    assert get_watermark(stats_db) == (START - timedelta(minutes=20)).replace(tzinfo=None)
+    assert check_stats_consistency(stats_db) == {"course_stats": [], "student_stats": []}
+
+
+def test_refresh_regroups_only_changed_keys(stats_db):
+    db = stats_db
+    db.enrollments.update_one({"enrollmentId": "e2"}, {"$set": {"status": "completed", "progress": 100.0,
+                                                                  "updatedAt": START + timedelta(hours=1)}})
+    db.enrollments.insert_one(_enrollment(4, "c3", "s3", minutes=90))
+
+    refreshed = refresh_stats(db)
+    # c1, c3 and s2, s3 changed; e1 sits at the old watermark, so the overlap
+    # window re-reads it and regroups s1 as well
+    assert refreshed == {"course_stats": 2, "student_stats": 3}
+    assert get_course_stats(db, "c1")["completionRate"] == 100.0
+    assert get_course_stats(db, "c3")["totalEnrollments"] == 1
+    assert get_watermark(db) == (START + timedelta(minutes=90)).replace(tzinfo=None)
+    assert check_stats_consistency(db) == {"course_stats": [], "student_stats": []}
+
+
+def test_deleted_enrollments_leave_tombstones_for_the_refresh(stats_db):
+    db = stats_db
+    writes.delete_enrollment(db, "s1", "c2")
+    assert db[TOMBSTONES].count_documents({"courseId": "c2", "studentId": "s1"}) == 1
+
+    refresh_stats(db)
+    # c2 has no enrollments left, so its stats are removed
+    assert get_course_stats(db, "c2") is None
+    assert get_student_stats(db, "s1")["totalEnrollments"] == 1
+    assert check_stats_consistency(db) == {"course_stats": [], "student_stats": []}
+
+
+def test_archived_enrollments_leave_the_stats(stats_db):
+    db = stats_db
+    archive_old_records(db, "enrollments", cutoff=datetime(2024, 1, 1))
+    refresh_stats(db)
+    assert get_course_stats(db, "c1")["totalEnrollments"] == 1
+    assert get_student_stats(db, "s1")["totalEnrollments"] == 1
+    assert check_stats_consistency(db) == {"course_stats": [], "student_stats": []}
+
+
+def test_refresh_without_watermark_or_after_the_ttl_rebuilds(stats_db):
+    db = stats_db
+    db[WATERMARKS].delete_many({})
+    assert refresh_stats(db) == {"course_stats": None, "student_stats": None}
+
+    stale = datetime.now(timezone.utc) - timedelta(seconds=TOMBSTONE_TTL_SECONDS + 60)
+    db[WATERMARKS].update_one({}, {"$set": {"watermark": stale}})
+    assert refresh_stats(db) == {"course_stats": None, "student_stats": None}
+
+
+def test_consistency_check_reports_drift(stats_db):
+    db = stats_db
+    db.course_stats.update_one({"_id": "c1"}, {"$set": {"totalEnrollments": 5}})
+    db.student_stats.delete_one({"_id": "s2"})
+    db.course_stats.insert_one({"_id": "gone", "totalEnrollments": 1})
+    report = check_stats_consistency(db)
+    assert report["course_stats"] == [{"_id": "c1", "fields": {"totalEnrollments": (5, 2)}},
+                                      {"_id": "gone", "extra": True}]
+    assert report["student_stats"] == [{"_id": "s2", "missing": True}]
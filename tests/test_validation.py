@@ -0,0 +1,66 @@
+
+# ### Client-side validators compiled from the collection schemas
+
+
+
+## Importing libraries
+from bson import Int64
+from datetime import datetime, timezone
+from eduhub.seed import SAMPLE_COUNTS, build_context, generate_documents
+from eduhub.validation import compile_schema, default_validators, screen_documents
+from eduhub.schema import COLLECTION_SCHEMAS
+
+import pytest
+
+
+
+ENROLLMENT = {"enrollmentId": "e1", "studentId": "s1", "courseId": "c1", "status": "active",
+              "enrolledAt": datetime(2025, 1, 1, tzinfo=timezone.utc), "progress": 50.0}
+
+
+
+
+@pytest.mark.parametrize("collection", sorted(COLLECTION_SCHEMAS))
+def test_seeded_documents_pass(collection):
+    ctx = build_context(SAMPLE_COUNTS, 5, datetime(2025, 1, 1, tzinfo=timezone.utc))
+    validate = default_validators()[collection]
+    assert [validate(doc) for doc in generate_documents(collection, 0, 50, ctx)] == [[]] * 50
+
+
+def test_reports_each_violation_with_its_path():
+    validate = default_validators()["users"]
+    errors = validate({"userId": "u1", "email": "no-at-sign", "firstName": "Ada", "role": "admin",
+                       "isActive": 1, "profile": {"skills": ["python", 2]}})
+    assert any(error.startswith("lastName") for error in errors)
+    assert any(error.startswith("email:") for error in errors)
+    assert any(error.startswith("role:") for error in errors)
+    assert "profile.skills[1]: expected string, got int" in errors
+    assert "isActive: expected bool, got int" in errors
+
+
+def test_numeric_types_and_bounds():
+    validate = default_validators()["enrollments"]
+    assert validate(ENROLLMENT) == []
+    assert validate({**ENROLLMENT, "progress": 50}) == ["progress: expected double, got int"]
+    assert validate({**ENROLLMENT, "progress": 101.0}) == ["progress: 101.0 is above the maximum 100"]
+
+    count = compile_schema({"bsonType": "object", "properties": {"n": {"bsonType": "long"}}})
+    assert count({"n": Int64(3)}) == []
+    assert count({"n": 2**40}) == []
+    assert count({"n": 3}) != []
+
+
+def test_unsupported_schema_is_rejected():
+    with pytest.raises(ValueError):
+        compile_schema({"bsonType": "object", "oneOf": []})
+    with pytest.raises(ValueError):
+        compile_schema({"bsonType": "uuid"})
+
+
+def test_screen_documents_splits_valid_and_rejects():
+    bad = {**ENROLLMENT, "status": "paused"}
+    valid, rejects = screen_documents([ENROLLMENT, bad, ENROLLMENT], default_validators()["enrollments"])
+    assert valid == [ENROLLMENT, ENROLLMENT]
+    assert len(rejects) == 1
+    assert rejects[0][0] is bad
+    assert rejects[0][1] == ["status: 'paused' is not one of ['active', 'completed', 'dropped']"]